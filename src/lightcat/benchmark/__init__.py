@@ -0,0 +1,29 @@
+r"""Contain benchmarks to measure the performance of lightcat."""
+
+from __future__ import annotations
+
+__all__ = [
+    "compare_results",
+    "format_comparison",
+    "get_environment_info",
+    "get_factory_benchmarks",
+    "get_peak_rss",
+    "load_results",
+    "measure",
+    "run_allreduce_benchmark",
+    "run_factory_benchmarks",
+    "run_training_benchmark",
+    "save_results",
+]
+
+from lightcat.benchmark.allreduce import run_allreduce_benchmark
+from lightcat.benchmark.factory import get_factory_benchmarks, run_factory_benchmarks
+from lightcat.benchmark.training import get_peak_rss, run_training_benchmark
+from lightcat.benchmark.utils import (
+    compare_results,
+    format_comparison,
+    get_environment_info,
+    load_results,
+    measure,
+    save_results,
+)
@@ -0,0 +1,10 @@
+r"""Run the benchmarks from the command line."""
+
+from __future__ import annotations
+
+import sys
+
+from lightcat.benchmark.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
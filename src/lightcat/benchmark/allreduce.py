@@ -0,0 +1,323 @@
+r"""Contain a benchmark to measure the gradient all-reduce time of the
+DDP communication hooks with several local ``gloo`` processes."""
+
+from __future__ import annotations
+
+__all__ = ["run_allreduce_benchmark"]
+
+import copy
+import json
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import torch
+from torch import distributed as dist
+from torch import multiprocessing as mp
+from torch.nn.parallel import DistributedDataParallel
+
+from lightcat.benchmark.training import _compute_distribution
+from lightcat.benchmark.utils import get_environment_info
+from lightcat.datamodule.creator import setup_datamodule_creator
+from lightcat.model.creator import setup_model_creator
+from lightcat.trainer.ddp import COMM_HOOKS, register_comm_hook
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+
+    from lightning import LightningModule
+
+    from lightcat.datamodule.creator import BaseDataModuleCreator
+    from lightcat.model.creator import BaseModelCreator
+
+logger = logging.getLogger(__name__)
+
+# The PowerSGD hook uses the default all-reduce during the first
+# ``start_powerSGD_iter`` steps, so the compression starts during the
+# warmup steps by default.
+DEFAULT_POWERSGD = {"matrix_approximation_rank": 1, "start_powerSGD_iter": 2}
+
+
+class _TrainingStepModule(torch.nn.Module):
+    r"""Implement a module that computes the training loss of a
+    ``LightningModule`` in ``forward``, so ``DistributedDataParallel``
+    synchronizes the gradients of the training loss.
+
+    Args:
+        model: The model.
+    """
+
+    def __init__(self, model: LightningModule) -> None:
+        super().__init__()
+        self.model = model
+
+    def forward(self, batch: Any) -> torch.Tensor:
+        output = self.model.training_step(batch, 0)
+        return output["loss"] if isinstance(output, dict) else output
+
+
+def run_allreduce_benchmark(
+    model: BaseModelCreator | dict,
+    datamodule: BaseDataModuleCreator | dict,
+    comm_hooks: Sequence[str | None] = (None, "fp16", "bf16", "powersgd"),
+    bucket_cap_mb: Sequence[float] = (25.0,),
+    num_processes: int = 2,
+    warmup_steps: int = 5,
+    num_steps: int = 20,
+    num_threads: int = 1,
+    powersgd: Mapping[str, Any] | None = None,
+    seed: int = 0,
+) -> dict[str, Any]:
+    r"""Measure the gradient all-reduce time of the DDP communication
+    hooks with several local ``gloo`` processes.
+
+    ``num_processes`` processes are started on the current machine
+    and each process trains the same model on the first batch of the
+    training dataloader, with ``DistributedDataParallel`` over
+    ``gloo``. For each communication hook and bucket size, the time
+    of the training steps with the gradient all-reduce is compared to
+    the time of the training steps without synchronization
+    (``no_sync``), so the difference of their medians is the
+    all-reduce time per step that is not hidden by the backward pass.
+    The time of a step is the maximum time across the processes. The
+    processes share the CPUs of the machine, so the results measure
+    the communication overhead of the hooks rather than the network
+    bandwidth of a multi-node run.
+
+    Args:
+        model: The model creator or its configuration.
+        datamodule: The datamodule creator or its configuration.
+        comm_hooks: The names of the communication hooks to measure.
+            ``None`` is the default all-reduce. See
+            ``lightcat.trainer.ddp.get_comm_hook`` for the valid
+            names.
+        bucket_cap_mb: The bucket sizes in MB to measure.
+        num_processes: The number of processes.
+        warmup_steps: The number of training steps before the timed
+            steps of each configuration.
+        num_steps: The number of timed training steps of each
+            configuration.
+        num_threads: The number of threads used by PyTorch in each
+            process.
+        powersgd: The keyword arguments of ``PowerSGDState``. If
+            ``None``, the compression starts at the third step.
+        seed: The random seed used to create the model.
+
+    Returns:
+        The benchmark results. ``'benchmarks'`` contains the
+            distribution of the step time without synchronization
+            (``'allreduce.no_sync.step_time'``), and the distribution
+            of the step time (``'allreduce.<hook>.bucket_<size>mb.step_time'``)
+            and the all-reduce time
+            (``'allreduce.<hook>.bucket_<size>mb.comm_time'``) of each
+            configuration. ``'gradients'`` contains the number of
+            parameters and the size of the gradients in MB.
+
+    Raises:
+        ValueError: if a communication hook is not valid, if
+            ``num_processes`` or ``num_steps`` is lower than 1, or if
+            ``warmup_steps`` is negative.
+
+    Example usage:
+
+    The example is not run by the doctests because it starts several
+    processes.
+
+    ```python
+
+    from lightcat.benchmark import run_allreduce_benchmark
+
+    results = run_allreduce_benchmark(
+        model={
+            "_target_": "lightcat.model.creator.ModelCreator",
+            "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+        },
+        datamodule={
+            "_target_": "lightcat.datamodule.creator.DataModuleCreator",
+            "datamodule": {
+                "_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"
+            },
+        },
+        comm_hooks=[None, "fp16"],
+        warmup_steps=2,
+        num_steps=5,
+    )
+    sorted(results["benchmarks"])
+    # ['allreduce.fp16.bucket_25mb.comm_time', 'allreduce.fp16.bucket_25mb.step_time',
+    #  'allreduce.no_sync.step_time', 'allreduce.none.bucket_25mb.comm_time',
+    #  'allreduce.none.bucket_25mb.step_time']
+
+    ```
+    """
+    for comm_hook in comm_hooks:
+        if comm_hook is not None and comm_hook not in COMM_HOOKS:
+            msg = (
+                f"Incorrect communication hook: {comm_hook}. "
+                f"The valid hooks are: {(None, *COMM_HOOKS)}"
+            )
+            raise ValueError(msg)
+    if num_processes < 1:
+        msg = f"num_processes must be greater than 0 (received: {num_processes})"
+        raise ValueError(msg)
+    if warmup_steps < 0:
+        msg = f"warmup_steps must be greater or equal to 0 (received: {warmup_steps})"
+        raise ValueError(msg)
+    if num_steps < 1:
+        msg = f"num_steps must be greater than 0 (received: {num_steps})"
+        raise ValueError(msg)
+
+    config = {
+        "comm_hooks": list(comm_hooks),
+        "bucket_cap_mb": list(bucket_cap_mb),
+        "num_processes": num_processes,
+        "warmup_steps": warmup_steps,
+        "num_steps": num_steps,
+        "num_threads": num_threads,
+        "powersgd": dict(DEFAULT_POWERSGD if powersgd is None else powersgd),
+        "seed": seed,
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_path = Path(tmpdir).joinpath("results.json")
+        context = mp.spawn(
+            _run_worker,
+            args=(
+                num_processes,
+                str(Path(tmpdir).joinpath("init")),
+                str(output_path),
+                model,
+                datamodule,
+                config,
+            ),
+            nprocs=num_processes,
+            join=False,
+        )
+        try:
+            # join raises an exception and terminates the other
+            # processes if a process fails.
+            while not context.join():
+                pass
+        finally:
+            _terminate_processes(context.processes)
+        results = json.loads(output_path.read_text())
+    return {"environment": get_environment_info(), "config": config, **results}
+
+
+def _run_worker(
+    rank: int,
+    world_size: int,
+    init_file: str,
+    output_path: str,
+    model: BaseModelCreator | dict,
+    datamodule: BaseDataModuleCreator | dict,
+    config: dict[str, Any],
+) -> None:
+    r"""Run the benchmark in a process.
+
+    Args:
+        rank: The rank of the process.
+        world_size: The number of processes.
+        init_file: The file used to initialize the process group.
+        output_path: The path to the JSON file where the rank 0 saves
+            the results.
+        model: The model creator or its configuration.
+        datamodule: The datamodule creator or its configuration.
+        config: The benchmark configuration.
+    """
+    torch.set_num_threads(config["num_threads"])
+    dist.init_process_group(
+        "gloo", init_method=f"file://{init_file}", rank=rank, world_size=world_size
+    )
+    try:
+        torch.manual_seed(config["seed"])
+        module = _TrainingStepModule(setup_model_creator(model).create())
+        dm = setup_datamodule_creator(datamodule).create()
+        dm.prepare_data()
+        dm.setup("fit")
+        batch = next(iter(dm.train_dataloader()))
+        num_steps = config["warmup_steps"] + config["num_steps"]
+
+        benchmarks = {}
+        ddp = DistributedDataParallel(copy.deepcopy(module))
+        no_sync = _measure_steps(ddp, batch, num_steps, sync=False)[config["warmup_steps"] :]
+        benchmarks["allreduce.no_sync.step_time"] = _compute_distribution(no_sync)
+        for comm_hook in config["comm_hooks"]:
+            for bucket_cap_mb in config["bucket_cap_mb"]:
+                ddp = DistributedDataParallel(copy.deepcopy(module), bucket_cap_mb=bucket_cap_mb)
+                if comm_hook is not None:
+                    register_comm_hook(ddp, comm_hook, powersgd=config["powersgd"])
+                step_times = _measure_steps(ddp, batch, num_steps, sync=True)
+                step_times = step_times[config["warmup_steps"] :]
+                name = f"allreduce.{comm_hook or 'none'}.bucket_{bucket_cap_mb:g}mb"
+                benchmarks[f"{name}.step_time"] = _compute_distribution(step_times)
+                benchmarks[f"{name}.comm_time"] = {
+                    "median": statistics.median(step_times) - statistics.median(no_sync)
+                }
+        params = [param for param in module.parameters() if param.requires_grad]
+        if rank == 0:
+            Path(output_path).write_text(
+                json.dumps(
+                    {
+                        "benchmarks": benchmarks,
+                        "gradients": {
+                            "num_parameters": sum(param.numel() for param in params),
+                            "size_mb": sum(param.numel() * param.element_size() for param in params)
+                            / 2**20,
+                        },
+                    }
+                )
+            )
+        # The processes leave the process group at the same time.
+        dist.barrier()
+    finally:
+        dist.destroy_process_group()
+
+
+def _terminate_processes(processes: Sequence[mp.Process]) -> None:
+    r"""Terminate the worker processes that are still running.
+
+    The worker processes are still running if the main process is
+    interrupted, for example by a timeout, while it waits for them.
+
+    Args:
+        processes: The worker processes.
+    """
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join()
+
+
+def _measure_steps(
+    model: DistributedDataParallel, batch: Any, num_steps: int, sync: bool
+) -> list[float]:
+    r"""Measure the time of some training steps.
+
+    Args:
+        model: The model.
+        batch: The batch used at each step.
+        num_steps: The number of steps.
+        sync: If ``True``, the gradients are synchronized at each
+            step, otherwise the steps run in ``no_sync``.
+
+    Returns:
+        The maximum time of each step across the processes, in
+            seconds.
+    """
+    times = []
+    for _ in range(num_steps):
+        model.zero_grad(set_to_none=True)
+        dist.barrier()
+        start_time = time.perf_counter()
+        if sync:
+            model(batch).backward()
+        else:
+            with model.no_sync():
+                model(batch).backward()
+        times.append(time.perf_counter() - start_time)
+    times = torch.tensor(times, dtype=torch.float64)
+    dist.all_reduce(times, op=dist.ReduceOp.MAX)
+    return times.tolist()
@@ -0,0 +1,261 @@
+r"""Contain the command line interface to run the benchmarks.
+
+Example usage:
+
+```bash
+python -m lightcat.benchmark factory --output results.json
+python -m lightcat.benchmark factory --baseline results.json --threshold 0.1
+python -m lightcat.benchmark training --config config.json --num-threads 4
+python -m lightcat.benchmark allreduce --config config.json --comm-hooks none bf16 powersgd
+```
+
+The configuration file of the ``training`` benchmark is a JSON file
+with the ``trainer``, ``model`` and ``datamodule`` creator
+configurations. The ``allreduce`` benchmark only uses the ``model``
+and ``datamodule`` creator configurations.
+"""
+
+from __future__ import annotations
+
+__all__ = ["main"]
+
+import argparse
+import json
+import logging
+from typing import TYPE_CHECKING, Any
+
+from lightcat.benchmark.allreduce import run_allreduce_benchmark
+from lightcat.benchmark.factory import get_factory_benchmarks, run_factory_benchmarks
+from lightcat.benchmark.training import run_training_benchmark
+from lightcat.benchmark.utils import (
+    compare_results,
+    format_comparison,
+    load_results,
+    save_results,
+)
+from lightcat.trainer.ddp import COMM_HOOKS
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def main(args: Sequence[str] | None = None) -> int:
+    r"""Run the benchmark command line interface.
+
+    Args:
+        args: The command line arguments. If ``None``, the arguments
+            of the current process are used.
+
+    Returns:
+        The exit code: ``1`` if a regression is found when comparing
+            to the baseline, otherwise ``0``.
+    """
+    parser = create_parser()
+    options = parser.parse_args(args)
+    results = options.run(options)
+    print(json.dumps(results["benchmarks"], indent=2, sort_keys=True))  # noqa: T201
+    if options.output:
+        save_results(results, options.output)
+    if options.baseline:
+        comparison = compare_results(
+            results, load_results(options.baseline), threshold=options.threshold
+        )
+        print(format_comparison(comparison))  # noqa: T201
+        if any(row["status"] == "regression" for row in comparison.values()):
+            return 1
+    return 0
+
+
+def create_parser() -> argparse.ArgumentParser:
+    r"""Create the parser of the command line interface.
+
+    Returns:
+        The parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m lightcat.benchmark", description="Run the lightcat benchmarks."
+    )
+    subparsers = parser.add_subparsers(title="benchmarks", required=True)
+
+    factory = subparsers.add_parser(
+        "factory", help="Measure the overhead of the factories and creators."
+    )
+    factory.add_argument(
+        "--benchmarks",
+        nargs="+",
+        choices=sorted(get_factory_benchmarks()),
+        help="The benchmarks to run. By default, all the benchmarks are run.",
+    )
+    factory.add_argument(
+        "--number", type=int, default=10, help="The number of calls in each measurement."
+    )
+    factory.add_argument("--repeat", type=int, default=5, help="The number of measurements.")
+    factory.add_argument(
+        "--warmup", type=int, default=1, help="The number of calls before the measurements."
+    )
+    _add_common_arguments(factory)
+    factory.set_defaults(run=_run_factory)
+
+    training = subparsers.add_parser(
+        "training", help="Measure the training throughput of a configuration."
+    )
+    training.add_argument(
+        "--config",
+        required=True,
+        help="The path to the JSON file with the trainer, model and datamodule creator "
+        "configurations.",
+    )
+    training.add_argument(
+        "--warmup-steps",
+        type=int,
+        default=5,
+        help="The number of training steps before the timed steps.",
+    )
+    training.add_argument(
+        "--num-steps", type=int, default=50, help="The number of timed training steps."
+    )
+    training.add_argument(
+        "--num-threads", type=int, help="The number of threads used by PyTorch on CPU."
+    )
+    training.add_argument("--seed", type=int, help="The random seed.")
+    _add_common_arguments(training)
+    training.set_defaults(run=_run_training)
+
+    allreduce = subparsers.add_parser(
+        "allreduce",
+        help="Measure the gradient all-reduce time of the DDP communication hooks with "
+        "several local gloo processes.",
+    )
+    allreduce.add_argument(
+        "--config",
+        required=True,
+        help="The path to the JSON file with the model and datamodule creator configurations.",
+    )
+    allreduce.add_argument(
+        "--comm-hooks",
+        nargs="+",
+        choices=["none", *COMM_HOOKS],
+        default=["none", *COMM_HOOKS],
+        help="The communication hooks to measure. 'none' is the default all-reduce.",
+    )
+    allreduce.add_argument(
+        "--bucket-cap-mb",
+        nargs="+",
+        type=float,
+        default=[25.0],
+        help="The bucket sizes in MB to measure.",
+    )
+    allreduce.add_argument(
+        "--num-processes", type=int, default=2, help="The number of gloo processes."
+    )
+    allreduce.add_argument(
+        "--warmup-steps",
+        type=int,
+        default=5,
+        help="The number of training steps before the timed steps of each configuration.",
+    )
+    allreduce.add_argument(
+        "--num-steps",
+        type=int,
+        default=20,
+        help="The number of timed training steps of each configuration.",
+    )
+    allreduce.add_argument(
+        "--num-threads",
+        type=int,
+        default=1,
+        help="The number of threads used by PyTorch in each process.",
+    )
+    allreduce.add_argument("--seed", type=int, default=0, help="The random seed.")
+    _add_common_arguments(allreduce)
+    allreduce.set_defaults(run=_run_allreduce)
+    return parser
+
+
+def _add_common_arguments(parser: argparse.ArgumentParser) -> None:
+    r"""Add the arguments shared by all the benchmarks.
+
+    Args:
+        parser: The parser of a benchmark.
+    """
+    parser.add_argument("--output", help="The path to the JSON file to save the results.")
+    parser.add_argument(
+        "--baseline", help="The path to the JSON file with the baseline results to compare."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="The relative slowdown above which a benchmark is a regression.",
+    )
+
+
+def _run_factory(options: argparse.Namespace) -> dict[str, Any]:
+    r"""Run the benchmarks of the factories and creators.
+
+    Args:
+        options: The command line options.
+
+    Returns:
+        The benchmark results.
+    """
+    return run_factory_benchmarks(
+        names=options.benchmarks,
+        number=options.number,
+        repeat=options.repeat,
+        warmup=options.warmup,
+    )
+
+
+def _run_training(options: argparse.Namespace) -> dict[str, Any]:
+    r"""Run the training throughput benchmark.
+
+    Args:
+        options: The command line options.
+
+    Returns:
+        The benchmark results.
+    """
+    config = load_results(options.config)
+    results = run_training_benchmark(
+        trainer=config["trainer"],
+        model=config["model"],
+        datamodule=config["datamodule"],
+        warmup_steps=options.warmup_steps,
+        num_steps=options.num_steps,
+        num_threads=options.num_threads,
+        seed=options.seed,
+    )
+    print(  # noqa: T201
+        json.dumps(
+            {"throughput": results["throughput"], "memory": results["memory"]},
+            indent=2,
+            sort_keys=True,
+        )
+    )
+    return results
+
+
+def _run_allreduce(options: argparse.Namespace) -> dict[str, Any]:
+    r"""Run the gradient all-reduce benchmark.
+
+    Args:
+        options: The command line options.
+
+    Returns:
+        The benchmark results.
+    """
+    config = load_results(options.config)
+    return run_allreduce_benchmark(
+        model=config["model"],
+        datamodule=config["datamodule"],
+        comm_hooks=[None if hook == "none" else hook for hook in options.comm_hooks],
+        bucket_cap_mb=options.bucket_cap_mb,
+        num_processes=options.num_processes,
+        warmup_steps=options.warmup_steps,
+        num_steps=options.num_steps,
+        num_threads=options.num_threads,
+        seed=options.seed,
+    )
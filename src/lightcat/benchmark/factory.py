@@ -0,0 +1,139 @@
+r"""Contain benchmarks to measure the overhead of the factories and
+creators."""
+
+from __future__ import annotations
+
+__all__ = ["get_factory_benchmarks", "run_factory_benchmarks"]
+
+import copy
+import logging
+from typing import TYPE_CHECKING, Any
+
+from lightcat.benchmark.utils import get_environment_info, measure
+from lightcat.callback import setup_callback, setup_list_callbacks
+from lightcat.datamodule import setup_datamodule
+from lightcat.datamodule.creator import DataModuleCreator
+from lightcat.model import setup_model
+from lightcat.model.creator import ModelCreator
+from lightcat.trainer import setup_trainer
+from lightcat.trainer.creator import TrainerCreator
+from lightcat.utils import setup_object
+from lightcat.utils.imports import check_objectory
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+logger = logging.getLogger(__name__)
+
+CALLBACK_CONFIG = {
+    "_target_": "lightning.pytorch.callbacks.EarlyStopping",
+    "monitor": "loss",
+}
+DATAMODULE_CONFIG = {"_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"}
+MODEL_CONFIG = {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"}
+OBJECT_CONFIG = {"_target_": "torch.nn.Linear", "in_features": 4, "out_features": 6}
+TRAINER_CONFIG = {
+    "_target_": "lightning.Trainer",
+    "accelerator": "cpu",
+    "devices": 1,
+    "logger": False,
+    "enable_checkpointing": False,
+    "enable_progress_bar": False,
+    "enable_model_summary": False,
+}
+
+
+def get_factory_benchmarks() -> dict[str, Callable[[], Any]]:
+    r"""Get the benchmarks of the factories and creators.
+
+    Each benchmark instantiates an object from its configuration.
+    The configurations are copied before each call because some
+    factories can modify their input configuration.
+
+    Returns:
+        The benchmark functions.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.benchmark import get_factory_benchmarks
+    >>> benchmarks = get_factory_benchmarks()
+    >>> sorted(benchmarks)
+    ['DataModuleCreator.create', 'ModelCreator.create', 'TrainerCreator.create',
+     'setup_callback', 'setup_datamodule', 'setup_list_callbacks', 'setup_model',
+     'setup_object', 'setup_trainer']
+
+    ```
+    """
+    check_objectory()
+
+    def config(cfg: dict) -> dict:
+        return copy.deepcopy(cfg)
+
+    return {
+        "setup_object": lambda: setup_object(config(OBJECT_CONFIG)),
+        "setup_callback": lambda: setup_callback(config(CALLBACK_CONFIG)),
+        "setup_list_callbacks": lambda: setup_list_callbacks(
+            [config(CALLBACK_CONFIG), {"_target_": "lightning.pytorch.callbacks.ModelSummary"}]
+        ),
+        "setup_trainer": lambda: setup_trainer(config(TRAINER_CONFIG)),
+        "setup_model": lambda: setup_model(config(MODEL_CONFIG)),
+        "setup_datamodule": lambda: setup_datamodule(config(DATAMODULE_CONFIG)),
+        "TrainerCreator.create": lambda: TrainerCreator(config(TRAINER_CONFIG)).create(),
+        "ModelCreator.create": lambda: ModelCreator(config(MODEL_CONFIG)).create(),
+        "DataModuleCreator.create": lambda: DataModuleCreator(config(DATAMODULE_CONFIG)).create(),
+    }
+
+
+def run_factory_benchmarks(
+    names: Sequence[str] | None = None, number: int = 10, repeat: int = 5, warmup: int = 1
+) -> dict[str, Any]:
+    r"""Run the benchmarks of the factories and creators.
+
+    Args:
+        names: The names of the benchmarks to run. If ``None``, all
+            the benchmarks are run.
+        number: The number of calls in each measurement.
+        repeat: The number of measurements.
+        warmup: The number of calls before the measurements.
+
+    Returns:
+        The benchmark results, with the environment information in
+            ``'environment'`` and the time statistics of each
+            benchmark in ``'benchmarks'``.
+
+    Raises:
+        ValueError: if a benchmark name is invalid.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.benchmark import run_factory_benchmarks
+    >>> results = run_factory_benchmarks(["setup_object"], number=2, repeat=2)
+    >>> sorted(results)
+    ['benchmarks', 'environment']
+    >>> sorted(results["benchmarks"])
+    ['setup_object']
+
+    ```
+    """
+    benchmarks = get_factory_benchmarks()
+    if names is None:
+        names = list(benchmarks)
+    for name in names:
+        if name not in benchmarks:
+            msg = f"Incorrect benchmark name '{name}'. The valid names are: {sorted(benchmarks)}"
+            raise ValueError(msg)
+
+    # The factories log at the INFO level at each call.
+    disabled = logging.root.manager.disable
+    logging.disable(logging.INFO)
+    try:
+        results = {}
+        for name in names:
+            results[name] = measure(benchmarks[name], number=number, repeat=repeat, warmup=warmup)
+    finally:
+        logging.disable(disabled)
+    return {"environment": get_environment_info(), "benchmarks": results}
@@ -0,0 +1,307 @@
+r"""Contain a benchmark to measure the training throughput of a
+configuration."""
+
+from __future__ import annotations
+
+__all__ = ["get_peak_rss", "run_training_benchmark"]
+
+import logging
+import math
+import statistics
+import sys
+import time
+from typing import TYPE_CHECKING, Any
+
+import torch
+from lightning import Callback, seed_everything
+from lightning.pytorch.utilities.data import extract_batch_size
+
+from lightcat.benchmark.utils import get_environment_info
+from lightcat.datamodule.creator import setup_datamodule_creator
+from lightcat.model.creator import setup_model_creator
+from lightcat.trainer.creator import setup_trainer_creator
+
+if TYPE_CHECKING:
+    from lightning import LightningModule, Trainer
+
+    from lightcat.datamodule.creator import BaseDataModuleCreator
+    from lightcat.model.creator import BaseModelCreator
+    from lightcat.trainer.creator import BaseTrainerCreator
+
+logger = logging.getLogger(__name__)
+
+
+class _TrainingBenchmarkCallback(Callback):
+    r"""Implement a callback to record the time of each training step.
+
+    The training is stopped after ``num_steps`` steps.
+
+    Args:
+        num_steps: The number of training steps to run.
+    """
+
+    def __init__(self, num_steps: int) -> None:
+        self._num_steps = num_steps
+        self.train_start_time: float | None = None
+        self.first_batch_start_time: float | None = None
+        # The end time of each step.
+        self.step_end_times: list[float] = []
+        self.batch_sizes: list[int | None] = []
+
+    def on_train_start(self, trainer: Trainer, pl_module: LightningModule) -> None:  # noqa: ARG002
+        self.train_start_time = time.perf_counter()
+
+    def on_train_batch_start(
+        self,
+        trainer: Trainer,  # noqa: ARG002
+        pl_module: LightningModule,  # noqa: ARG002
+        batch: Any,
+        batch_idx: int,  # noqa: ARG002
+    ) -> None:
+        if self.first_batch_start_time is None:
+            self.first_batch_start_time = time.perf_counter()
+        self.batch_sizes.append(_get_batch_size(batch))
+
+    def on_train_batch_end(
+        self,
+        trainer: Trainer,
+        pl_module: LightningModule,  # noqa: ARG002
+        outputs: Any,  # noqa: ARG002
+        batch: Any,  # noqa: ARG002
+        batch_idx: int,  # noqa: ARG002
+    ) -> None:
+        self.step_end_times.append(time.perf_counter())
+        if len(self.step_end_times) >= self._num_steps:
+            trainer.should_stop = True
+
+
+def run_training_benchmark(
+    trainer: BaseTrainerCreator | dict,
+    model: BaseModelCreator | dict,
+    datamodule: BaseDataModuleCreator | dict,
+    warmup_steps: int = 5,
+    num_steps: int = 50,
+    num_threads: int | None = None,
+    seed: int | None = None,
+) -> dict[str, Any]:
+    r"""Measure the training throughput of a configuration.
+
+    The trainer, model and datamodule are created with their
+    creators, then the model is trained for ``warmup_steps`` steps
+    that are not measured, followed by ``num_steps`` timed steps. The
+    time of a step is the time between the end of two consecutive
+    training steps, so it includes the data loading time. The trainer
+    configuration should allow enough steps, for example with
+    ``max_epochs`` or ``max_steps``. It is recommended to disable the
+    sanity check, logger and checkpointing, otherwise their time is
+    included in the startup time.
+
+    Args:
+        trainer: The trainer creator or its configuration.
+        model: The model creator or its configuration.
+        datamodule: The datamodule creator or its configuration.
+        warmup_steps: The number of training steps before the timed
+            steps.
+        num_steps: The number of timed training steps.
+        num_threads: The number of threads used by PyTorch on CPU. If
+            ``None``, the default value is used.
+        seed: The random seed. If ``None``, the seed is not set.
+
+    Returns:
+        The benchmark results. ``'benchmarks'`` contains the
+            distribution of the step time in seconds
+            (``'training.step_time'``) and the time of each startup
+            phase in seconds (``'training.startup.<phase>'``).
+            ``'throughput'`` contains the number of samples and
+            steps per second, and ``'memory'`` contains the peak
+            resident set size of the process in MB.
+
+    Raises:
+        ValueError: if ``warmup_steps`` is negative or if
+            ``num_steps`` is lower than 1.
+        RuntimeError: if the training stops before the end of the
+            timed steps.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.benchmark import run_training_benchmark
+    >>> results = run_training_benchmark(
+    ...     trainer={
+    ...         "_target_": "lightcat.trainer.creator.TrainerCreator",
+    ...         "trainer": {
+    ...             "_target_": "lightning.Trainer",
+    ...             "max_epochs": 1,
+    ...             "logger": False,
+    ...             "enable_checkpointing": False,
+    ...             "enable_progress_bar": False,
+    ...             "enable_model_summary": False,
+    ...             "num_sanity_val_steps": 0,
+    ...         },
+    ...     },
+    ...     model={
+    ...         "_target_": "lightcat.model.creator.ModelCreator",
+    ...         "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+    ...     },
+    ...     datamodule={
+    ...         "_target_": "lightcat.datamodule.creator.DataModuleCreator",
+    ...         "datamodule": {
+    ...             "_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"
+    ...         },
+    ...     },
+    ...     warmup_steps=2,
+    ...     num_steps=10,
+    ... )
+    >>> sorted(results)
+    ['benchmarks', 'config', 'environment', 'memory', 'throughput']
+    >>> results["benchmarks"]["training.step_time"]["number"]
+    10
+
+    ```
+    """
+    if warmup_steps < 0:
+        msg = f"warmup_steps must be greater or equal to 0 (received: {warmup_steps})"
+        raise ValueError(msg)
+    if num_steps < 1:
+        msg = f"num_steps must be greater than 0 (received: {num_steps})"
+        raise ValueError(msg)
+    if num_threads is not None:
+        torch.set_num_threads(num_threads)
+    if seed is not None:
+        seed_everything(seed)
+
+    startup = {}
+    start_time = time.perf_counter()
+    trainer = setup_trainer_creator(trainer).create()
+    startup["create_trainer"] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    model = setup_model_creator(model).create()
+    startup["create_model"] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    datamodule = setup_datamodule_creator(datamodule).create()
+    startup["create_datamodule"] = time.perf_counter() - start_time
+
+    callback = _TrainingBenchmarkCallback(num_steps=warmup_steps + num_steps)
+    trainer.callbacks.append(callback)
+    fit_start_time = time.perf_counter()
+    try:
+        trainer.fit(model, datamodule=datamodule)
+    finally:
+        trainer.callbacks.remove(callback)
+
+    if len(callback.step_end_times) < warmup_steps + num_steps:
+        msg = (
+            f"The training stopped after {len(callback.step_end_times):,} steps but "
+            f"{warmup_steps + num_steps:,} steps are required. Please increase the number of "
+            "training steps in the trainer configuration"
+        )
+        raise RuntimeError(msg)
+    startup["fit_setup"] = callback.train_start_time - fit_start_time
+    startup["first_batch"] = callback.first_batch_start_time - callback.train_start_time
+
+    # The first timed step starts at the end of the last warmup step,
+    # or at the start of the first batch if there is no warmup step.
+    end_times = [callback.first_batch_start_time, *callback.step_end_times]
+    step_times = [
+        end_times[i + 1] - end_times[i] for i in range(warmup_steps, warmup_steps + num_steps)
+    ]
+    batch_sizes = callback.batch_sizes[warmup_steps : warmup_steps + num_steps]
+    total_time = sum(step_times)
+    throughput = {"steps_per_sec": num_steps / total_time}
+    if all(batch_size is not None for batch_size in batch_sizes):
+        throughput["samples_per_sec"] = sum(batch_sizes) / total_time
+
+    return {
+        "environment": get_environment_info(),
+        "config": {
+            "warmup_steps": warmup_steps,
+            "num_steps": num_steps,
+            "num_threads": torch.get_num_threads(),
+            "seed": seed,
+        },
+        "benchmarks": {
+            "training.step_time": _compute_distribution(step_times),
+            **{f"training.startup.{phase}": {"median": value} for phase, value in startup.items()},
+        },
+        "throughput": throughput,
+        "memory": {"peak_rss_mb": get_peak_rss() / 2**20},
+    }
+
+
+def get_peak_rss() -> int:
+    r"""Get the peak resident set size of the current process.
+
+    Returns:
+        The peak resident set size in bytes, or ``0`` if it is not
+            available on the current platform.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.benchmark import get_peak_rss
+    >>> get_peak_rss() > 0
+    True
+
+    ```
+    """
+    try:
+        import resource  # noqa: PLC0415
+    except ImportError:  # pragma: no cover
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # The value is in bytes on macOS and in kilobytes on Linux.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _compute_distribution(values: list[float]) -> dict[str, float | int]:
+    r"""Compute the distribution statistics of some values.
+
+    Args:
+        values: The values.
+
+    Returns:
+        The distribution statistics.
+    """
+    ordered = sorted(values)
+    return {
+        "min": ordered[0],
+        "max": ordered[-1],
+        "mean": statistics.fmean(ordered),
+        "median": statistics.median(ordered),
+        "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "p90": _percentile(ordered, 0.9),
+        "p99": _percentile(ordered, 0.99),
+        "number": len(ordered),
+    }
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    r"""Compute a percentile with the nearest-rank method.
+
+    Args:
+        ordered: The sorted values.
+        q: The quantile, between 0 and 1.
+
+    Returns:
+        The percentile.
+    """
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+
+def _get_batch_size(batch: Any) -> int | None:
+    r"""Get the batch size of a batch.
+
+    Args:
+        batch: The batch.
+
+    Returns:
+        The batch size, or ``None`` if it cannot be found.
+    """
+    try:
+        return extract_batch_size(batch)
+    except Exception:  # noqa: BLE001
+        return None
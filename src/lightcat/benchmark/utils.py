@@ -0,0 +1,197 @@
+r"""Contain utility functions to run benchmarks and compare their
+results."""
+
+from __future__ import annotations
+
+__all__ = [
+    "compare_results",
+    "format_comparison",
+    "get_environment_info",
+    "load_results",
+    "measure",
+    "save_results",
+]
+
+import json
+import logging
+import platform
+import sys
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+import torch
+
+from lightcat.utils.timing import measure
+
+logger = logging.getLogger(__name__)
+
+
+def get_environment_info() -> dict[str, Any]:
+    r"""Get some information about the environment used to run the
+    benchmarks.
+
+    Returns:
+        The environment information.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.benchmark import get_environment_info
+    >>> info = get_environment_info()
+    >>> sorted(info)
+    ['machine', 'packages', 'platform', 'python', 'timestamp', 'torch_num_threads']
+
+    ```
+    """
+    packages = {
+        name: _get_package_version(name)
+        for name in ("lightcat", "lightning", "torch", "coola", "objectory")
+    }
+    return {
+        "timestamp": datetime.now(tz=timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "torch_num_threads": torch.get_num_threads(),
+        "packages": packages,
+    }
+
+
+def save_results(results: dict[str, Any], path: Path | str) -> None:
+    r"""Save benchmark results in a JSON file.
+
+    Args:
+        results: The benchmark results.
+        path: The path to the JSON file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Saving the benchmark results in {path}")
+    path.write_text(json.dumps(results, indent=2, sort_keys=True))
+
+
+def load_results(path: Path | str) -> dict[str, Any]:
+    r"""Load benchmark results from a JSON file.
+
+    Args:
+        path: The path to the JSON file.
+
+    Returns:
+        The benchmark results.
+    """
+    return json.loads(Path(path).read_text())
+
+
+def compare_results(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float = 0.2, key: str = "median"
+) -> dict[str, dict[str, Any]]:
+    r"""Compare benchmark results to baseline results.
+
+    Args:
+        results: The benchmark results. The statistics of each
+            benchmark are in ``results["benchmarks"]``.
+        baseline: The baseline results, with the same format as
+            ``results``.
+        threshold: The relative slowdown above which a benchmark is
+            a regression, and the relative speedup above which a
+            benchmark is an improvement.
+        key: The statistic used to compare the results.
+
+    Returns:
+        The comparison of each benchmark. The status is
+            ``'regression'``, ``'improvement'``, ``'ok'``, ``'new'``
+            if the benchmark is not in the baseline, or
+            ``'missing'`` if the benchmark is only in the baseline.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.benchmark import compare_results
+    >>> compare_results(
+    ...     {"benchmarks": {"a": {"median": 1.5}, "b": {"median": 1.0}}},
+    ...     {"benchmarks": {"a": {"median": 1.0}, "b": {"median": 1.0}}},
+    ... )
+    {'a': {'baseline': 1.0, 'current': 1.5, 'ratio': 1.5, 'status': 'regression'},
+     'b': {'baseline': 1.0, 'current': 1.0, 'ratio': 1.0, 'status': 'ok'}}
+
+    ```
+    """
+    current = results.get("benchmarks", {})
+    reference = baseline.get("benchmarks", {})
+    comparison = {}
+    for name in sorted(set(current) | set(reference)):
+        if name not in reference:
+            comparison[name] = {"current": current[name][key], "status": "new"}
+            continue
+        if name not in current:
+            comparison[name] = {"baseline": reference[name][key], "status": "missing"}
+            continue
+        value, ref_value = current[name][key], reference[name][key]
+        ratio = value / ref_value if ref_value > 0 else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        comparison[name] = {
+            "baseline": ref_value,
+            "current": value,
+            "ratio": ratio,
+            "status": status,
+        }
+    return comparison
+
+
+def format_comparison(comparison: dict[str, dict[str, Any]]) -> str:
+    r"""Format a comparison of benchmark results as a table.
+
+    Args:
+        comparison: The comparison generated by ``compare_results``.
+
+    Returns:
+        The formatted table.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.benchmark import format_comparison
+    >>> print(
+    ...     format_comparison(
+    ...         {"a": {"baseline": 1.0, "current": 1.5, "ratio": 1.5, "status": "regression"}}
+    ...     )
+    ... )
+    name  baseline     current      ratio    status
+    a     1.000e+00 s  1.500e+00 s  1.50x    regression
+
+    ```
+    """
+    width = max([len(name) for name in comparison] + [4])
+    lines = [f"{'name':<{width}}  {'baseline':<11}  {'current':<11}  {'ratio':<7}  status"]
+    for name, row in comparison.items():
+        baseline = f"{row['baseline']:.3e} s" if "baseline" in row else "-"
+        current = f"{row['current']:.3e} s" if "current" in row else "-"
+        ratio = f"{row['ratio']:.2f}x" if "ratio" in row else "-"
+        lines.append(f"{name:<{width}}  {baseline:<11}  {current:<11}  {ratio:<7}  {row['status']}")
+    return "\n".join(lines)
+
+
+def _get_package_version(name: str) -> str | None:
+    r"""Get the version of a package.
+
+    Args:
+        name: The package name.
+
+    Returns:
+        The package version, or ``None`` if the package is not
+            installed.
+    """
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
@@ -2,10 +2,30 @@ r"""Contain ``lightning.Callback`` and code to manage them."""
 
 from __future__ import annotations
 
-__all__ = ["is_callback_config", "setup_callback", "setup_list_callbacks"]
+__all__ = [
+    "AsyncCheckpointEvaluation",
+    "BufferedMetricLogger",
+    "FanOutCheckpoint",
+    "GradientMonitor",
+    "MetricCollectionCallback",
+    "SamplerCheckpoint",
+    "StreamingPredictionWriter",
+    "SubsetValidation",
+    "is_callback_config",
+    "setup_callback",
+    "setup_list_callbacks",
+]
 
 from lightcat.callback.factory import (
     is_callback_config,
     setup_callback,
     setup_list_callbacks,
 )
+from lightcat.callback.collection import MetricCollectionCallback
+from lightcat.callback.evaluation import AsyncCheckpointEvaluation
+from lightcat.callback.fanout import FanOutCheckpoint
+from lightcat.callback.gradient import GradientMonitor
+from lightcat.callback.metric import BufferedMetricLogger
+from lightcat.callback.prediction import StreamingPredictionWriter
+from lightcat.callback.sampler import SamplerCheckpoint
+from lightcat.callback.validation import SubsetValidation
@@ -0,0 +1,262 @@
+r"""Contain a callback to update, synchronize and log a collection of
+``torchmetrics.Metric`` objects."""
+
+from __future__ import annotations
+
+__all__ = ["MetricCollectionCallback"]
+
+import copy
+import logging
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any
+
+import torch
+from lightning import Callback
+
+from lightcat.utils.factory import setup_object
+from lightcat.utils.imports import check_torchmetrics
+from lightcat.utils.metric import supports_fused_sync, sync_metric_states
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from lightning import LightningModule, Trainer
+    from torchmetrics import Metric
+
+logger = logging.getLogger(__name__)
+
+# The prefix of the metric names for each stage.
+STAGES = {"train": "train/", "validation": "val/", "test": "test/"}
+
+
+class MetricCollectionCallback(Callback):
+    r"""Implement a callback to update, synchronize and log a collection
+    of ``torchmetrics.Metric`` objects.
+
+    The metrics are updated at each batch with the values of
+    ``input_keys`` in the output of the step, for example
+    ``validation_step`` must return ``{"preds": preds, "target":
+    target}`` with the default ``input_keys``. The metrics do not
+    synchronize their states during the epoch. At the end of the
+    epoch, the states of all the metrics are packed in a flat buffer
+    and synchronized with a single all-reduce by
+    ``lightcat.utils.metric.sync_metric_states``, instead of one
+    collective operation per state. The metrics with list states, for
+    example ``torchmetrics.classification.BinaryAUROC``, are
+    synchronized by ``torchmetrics`` in ``compute``. The values are
+    then logged with ``LightningModule.log`` and the metrics are
+    reset. A metric that returns a mapping is logged with one value
+    per key.
+
+    Each stage has its own copy of the metrics. The metric names are
+    prefixed by ``'train/'``, ``'val/'`` or ``'test/'``. The metrics
+    are not registered in the model, so they are not saved in the
+    checkpoints.
+
+    Args:
+        metrics: The metrics or their configurations.
+        stages: The stages where the metrics are computed. The valid
+            stages are ``'train'``, ``'validation'``, and ``'test'``.
+        input_keys: The keys of the step output that are given to the
+            ``update`` method of the metrics.
+
+    Raises:
+        ValueError: if a stage is not valid.
+        RuntimeError: if the ``torchmetrics`` package is not
+            installed.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.callback import MetricCollectionCallback
+    >>> callback = MetricCollectionCallback(
+    ...     metrics={
+    ...         "accuracy": {"_target_": "torchmetrics.classification.BinaryAccuracy"},
+    ...     },
+    ...     stages=["validation"],
+    ... )
+    >>> callback
+    MetricCollectionCallback(metrics=('accuracy',), stages=('validation',), input_keys=('preds', 'target'))
+
+    ```
+    """
+
+    def __init__(
+        self,
+        metrics: Mapping[str, Metric | dict],
+        stages: Sequence[str] = ("validation",),
+        input_keys: Sequence[str] = ("preds", "target"),
+    ) -> None:
+        check_torchmetrics()
+        for stage in stages:
+            if stage not in STAGES:
+                msg = f"Incorrect stage: {stage}. The valid stages are: {tuple(STAGES)}"
+                raise ValueError(msg)
+        self._metrics = dict(metrics)
+        self._stages = tuple(stages)
+        self._input_keys = tuple(input_keys)
+
+        self._stage_metrics: dict[str, dict[str, Metric]] = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(metrics={tuple(self._metrics)}, "
+            f"stages={self._stages}, input_keys={self._input_keys})"
+        )
+
+    def get_metrics(self, stage: str) -> dict[str, Metric]:
+        r"""Get the metrics of a stage.
+
+        The metrics are created the first time this method is called
+        for a stage.
+
+        Args:
+            stage: The stage.
+
+        Returns:
+            The metrics of the stage.
+
+        Raises:
+            ValueError: if the stage is not valid.
+
+        Example usage:
+
+        ```pycon
+
+        >>> from lightcat.callback import MetricCollectionCallback
+        >>> callback = MetricCollectionCallback(
+        ...     metrics={
+        ...         "accuracy": {"_target_": "torchmetrics.classification.BinaryAccuracy"},
+        ...     },
+        ... )
+        >>> callback.get_metrics("validation")
+        {'accuracy': BinaryAccuracy()}
+
+        ```
+        """
+        if stage not in STAGES:
+            msg = f"Incorrect stage: {stage}. The valid stages are: {tuple(STAGES)}"
+            raise ValueError(msg)
+        if stage not in self._stage_metrics:
+            metrics = {
+                name: setup_object(copy.deepcopy(metric)) for name, metric in self._metrics.items()
+            }
+            for metric in metrics.values():
+                # The states of these metrics are synchronized at the
+                # end of the epoch with a single all-reduce.
+                metric.dist_sync_on_step = False
+                if supports_fused_sync(metric):
+                    metric.sync_on_compute = False
+            self._stage_metrics[stage] = metrics
+        return self._stage_metrics[stage]
+
+    def setup(
+        self,
+        trainer: Trainer,  # noqa: ARG002
+        pl_module: LightningModule,
+        stage: str,  # noqa: ARG002
+    ) -> None:
+        for name in self._stages:
+            for metric in self.get_metrics(name).values():
+                metric.to(pl_module.device)
+
+    def on_train_batch_end(
+        self,
+        trainer: Trainer,  # noqa: ARG002
+        pl_module: LightningModule,  # noqa: ARG002
+        outputs: Any,
+        batch: Any,  # noqa: ARG002
+        batch_idx: int,  # noqa: ARG002
+    ) -> None:
+        self._update("train", outputs)
+
+    def on_validation_batch_end(
+        self,
+        trainer: Trainer,  # noqa: ARG002
+        pl_module: LightningModule,  # noqa: ARG002
+        outputs: Any,
+        batch: Any,  # noqa: ARG002
+        batch_idx: int,  # noqa: ARG002
+        dataloader_idx: int = 0,  # noqa: ARG002
+    ) -> None:
+        self._update("validation", outputs)
+
+    def on_test_batch_end(
+        self,
+        trainer: Trainer,  # noqa: ARG002
+        pl_module: LightningModule,  # noqa: ARG002
+        outputs: Any,
+        batch: Any,  # noqa: ARG002
+        batch_idx: int,  # noqa: ARG002
+        dataloader_idx: int = 0,  # noqa: ARG002
+    ) -> None:
+        self._update("test", outputs)
+
+    def on_train_epoch_end(
+        self, trainer: Trainer, pl_module: LightningModule  # noqa: ARG002
+    ) -> None:
+        self._compute_and_log("train", pl_module)
+
+    def on_validation_epoch_end(
+        self, trainer: Trainer, pl_module: LightningModule  # noqa: ARG002
+    ) -> None:
+        self._compute_and_log("validation", pl_module)
+
+    def on_test_epoch_end(
+        self, trainer: Trainer, pl_module: LightningModule  # noqa: ARG002
+    ) -> None:
+        self._compute_and_log("test", pl_module)
+
+    def _update(self, stage: str, outputs: Any) -> None:
+        r"""Update the metrics of a stage with the output of a step.
+
+        Args:
+            stage: The stage.
+            outputs: The output of the step.
+
+        Raises:
+            ValueError: if the output is not a mapping with the input
+                keys.
+        """
+        if stage not in self._stages:
+            return
+        if not isinstance(outputs, Mapping) or any(key not in outputs for key in self._input_keys):
+            msg = (
+                f"The output of the {stage} step must be a mapping with the keys "
+                f"{self._input_keys} to update the metrics"
+            )
+            raise ValueError(msg)
+        inputs = [outputs[key] for key in self._input_keys]
+        for metric in self.get_metrics(stage).values():
+            metric.update(*inputs)
+
+    def _compute_and_log(self, stage: str, pl_module: LightningModule) -> None:
+        r"""Synchronize, compute, log and reset the metrics of a stage.
+
+        Args:
+            stage: The stage.
+            pl_module: The module used to log the values.
+        """
+        if stage not in self._stages:
+            return
+        metrics = self.get_metrics(stage)
+        # All the processes synchronize the same metrics, even if they
+        # did not update some of them, otherwise the collective
+        # operations would not match across the processes.
+        sync_metric_states([metric for metric in metrics.values() if not metric.sync_on_compute])
+        updated = {name: metric for name, metric in metrics.items() if metric.update_called}
+        values = {}
+        for name, metric in updated.items():
+            value = metric.compute()
+            if isinstance(value, Mapping):
+                values.update({f"{STAGES[stage]}{name}/{key}": v for key, v in value.items()})
+            else:
+                values[f"{STAGES[stage]}{name}"] = value
+        for name, value in values.items():
+            if torch.is_tensor(value) and value.numel() != 1:
+                logger.warning(f"The value of {name} is not logged because it is not a scalar")
+                continue
+            pl_module.log(name, value, on_step=False, on_epoch=True)
+        for metric in metrics.values():
+            metric.reset()
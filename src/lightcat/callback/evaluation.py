@@ -0,0 +1,131 @@
+r"""Contain a callback to evaluate the checkpoints in worker processes
+while the training continues."""
+
+from __future__ import annotations
+
+__all__ = ["AsyncCheckpointEvaluation"]
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+from lightning import Callback
+
+from lightcat.utils.factory import setup_object
+
+if TYPE_CHECKING:
+    from lightning import LightningModule, Trainer
+
+    from lightcat.evaluation import CheckpointEvaluator
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCheckpointEvaluation(Callback):
+    r"""Implement a callback to evaluate the checkpoints in worker
+    processes while the training continues.
+
+    The checkpoint directory is polled at the start of each training
+    epoch, and the new checkpoints are evaluated by a
+    ``CheckpointEvaluator``. The results of the finished evaluations
+    are logged with the loggers of the trainer, at the step of the
+    evaluated checkpoint. At the end of the training, the callback
+    evaluates the last checkpoints without waiting for ``min_age``
+    of the evaluator, and waits until all the checkpoints are
+    evaluated. A failed evaluation is logged by the evaluator and
+    does not stop the training. The evaluation is only done by the
+    global rank 0.
+
+    Args:
+        evaluator: The checkpoint evaluator or its configuration. Its
+            checkpoint directory should be the directory where the
+            ``ModelCheckpoint`` callback saves the checkpoints.
+        prefix: The prefix of the logged metric names.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.callback import AsyncCheckpointEvaluation
+    >>> from lightcat.evaluation import CheckpointEvaluator
+    >>> callback = AsyncCheckpointEvaluation(
+    ...     CheckpointEvaluator(
+    ...         model={
+    ...             "_target_": "lightcat.model.creator.ModelCreator",
+    ...             "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+    ...         },
+    ...         datamodule={
+    ...             "_target_": "lightcat.datamodule.creator.DataModuleCreator",
+    ...             "datamodule": {
+    ...                 "_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"
+    ...             },
+    ...         },
+    ...         dirpath="/tmp/checkpoints",
+    ...     )
+    ... )
+    >>> callback
+    AsyncCheckpointEvaluation(evaluator=CheckpointEvaluator(dirpath=/tmp/checkpoints, stage=validate), prefix=eval/)
+
+    ```
+    """
+
+    def __init__(self, evaluator: CheckpointEvaluator | dict, prefix: str = "eval/") -> None:
+        self._evaluator = setup_object(evaluator)
+        self._prefix = prefix
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(evaluator={self._evaluator!r}, "
+            f"prefix={self._prefix})"
+        )
+
+    @property
+    def evaluator(self) -> CheckpointEvaluator:
+        r"""The checkpoint evaluator."""
+        return self._evaluator
+
+    def on_train_epoch_start(
+        self, trainer: Trainer, pl_module: LightningModule  # noqa: ARG002
+    ) -> None:
+        if not trainer.is_global_zero:
+            return
+        self._evaluator.poll()
+        self._log_results(trainer, self._evaluator.collect())
+
+    def on_train_end(self, trainer: Trainer, pl_module: LightningModule) -> None:  # noqa: ARG002
+        if not trainer.is_global_zero:
+            return
+        # The checkpoints of the trainer are fully written at the end
+        # of the training.
+        self._evaluator.poll(min_age=0.0)
+        if self._evaluator.num_pending:
+            logger.info(
+                f"Waiting for the evaluation of {self._evaluator.num_pending:,} checkpoints"
+            )
+        self._log_results(trainer, self._evaluator.collect(wait=True))
+        self._evaluator.shutdown()
+
+    def on_exception(
+        self,
+        trainer: Trainer,  # noqa: ARG002
+        pl_module: LightningModule,  # noqa: ARG002
+        exception: BaseException,  # noqa: ARG002
+    ) -> None:
+        self._evaluator.shutdown(wait=False)
+
+    def _log_results(self, trainer: Trainer, results: list[dict[str, Any]]) -> None:
+        r"""Log the results of some evaluations.
+
+        Args:
+            trainer: The trainer with the loggers.
+            results: The results of the evaluations.
+        """
+        for result in results:
+            if "error" in result:
+                continue
+            metrics = {
+                f"{self._prefix}{key}": value
+                for key, value in result.items()
+                if key not in {"checkpoint", "step"}
+            }
+            for pl_logger in trainer.loggers:
+                pl_logger.log_metrics(metrics, step=result["step"])
@@ -0,0 +1,84 @@
+r"""Contain a callback to save a checkpoint for each model of a
+``FanOutModel``."""
+
+from __future__ import annotations
+
+__all__ = ["FanOutCheckpoint"]
+
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from lightning import Callback
+
+from lightcat.model.fanout import FanOutModel
+
+if TYPE_CHECKING:
+    from lightning import LightningModule, Trainer
+
+logger = logging.getLogger(__name__)
+
+
+class FanOutCheckpoint(Callback):
+    r"""Implement a callback to save a checkpoint for each model of a
+    ``FanOutModel``.
+
+    The checkpoint of the model ``<name>`` at the end of the epoch
+    ``<epoch>`` is saved in ``<dirpath>/epoch=<epoch>/<name>.ckpt``,
+    and it can be loaded with the ``load_from_checkpoint`` method of
+    the model class. The checkpoints are only saved by the global
+    rank 0.
+
+    Args:
+        dirpath: The directory where the checkpoints are saved. If
+            ``None``, the checkpoints are saved in the
+            ``checkpoints`` directory of ``trainer.default_root_dir``.
+        every_n_epochs: The number of epochs between two checkpoints.
+
+    Raises:
+        ValueError: if ``every_n_epochs`` is lower than 1.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.callback import FanOutCheckpoint
+    >>> callback = FanOutCheckpoint(dirpath="/tmp/checkpoints", every_n_epochs=2)
+    >>> callback
+    FanOutCheckpoint(dirpath=/tmp/checkpoints, every_n_epochs=2)
+
+    ```
+    """
+
+    def __init__(self, dirpath: Path | str | None = None, every_n_epochs: int = 1) -> None:
+        if every_n_epochs < 1:
+            msg = f"every_n_epochs must be greater than 0 (received: {every_n_epochs})"
+            raise ValueError(msg)
+        self._dirpath = None if dirpath is None else Path(dirpath)
+        self._every_n_epochs = every_n_epochs
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(dirpath={self._dirpath}, "
+            f"every_n_epochs={self._every_n_epochs})"
+        )
+
+    def setup(
+        self, trainer: Trainer, pl_module: LightningModule, stage: str  # noqa: ARG002
+    ) -> None:
+        if not isinstance(pl_module, FanOutModel):
+            msg = (
+                f"{self.__class__.__qualname__} requires a FanOutModel "
+                f"(received: {type(pl_module).__qualname__})"
+            )
+            raise TypeError(msg)
+        if self._dirpath is None:
+            self._dirpath = Path(trainer.default_root_dir).joinpath("checkpoints")
+
+    def on_train_epoch_end(self, trainer: Trainer, pl_module: LightningModule) -> None:
+        epoch = trainer.current_epoch
+        if (epoch + 1) % self._every_n_epochs or not trainer.is_global_zero:
+            return
+        dirpath = self._dirpath.joinpath(f"epoch={epoch}")
+        logger.info(f"Saving the checkpoints of the models in {dirpath}")
+        pl_module.save_model_checkpoints(dirpath)
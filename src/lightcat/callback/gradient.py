@@ -0,0 +1,308 @@
+r"""Contain a callback to monitor the gradient norms, the parameter
+norms and the update ratios with fused operations."""
+
+from __future__ import annotations
+
+__all__ = ["GradientMonitor"]
+
+import logging
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any
+
+import torch
+from lightning import Callback
+
+if TYPE_CHECKING:
+    from lightning import LightningModule, Trainer
+
+logger = logging.getLogger(__name__)
+
+
+class GradientMonitor(Callback):
+    r"""Implement a callback to monitor the gradient norms, the
+    parameter norms and the update ratios of the optimizers.
+
+    The norms are computed with the multi-tensor operation
+    ``torch._foreach_norm``, so there is a few kernel launches per
+    parameter group instead of one per parameter. Nothing is computed
+    on the steps where the metrics are not logged, and the metrics are
+    copied to the host with a single synchronization on the steps
+    where they are logged. The gradients are read just before the
+    optimizer step, so they are unscaled when mixed precision is used.
+    The update ratio is the norm of the parameter update divided by
+    the norm of the parameters before the update. Computing it requires
+    a copy of the parameters on the logged steps.
+
+    The following metrics are logged, where the per-group metrics are
+    only logged if the optimizer has several parameter groups with
+    gradients, and ``j`` is the index of the group in the optimizer:
+
+    - ``'{prefix}grad_norm'`` and ``'{prefix}grad_norm/group_{j}'``
+    - ``'{prefix}param_norm'`` and ``'{prefix}param_norm/group_{j}'``
+    - ``'{prefix}update_ratio'`` and ``'{prefix}update_ratio/group_{j}'``
+
+    If the trainer has several optimizers, ``'optimizer_{i}/'`` is
+    added after the prefix. Only the parameters with a gradient are
+    taken into account. The norms are computed on the local
+    parameters, so they are not the global norms if the parameters
+    are sharded across the processes.
+
+    Args:
+        log_every_n_steps: The number of optimizer steps between two
+            logged steps. If ``None``, the metrics are logged at the
+            same frequency as the other metrics of the trainer.
+        norm_type: The type of the norms.
+        per_group: If ``True``, the norms of each parameter group are
+            also logged.
+        log_param_norms: If ``True``, the parameter norms are logged.
+        log_update_ratios: If ``True``, the update ratios are logged.
+        prefix: The prefix of the metric names.
+
+    Raises:
+        ValueError: if ``log_every_n_steps`` is lower than 1.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.callback import GradientMonitor
+    >>> callback = GradientMonitor(log_every_n_steps=10)
+    >>> callback
+    GradientMonitor(log_every_n_steps=10, norm_type=2.0, per_group=True, log_param_norms=True, log_update_ratios=True, prefix=optim/)
+
+    ```
+    """
+
+    def __init__(
+        self,
+        log_every_n_steps: int | None = None,
+        norm_type: float = 2.0,
+        per_group: bool = True,
+        log_param_norms: bool = True,
+        log_update_ratios: bool = True,
+        prefix: str = "optim/",
+    ) -> None:
+        if log_every_n_steps is not None and log_every_n_steps < 1:
+            msg = f"log_every_n_steps must be greater than 0 (received: {log_every_n_steps})"
+            raise ValueError(msg)
+        self._log_every_n_steps = log_every_n_steps
+        self._norm_type = float(norm_type)
+        self._per_group = bool(per_group)
+        self._log_param_norms = bool(log_param_norms)
+        self._log_update_ratios = bool(log_update_ratios)
+        self._prefix = prefix
+
+        # The metrics computed before the optimizer steps of the
+        # current batch, and the parameters before the steps.
+        self._metrics: dict[str, torch.Tensor] = {}
+        self._snapshots: list[tuple[str, list[list[torch.Tensor]], list[torch.Tensor]]] = []
+        self._step: int | None = None
+
+    def __repr__(self) -> str:
+        args = ", ".join(
+            [
+                f"log_every_n_steps={self._log_every_n_steps}",
+                f"norm_type={self._norm_type}",
+                f"per_group={self._per_group}",
+                f"log_param_norms={self._log_param_norms}",
+                f"log_update_ratios={self._log_update_ratios}",
+                f"prefix={self._prefix}",
+            ]
+        )
+        return f"{self.__class__.__qualname__}({args})"
+
+    def on_train_batch_start(
+        self,
+        trainer: Trainer,
+        pl_module: LightningModule,  # noqa: ARG002
+        batch: Any,  # noqa: ARG002
+        batch_idx: int,  # noqa: ARG002
+    ) -> None:
+        # The step is read before the optimizer steps of the batch, so
+        # all the optimizers of the batch are logged at the same step.
+        step = trainer.global_step
+        self._step = step if trainer.loggers and self._should_log(trainer, step) else None
+
+    def on_before_optimizer_step(
+        self,
+        trainer: Trainer,
+        pl_module: LightningModule,  # noqa: ARG002
+        optimizer: torch.optim.Optimizer,
+    ) -> None:
+        if self._step is None:
+            return
+        prefix = self._get_optimizer_prefix(trainer, optimizer)
+        # The groups without gradients are skipped, but the other groups
+        # keep their index in the optimizer.
+        groups = [
+            (index, params)
+            for index, group in enumerate(optimizer.param_groups)
+            if (params := [param for param in group["params"] if param.grad is not None])
+        ]
+        if not groups:
+            return
+        with torch.no_grad():
+            self._add_norms(
+                f"{prefix}grad_norm", [(i, [p.grad for p in params]) for i, params in groups]
+            )
+            if self._log_param_norms:
+                self._add_norms(f"{prefix}param_norm", groups)
+            if self._log_update_ratios:
+                self._snapshots.append(
+                    (
+                        prefix,
+                        groups,
+                        torch._foreach_mul([p.detach() for _, g in groups for p in g], 1.0),
+                    )
+                )
+
+    def on_train_batch_end(
+        self,
+        trainer: Trainer,
+        pl_module: LightningModule,  # noqa: ARG002
+        outputs: Any,  # noqa: ARG002
+        batch: Any,  # noqa: ARG002
+        batch_idx: int,  # noqa: ARG002
+    ) -> None:
+        if self._step is None:
+            return
+        with torch.no_grad():
+            for prefix, groups, before in self._snapshots:
+                self._add_update_ratios(prefix, groups, before)
+        metrics, step = self._metrics, self._step
+        self._metrics, self._snapshots, self._step = {}, [], None
+        if not metrics:
+            return
+        device = next(iter(metrics.values())).device
+        values = torch.stack([value.to(device=device) for value in metrics.values()]).tolist()
+        for lg in trainer.loggers:
+            lg.log_metrics(dict(zip(metrics, values)), step=step)
+
+    def on_train_end(self, trainer: Trainer, pl_module: LightningModule) -> None:  # noqa: ARG002
+        self._metrics, self._snapshots, self._step = {}, [], None
+
+    def _should_log(self, trainer: Trainer, step: int) -> bool:
+        r"""Indicate if the metrics are logged at a step.
+
+        If ``log_every_n_steps`` is ``None``, the same rule as the
+        trainer is used: the metrics are logged every
+        ``trainer.log_every_n_steps`` steps and when the training
+        stops.
+
+        Args:
+            trainer: The trainer.
+            step: The number of optimizer steps before the current
+                batch.
+
+        Returns:
+            ``True`` if the metrics are logged, otherwise ``False``.
+        """
+        if self._log_every_n_steps is None:
+            every = trainer.log_every_n_steps
+            return every > 0 and ((step + 1) % every == 0 or trainer.should_stop)
+        return step % self._log_every_n_steps == 0
+
+    def _get_optimizer_prefix(self, trainer: Trainer, optimizer: torch.optim.Optimizer) -> str:
+        r"""Get the prefix of the metric names of an optimizer.
+
+        Args:
+            trainer: The trainer.
+            optimizer: The optimizer.
+
+        Returns:
+            The prefix of the metric names.
+        """
+        optimizers = trainer.optimizers
+        if len(optimizers) <= 1:
+            return self._prefix
+        index = next(i for i, opt in enumerate(optimizers) if opt is optimizer)
+        return f"{self._prefix}optimizer_{index}/"
+
+    def _add_norms(self, name: str, groups: list[tuple[int, list[torch.Tensor]]]) -> None:
+        r"""Compute and add the global and per-group norms of some
+        tensors to the metrics.
+
+        Args:
+            name: The metric name.
+            groups: The index in the optimizer and the tensors of each
+                group.
+        """
+        norms = [(index, _compute_norm(tensors, self._norm_type)) for index, tensors in groups]
+        self._add_metrics(name, norms, _compute_norm([norm for _, norm in norms], self._norm_type))
+
+    def _add_update_ratios(
+        self,
+        prefix: str,
+        groups: list[tuple[int, list[torch.Tensor]]],
+        before: list[torch.Tensor],
+    ) -> None:
+        r"""Compute and add the global and per-group update ratios to the
+        metrics.
+
+        Args:
+            prefix: The prefix of the metric names.
+            groups: The index in the optimizer and the parameters of
+                each group.
+            before: The flat list of the parameters before the update.
+        """
+        deltas = torch._foreach_sub([p.detach() for _, params in groups for p in params], before)
+        delta_norms, param_norms = [], []
+        start = 0
+        for _, params in groups:
+            end = start + len(params)
+            delta_norms.append(_compute_norm(deltas[start:end], self._norm_type))
+            param_norms.append(_compute_norm(before[start:end], self._norm_type))
+            start = end
+        ratios = [
+            (index, delta / param)
+            for (index, _), delta, param in zip(groups, delta_norms, param_norms)
+        ]
+        total = _compute_norm(delta_norms, self._norm_type) / _compute_norm(
+            param_norms, self._norm_type
+        )
+        self._add_metrics(f"{prefix}update_ratio", ratios, total)
+
+    def _add_metrics(
+        self, name: str, values: list[tuple[int, torch.Tensor]], total: torch.Tensor
+    ) -> None:
+        r"""Add the global and per-group values of a metric.
+
+        Args:
+            name: The metric name.
+            values: The index in the optimizer and the value of each
+                group.
+            total: The global value.
+        """
+        self._metrics[name] = total
+        if self._per_group and len(values) > 1:
+            for index, value in values:
+                self._metrics[f"{name}/group_{index}"] = value
+
+
+def _compute_norm(tensors: list[torch.Tensor], norm_type: float) -> torch.Tensor:
+    r"""Compute the norm of a list of tensors with fused operations.
+
+    The tensors are grouped by device and data type, and the norms of
+    each group are computed with ``torch._foreach_norm``.
+
+    Args:
+        tensors: The tensors.
+        norm_type: The type of the norm.
+
+    Returns:
+        The norm of the concatenation of the tensors, as a float32
+            tensor on the device of the first tensor.
+    """
+    grouped = defaultdict(list)
+    for tensor in tensors:
+        grouped[(tensor.device, tensor.dtype)].append(tensor)
+    device = tensors[0].device
+    norms = torch.cat(
+        [
+            torch.stack(torch._foreach_norm(group, norm_type)).to(
+                device=device, dtype=torch.float32
+            )
+            for group in grouped.values()
+        ]
+    )
+    return torch.linalg.vector_norm(norms, norm_type)
@@ -0,0 +1,262 @@
+r"""Contain a callback to log the training metrics from on-device
+buffers without synchronizing the host at each step."""
+
+from __future__ import annotations
+
+__all__ = ["BufferedMetricLogger"]
+
+import csv
+import json
+import logging
+import math
+from collections.abc import Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import torch
+from lightning import Callback
+
+from lightcat.utils.distributed import all_reduce
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from typing import TextIO
+
+    from lightning import LightningModule, Trainer
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("jsonl", "csv")
+
+
+class BufferedMetricLogger(Callback):
+    r"""Implement a callback to log the training metrics from on-device
+    buffers.
+
+    The metrics are read from the output of ``training_step``, which
+    must be a mapping, for example ``{"loss": loss, "accuracy":
+    accuracy}``. The scalar values are copied in a preallocated
+    buffer on the device of the model at each training batch, so
+    logging a metric does not synchronize the host with the device.
+    Every ``log_every_n_steps`` training batches and at the end of
+    each epoch, the buffered values are averaged with a single
+    operation, and a single all-reduce is used for all the metrics if
+    there are several processes. The averages are then written to a
+    JSON Lines or CSV file by the process with rank 0. The file is
+    opened in append mode and is buffered, so it is flushed at the end
+    of each epoch and at the end of the training.
+
+    The metric names are the keys of the first output of
+    ``training_step``, or ``keys`` if it is given. A missing value or a
+    NaN value is ignored in the average. Each row contains the global
+    step (``'step'``), the epoch (``'epoch'``), the number of averaged
+    training batches per process (``'num_batches'``) and the average
+    of each metric.
+
+    Args:
+        path: The path to the output file.
+        log_every_n_steps: The number of training batches between two
+            rows.
+        keys: The names of the metrics to log. If ``None``, all the
+            scalar values of the first output of ``training_step`` are
+            logged.
+        format: The file format: ``'jsonl'`` or ``'csv'``. If
+            ``None``, the format is inferred from the file extension.
+
+    Raises:
+        ValueError: if ``log_every_n_steps`` is lower than 1 or if
+            the format is not supported.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.callback import BufferedMetricLogger
+    >>> callback = BufferedMetricLogger("/tmp/metrics.jsonl", log_every_n_steps=100)
+    >>> callback
+    BufferedMetricLogger(path=/tmp/metrics.jsonl, log_every_n_steps=100, format=jsonl)
+
+    ```
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        log_every_n_steps: int = 50,
+        keys: Sequence[str] | None = None,
+        format: str | None = None,  # noqa: A002
+    ) -> None:
+        self._path = Path(path)
+        if log_every_n_steps < 1:
+            msg = f"log_every_n_steps must be greater than 0 (received: {log_every_n_steps})"
+            raise ValueError(msg)
+        self._format = format or self._path.suffix.lstrip(".")
+        if self._format not in FORMATS:
+            msg = f"Incorrect format: {self._format}. The supported formats are: {FORMATS}"
+            raise ValueError(msg)
+        self._log_every_n_steps = int(log_every_n_steps)
+        self._keys = None if keys is None else tuple(keys)
+
+        self._buffer: torch.Tensor | None = None
+        self._nan: torch.Tensor | None = None
+        self._index = 0
+        self._file: TextIO | None = None
+        self._writer: Any = None
+        self._ignored_keys: set[str] = set()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(path={self._path}, "
+            f"log_every_n_steps={self._log_every_n_steps}, format={self._format})"
+        )
+
+    def on_train_batch_end(
+        self,
+        trainer: Trainer,
+        pl_module: LightningModule,
+        outputs: Any,
+        batch: Any,  # noqa: ARG002
+        batch_idx: int,  # noqa: ARG002
+    ) -> None:
+        metrics = _get_scalar_metrics(outputs)
+        if self._buffer is None:
+            if self._keys is None:
+                self._keys = tuple(metrics)
+            if not self._keys:
+                return
+            self._buffer = torch.full(
+                (self._log_every_n_steps, len(self._keys)),
+                math.nan,
+                dtype=torch.float32,
+                device=pl_module.device,
+            )
+            self._nan = self._buffer.new_tensor(math.nan)
+        self._warn_ignored_keys(metrics)
+        self._buffer[self._index] = torch.stack(
+            [
+                (
+                    metrics[key].to(device=self._buffer.device, dtype=torch.float32)
+                    if key in metrics
+                    else self._nan
+                )
+                for key in self._keys
+            ]
+        )
+        self._index += 1
+        if self._index == self._log_every_n_steps:
+            self._flush(trainer)
+
+    def on_train_epoch_end(
+        self, trainer: Trainer, pl_module: LightningModule  # noqa: ARG002
+    ) -> None:
+        self._flush(trainer)
+        if self._file is not None:
+            self._file.flush()
+
+    def on_train_end(self, trainer: Trainer, pl_module: LightningModule) -> None:  # noqa: ARG002
+        self._flush(trainer)
+        self._close()
+        self._buffer = None
+
+    def on_exception(
+        self,
+        trainer: Trainer,  # noqa: ARG002
+        pl_module: LightningModule,  # noqa: ARG002
+        exception: BaseException,  # noqa: ARG002
+    ) -> None:
+        self._close()
+        self._buffer = None
+        self._index = 0
+
+    def _flush(self, trainer: Trainer) -> None:
+        r"""Average the buffered values and write them to the file.
+
+        Args:
+            trainer: The trainer.
+        """
+        if self._buffer is None or self._index == 0:
+            return
+        values = self._buffer[: self._index]
+        # The sums and the counts are reduced with a single collective
+        # operation.
+        packed = torch.cat(
+            [values.nansum(dim=0), values.isnan().logical_not().sum(dim=0, dtype=torch.float32)]
+        )
+        packed = all_reduce(packed).tolist()
+        num_keys = len(self._keys)
+        sums, counts = packed[:num_keys], packed[num_keys:]
+        row = {
+            "step": trainer.global_step,
+            "epoch": trainer.current_epoch,
+            "num_batches": self._index,
+        }
+        row.update(
+            {
+                key: total / count if count else None
+                for key, total, count in zip(self._keys, sums, counts)
+            }
+        )
+        self._buffer.fill_(math.nan)
+        self._index = 0
+        if trainer.is_global_zero:
+            self._write(row)
+
+    def _write(self, row: dict[str, Any]) -> None:
+        r"""Write a row to the file.
+
+        Args:
+            row: The row to write.
+        """
+        if self._file is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            is_new = not self._path.is_file() or self._path.stat().st_size == 0
+            self._file = self._path.open(mode="a", newline="" if self._format == "csv" else None)
+            if self._format == "csv":
+                self._writer = csv.DictWriter(self._file, fieldnames=list(row))
+                if is_new:
+                    self._writer.writeheader()
+        if self._format == "csv":
+            self._writer.writerow(row)
+        else:
+            self._file.write(json.dumps(row) + "\n")
+
+    def _close(self) -> None:
+        r"""Close the file."""
+        if self._file is not None:
+            self._file.close()
+        self._file, self._writer = None, None
+
+    def _warn_ignored_keys(self, metrics: dict[str, torch.Tensor]) -> None:
+        r"""Log a warning the first time a metric is ignored.
+
+        Args:
+            metrics: The metrics of the current training batch.
+        """
+        ignored = set(metrics).difference(self._keys, self._ignored_keys)
+        if ignored:
+            logger.warning(
+                f"The following metrics are ignored because they are not in the logged keys "
+                f"{self._keys}: {sorted(ignored)}"
+            )
+            self._ignored_keys.update(ignored)
+
+
+def _get_scalar_metrics(outputs: Any) -> dict[str, torch.Tensor]:
+    r"""Get the scalar metrics from the output of a training step.
+
+    Args:
+        outputs: The output of the training step.
+
+    Returns:
+        The detached scalar tensors. The Python numbers are converted
+            to tensors.
+    """
+    if not isinstance(outputs, Mapping):
+        return {}
+    metrics = {}
+    for key, value in outputs.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[key] = torch.tensor(float(value))
+        elif torch.is_tensor(value) and value.numel() == 1:
+            metrics[key] = value.detach().reshape(())
+    return metrics
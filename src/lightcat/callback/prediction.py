@@ -0,0 +1,492 @@
+r"""Contain a callback to stream the predictions to memory-mapped arrays
+or shard files."""
+
+from __future__ import annotations
+
+__all__ = ["StreamingPredictionWriter"]
+
+import json
+import logging
+import os
+import queue
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from unittest.mock import Mock
+
+import torch
+from lightning.pytorch.callbacks import BasePredictionWriter
+
+from lightcat.utils.imports import check_numpy, is_numpy_available
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from lightning import LightningModule, Trainer
+    from torch.utils.data import DataLoader
+
+if is_numpy_available():
+    import numpy as np
+else:  # pragma: no cover
+    np = Mock()
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("memmap", "shards")
+MANIFEST_NAME = "manifest.json"
+
+# The item put in the queue to stop the writer thread.
+_STOP = object()
+
+
+class StreamingPredictionWriter(BasePredictionWriter):
+    r"""Implement a callback to stream the predictions to memory-mapped
+    arrays or shard files.
+
+    The outputs of ``predict_step`` are written batch by batch, so they
+    are never accumulated in memory. The outputs are copied to CPU
+    numpy arrays in the prediction loop, then a background thread
+    writes them to disk while the next batches are predicted. The
+    queue between the prediction loop and the writer thread is
+    bounded, so the prediction loop waits if the writer thread cannot
+    keep up. The output of ``predict_step`` must be a tensor or a
+    mapping of tensors, and the first dimension of each tensor must be
+    the batch dimension. A tensor output is saved with the name
+    ``'output'``. The dataset indices of the examples are saved with
+    the name ``'indices'`` if they are available.
+
+    Two formats are supported:
+
+    - ``'memmap'``: each output is written to a ``<name>.npy`` file
+      preallocated with the number of examples of the dataloader. The
+      files can be loaded with ``numpy.load(path, mmap_mode="r")``.
+      The dataloader must have a length.
+    - ``'shards'``: the outputs are written to ``shard-<index>.npz``
+      files of ``shard_size`` examples, with one array per output
+      name. Only the current shard is kept in memory.
+
+    The files are written in ``output_dir``, in a ``rank-<rank>``
+    subdirectory if there are several processes and in a
+    ``dataloader-<index>`` subdirectory if there are several
+    dataloaders. A ``manifest.json`` file is written in each
+    directory at the end of the prediction. The predictions should be
+    run with ``trainer.predict(..., return_predictions=False)``,
+    otherwise the trainer also keeps the outputs in memory.
+
+    Args:
+        output_dir: The directory where the predictions are written.
+        format: The output format: ``'memmap'`` or ``'shards'``.
+        shard_size: The number of examples in each shard file. Only
+            used with the ``'shards'`` format.
+        max_queue_size: The maximum number of batches waiting to be
+            written.
+
+    Raises:
+        ValueError: if ``format`` is not supported, or if
+            ``shard_size`` or ``max_queue_size`` is lower than 1.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.callback import StreamingPredictionWriter
+    >>> callback = StreamingPredictionWriter("/tmp/predictions", format="shards")
+    >>> callback
+    StreamingPredictionWriter(output_dir=/tmp/predictions, format=shards, shard_size=65536)
+
+    ```
+    """
+
+    def __init__(
+        self,
+        output_dir: Path | str,
+        format: str = "memmap",  # noqa: A002
+        shard_size: int = 65536,
+        max_queue_size: int = 8,
+    ) -> None:
+        super().__init__(write_interval="batch")
+        check_numpy()
+        if format not in FORMATS:
+            msg = f"Incorrect format: {format}. The supported formats are: {FORMATS}"
+            raise ValueError(msg)
+        if shard_size < 1:
+            msg = f"shard_size must be greater than 0 (received: {shard_size})"
+            raise ValueError(msg)
+        if max_queue_size < 1:
+            msg = f"max_queue_size must be greater than 0 (received: {max_queue_size})"
+            raise ValueError(msg)
+        self._output_dir = Path(output_dir)
+        self._format = format
+        self._shard_size = int(shard_size)
+        self._max_queue_size = int(max_queue_size)
+
+        self._queue: queue.Queue | None = None
+        self._thread: threading.Thread | None = None
+        self._error: BaseException | None = None
+        self._dirpaths: list[Path] = []
+        self._num_examples: list[int | None] = []
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(output_dir={self._output_dir}, "
+            f"format={self._format}, shard_size={self._shard_size})"
+        )
+
+    def on_predict_start(
+        self, trainer: Trainer, pl_module: LightningModule  # noqa: ARG002
+    ) -> None:
+        dataloaders = trainer.predict_dataloaders
+        if not isinstance(dataloaders, (list, tuple)):
+            dataloaders = [dataloaders]
+        self._dirpaths = [
+            _get_dirpath(
+                self._output_dir,
+                rank=trainer.global_rank if trainer.world_size > 1 else None,
+                dataloader_idx=i if len(dataloaders) > 1 else None,
+            )
+            for i in range(len(dataloaders))
+        ]
+        self._num_examples = [_get_num_examples(dataloader) for dataloader in dataloaders]
+        if self._format == "memmap" and None in self._num_examples:
+            msg = "The 'memmap' format requires dataloaders with a length"
+            raise ValueError(msg)
+        self._error = None
+        self._queue = queue.Queue(maxsize=self._max_queue_size)
+        self._thread = threading.Thread(
+            target=self._write_loop, name=f"{self.__class__.__qualname__}", daemon=True
+        )
+        self._thread.start()
+
+    def write_on_batch_end(
+        self,
+        trainer: Trainer,  # noqa: ARG002
+        pl_module: LightningModule,  # noqa: ARG002
+        prediction: Any,
+        batch_indices: Sequence[int] | None,
+        batch: Any,  # noqa: ARG002
+        batch_idx: int,  # noqa: ARG002
+        dataloader_idx: int,
+    ) -> None:
+        self._check_error()
+        arrays = _to_numpy(prediction)
+        if batch_indices:
+            arrays["indices"] = np.asarray(batch_indices, dtype=np.int64)
+        self._put((dataloader_idx, arrays))
+
+    def on_predict_end(self, trainer: Trainer, pl_module: LightningModule) -> None:  # noqa: ARG002
+        self._close()
+
+    def on_exception(
+        self,
+        trainer: Trainer,  # noqa: ARG002
+        pl_module: LightningModule,  # noqa: ARG002
+        exception: BaseException,  # noqa: ARG002
+    ) -> None:
+        # The error of the writer thread is not raised to keep the
+        # original error.
+        self._stop_thread()
+
+    def _check_error(self) -> None:
+        r"""Raise the error of the writer thread if there is one.
+
+        Raises:
+            RuntimeError: if the writer thread failed.
+        """
+        if self._error is not None:
+            msg = "The prediction writer thread failed"
+            raise RuntimeError(msg) from self._error
+
+    def _close(self) -> None:
+        r"""Write the remaining predictions and stop the writer thread.
+
+        Raises:
+            RuntimeError: if the writer thread failed.
+        """
+        self._stop_thread()
+        self._check_error()
+
+    def _stop_thread(self) -> None:
+        r"""Stop the writer thread after the remaining predictions are
+        written."""
+        if self._thread is None:
+            return
+        self._put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def _put(self, item: Any) -> None:
+        r"""Put an item in the queue of the writer thread.
+
+        The item is dropped if the writer thread stopped because of an
+        error.
+
+        Args:
+            item: The item to put in the queue.
+        """
+        while self._thread is not None and self._thread.is_alive():
+            try:
+                self._queue.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            return
+
+    def _write_loop(self) -> None:
+        r"""Write the predictions of the queue until the stop item."""
+        writers: dict[int, _MemmapWriter | _ShardWriter] = {}
+        try:
+            while (item := self._queue.get()) is not _STOP:
+                dataloader_idx, arrays = item
+                if dataloader_idx not in writers:
+                    writers[dataloader_idx] = self._create_writer(dataloader_idx)
+                writers[dataloader_idx].write(arrays)
+            for writer in writers.values():
+                writer.close()
+        except BaseException as exc:  # noqa: BLE001
+            self._error = exc
+
+    def _create_writer(self, dataloader_idx: int) -> _MemmapWriter | _ShardWriter:
+        r"""Create the writer of the predictions of a dataloader.
+
+        Args:
+            dataloader_idx: The index of the dataloader.
+
+        Returns:
+            The writer.
+        """
+        dirpath = self._dirpaths[dataloader_idx]
+        if self._format == "memmap":
+            return _MemmapWriter(dirpath, num_examples=self._num_examples[dataloader_idx])
+        return _ShardWriter(dirpath, shard_size=self._shard_size)
+
+
+class _MemmapWriter:
+    r"""Implement a writer of predictions to preallocated memory-mapped
+    ``.npy`` files.
+
+    The files are allocated when the first batch is written, using the
+    shape and data type of its arrays.
+
+    Args:
+        dirpath: The directory where the files are written.
+        num_examples: The number of examples to write.
+    """
+
+    def __init__(self, dirpath: Path, num_examples: int) -> None:
+        self._dirpath = dirpath
+        self._num_examples = num_examples
+        self._arrays: dict[str, np.memmap] = {}
+        self._offset = 0
+
+    def write(self, arrays: dict[str, np.ndarray]) -> None:
+        r"""Write the arrays of a batch.
+
+        Args:
+            arrays: The arrays of the batch.
+
+        Raises:
+            ValueError: if there are more examples than expected.
+        """
+        if not self._arrays:
+            self._dirpath.mkdir(parents=True, exist_ok=True)
+            for name, array in arrays.items():
+                self._arrays[name] = np.lib.format.open_memmap(
+                    self._dirpath.joinpath(f"{name}.npy"),
+                    mode="w+",
+                    dtype=array.dtype,
+                    shape=(self._num_examples, *array.shape[1:]),
+                )
+        batch_size = _get_batch_size(arrays)
+        if self._offset + batch_size > self._num_examples:
+            msg = (
+                f"Received more than the {self._num_examples:,} expected examples. "
+                "Please check the length of the dataloader"
+            )
+            raise ValueError(msg)
+        for name, array in arrays.items():
+            self._arrays[name][self._offset : self._offset + batch_size] = array
+        self._offset += batch_size
+
+    def close(self) -> None:
+        r"""Flush the files and write the manifest."""
+        for array in self._arrays.values():
+            array.flush()
+        _write_manifest(
+            self._dirpath,
+            {
+                "format": "memmap",
+                "num_examples": self._offset,
+                "files": {name: f"{name}.npy" for name in self._arrays},
+            },
+        )
+        self._arrays.clear()
+
+
+class _ShardWriter:
+    r"""Implement a writer of predictions to ``.npz`` shard files.
+
+    Args:
+        dirpath: The directory where the files are written.
+        shard_size: The number of examples in each shard file.
+    """
+
+    def __init__(self, dirpath: Path, shard_size: int) -> None:
+        self._dirpath = dirpath
+        self._shard_size = shard_size
+        self._buffers: dict[str, list[np.ndarray]] = {}
+        self._buffer_size = 0
+        self._shards: list[dict[str, Any]] = []
+
+    def write(self, arrays: dict[str, np.ndarray]) -> None:
+        r"""Write the arrays of a batch.
+
+        Full shards are written to disk.
+
+        Args:
+            arrays: The arrays of the batch.
+        """
+        for name, array in arrays.items():
+            self._buffers.setdefault(name, []).append(array)
+        self._buffer_size += _get_batch_size(arrays)
+        while self._buffer_size >= self._shard_size:
+            self._write_shard(self._shard_size)
+
+    def close(self) -> None:
+        r"""Write the last shard and the manifest."""
+        if self._buffer_size > 0:
+            self._write_shard(self._buffer_size)
+        self._dirpath.mkdir(parents=True, exist_ok=True)
+        _write_manifest(
+            self._dirpath,
+            {
+                "format": "shards",
+                "num_examples": sum(shard["num_examples"] for shard in self._shards),
+                "shards": self._shards,
+            },
+        )
+
+    def _write_shard(self, size: int) -> None:
+        r"""Write the first examples of the buffers to a shard file.
+
+        Args:
+            size: The number of examples in the shard.
+        """
+        shard = {}
+        for name, arrays in self._buffers.items():
+            array = np.concatenate(arrays)
+            shard[name] = array[:size]
+            self._buffers[name] = [array[size:]] if len(array) > size else []
+        self._buffer_size -= size
+
+        self._dirpath.mkdir(parents=True, exist_ok=True)
+        path = self._dirpath.joinpath(f"shard-{len(self._shards):06d}.npz")
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("wb") as file:
+            np.savez(file, **shard)
+        tmp_path.replace(path)
+        self._shards.append({"file": path.name, "num_examples": size})
+
+
+def _get_dirpath(output_dir: Path, rank: int | None, dataloader_idx: int | None) -> Path:
+    r"""Get the directory of the predictions of a dataloader.
+
+    Args:
+        output_dir: The output directory.
+        rank: The global rank of the process, or ``None`` if there is
+            only one process.
+        dataloader_idx: The index of the dataloader, or ``None`` if
+            there is only one dataloader.
+
+    Returns:
+        The directory of the predictions.
+    """
+    if rank is not None:
+        output_dir = output_dir.joinpath(f"rank-{rank}")
+    if dataloader_idx is not None:
+        output_dir = output_dir.joinpath(f"dataloader-{dataloader_idx}")
+    return output_dir
+
+
+def _get_num_examples(dataloader: DataLoader) -> int | None:
+    r"""Get the number of examples returned by a dataloader.
+
+    Args:
+        dataloader: The dataloader.
+
+    Returns:
+        The number of examples, or ``None`` if it is not known.
+    """
+    # The sampler only returns the indices of the current process in
+    # distributed mode.
+    sampler = getattr(getattr(dataloader, "batch_sampler", None), "sampler", None)
+    if sampler is not None and hasattr(sampler, "__len__"):
+        return len(sampler)
+    dataset = getattr(dataloader, "dataset", None)
+    if dataset is not None and hasattr(dataset, "__len__"):
+        return len(dataset)
+    return None
+
+
+def _get_batch_size(arrays: dict[str, np.ndarray]) -> int:
+    r"""Get the batch size of the arrays of a batch.
+
+    Args:
+        arrays: The arrays of the batch.
+
+    Returns:
+        The batch size.
+
+    Raises:
+        ValueError: if the arrays do not have the same batch size.
+    """
+    sizes = {name: len(array) for name, array in arrays.items()}
+    if len(set(sizes.values())) != 1:
+        msg = f"The outputs do not have the same batch size: {sizes}"
+        raise ValueError(msg)
+    return next(iter(sizes.values()))
+
+
+def _to_numpy(prediction: Any) -> dict[str, np.ndarray]:
+    r"""Convert the output of ``predict_step`` to numpy arrays.
+
+    Args:
+        prediction: The output of ``predict_step``.
+
+    Returns:
+        The numpy arrays.
+
+    Raises:
+        TypeError: if the output is not a tensor or a mapping of
+            tensors.
+    """
+    if torch.is_tensor(prediction):
+        prediction = {"output": prediction}
+    if not isinstance(prediction, Mapping) or not all(
+        torch.is_tensor(value) for value in prediction.values()
+    ):
+        msg = (
+            "The output of predict_step must be a tensor or a mapping of tensors "
+            f"(received: {type(prediction).__qualname__})"
+        )
+        raise TypeError(msg)
+    arrays = {}
+    for name, value in prediction.items():
+        value = value.detach()  # noqa: PLW2901
+        if value.dtype == torch.bfloat16:
+            # numpy does not support bfloat16.
+            value = value.float()  # noqa: PLW2901
+        arrays[str(name)] = value.cpu().numpy()
+    return arrays
+
+
+def _write_manifest(dirpath: Path, manifest: dict[str, Any]) -> None:
+    r"""Write the manifest of the predictions of a directory.
+
+    Args:
+        dirpath: The directory of the predictions.
+        manifest: The manifest.
+    """
+    path = dirpath.joinpath(MANIFEST_NAME)
+    tmp_path = path.with_name(f"{MANIFEST_NAME}.tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    tmp_path.replace(path)
@@ -0,0 +1,259 @@
+r"""Contain a callback to save the state of the training samplers in the
+checkpoints."""
+
+from __future__ import annotations
+
+__all__ = ["SamplerCheckpoint"]
+
+import logging
+import random
+from typing import TYPE_CHECKING, Any
+from unittest.mock import Mock
+
+import torch
+from lightning import Callback
+from torch.utils.data import DataLoader
+
+from lightcat.utils.imports import is_numpy_available
+
+if TYPE_CHECKING:
+    from lightning import LightningModule, Trainer
+    from torch.utils.data import Sampler
+
+if is_numpy_available():
+    import numpy as np
+else:  # pragma: no cover
+    np = Mock()
+
+logger = logging.getLogger(__name__)
+
+
+class SamplerCheckpoint(Callback):
+    r"""Implement a callback to resume an epoch at the right batch.
+
+    The callback saves in the checkpoints the state of the samplers of
+    the training dataloaders that expose ``state_dict`` and
+    ``load_state_dict`` methods, for example
+    ``lightcat.datamodule.sampler.FeistelSampler``. The saved start
+    index of each sampler is the number of samples consumed by the
+    training loop in the current epoch, so the resumed epoch starts
+    directly at the first batch that was not trained on. The samples
+    prefetched by the dataloader but not consumed are not counted.
+    Optionally, the states of the global random number generators are
+    also saved and restored.
+
+    The samplers are restored at the beginning of the training. The
+    dataloaders are expected to be map-style dataloaders with a
+    ``batch_size``.
+
+    Args:
+        save_rng_states: If ``True``, the states of the ``random``,
+            ``numpy`` and ``torch`` random number generators are saved
+            and restored.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.callback import SamplerCheckpoint
+    >>> callback = SamplerCheckpoint()
+    >>> callback
+    SamplerCheckpoint(save_rng_states=True)
+
+    ```
+    """
+
+    def __init__(self, save_rng_states: bool = True) -> None:
+        self._save_rng_states = bool(save_rng_states)
+
+        # Positions of the samplers when the current epoch started.
+        self._start_indices: list[int] = []
+        # Number of batches consumed since the current epoch started.
+        self._num_batches = 0
+        self._state_to_load: dict | None = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}(save_rng_states={self._save_rng_states})"
+
+    def on_train_start(self, trainer: Trainer, pl_module: LightningModule) -> None:  # noqa: ARG002
+        if self._state_to_load is None:
+            return
+        state, self._state_to_load = self._state_to_load, None
+        dataloaders = _get_dataloaders(trainer.train_dataloader)
+        samplers = [_get_stateful_sampler(dataloader) for dataloader in dataloaders]
+        sampler_states = state.get("samplers", [])
+        if len([sampler for sampler in samplers if sampler is not None]) != len(sampler_states):
+            logger.warning(
+                "The number of stateful samplers does not match the number of saved states "
+                f"({len(sampler_states)}). The sampler states are not restored."
+            )
+        else:
+            states = iter(sampler_states)
+            for sampler in samplers:
+                if sampler is not None:
+                    sampler.load_state_dict(next(states))
+            self._start_indices = [sampler_state["start_index"] for sampler_state in sampler_states]
+            self._num_batches = 0
+            # Lightning creates the train iterator before this hook is
+            # called, and the dataloader workers may already have
+            # prefetched indices of the old position, so the iterator
+            # is recreated to take into account the restored state.
+            data_fetcher = getattr(trainer.fit_loop, "_data_fetcher", None)
+            if data_fetcher is not None:
+                iter(data_fetcher)
+            logger.info(
+                f"Restored the state of {len(sampler_states)} sampler(s) "
+                f"(start indices: {self._start_indices})"
+            )
+        if "rng_states" in state:
+            _set_rng_states(state["rng_states"])
+
+    def on_train_epoch_start(
+        self, trainer: Trainer, pl_module: LightningModule  # noqa: ARG002
+    ) -> None:
+        self._start_indices = []
+        self._num_batches = 0
+
+    def on_train_batch_end(
+        self,
+        trainer: Trainer,  # noqa: ARG002
+        pl_module: LightningModule,  # noqa: ARG002
+        outputs: Any,  # noqa: ARG002
+        batch: Any,  # noqa: ARG002
+        batch_idx: int,  # noqa: ARG002
+    ) -> None:
+        self._num_batches += 1
+
+    def state_dict(self) -> dict[str, Any]:
+        if self._save_rng_states:
+            return {"rng_states": _get_rng_states()}
+        return {}
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        self._state_to_load = state_dict
+
+    def on_save_checkpoint(
+        self,
+        trainer: Trainer,
+        pl_module: LightningModule,  # noqa: ARG002
+        checkpoint: dict[str, Any],
+    ) -> None:
+        if "callbacks" not in checkpoint:
+            # The checkpoint only contains the weights.
+            return
+        samplers = []
+        for dataloader in _get_dataloaders(trainer.train_dataloader):
+            sampler = _get_stateful_sampler(dataloader)
+            if sampler is None:
+                continue
+            batch_size = _get_batch_size(dataloader)
+            start_index = (
+                self._start_indices[len(samplers)]
+                if len(samplers) < len(self._start_indices)
+                else 0
+            )
+            position = start_index + self._num_batches * batch_size
+            state = sampler.state_dict() | {"start_index": position}
+            if position >= min(len(sampler), trainer.num_training_batches * batch_size):
+                # The epoch is complete, so the training will resume at
+                # the beginning of the next epoch.
+                state |= {"epoch": state["epoch"] + 1, "start_index": 0}
+            samplers.append(state)
+        # The states returned by ``state_dict`` are collected by
+        # Lightning before this hook is called, so the sampler states
+        # are added to the collected state.
+        checkpoint["callbacks"].setdefault(self.state_key, {})["samplers"] = samplers
+
+
+def _get_dataloaders(dataloaders: Any) -> list[DataLoader]:
+    r"""Get the list of ``DataLoader``s in a collection of dataloaders.
+
+    Args:
+        dataloaders: A dataloader or a collection of dataloaders.
+
+    Returns:
+        The list of ``DataLoader`` objects.
+    """
+    if isinstance(dataloaders, DataLoader):
+        return [dataloaders]
+    if isinstance(dataloaders, dict):
+        dataloaders = list(dataloaders.values())
+    if isinstance(dataloaders, (list, tuple)):
+        return [dl for dataloader in dataloaders for dl in _get_dataloaders(dataloader)]
+    return []
+
+
+def _get_stateful_sampler(dataloader: DataLoader) -> Sampler | None:
+    r"""Get the stateful sampler of a dataloader.
+
+    Args:
+        dataloader: The dataloader.
+
+    Returns:
+        The sampler if it exposes ``state_dict`` and
+            ``load_state_dict`` methods, otherwise ``None``.
+    """
+    for sampler in (getattr(dataloader.batch_sampler, "sampler", None), dataloader.sampler):
+        if hasattr(sampler, "state_dict") and hasattr(sampler, "load_state_dict"):
+            return sampler
+    return None
+
+
+def _get_batch_size(dataloader: DataLoader) -> int:
+    r"""Get the batch size of a dataloader.
+
+    Args:
+        dataloader: The dataloader.
+
+    Returns:
+        The batch size.
+
+    Raises:
+        RuntimeError: if the batch size cannot be found.
+    """
+    batch_size = dataloader.batch_size or getattr(dataloader.batch_sampler, "batch_size", None)
+    if batch_size is None:
+        msg = f"Cannot find the batch size of the dataloader: {dataloader}"
+        raise RuntimeError(msg)
+    return batch_size
+
+
+def _get_rng_states() -> dict[str, Any]:
+    r"""Get the states of the global random number generators.
+
+    Returns:
+        The states of the random number generators.
+    """
+    states = {"python": random.getstate(), "torch": torch.get_rng_state()}
+    if is_numpy_available():
+        # The numpy state is converted to tensors and python objects so
+        # the checkpoints can be loaded with ``weights_only=True``.
+        name, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+        states["numpy"] = (
+            name,
+            torch.from_numpy(keys.astype(np.int64)),
+            int(pos),
+            int(has_gauss),
+            float(cached_gaussian),
+        )
+    if torch.cuda.is_available():
+        states["torch.cuda"] = torch.cuda.get_rng_state_all()
+    return states
+
+
+def _set_rng_states(states: dict[str, Any]) -> None:
+    r"""Set the states of the global random number generators.
+
+    Args:
+        states: The states of the random number generators, usually
+            generated by ``_get_rng_states``.
+    """
+    if "python" in states:
+        random.setstate(states["python"])
+    if "torch" in states:
+        torch.set_rng_state(states["torch"])
+    if "numpy" in states and is_numpy_available():
+        name, keys, pos, has_gauss, cached_gaussian = states["numpy"]
+        np.random.set_state((name, keys.numpy().astype(np.uint32), pos, has_gauss, cached_gaussian))
+    if "torch.cuda" in states and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(states["torch.cuda"])
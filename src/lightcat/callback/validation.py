@@ -0,0 +1,378 @@
+r"""Contain a callback to validate on a subset of the validation data
+most of the time and on the full validation data on a schedule."""
+
+from __future__ import annotations
+
+__all__ = ["SubsetValidation", "get_subset_indices"]
+
+import logging
+import math
+from collections import defaultdict
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any
+
+import torch
+from lightning import Callback
+from lightning.pytorch.trainer.connectors.data_connector import _parse_num_batches
+from lightning.pytorch.trainer.states import RunningStage, TrainerFn
+from lightning.pytorch.utilities.data import _update_dataloader
+from torch.utils.data import DataLoader, Sampler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Sequence
+
+    from lightning import LightningModule, Trainer
+    from torch.utils.data import Dataset
+
+logger = logging.getLogger(__name__)
+
+
+class SubsetValidation(Callback):
+    r"""Implement a callback to validate on a deterministic subset of
+    the validation data most of the time and on the full validation
+    data on a schedule.
+
+    The subset of each validation dataloader contains ``fraction`` of
+    its examples. It is sampled once with ``seed``, so the same
+    examples are used at each subset validation. If ``strata`` is
+    given, the subset is stratified: each stratum contributes
+    ``fraction`` of its examples, and at least one example. The
+    subset keeps the order of the examples and is split across the
+    processes like the ``DistributedSampler`` of Lightning.
+
+    The full validation data is used:
+
+    - every ``full_every_n_epochs`` epochs. It can be a mapping from
+      the first epoch to the period, for example ``{0: 10, 80: 1}``
+      runs a full validation every 10 epochs, and every epoch from the
+      epoch 80.
+    - at the last epoch if ``full_on_last_epoch`` is ``True``.
+    - at the next validation after a subset validation where the
+      ``monitor`` metric is lower (``mode='min'``) or greater
+      (``mode='max'``) than ``threshold``.
+
+    The sanity check and ``trainer.validate`` always use the full
+    validation data. The subset and full validation metrics have the
+    same names, so the callbacks that monitor a validation metric, for
+    example ``ModelCheckpoint``, should be configured accordingly. The
+    validation dataloaders must be map-style dataloaders.
+
+    Args:
+        fraction: The fraction of the examples in the subset.
+        full_every_n_epochs: The number of epochs between two full
+            validations, or a mapping from the first epoch to the
+            number of epochs between two full validations.
+        strata: The name of the attribute of the validation datasets
+            with the label of each example, or a function that returns
+            the labels of a dataset. If ``None``, the subset is not
+            stratified.
+        seed: The random seed used to sample the subset.
+        full_on_last_epoch: If ``True``, the full validation data is
+            used at the last epoch.
+        monitor: The name of the metric that triggers a full
+            validation. If ``None``, the full validation is only
+            triggered by the schedule.
+        threshold: The threshold of the monitored metric.
+        mode: ``'min'`` if a full validation is triggered when the
+            metric is lower than the threshold, or ``'max'`` if it is
+            triggered when the metric is greater than the threshold.
+
+    Raises:
+        ValueError: if the fraction is not in ``(0, 1]``, if the
+            number of epochs between two full validations is lower
+            than 1, or if the mode is not valid.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.callback import SubsetValidation
+    >>> callback = SubsetValidation(fraction=0.1, full_every_n_epochs={0: 10, 80: 1})
+    >>> callback
+    SubsetValidation(fraction=0.1, full_every_n_epochs={0: 10, 80: 1}, seed=0)
+
+    ```
+    """
+
+    def __init__(
+        self,
+        fraction: float = 0.1,
+        full_every_n_epochs: int | Mapping[int, int] = 5,
+        strata: str | Callable[[Dataset], Sequence[Any]] | None = None,
+        seed: int = 0,
+        full_on_last_epoch: bool = True,
+        monitor: str | None = None,
+        threshold: float | None = None,
+        mode: str = "min",
+    ) -> None:
+        if not 0 < fraction <= 1:
+            msg = f"fraction must be in (0, 1] (received: {fraction})"
+            raise ValueError(msg)
+        schedule = (
+            dict(full_every_n_epochs)
+            if isinstance(full_every_n_epochs, Mapping)
+            else {0: full_every_n_epochs}
+        )
+        if any(every_n_epochs < 1 for every_n_epochs in schedule.values()):
+            msg = (
+                "The number of epochs between two full validations must be greater than 0 "
+                f"(received: {full_every_n_epochs})"
+            )
+            raise ValueError(msg)
+        if mode not in {"min", "max"}:
+            msg = f"Incorrect mode: {mode}. The valid modes are: ('min', 'max')"
+            raise ValueError(msg)
+        self._fraction = float(fraction)
+        self._full_every_n_epochs = full_every_n_epochs
+        self._schedule = sorted((int(epoch), int(n)) for epoch, n in schedule.items())
+        self._strata = strata
+        self._seed = int(seed)
+        self._full_on_last_epoch = bool(full_on_last_epoch)
+        self._monitor = monitor
+        self._threshold = threshold
+        self._mode = mode
+
+        # The full and subset dataloaders of the validation loop, and
+        # their number of batches.
+        self._full: tuple[list, list] | None = None
+        self._subset: tuple[list, list] | None = None
+        self._is_full = True
+        self._force_full = False
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(fraction={self._fraction}, "
+            f"full_every_n_epochs={self._full_every_n_epochs}, seed={self._seed})"
+        )
+
+    @property
+    def is_full(self) -> bool:
+        r"""Indicate if the full validation data is used at the next or
+        current validation."""
+        return self._is_full
+
+    def is_full_epoch(self, epoch: int, max_epochs: int | None = None) -> bool:
+        r"""Indicate if the full validation data is used by the schedule
+        at a given epoch.
+
+        Args:
+            epoch: The epoch, starting from 0.
+            max_epochs: The maximum number of epochs. It is used to
+                find the last epoch.
+
+        Returns:
+            ``True`` if the full validation data is used at this
+                epoch, otherwise ``False``.
+
+        Example usage:
+
+        ```pycon
+
+        >>> from lightcat.callback import SubsetValidation
+        >>> callback = SubsetValidation(full_every_n_epochs={0: 5, 8: 1})
+        >>> [callback.is_full_epoch(epoch, max_epochs=12) for epoch in range(12)]
+        [False, False, False, False, True, False, False, False, True, True, True, True]
+
+        ```
+        """
+        if self._full_on_last_epoch and max_epochs is not None and epoch >= max_epochs - 1 >= 0:
+            return True
+        every_n_epochs = self._schedule[0][1]
+        for start, n in self._schedule:
+            if epoch >= start:
+                every_n_epochs = n
+        return (epoch + 1) % every_n_epochs == 0
+
+    def on_train_batch_end(
+        self,
+        trainer: Trainer,
+        pl_module: LightningModule,  # noqa: ARG002
+        outputs: Any,  # noqa: ARG002
+        batch: Any,  # noqa: ARG002
+        batch_idx: int,  # noqa: ARG002
+    ) -> None:
+        # The validation of the fit loop runs after this hook, and the
+        # validation dataloaders are iterated in the validation loop
+        # before the validation hooks are called.
+        max_epochs = trainer.max_epochs if trainer.max_epochs not in (None, -1) else None
+        is_full = self._force_full or self.is_full_epoch(trainer.current_epoch, max_epochs)
+        val_loop = trainer.fit_loop.epoch_loop.val_loop
+        if val_loop._combined_loader is None:
+            val_loop.setup_data()
+        combined_loader = val_loop._combined_loader
+        if combined_loader is None:
+            # There is no validation.
+            return
+        if self._full is None or (
+            combined_loader.flattened is not self._full[0]
+            and (self._subset is None or combined_loader.flattened is not self._subset[0])
+        ):
+            # The dataloaders are created or reloaded.
+            self._full = (combined_loader.flattened, list(val_loop._max_batches))
+            self._subset = self._create_subset(trainer, combined_loader.flattened)
+        loaders, max_batches = self._full if is_full else self._subset
+        if combined_loader.flattened is not loaders:
+            combined_loader.flattened = loaders
+        val_loop._max_batches = list(max_batches)
+        self._is_full = is_full
+
+    def on_validation_end(
+        self, trainer: Trainer, pl_module: LightningModule  # noqa: ARG002
+    ) -> None:
+        if trainer.sanity_checking or trainer.state.fn != TrainerFn.FITTING:
+            return
+        if self._is_full:
+            self._force_full = False
+            return
+        if self._monitor is None or self._threshold is None:
+            return
+        value = trainer.callback_metrics.get(self._monitor)
+        if value is None:
+            logger.warning(f"The monitored metric {self._monitor!r} is not available")
+            return
+        value = float(value)
+        if (self._mode == "min" and value < self._threshold) or (
+            self._mode == "max" and value > self._threshold
+        ):
+            logger.info(
+                f"The subset value of {self._monitor} ({value:.6g}) crossed the threshold "
+                f"{self._threshold}. The next validation uses the full validation data"
+            )
+            self._force_full = True
+
+    def on_train_end(self, trainer: Trainer, pl_module: LightningModule) -> None:  # noqa: ARG002
+        # Restore the full validation dataloaders for the next
+        # validation, for example ``trainer.validate``.
+        combined_loader = trainer.fit_loop.epoch_loop.val_loop._combined_loader
+        if self._full is not None and combined_loader is not None:
+            combined_loader.flattened = self._full[0]
+            trainer.fit_loop.epoch_loop.val_loop._max_batches = list(self._full[1])
+        self._full, self._subset, self._is_full = None, None, True
+
+    def _create_subset(self, trainer: Trainer, dataloaders: list) -> tuple[list, list]:
+        r"""Create the subset dataloaders.
+
+        Args:
+            trainer: The trainer.
+            dataloaders: The full validation dataloaders.
+
+        Returns:
+            The subset dataloaders and their number of batches.
+        """
+        loaders, max_batches = [], []
+        for dataloader in dataloaders:
+            if not isinstance(dataloader, DataLoader):
+                msg = f"The validation dataloaders must be DataLoader objects: {type(dataloader)}"
+                raise TypeError(msg)
+            dataset = dataloader.dataset
+            labels = None
+            if self._strata is not None:
+                labels = (
+                    getattr(dataset, self._strata)
+                    if isinstance(self._strata, str)
+                    else self._strata(dataset)
+                )
+            indices = get_subset_indices(
+                len(dataset), fraction=self._fraction, labels=labels, seed=self._seed
+            )
+            sampler = _SubsetSampler(
+                indices, rank=trainer.global_rank, world_size=trainer.world_size
+            )
+            loader = _update_dataloader(dataloader, sampler, mode=RunningStage.VALIDATING)
+            loaders.append(loader)
+            max_batches.append(
+                _parse_num_batches(RunningStage.VALIDATING, len(loader), trainer.limit_val_batches)
+            )
+            logger.info(
+                f"The validation subset contains {len(indices):,} of {len(dataset):,} examples"
+            )
+        return loaders, max_batches
+
+
+def get_subset_indices(
+    num_examples: int,
+    fraction: float,
+    labels: Sequence[Any] | torch.Tensor | None = None,
+    seed: int = 0,
+) -> list[int]:
+    r"""Sample a deterministic and optionally stratified subset of
+    example indices.
+
+    Args:
+        num_examples: The number of examples.
+        fraction: The fraction of the examples in the subset.
+        labels: The label of each example. If given, each label
+            contributes ``fraction`` of its examples, and at least one
+            example.
+        seed: The random seed.
+
+    Returns:
+        The sorted indices of the examples in the subset.
+
+    Raises:
+        ValueError: if the number of labels does not match the number
+            of examples.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.callback.validation import get_subset_indices
+    >>> indices = get_subset_indices(10, fraction=0.5, labels=[0] * 8 + [1] * 2)
+    >>> len(indices)
+    5
+    >>> sum(index >= 8 for index in indices)
+    1
+
+    ```
+    """
+    if labels is None:
+        groups = [list(range(num_examples))]
+    else:
+        if torch.is_tensor(labels):
+            labels = labels.tolist()
+        if len(labels) != num_examples:
+            msg = (
+                f"The number of labels ({len(labels):,}) does not match the number of "
+                f"examples ({num_examples:,})"
+            )
+            raise ValueError(msg)
+        strata = defaultdict(list)
+        for index, label in enumerate(labels):
+            strata[label].append(index)
+        groups = list(strata.values())
+    generator = torch.Generator().manual_seed(seed)
+    indices = []
+    for group in groups:
+        if not group:
+            continue
+        size = max(1, round(fraction * len(group)))
+        permutation = torch.randperm(len(group), generator=generator)[:size]
+        indices.extend(group[i] for i in permutation.tolist())
+    return sorted(indices)
+
+
+class _SubsetSampler(Sampler[int]):
+    r"""Implement a sampler that iterates over the part of a subset of a
+    process.
+
+    The subset is padded by repeating its first indices so each
+    process has the same number of indices, like the
+    ``DistributedSampler``.
+
+    Args:
+        indices: The indices of the subset.
+        rank: The rank of the current process.
+        world_size: The number of processes.
+    """
+
+    def __init__(self, indices: Sequence[int], rank: int = 0, world_size: int = 1) -> None:
+        total_size = math.ceil(len(indices) / world_size) * world_size
+        padded = list(indices) + list(indices[: total_size - len(indices)])
+        self._indices = padded[rank:total_size:world_size]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._indices)
+
+    def __len__(self) -> int:
+        return len(self._indices)
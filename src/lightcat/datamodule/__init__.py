@@ -3,6 +3,24 @@ them."""
 
 from __future__ import annotations
 
-__all__ = ["is_datamodule_config", "setup_datamodule"]
+__all__ = [
+    "BatchPackingMixin",
+    "PackedBatch",
+    "PackedCollate",
+    "SharedMemoryDataModule",
+    "SharedMemoryDataset",
+    "is_datamodule_config",
+    "pack_batch",
+    "setup_datamodule",
+    "unpack_batch",
+]
 
 from lightcat.datamodule.factory import is_datamodule_config, setup_datamodule
+from lightcat.datamodule.packing import (
+    BatchPackingMixin,
+    PackedBatch,
+    PackedCollate,
+    pack_batch,
+    unpack_batch,
+)
+from lightcat.datamodule.shared import SharedMemoryDataModule, SharedMemoryDataset
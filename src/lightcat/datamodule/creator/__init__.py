@@ -4,6 +4,7 @@ from __future__ import annotations
 
 __all__ = [
     "BaseDataModuleCreator",
+    "BroadcastDataModuleCreator",
     "DataModuleCreator",
     "is_datamodule_creator_config",
     "setup_datamodule_creator",
@@ -14,4 +15,5 @@ from lightcat.datamodule.creator.base import (
     is_datamodule_creator_config,
     setup_datamodule_creator,
 )
+from lightcat.datamodule.creator.broadcast import BroadcastDataModuleCreator
 from lightcat.datamodule.creator.vanilla import DataModuleCreator
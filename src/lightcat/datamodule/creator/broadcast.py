@@ -0,0 +1,109 @@
+r"""Contain a ``lightning.LightningDataModule`` creator that creates the
+datamodule in a single process and broadcasts it to the other
+processes."""
+
+from __future__ import annotations
+
+__all__ = ["BroadcastDataModuleCreator"]
+
+import logging
+from typing import TYPE_CHECKING
+
+from coola.utils import repr_indent, repr_mapping, str_indent, str_mapping
+
+from lightcat.datamodule.creator.base import BaseDataModuleCreator, setup_datamodule_creator
+from lightcat.utils.distributed import build_and_broadcast
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from lightning import LightningDataModule
+
+logger = logging.getLogger(__name__)
+
+
+class BroadcastDataModuleCreator(BaseDataModuleCreator):
+    r"""Create a ``lightning.LightningDataModule`` object in the process
+    with rank ``src`` and broadcast it to the other processes.
+
+    In a distributed run, each process usually creates its own
+    datamodule, so an expensive preparation, for example building an
+    index or a vocabulary, is repeated in each process. With this
+    creator, only the source process creates the datamodule and calls
+    its ``setup`` method for each stage in ``stages``, and the other
+    processes receive a copy of the datamodule through the ``gloo``
+    process group. The datamodule must be picklable, and its
+    ``setup`` method should not rebuild what is already built because
+    Lightning calls it again in each process. The default process
+    group must be initialized before the datamodule is created, for
+    example with ``torch.distributed.init_process_group`` in a script
+    started by ``torchrun``. If the default process group is not
+    initialized, the datamodule is created by the current process.
+
+    Args:
+        datamodule: The datamodule creator or its configuration.
+        stages: The stages passed to the ``setup`` method of the
+            datamodule before it is broadcast, for example
+            ``["fit"]``.
+        src: The global rank of the process that creates the
+            datamodule.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.datamodule.creator import BroadcastDataModuleCreator
+    >>> creator = BroadcastDataModuleCreator(
+    ...     datamodule={
+    ...         "_target_": "lightcat.datamodule.creator.DataModuleCreator",
+    ...         "datamodule": {
+    ...             "_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"
+    ...         },
+    ...     },
+    ...     stages=["fit"],
+    ... )
+    >>> datamodule = creator.create()
+    >>> datamodule
+    <lightning.pytorch.demos.boring_classes.BoringDataModule object at ...>
+
+    ```
+    """
+
+    def __init__(
+        self, datamodule: BaseDataModuleCreator | dict, stages: Sequence[str] = (), src: int = 0
+    ) -> None:
+        self._datamodule = datamodule
+        self._stages = tuple(stages)
+        self._src = src
+
+    def __repr__(self) -> str:
+        args = repr_indent(repr_mapping(self._get_args()))
+        return f"{self.__class__.__qualname__}(\n  {args}\n)"
+
+    def __str__(self) -> str:
+        args = str_indent(str_mapping(self._get_args()))
+        return f"{self.__class__.__qualname__}(\n  {args}\n)"
+
+    def create(self) -> LightningDataModule:
+        logger.info(f"Creating 'LightningDataModule' in the process with rank {self._src}...")
+        return build_and_broadcast(self._build, src=self._src)
+
+    def _build(self) -> LightningDataModule:
+        r"""Create the datamodule and set it up for each stage.
+
+        Returns:
+            The datamodule.
+        """
+        datamodule = setup_datamodule_creator(self._datamodule).create()
+        for stage in self._stages:
+            logger.info(f"Setting up the datamodule for the stage '{stage}'...")
+            datamodule.setup(stage)
+        return datamodule
+
+    def _get_args(self) -> dict:
+        r"""Get the arguments of the creator.
+
+        Returns:
+            The arguments.
+        """
+        return {"datamodule": self._datamodule, "stages": self._stages, "src": self._src}
@@ -0,0 +1,410 @@
+r"""Contain utilities to pack all the tensors of a batch in a single
+contiguous buffer.
+
+A batch with many small tensors has a per-tensor overhead when it is
+sent from the dataloader workers to the main process (one shared memory
+segment per tensor), when it is pinned, and when it is copied to the
+device. Packing the batch in a single ``torch.uint8`` buffer with an
+offset table replaces these operations by a single operation on the
+buffer. The tensors are recovered as views of the buffer.
+"""
+
+from __future__ import annotations
+
+__all__ = ["BatchPackingMixin", "PackedBatch", "PackedCollate", "pack_batch", "unpack_batch"]
+
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+import torch
+from torch.utils.data import default_collate
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+# Alignment in bytes of each tensor in the buffer. It must be a
+# multiple of the largest element size to create the typed views.
+ALIGNMENT = 16
+
+
+class TensorSpec(NamedTuple):
+    r"""Define the location of a tensor in a packed buffer."""
+
+    offset: int
+    dtype: torch.dtype
+    shape: torch.Size
+
+
+class _TensorRef(NamedTuple):
+    r"""Define a placeholder for a packed tensor in the batch
+    structure."""
+
+    index: int
+
+
+class PackedBatch:
+    r"""Implement a batch where all the tensors are stored in a single
+    contiguous buffer.
+
+    ``PackedBatch`` objects are usually created with ``pack_batch``.
+
+    Args:
+        buffer: The 1-d ``torch.uint8`` buffer with the data of all
+            the tensors.
+        specs: The location, data type and shape of each tensor in
+            the buffer.
+        structure: The batch structure where the tensors are replaced
+            by placeholders.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.datamodule import pack_batch
+    >>> packed = pack_batch({"x": torch.ones(2, 3), "y": torch.tensor([1, 2])})
+    >>> packed
+    PackedBatch(num_tensors=2, nbytes=48, device=cpu)
+    >>> packed.unpack()
+    {'x': tensor([[1., 1., 1.], [1., 1., 1.]]), 'y': tensor([1, 2])}
+
+    ```
+    """
+
+    def __init__(self, buffer: torch.Tensor, specs: Sequence[TensorSpec], structure: Any) -> None:
+        self._buffer = buffer
+        self._specs = tuple(specs)
+        self._structure = structure
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(num_tensors={len(self._specs):,}, "
+            f"nbytes={self._buffer.numel():,}, device={self._buffer.device})"
+        )
+
+    @property
+    def buffer(self) -> torch.Tensor:
+        r"""The buffer with the data of all the tensors."""
+        return self._buffer
+
+    @property
+    def device(self) -> torch.device:
+        r"""The device of the buffer."""
+        return self._buffer.device
+
+    @property
+    def specs(self) -> tuple[TensorSpec, ...]:
+        r"""The location, data type and shape of each tensor."""
+        return self._specs
+
+    def is_pinned(self) -> bool:
+        r"""Indicate if the buffer is in pinned memory.
+
+        Returns:
+            ``True`` if the buffer is in pinned memory, otherwise
+                ``False``.
+        """
+        return self._buffer.is_pinned()
+
+    def pin_memory(self) -> PackedBatch:
+        r"""Copy the buffer to pinned memory.
+
+        This method is called by ``torch.utils.data.DataLoader`` when
+        ``pin_memory=True``, so a single buffer is pinned per batch.
+
+        Returns:
+            The packed batch with a buffer in pinned memory.
+        """
+        return self.__class__(self._buffer.pin_memory(), self._specs, self._structure)
+
+    def to(self, device: torch.device | str, non_blocking: bool = False) -> PackedBatch:
+        r"""Move the buffer to another device.
+
+        Args:
+            device: The target device.
+            non_blocking: If ``True``, the copy is asynchronous with
+                respect to the host when possible.
+
+        Returns:
+            The packed batch with a buffer on the target device.
+
+        Example usage:
+
+        ```pycon
+
+        >>> import torch
+        >>> from lightcat.datamodule import pack_batch
+        >>> packed = pack_batch({"x": torch.ones(2, 3), "y": torch.tensor([1, 2])})
+        >>> packed.to(device="cpu")
+        PackedBatch(num_tensors=2, nbytes=48, device=cpu)
+
+        ```
+        """
+        buffer = self._buffer.to(device=device, non_blocking=non_blocking)
+        return self.__class__(buffer, self._specs, self._structure)
+
+    def unpack(self) -> Any:
+        r"""Unpack the batch.
+
+        Returns:
+            The batch with the same structure as the original batch.
+                The tensors are views of the buffer.
+        """
+        tensors = [
+            self._buffer[spec.offset : spec.offset + _nbytes(spec)]
+            .view(spec.dtype)
+            .view(spec.shape)
+            for spec in self._specs
+        ]
+        return _fill_structure(self._structure, tensors)
+
+
+class PackedCollate:
+    r"""Implement a collate function that packs the collated batch.
+
+    Args:
+        collate_fn: The collate function used to create the batch
+            before packing it. If ``None``,
+            ``torch.utils.data.default_collate`` is used.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.datamodule import PackedCollate
+    >>> collate = PackedCollate()
+    >>> collate
+    PackedCollate(collate_fn=default_collate)
+    >>> batch = collate([{"x": torch.ones(3), "y": 1}, {"x": torch.zeros(3), "y": 0}])
+    >>> batch
+    PackedBatch(num_tensors=2, nbytes=48, device=cpu)
+    >>> batch.unpack()
+    {'x': tensor([[1., 1., 1.], [0., 0., 0.]]), 'y': tensor([1, 0])}
+
+    ```
+    """
+
+    def __init__(self, collate_fn: Callable[[list], Any] | None = None) -> None:
+        self._collate_fn = collate_fn or default_collate
+
+    def __repr__(self) -> str:
+        name = getattr(self._collate_fn, "__qualname__", self._collate_fn)
+        return f"{self.__class__.__qualname__}(collate_fn={name})"
+
+    def __call__(self, samples: list) -> PackedBatch:
+        return pack_batch(self._collate_fn(samples))
+
+
+class BatchPackingMixin:
+    r"""Implement a mixin to transfer packed batches to the device.
+
+    The mixin can be used with a ``lightning.LightningModule`` or a
+    ``lightning.LightningDataModule``. It overrides the
+    ``transfer_batch_to_device`` hook so the packed batches are
+    copied to the device with a single copy, and then unpacked. The
+    other batches are transferred with the default implementation.
+    The mixin must be before the Lightning class in the base classes.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightning.pytorch.demos.boring_classes import BoringModel
+    >>> from lightcat.datamodule import BatchPackingMixin, pack_batch
+    >>> class MyModel(BatchPackingMixin, BoringModel):
+    ...     pass
+    ...
+    >>> model = MyModel()
+    >>> model.transfer_batch_to_device(
+    ...     pack_batch({"x": torch.ones(2, 3)}), torch.device("cpu"), dataloader_idx=0
+    ... )
+    {'x': tensor([[1., 1., 1.], [1., 1., 1.]])}
+
+    ```
+    """
+
+    def transfer_batch_to_device(
+        self, batch: Any, device: torch.device, dataloader_idx: int
+    ) -> Any:
+        if isinstance(batch, PackedBatch):
+            return batch.to(device=device, non_blocking=batch.is_pinned()).unpack()
+        return super().transfer_batch_to_device(batch, device, dataloader_idx)
+
+
+def pack_batch(batch: Any) -> PackedBatch:
+    r"""Pack all the tensors of a batch in a single contiguous buffer.
+
+    The batch can be a nested structure of mappings, lists and
+    tuples. The tensors must be on the same device. The other values
+    are kept in the batch structure.
+
+    Args:
+        batch: The batch to pack.
+
+    Returns:
+        The packed batch.
+
+    Raises:
+        ValueError: if the tensors are not on the same device.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.datamodule import pack_batch
+    >>> packed = pack_batch([torch.ones(2, 3), {"mask": torch.tensor([True, False])}, "abc"])
+    >>> packed
+    PackedBatch(num_tensors=2, nbytes=34, device=cpu)
+    >>> packed.unpack()
+    [tensor([[1., 1., 1.], [1., 1., 1.]]), {'mask': tensor([ True, False])}, 'abc']
+
+    ```
+    """
+    tensors = []
+    structure = _extract_tensors(batch, tensors)
+    devices = {tensor.device for tensor in tensors}
+    if len(devices) > 1:
+        msg = f"All the tensors must be on the same device (received: {devices})"
+        raise ValueError(msg)
+    device = devices.pop() if devices else torch.device("cpu")
+
+    specs, nbytes = _compute_layout(tensors)
+    buffer = torch.empty(nbytes, dtype=torch.uint8, device=device)
+    _copy_to_buffer(buffer, tensors, specs)
+    return PackedBatch(buffer=buffer, specs=specs, structure=structure)
+
+
+def unpack_batch(batch: Any) -> Any:
+    r"""Unpack a batch if it is packed.
+
+    Args:
+        batch: The batch to unpack.
+
+    Returns:
+        The unpacked batch if the input is a ``PackedBatch``,
+            otherwise the input batch.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.datamodule import pack_batch, unpack_batch
+    >>> unpack_batch(pack_batch({"x": torch.ones(2, 3)}))
+    {'x': tensor([[1., 1., 1.], [1., 1., 1.]])}
+    >>> unpack_batch({"x": torch.ones(2, 3)})
+    {'x': tensor([[1., 1., 1.], [1., 1., 1.]])}
+
+    ```
+    """
+    if isinstance(batch, PackedBatch):
+        return batch.unpack()
+    return batch
+
+
+def _align(offset: int) -> int:
+    r"""Round up an offset to the next multiple of ``ALIGNMENT``.
+
+    Args:
+        offset: The offset in bytes.
+
+    Returns:
+        The aligned offset.
+    """
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _compute_layout(tensors: Sequence[torch.Tensor]) -> tuple[list[TensorSpec], int]:
+    r"""Compute the location of each tensor in a packed buffer.
+
+    Args:
+        tensors: The tensors to pack.
+
+    Returns:
+        A tuple with the specification of each tensor and the size
+            of the buffer in bytes.
+    """
+    specs = []
+    offset = 0
+    for tensor in tensors:
+        offset = _align(offset)
+        spec = TensorSpec(offset=offset, dtype=tensor.dtype, shape=tensor.shape)
+        specs.append(spec)
+        offset += _nbytes(spec)
+    return specs, offset
+
+
+def _copy_to_buffer(
+    buffer: torch.Tensor, tensors: Sequence[torch.Tensor], specs: Sequence[TensorSpec]
+) -> None:
+    r"""Copy tensors to a packed buffer.
+
+    Args:
+        buffer: The 1-d ``torch.uint8`` buffer.
+        tensors: The tensors to copy.
+        specs: The location of each tensor in the buffer.
+    """
+    for tensor, spec in zip(tensors, specs):
+        buffer[spec.offset : spec.offset + _nbytes(spec)].view(spec.dtype).view(spec.shape).copy_(
+            tensor
+        )
+
+
+def _nbytes(spec: TensorSpec) -> int:
+    r"""Compute the number of bytes of a tensor.
+
+    Args:
+        spec: The tensor specification.
+
+    Returns:
+        The number of bytes.
+    """
+    return spec.shape.numel() * torch.empty((), dtype=spec.dtype).element_size()
+
+
+def _extract_tensors(data: Any, tensors: list[torch.Tensor]) -> Any:
+    r"""Replace the tensors of a nested structure by placeholders.
+
+    Args:
+        data: The nested structure.
+        tensors: The list where the extracted tensors are appended.
+
+    Returns:
+        The nested structure with placeholders.
+    """
+    if isinstance(data, torch.Tensor):
+        tensors.append(data.detach())
+        return _TensorRef(len(tensors) - 1)
+    if isinstance(data, Mapping):
+        return type(data)({key: _extract_tensors(value, tensors) for key, value in data.items()})
+    if isinstance(data, tuple) and hasattr(data, "_fields"):  # namedtuple
+        return type(data)(*(_extract_tensors(value, tensors) for value in data))
+    if isinstance(data, (list, tuple)):
+        return type(data)(_extract_tensors(value, tensors) for value in data)
+    return data
+
+
+def _fill_structure(structure: Any, tensors: Sequence[torch.Tensor]) -> Any:
+    r"""Replace the placeholders of a nested structure by the tensors.
+
+    Args:
+        structure: The nested structure with placeholders.
+        tensors: The tensors.
+
+    Returns:
+        The nested structure with tensors.
+    """
+    if isinstance(structure, _TensorRef):
+        return tensors[structure.index]
+    if isinstance(structure, Mapping):
+        return type(structure)(
+            {key: _fill_structure(value, tensors) for key, value in structure.items()}
+        )
+    if isinstance(structure, tuple) and hasattr(structure, "_fields"):  # namedtuple
+        return type(structure)(*(_fill_structure(value, tensors) for value in structure))
+    if isinstance(structure, (list, tuple)):
+        return type(structure)(_fill_structure(value, tensors) for value in structure)
+    return structure
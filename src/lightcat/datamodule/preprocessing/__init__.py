@@ -0,0 +1,25 @@
+r"""Contain a multiprocess preprocessing pipeline that caches its
+outputs on disk."""
+
+from __future__ import annotations
+
+__all__ = [
+    "BaseStage",
+    "FilterStage",
+    "MapStage",
+    "PreprocessedDataModule",
+    "PreprocessingPipeline",
+    "ShardedDataset",
+    "is_stage_config",
+    "setup_stage",
+]
+
+from lightcat.datamodule.preprocessing.datamodule import PreprocessedDataModule
+from lightcat.datamodule.preprocessing.pipeline import PreprocessingPipeline, ShardedDataset
+from lightcat.datamodule.preprocessing.stage import (
+    BaseStage,
+    FilterStage,
+    MapStage,
+    is_stage_config,
+    setup_stage,
+)
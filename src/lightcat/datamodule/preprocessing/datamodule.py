@@ -0,0 +1,134 @@
+r"""Contain a ``lightning.LightningDataModule`` that preprocesses its
+data in ``prepare_data``."""
+
+from __future__ import annotations
+
+__all__ = ["PreprocessedDataModule"]
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+from lightning import LightningDataModule
+from torch.utils.data import DataLoader
+
+from lightcat.datamodule.preprocessing.pipeline import PreprocessingPipeline, ShardedDataset
+from lightcat.utils.factory import setup_object
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+logger = logging.getLogger(__name__)
+
+SPLITS = ("train", "val", "test", "predict")
+
+
+class PreprocessedDataModule(LightningDataModule):
+    r"""Implement a ``lightning.LightningDataModule`` where the data
+    are generated by preprocessing pipelines.
+
+    The pipelines are run in ``prepare_data``, so only once per node
+    in a distributed setting, and the datasets are created in
+    ``setup`` from the cached outputs. The outputs are fingerprinted
+    by the pipeline configurations, so every later run with the same
+    configuration, for example with the same ``DataModuleCreator``
+    configuration, reuses the cached outputs.
+
+    Args:
+        pipelines: The preprocessing pipelines or their
+            configurations. The keys are the data splits and must be
+            ``'train'``, ``'val'``, ``'test'`` or ``'predict'``.
+        dataloader_kwargs: The keyword arguments used to create the
+            ``torch.utils.data.DataLoader``s.
+
+    Raises:
+        ValueError: if a split is invalid.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import tempfile
+    >>> from lightcat.datamodule.preprocessing import MapStage, PreprocessedDataModule
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     datamodule = PreprocessedDataModule(
+    ...         pipelines={
+    ...             "train": {
+    ...                 "_target_": "lightcat.datamodule.preprocessing.PreprocessingPipeline",
+    ...                 "source": list(range(10)),
+    ...                 "stages": [MapStage(float)],
+    ...                 "cache_dir": tmpdir,
+    ...             },
+    ...         },
+    ...         dataloader_kwargs={"batch_size": 4},
+    ...     )
+    ...     datamodule.prepare_data()
+    ...     datamodule.setup("fit")
+    ...     next(iter(datamodule.train_dataloader()))
+    ...
+    tensor([0., 1., 2., 3.], dtype=torch.float64)
+
+    ```
+    """
+
+    def __init__(
+        self,
+        pipelines: Mapping[str, PreprocessingPipeline | dict],
+        dataloader_kwargs: dict[str, Any] | None = None,
+    ) -> None:
+        super().__init__()
+        for split in pipelines:
+            if split not in SPLITS:
+                msg = f"Incorrect split '{split}'. The valid splits are: {SPLITS}"
+                raise ValueError(msg)
+        self._pipelines = {split: setup_object(pipeline) for split, pipeline in pipelines.items()}
+        self._dataloader_kwargs = dataloader_kwargs or {}
+        self._datasets: dict[str, ShardedDataset] = {}
+
+    @property
+    def pipelines(self) -> dict[str, PreprocessingPipeline]:
+        r"""The preprocessing pipelines."""
+        return self._pipelines
+
+    def prepare_data(self) -> None:
+        for split, pipeline in self._pipelines.items():
+            logger.info(f"Preparing the '{split}' data...")
+            pipeline.run()
+
+    def setup(self, stage: str) -> None:  # noqa: ARG002
+        self._datasets = {
+            split: ShardedDataset(pipeline.manifest_path)
+            for split, pipeline in self._pipelines.items()
+        }
+
+    def train_dataloader(self) -> DataLoader:
+        return self._create_dataloader("train")
+
+    def val_dataloader(self) -> DataLoader:
+        return self._create_dataloader("val")
+
+    def test_dataloader(self) -> DataLoader:
+        return self._create_dataloader("test")
+
+    def predict_dataloader(self) -> DataLoader:
+        return self._create_dataloader("predict")
+
+    def _create_dataloader(self, split: str) -> DataLoader:
+        r"""Create the dataloader of a data split.
+
+        Args:
+            split: The data split.
+
+        Returns:
+            The dataloader.
+
+        Raises:
+            RuntimeError: if the dataset of the split is not
+                available.
+        """
+        if split not in self._datasets:
+            msg = (
+                f"The '{split}' dataset is not available. Make sure a '{split}' pipeline is "
+                "defined, and prepare_data and setup were called"
+            )
+            raise RuntimeError(msg)
+        return DataLoader(self._datasets[split], **self._dataloader_kwargs)
@@ -0,0 +1,425 @@
+r"""Contain a preprocessing pipeline that caches its outputs on disk."""
+
+from __future__ import annotations
+
+__all__ = ["PreprocessingPipeline", "ShardedDataset"]
+
+import copy
+import hashlib
+import json
+import logging
+import math
+import os
+import pickle
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import torch
+from coola.utils import str_indent, str_mapping
+from torch.utils.data import Dataset
+
+from lightcat.datamodule.preprocessing.stage import setup_stage
+from lightcat.utils.factory import setup_object
+from lightcat.utils.hashing import hash_config
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from lightcat.datamodule.preprocessing.stage import BaseStage
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+# The pipeline run by the current worker process.
+_worker_pipeline: PreprocessingPipeline | None = None
+
+
+class PreprocessingPipeline:
+    r"""Implement a preprocessing pipeline that caches its outputs on
+    disk.
+
+    The records of the source are split in shards of ``shard_size``
+    consecutive records. Each shard is processed by the stages in a
+    process pool, and the processed records are written in a shard
+    file. A manifest is written when all the shards are processed.
+    The outputs are stored in a sub-directory of ``cache_dir`` named
+    after the fingerprint of the pipeline, which is computed from the
+    name or the configuration of the source, the configuration of the
+    stages and the shard size. If the source has no name and is not
+    given by its configuration, its records are hashed, which
+    requires to read all of them once. The shards already processed
+    by a previous run with the same fingerprint are not processed
+    again, so the pipeline can be resumed after an interruption, and
+    it does nothing if all the shards are already processed.
+
+    Args:
+        source: The sequence of records to process, or its
+            configuration. The source must be picklable to be used
+            with multiple processes.
+        stages: The stages or their configurations.
+        cache_dir: The directory where the outputs are cached.
+        shard_size: The number of source records in each shard.
+        num_workers: The number of processes used to process the
+            shards. If ``0``, the shards are processed in the main
+            process.
+        name: An optional name to identify the source in the
+            fingerprint. The name should be changed when the records
+            of the source are changed. By default, the configuration
+            of the source is used if it is a configuration, otherwise
+            the hash of the records is used.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import tempfile
+    >>> from lightcat.datamodule.preprocessing import (
+    ...     FilterStage,
+    ...     MapStage,
+    ...     PreprocessingPipeline,
+    ... )
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     pipeline = PreprocessingPipeline(
+    ...         source=list(range(-5, 5)),
+    ...         stages=[MapStage(abs), FilterStage(bool)],
+    ...         cache_dir=tmpdir,
+    ...         shard_size=4,
+    ...     )
+    ...     pipeline.is_complete()
+    ...     dataset = pipeline.run()
+    ...     pipeline.is_complete()
+    ...     list(dataset)
+    ...
+    False
+    True
+    [5, 4, 3, 2, 1, 1, 2, 3, 4]
+
+    ```
+    """
+
+    def __init__(
+        self,
+        source: Sequence | dict,
+        stages: Sequence[BaseStage | dict],
+        cache_dir: Path | str,
+        shard_size: int = 10000,
+        num_workers: int = 0,
+        name: str | None = None,
+    ) -> None:
+        if shard_size < 1:
+            msg = f"shard_size must be greater than 0 (received: {shard_size})"
+            raise ValueError(msg)
+        if num_workers < 0:
+            msg = f"num_workers must be greater or equal to 0 (received: {num_workers})"
+            raise ValueError(msg)
+        self._source_config = source if isinstance(source, dict) else None
+        self._source = setup_object(source)
+        self._stages = tuple(setup_stage(stage) for stage in stages)
+        self._cache_dir = Path(cache_dir)
+        self._shard_size = int(shard_size)
+        self._num_workers = int(num_workers)
+        self._name = name
+        # The configuration is computed once because it can require
+        # to hash all the records of the source.
+        self._config = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}(fingerprint={self.fingerprint})"
+
+    def __str__(self) -> str:
+        args = str_indent(
+            str_mapping(
+                {
+                    "stages": "\n".join(map(str, self._stages)),
+                    "cache_dir": self._cache_dir,
+                    "shard_size": self._shard_size,
+                    "num_workers": self._num_workers,
+                    "fingerprint": self.fingerprint,
+                }
+            )
+        )
+        return f"{self.__class__.__qualname__}(\n  {args}\n)"
+
+    @property
+    def fingerprint(self) -> str:
+        r"""The fingerprint of the pipeline."""
+        return hash_config(self.get_config())[:16]
+
+    @property
+    def output_dir(self) -> Path:
+        r"""The directory where the outputs of the pipeline are
+        stored."""
+        return self._cache_dir.joinpath(self.fingerprint)
+
+    @property
+    def manifest_path(self) -> Path:
+        r"""The path to the manifest of the pipeline."""
+        return self.output_dir.joinpath(MANIFEST_NAME)
+
+    def get_config(self) -> dict[str, Any]:
+        r"""Get the configuration used to fingerprint the pipeline.
+
+        Returns:
+            The configuration of the pipeline.
+        """
+        if self._config is None:
+            self._config = self._compute_config()
+        return copy.deepcopy(self._config)
+
+    def _compute_config(self) -> dict[str, Any]:
+        r"""Compute the configuration used to fingerprint the pipeline.
+
+        Returns:
+            The configuration of the pipeline.
+        """
+        if self._name is not None:
+            source = self._name
+        elif self._source_config is not None:
+            source = self._source_config
+        else:
+            source = (
+                f"{type(self._source).__qualname__}(num_records={len(self._source)}, "
+                f"sha256={_hash_records(self._source)})"
+            )
+        return {
+            "source": source,
+            "stages": [stage.get_config() for stage in self._stages],
+            "shard_size": self._shard_size,
+        }
+
+    def is_complete(self) -> bool:
+        r"""Indicate if all the shards are processed.
+
+        Returns:
+            ``True`` if the manifest exists, otherwise ``False``.
+        """
+        return self.manifest_path.is_file()
+
+    def run(self) -> ShardedDataset:
+        r"""Run the pipeline.
+
+        The shards that are already processed are skipped.
+
+        Returns:
+            The dataset with the processed records.
+        """
+        if self.is_complete():
+            logger.info(f"The preprocessed data are already available in {self.output_dir}")
+            return ShardedDataset(self.manifest_path)
+
+        num_shards = max(math.ceil(len(self._source) / self._shard_size), 1)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        todo = [
+            index
+            for index in range(num_shards)
+            if not self.output_dir.joinpath(_shard_name(index)).is_file()
+        ]
+        logger.info(
+            f"Preprocessing {len(todo):,}/{num_shards:,} shards in {self.output_dir} "
+            f"with {self._num_workers:,} worker(s)..."
+        )
+        num_records = {}
+        if self._num_workers == 0:
+            for index in todo:
+                num_records[index] = self._process_shard(index)
+        else:
+            # The pipeline is sent once to each worker instead of once
+            # per shard.
+            with ProcessPoolExecutor(
+                max_workers=self._num_workers, initializer=_init_worker, initargs=(self,)
+            ) as executor:
+                futures = {index: executor.submit(_process_shard, index) for index in todo}
+                for index, future in futures.items():
+                    num_records[index] = future.result()
+
+        shards = []
+        for index in range(num_shards):
+            path = self.output_dir.joinpath(_shard_name(index))
+            if index not in num_records:
+                num_records[index] = len(_load_shard(path))
+            shards.append({"file": path.name, "num_records": num_records[index]})
+        _atomic_write_text(
+            self.manifest_path,
+            json.dumps(
+                {"fingerprint": self.fingerprint, "config": self.get_config(), "shards": shards},
+                indent=2,
+                sort_keys=True,
+                default=str,
+            ),
+        )
+        logger.info(f"The preprocessed data are available in {self.output_dir}")
+        return ShardedDataset(self.manifest_path)
+
+    def _process_shard(self, index: int) -> int:
+        r"""Process a shard and write its records on disk.
+
+        Args:
+            index: The index of the shard.
+
+        Returns:
+            The number of processed records in the shard.
+        """
+        start = index * self._shard_size
+        end = min(start + self._shard_size, len(self._source))
+        records = (self._source[i] for i in range(start, end))
+        for stage in self._stages:
+            records = stage(records)
+        records = list(records)
+        path = self.output_dir.joinpath(_shard_name(index))
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        torch.save(records, tmp_path)
+        tmp_path.replace(path)
+        return len(records)
+
+
+class ShardedDataset(Dataset):
+    r"""Implement a dataset to read the records generated by a
+    ``PreprocessingPipeline``.
+
+    The shards are loaded lazily, and only the last loaded shard is
+    kept in memory, so it is recommended to read the records in order
+    or with a sampler that preserves the locality of the shards.
+
+    Args:
+        manifest_path: The path to the manifest of the pipeline.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import tempfile
+    >>> from lightcat.datamodule.preprocessing import (
+    ...     MapStage,
+    ...     PreprocessingPipeline,
+    ...     ShardedDataset,
+    ... )
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     pipeline = PreprocessingPipeline(
+    ...         source=list(range(10)), stages=[MapStage(str)], cache_dir=tmpdir, shard_size=4
+    ...     )
+    ...     _ = pipeline.run()
+    ...     dataset = ShardedDataset(pipeline.manifest_path)
+    ...     dataset
+    ...     len(dataset)
+    ...     dataset[5]
+    ...
+    ShardedDataset(num_records=10, num_shards=3)
+    10
+    '5'
+
+    ```
+    """
+
+    def __init__(self, manifest_path: Path | str) -> None:
+        self._manifest_path = Path(manifest_path)
+        manifest = json.loads(self._manifest_path.read_text())
+        self._paths = [
+            self._manifest_path.parent.joinpath(shard["file"]) for shard in manifest["shards"]
+        ]
+        self._offsets = [0]
+        for shard in manifest["shards"]:
+            self._offsets.append(self._offsets[-1] + shard["num_records"])
+
+        self._shard_index = None
+        self._shard = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(num_records={len(self):,}, "
+            f"num_shards={len(self._paths):,})"
+        )
+
+    def __len__(self) -> int:
+        return self._offsets[-1]
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            msg = f"index {index} is out of range for a dataset with {len(self):,} records"
+            raise IndexError(msg)
+        shard_index = bisect_right(self._offsets, index) - 1
+        if shard_index != self._shard_index:
+            self._shard = _load_shard(self._paths[shard_index])
+            self._shard_index = shard_index
+        return self._shard[index - self._offsets[shard_index]]
+
+    def __getstate__(self) -> dict[str, Any]:
+        # The loaded shard is not sent to the dataloader workers.
+        return self.__dict__ | {"_shard_index": None, "_shard": None}
+
+
+def _init_worker(pipeline: PreprocessingPipeline) -> None:
+    r"""Initialize a worker process of the pipeline.
+
+    Args:
+        pipeline: The pipeline run by the worker.
+    """
+    global _worker_pipeline  # noqa: PLW0603
+    _worker_pipeline = pipeline
+
+
+def _process_shard(index: int) -> int:
+    r"""Process a shard in a worker process.
+
+    Args:
+        index: The index of the shard.
+
+    Returns:
+        The number of processed records in the shard.
+    """
+    return _worker_pipeline._process_shard(index)
+
+
+def _hash_records(source: Sequence) -> str:
+    r"""Compute the hash of the records of a source.
+
+    Args:
+        source: The sequence of records.
+
+    Returns:
+        The SHA-256 hash of the pickled records.
+    """
+    digest = hashlib.sha256()
+    for index in range(len(source)):
+        digest.update(pickle.dumps(source[index], protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+def _shard_name(index: int) -> str:
+    r"""Get the file name of a shard.
+
+    Args:
+        index: The index of the shard.
+
+    Returns:
+        The file name of the shard.
+    """
+    return f"shard-{index:06d}.pt"
+
+
+def _load_shard(path: Path) -> list:
+    r"""Load the records of a shard.
+
+    Args:
+        path: The path to the shard.
+
+    Returns:
+        The records of the shard.
+    """
+    return torch.load(path, weights_only=False)
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    r"""Write a text file atomically.
+
+    Args:
+        path: The path to the file.
+        text: The text to write.
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(text)
+    tmp_path.replace(path)
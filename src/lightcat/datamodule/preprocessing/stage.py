@@ -0,0 +1,343 @@
+r"""Contain the preprocessing stages."""
+
+from __future__ import annotations
+
+__all__ = ["BaseStage", "FilterStage", "MapStage", "is_stage_config", "setup_stage"]
+
+import functools
+import inspect
+import logging
+from abc import ABC, ABCMeta, abstractmethod
+from typing import TYPE_CHECKING, Any
+from unittest.mock import Mock
+
+from lightcat.utils.factory import str_target_object
+from lightcat.utils.imports import check_objectory, is_objectory_available
+
+if is_objectory_available():
+    import objectory
+    from objectory import AbstractFactory
+else:  # pragma: no cover
+    objectory = Mock()
+    AbstractFactory = ABCMeta
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class BaseStage(ABC, metaclass=AbstractFactory):
+    r"""Define the base class to implement a preprocessing stage.
+
+    A stage transforms a stream of records into another stream of
+    records. The configuration returned by ``get_config`` is used to
+    fingerprint the outputs of the stage, so two stages with the same
+    configuration must generate the same records.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.datamodule.preprocessing import MapStage
+    >>> stage = MapStage(abs)
+    >>> stage
+    MapStage(fn=builtins.abs)
+    >>> list(stage([-1, 2, -3]))
+    [1, 2, 3]
+
+    ```
+    """
+
+    @abstractmethod
+    def __call__(self, records: Iterable[Any]) -> Iterator[Any]:
+        r"""Process a stream of records.
+
+        Args:
+            records: The input records.
+
+        Returns:
+            The processed records.
+
+        Example usage:
+
+        ```pycon
+
+        >>> from lightcat.datamodule.preprocessing import MapStage
+        >>> stage = MapStage(abs)
+        >>> list(stage([-1, 2, -3]))
+        [1, 2, 3]
+
+        ```
+        """
+
+    @abstractmethod
+    def get_config(self) -> dict[str, Any]:
+        r"""Get the configuration of the stage.
+
+        Returns:
+            The configuration of the stage. The values must be JSON
+                serializable.
+
+        Example usage:
+
+        ```pycon
+
+        >>> from lightcat.datamodule.preprocessing import MapStage
+        >>> stage = MapStage(abs)
+        >>> stage.get_config()
+        {'stage': 'MapStage', 'fn': 'builtins.abs'}
+
+        ```
+        """
+
+
+class MapStage(BaseStage):
+    r"""Implement a stage that applies a function to each record.
+
+    Args:
+        fn: The function to apply to each record, or its fully
+            qualified name. The function must be picklable to be
+            used with multiple processes.
+        name: The name used to fingerprint the function. It is
+            required if the function is a lambda, a closure, a bound
+            method or a callable object, whose outputs cannot be
+            identified by the qualified name. The name should be
+            changed when the function is changed.
+
+    Raises:
+        ValueError: if the function has no name and cannot be
+            identified by its qualified name.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.datamodule.preprocessing import MapStage
+    >>> stage = MapStage("builtins.abs")
+    >>> stage
+    MapStage(fn=builtins.abs)
+    >>> list(stage([-1, 2, -3]))
+    [1, 2, 3]
+
+    ```
+    """
+
+    def __init__(self, fn: Callable[[Any], Any] | str, name: str | None = None) -> None:
+        self._fn = _setup_callable(fn)
+        self._name = _callable_name(self._fn) if name is None else name
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}(fn={self._name})"
+
+    def __call__(self, records: Iterable[Any]) -> Iterator[Any]:
+        for record in records:
+            yield self._fn(record)
+
+    def get_config(self) -> dict[str, Any]:
+        return {"stage": self.__class__.__qualname__, "fn": self._name}
+
+
+class FilterStage(BaseStage):
+    r"""Implement a stage that keeps only the records that satisfy a
+    predicate.
+
+    Args:
+        fn: The predicate, or its fully qualified name. The records
+            where the predicate returns ``False`` are removed. The
+            predicate must be picklable to be used with multiple
+            processes.
+        name: The name used to fingerprint the predicate. It is
+            required if the predicate is a lambda, a closure, a bound
+            method or a callable object, whose outputs cannot be
+            identified by the qualified name. The name should be
+            changed when the predicate is changed.
+
+    Raises:
+        ValueError: if the predicate has no name and cannot be
+            identified by its qualified name.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.datamodule.preprocessing import FilterStage
+    >>> stage = FilterStage(bool)
+    >>> stage
+    FilterStage(fn=builtins.bool)
+    >>> list(stage([0, 1, 2, 0, 3]))
+    [1, 2, 3]
+
+    ```
+    """
+
+    def __init__(self, fn: Callable[[Any], bool] | str, name: str | None = None) -> None:
+        self._fn = _setup_callable(fn)
+        self._name = _callable_name(self._fn) if name is None else name
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}(fn={self._name})"
+
+    def __call__(self, records: Iterable[Any]) -> Iterator[Any]:
+        for record in records:
+            if self._fn(record):
+                yield record
+
+    def get_config(self) -> dict[str, Any]:
+        return {"stage": self.__class__.__qualname__, "fn": self._name}
+
+
+def is_stage_config(config: dict) -> bool:
+    r"""Indicate if the input configuration is a configuration for a
+    ``BaseStage``.
+
+    This function only checks if the value of the key  ``_target_``
+    is valid. It does not check the other values. If ``_target_``
+    indicates a function, the returned type hint is used to check
+    the class.
+
+    Args:
+        config: The configuration to check.
+
+    Returns:
+        ``True`` if the input configuration is a configuration
+            for a ``BaseStage`` object, otherwise ``False``.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.datamodule.preprocessing import is_stage_config
+    >>> is_stage_config(
+    ...     {"_target_": "lightcat.datamodule.preprocessing.MapStage", "fn": "builtins.abs"}
+    ... )
+    True
+
+    ```
+    """
+    check_objectory()
+    return objectory.utils.is_object_config(config, BaseStage)
+
+
+def setup_stage(stage: BaseStage | dict) -> BaseStage:
+    r"""Set up a preprocessing stage.
+
+    The stage is instantiated from its configuration by using the
+    ``BaseStage`` factory function.
+
+    Args:
+        stage: The stage or its configuration.
+
+    Returns:
+        The instantiated stage.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.datamodule.preprocessing import setup_stage
+    >>> stage = setup_stage(
+    ...     {"_target_": "lightcat.datamodule.preprocessing.MapStage", "fn": "builtins.abs"}
+    ... )
+    >>> stage
+    MapStage(fn=builtins.abs)
+
+    ```
+    """
+    if isinstance(stage, dict):
+        logger.info(
+            f"Initializing a preprocessing stage from its configuration... "
+            f"{str_target_object(stage)}"
+        )
+        check_objectory()
+        stage = BaseStage.factory(**stage)
+    if not isinstance(stage, BaseStage):
+        logger.warning(f"stage is not a 'BaseStage' (received: {type(stage)})")
+    return stage
+
+
+def _setup_callable(fn: Callable | str) -> Callable:
+    r"""Set up a callable.
+
+    Args:
+        fn: The callable or its fully qualified name.
+
+    Returns:
+        The callable.
+    """
+    if isinstance(fn, str):
+        check_objectory()
+        return objectory.utils.import_object(fn)
+    return fn
+
+
+def _callable_name(fn: Callable) -> str:
+    r"""Get a name that identifies a callable.
+
+    The name is used to fingerprint the stages, so it includes the
+    arguments of ``functools.partial`` objects. The lambdas, the
+    closures, the local functions, the bound methods and the callable
+    objects are rejected because their outputs can change while their
+    qualified name does not.
+
+    Args:
+        fn: The callable.
+
+    Returns:
+        The name of the callable.
+
+    Raises:
+        ValueError: if the callable cannot be identified by its
+            qualified name.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import functools
+    >>> from lightcat.datamodule.preprocessing.stage import _callable_name
+    >>> _callable_name(abs)
+    'builtins.abs'
+    >>> _callable_name(functools.partial(round, ndigits=2))
+    'builtins.round(ndigits=2)'
+
+    ```
+    """
+    if isinstance(fn, functools.partial):
+        args = [repr(arg) for arg in fn.args]
+        args.extend(f"{key}={value!r}" for key, value in sorted(fn.keywords.items()))
+        return f"{_callable_name(fn.func)}({', '.join(args)})"
+    if not _has_stable_name(fn):
+        msg = (
+            f"{fn!r} cannot be identified by its qualified name because it is a lambda, "
+            "a closure, a local function, a bound method or a callable object. Please use "
+            "a module-level function or give a name to the stage"
+        )
+        raise ValueError(msg)
+    module = getattr(fn, "__module__", None) or type(fn).__module__
+    return f"{module}.{fn.__qualname__}"
+
+
+def _has_stable_name(fn: Callable) -> bool:
+    r"""Indicate if the outputs of a callable are identified by its
+    qualified name.
+
+    Args:
+        fn: The callable.
+
+    Returns:
+        ``True`` if the callable is a class, a module-level function
+            without closure, a builtin function or a method
+            descriptor, otherwise ``False``.
+    """
+    if isinstance(fn, type) or inspect.ismethoddescriptor(fn):
+        return True
+    if inspect.isbuiltin(fn):
+        # The bound builtin methods, like ``"-".join``, depend on
+        # their object.
+        return fn.__self__ is None or inspect.ismodule(fn.__self__)
+    if inspect.isfunction(fn):
+        return (
+            fn.__name__ != "<lambda>" and "<locals>" not in fn.__qualname__ and not fn.__closure__
+        )
+    return False
@@ -0,0 +1,9 @@
+r"""Contain ``torch.utils.data.Sampler`` implementations and code to
+manage them."""
+
+from __future__ import annotations
+
+__all__ = ["FeistelPermutation", "FeistelSampler", "is_sampler_config", "setup_sampler"]
+
+from lightcat.datamodule.sampler.factory import is_sampler_config, setup_sampler
+from lightcat.datamodule.sampler.feistel import FeistelPermutation, FeistelSampler
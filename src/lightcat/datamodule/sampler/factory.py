@@ -0,0 +1,87 @@
+r"""Contain functions to instantiate a ``torch.utils.data.Sampler``
+object from its configuration."""
+
+from __future__ import annotations
+
+__all__ = ["is_sampler_config", "setup_sampler"]
+
+import logging
+from unittest.mock import Mock
+
+from torch.utils.data import Sampler
+
+from lightcat.utils.imports import check_objectory, is_objectory_available
+
+if is_objectory_available():
+    import objectory
+else:  # pragma: no cover
+    objectory = Mock()
+
+
+logger = logging.getLogger(__name__)
+
+
+def is_sampler_config(config: dict) -> bool:
+    r"""Indicate if the input configuration is a configuration for a
+    ``torch.utils.data.Sampler``.
+
+    This function only checks if the value of the key  ``_target_``
+    is valid. It does not check the other values. If ``_target_``
+    indicates a function, the returned type hint is used to check
+    the class.
+
+    Args:
+        config: The configuration to check.
+
+    Returns:
+        ``True`` if the input configuration is a configuration
+            for a ``torch.utils.data.Sampler`` object,
+            otherwise ``False``.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.datamodule.sampler import is_sampler_config
+    >>> is_sampler_config(
+    ...     {"_target_": "lightcat.datamodule.sampler.FeistelSampler", "num_samples": 10}
+    ... )
+    True
+
+    ```
+    """
+    check_objectory()
+    return objectory.utils.is_object_config(config, Sampler)
+
+
+def setup_sampler(sampler: Sampler | dict) -> Sampler:
+    r"""Set up a ``torch.utils.data.Sampler`` object.
+
+    Args:
+        sampler: The sampler or its configuration.
+
+    Returns:
+        The instantiated ``torch.utils.data.Sampler`` object.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.datamodule.sampler import setup_sampler
+    >>> sampler = setup_sampler(
+    ...     {"_target_": "lightcat.datamodule.sampler.FeistelSampler", "num_samples": 10}
+    ... )
+    >>> sampler
+    FeistelSampler(num_samples=10, shuffle=True, seed=0, ...)
+
+    ```
+    """
+    if isinstance(sampler, dict):
+        logger.info("Initializing a 'torch.utils.data.Sampler' from its configuration... ")
+        check_objectory()
+        sampler = objectory.factory(**sampler)
+    if not isinstance(sampler, Sampler):
+        logger.warning(
+            f"sampler is not a 'torch.utils.data.Sampler' object (received: {type(sampler)})"
+        )
+    return sampler
@@ -0,0 +1,465 @@
+r"""Contain a sampler that generates a pseudorandom permutation on the
+fly by using a keyed Feistel network.
+
+The permutation is never materialized, so the memory cost of the sampler
+does not depend on the number of samples. This makes it possible to
+shuffle datasets with billions of samples without allocating the large
+index tensor created by ``torch.randperm``.
+"""
+
+from __future__ import annotations
+
+__all__ = ["FeistelPermutation", "FeistelSampler"]
+
+import math
+from typing import TYPE_CHECKING
+
+import torch
+from torch.utils.data import Sampler
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+_MASK64 = (1 << 64) - 1
+# Odd multipliers smaller than 2^31 so that the products computed in
+# the round function always fit in a signed 64-bit integer.
+_MULTIPLIER1 = 0x5BD1E995
+_MULTIPLIER2 = 0x2C1B3C6D
+
+
+def _splitmix64(value: int) -> int:
+    r"""Compute the SplitMix64 hash of an integer.
+
+    Args:
+        value: The integer to hash.
+
+    Returns:
+        The 64-bit hash value.
+    """
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+class FeistelPermutation:
+    r"""Implement a keyed bijection over ``[0, num_items)``.
+
+    The bijection is a balanced Feistel network over the smallest
+    power-of-4 domain that contains ``num_items``. Values outside of
+    ``[0, num_items)`` are mapped back into the range by cycle-walking,
+    so each call needs at most a few Feistel evaluations on average.
+    The same instance works on python integers and on ``torch.int64``
+    tensors.
+
+    Args:
+        num_items: The number of items to permute. It must be lower
+            than ``2**62``.
+        key: The key of the permutation. Two permutations with the
+            same number of items and the same key are identical.
+        num_rounds: The number of Feistel rounds.
+
+    Raises:
+        ValueError: if ``num_items`` or ``num_rounds`` is not valid.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.datamodule.sampler import FeistelPermutation
+    >>> perm = FeistelPermutation(num_items=10, key=42)
+    >>> perm
+    FeistelPermutation(num_items=10, key=42, num_rounds=4)
+    >>> sorted(perm(i) for i in range(10))
+    [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
+
+    ```
+    """
+
+    def __init__(self, num_items: int, key: int = 0, num_rounds: int = 4) -> None:
+        if num_items < 1:
+            msg = f"num_items has to be greater than 0 (received: {num_items})"
+            raise ValueError(msg)
+        if num_items > 2**62:
+            msg = f"num_items has to be lower or equal to 2**62 (received: {num_items})"
+            raise ValueError(msg)
+        if num_rounds < 1:
+            msg = f"num_rounds has to be greater than 0 (received: {num_rounds})"
+            raise ValueError(msg)
+        self._num_items = int(num_items)
+        self._key = int(key)
+        self._num_rounds = int(num_rounds)
+
+        self._half_bits = max(1, math.ceil((self._num_items - 1).bit_length() / 2))
+        self._half_mask = (1 << self._half_bits) - 1
+        self._shift = self._half_bits // 2 + 1
+        self._round_keys = []
+        state = self._key & _MASK64
+        for _ in range(self._num_rounds):
+            state = _splitmix64(state)
+            self._round_keys.append(state & self._half_mask)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(num_items={self._num_items:,}, key={self._key}, "
+            f"num_rounds={self._num_rounds})"
+        )
+
+    def __call__(self, index: int) -> int:
+        if not 0 <= index < self._num_items:
+            msg = f"index has to be in [0, {self._num_items}) (received: {index})"
+            raise IndexError(msg)
+        value = self._encrypt(index)
+        while value >= self._num_items:
+            value = self._encrypt(value)
+        return value
+
+    def __len__(self) -> int:
+        return self._num_items
+
+    @property
+    def num_items(self) -> int:
+        r"""The number of items to permute."""
+        return self._num_items
+
+    def permute(self, indices: torch.Tensor) -> torch.Tensor:
+        r"""Apply the permutation to a tensor of indices.
+
+        Args:
+            indices: The ``torch.int64`` tensor of indices to permute.
+                All the values must be in ``[0, num_items)``.
+
+        Returns:
+            The permuted indices.
+
+        Example usage:
+
+        ```pycon
+
+        >>> import torch
+        >>> from lightcat.datamodule.sampler import FeistelPermutation
+        >>> perm = FeistelPermutation(num_items=10, key=42)
+        >>> perm.permute(torch.arange(10)).sort().values
+        tensor([0, 1, 2, 3, 4, 5, 6, 7, 8, 9])
+
+        ```
+        """
+        values = self._encrypt(indices.long())
+        mask = values >= self._num_items
+        while mask.any():
+            values[mask] = self._encrypt(values[mask])
+            mask = values >= self._num_items
+        return values
+
+    def _encrypt(self, value: int | torch.Tensor) -> int | torch.Tensor:
+        r"""Apply the Feistel network to a value of the full domain.
+
+        Args:
+            value: The value or tensor of values to encrypt.
+
+        Returns:
+            The encrypted value(s).
+        """
+        left = value >> self._half_bits
+        right = value & self._half_mask
+        for key in self._round_keys:
+            left, right = right, left ^ self._round(right, key)
+        return (left << self._half_bits) | right
+
+    def _round(self, value: int | torch.Tensor, key: int) -> int | torch.Tensor:
+        r"""Compute the Feistel round function.
+
+        Args:
+            value: The half-block value(s).
+            key: The round key.
+
+        Returns:
+            The pseudorandom half-block value(s).
+        """
+        value = ((value ^ key) * _MULTIPLIER1) & self._half_mask
+        value = value ^ (value >> self._shift)
+        value = (value * _MULTIPLIER2) & self._half_mask
+        return value ^ (value >> self._shift)
+
+
+class FeistelSampler(Sampler[int]):
+    r"""Implement a shuffle sampler with a constant memory cost.
+
+    The indices of an epoch are a pseudorandom permutation of
+    ``[0, num_samples)`` computed on the fly by a
+    ``FeistelPermutation`` keyed by ``seed`` and the current epoch.
+    The permutation is sharded across the distributed ranks like
+    ``torch.utils.data.DistributedSampler``: the rank ``r`` reads the
+    positions ``r, r + num_replicas, r + 2 * num_replicas, ...``.
+    The iteration can start at an arbitrary position of the rank
+    sequence, which makes it possible to resume an epoch without
+    iterating over the already consumed samples.
+
+    Because the sampler already shards the indices, the distributed
+    sampler injection of ``lightning.Trainer`` has to be disabled with
+    ``use_distributed_sampler=False``.
+
+    Args:
+        num_samples: The number of samples in the dataset.
+        shuffle: If ``True``, the indices are shuffled, otherwise
+            they are returned in order.
+        seed: The random seed used to generate the permutation. It
+            must be the same on all the ranks.
+        num_replicas: The number of distributed ranks. If ``None``,
+            it is set to the world size of the default process group
+            when it is initialized, otherwise ``1``.
+        rank: The rank of the current process. If ``None``, it is
+            set to the rank in the default process group when it is
+            initialized, otherwise ``0``.
+        drop_last: If ``True``, the tail of the permutation is
+            dropped to make it evenly divisible across the ranks.
+            Otherwise, the first indices are repeated.
+        chunk_size: The number of indices computed at once during the
+            iteration. It bounds the memory used by the sampler.
+
+    Raises:
+        ValueError: if one of the arguments is not valid.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.datamodule.sampler import FeistelSampler
+    >>> sampler = FeistelSampler(num_samples=10, seed=42)
+    >>> sampler
+    FeistelSampler(num_samples=10, shuffle=True, seed=42, num_replicas=None, rank=None, drop_last=False, chunk_size=65,536)
+    >>> len(sampler)
+    10
+    >>> sorted(sampler)
+    [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
+
+    ```
+    """
+
+    def __init__(
+        self,
+        num_samples: int,
+        shuffle: bool = True,
+        seed: int = 0,
+        num_replicas: int | None = None,
+        rank: int | None = None,
+        drop_last: bool = False,
+        chunk_size: int = 65536,
+    ) -> None:
+        if num_samples < 1:
+            msg = f"num_samples has to be greater than 0 (received: {num_samples})"
+            raise ValueError(msg)
+        if num_replicas is not None and num_replicas < 1:
+            msg = f"num_replicas has to be greater than 0 (received: {num_replicas})"
+            raise ValueError(msg)
+        if rank is not None and num_replicas is not None and not 0 <= rank < num_replicas:
+            msg = f"rank has to be in [0, {num_replicas}) (received: {rank})"
+            raise ValueError(msg)
+        if chunk_size < 1:
+            msg = f"chunk_size has to be greater than 0 (received: {chunk_size})"
+            raise ValueError(msg)
+        self._num_samples = int(num_samples)
+        self._shuffle = bool(shuffle)
+        self._seed = int(seed)
+        self._num_replicas = num_replicas
+        self._rank = rank
+        self._drop_last = bool(drop_last)
+        self._chunk_size = int(chunk_size)
+
+        self._epoch = 0
+        self._start_index = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(num_samples={self._num_samples:,}, "
+            f"shuffle={self._shuffle}, seed={self._seed}, num_replicas={self._num_replicas}, "
+            f"rank={self._rank}, drop_last={self._drop_last}, chunk_size={self._chunk_size:,})"
+        )
+
+    def __iter__(self) -> Iterator[int]:
+        num_replicas, rank = self._get_num_replicas(), self._get_rank()
+        num_samples_per_replica = self._get_num_samples_per_replica()
+        # The start index only applies to the next iteration.
+        start, self._start_index = self._start_index, 0
+        perm = FeistelPermutation(self._num_samples, key=self._get_key()) if self._shuffle else None
+        for first in range(start, num_samples_per_replica, self._chunk_size):
+            last = min(first + self._chunk_size, num_samples_per_replica)
+            indices = (torch.arange(first, last) * num_replicas + rank) % self._num_samples
+            if perm is not None:
+                indices = perm.permute(indices)
+            yield from indices.tolist()
+
+    def __len__(self) -> int:
+        return self._get_num_samples_per_replica()
+
+    @property
+    def epoch(self) -> int:
+        r"""The current epoch."""
+        return self._epoch
+
+    @property
+    def start_index(self) -> int:
+        r"""The position in the rank sequence where the next iteration
+        starts."""
+        return self._start_index
+
+    def state_dict(self) -> dict:
+        r"""Return the state of the sampler.
+
+        Returns:
+            The state of the sampler. The random state is fully
+                described by the seed and the epoch.
+
+        Example usage:
+
+        ```pycon
+
+        >>> from lightcat.datamodule.sampler import FeistelSampler
+        >>> sampler = FeistelSampler(num_samples=10, seed=42)
+        >>> sampler.set_start_index(4)
+        >>> sampler.state_dict()
+        {'num_samples': 10, 'seed': 42, 'epoch': 0, 'start_index': 4}
+
+        ```
+        """
+        return {
+            "num_samples": self._num_samples,
+            "seed": self._seed,
+            "epoch": self._epoch,
+            "start_index": self._start_index,
+        }
+
+    def load_state_dict(self, state_dict: dict) -> None:
+        r"""Load the state of the sampler.
+
+        Args:
+            state_dict: The state to load. It is usually generated by
+                ``state_dict``.
+
+        Raises:
+            ValueError: if the state was generated by a sampler with a
+                different number of samples.
+
+        Example usage:
+
+        ```pycon
+
+        >>> from lightcat.datamodule.sampler import FeistelSampler
+        >>> sampler = FeistelSampler(num_samples=10)
+        >>> sampler.load_state_dict({"num_samples": 10, "seed": 42, "epoch": 2, "start_index": 4})
+        >>> sampler.epoch, sampler.start_index
+        (2, 4)
+
+        ```
+        """
+        num_samples = state_dict.get("num_samples", self._num_samples)
+        if num_samples != self._num_samples:
+            msg = (
+                f"Incorrect number of samples: the state was generated with {num_samples:,} "
+                f"samples but the sampler has {self._num_samples:,} samples"
+            )
+            raise ValueError(msg)
+        self._seed = int(state_dict.get("seed", self._seed))
+        self.set_epoch(state_dict.get("epoch", self._epoch))
+        self.set_start_index(state_dict.get("start_index", 0))
+
+    def set_epoch(self, epoch: int) -> None:
+        r"""Set the epoch of the sampler.
+
+        Each epoch uses a different permutation.
+
+        Args:
+            epoch: The epoch number.
+
+        Example usage:
+
+        ```pycon
+
+        >>> from lightcat.datamodule.sampler import FeistelSampler
+        >>> sampler = FeistelSampler(num_samples=10, seed=42)
+        >>> sampler.set_epoch(1)
+        >>> sampler.epoch
+        1
+
+        ```
+        """
+        self._epoch = int(epoch)
+
+    def set_start_index(self, index: int) -> None:
+        r"""Set the position where the next iteration starts.
+
+        The position is relative to the indices of the current rank,
+        so the next iteration skips the first ``index`` indices that
+        would have been returned to this rank. Only the next
+        iteration is affected. The length of the sampler is not
+        modified, so the batch counters of ``lightning.Trainer`` stay
+        consistent when resuming an epoch.
+
+        Args:
+            index: The start position.
+
+        Raises:
+            ValueError: if the start position is not valid.
+
+        Example usage:
+
+        ```pycon
+
+        >>> from lightcat.datamodule.sampler import FeistelSampler
+        >>> sampler = FeistelSampler(num_samples=10, seed=42)
+        >>> sampler.set_start_index(8)
+        >>> len(list(sampler))
+        2
+        >>> len(list(sampler))
+        10
+
+        ```
+        """
+        num_samples_per_replica = self._get_num_samples_per_replica()
+        if not 0 <= index <= num_samples_per_replica:
+            msg = f"index has to be in [0, {num_samples_per_replica}] (received: {index})"
+            raise ValueError(msg)
+        self._start_index = int(index)
+
+    def _get_key(self) -> int:
+        r"""Get the permutation key of the current epoch.
+
+        Returns:
+            The permutation key.
+        """
+        return _splitmix64((self._seed & _MASK64) ^ _splitmix64(self._epoch & _MASK64))
+
+    def _get_num_replicas(self) -> int:
+        r"""Get the number of distributed ranks.
+
+        Returns:
+            The number of distributed ranks.
+        """
+        if self._num_replicas is not None:
+            return self._num_replicas
+        if torch.distributed.is_available() and torch.distributed.is_initialized():
+            return torch.distributed.get_world_size()
+        return 1
+
+    def _get_rank(self) -> int:
+        r"""Get the rank of the current process.
+
+        Returns:
+            The rank of the current process.
+        """
+        if self._rank is not None:
+            return self._rank
+        if torch.distributed.is_available() and torch.distributed.is_initialized():
+            return torch.distributed.get_rank()
+        return 0
+
+    def _get_num_samples_per_replica(self) -> int:
+        r"""Get the number of indices returned to each rank per epoch.
+
+        Returns:
+            The number of indices per rank.
+        """
+        num_replicas = self._get_num_replicas()
+        if self._drop_last:
+            return self._num_samples // num_replicas
+        return math.ceil(self._num_samples / num_replicas)
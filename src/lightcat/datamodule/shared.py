@@ -0,0 +1,433 @@
+r"""Contain a ``lightning.LightningDataModule`` that shares its datasets
+between the processes of a node with POSIX shared memory."""
+
+from __future__ import annotations
+
+__all__ = ["SharedMemoryDataModule", "SharedMemoryDataset"]
+
+import logging
+import sys
+from collections.abc import Mapping
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Any
+
+import torch
+from lightning import LightningDataModule
+from torch import distributed as dist
+from torch.utils.data import DataLoader, Dataset
+
+from lightcat.datamodule.packing import (
+    PackedBatch,
+    _compute_layout,
+    _copy_to_buffer,
+    _extract_tensors,
+)
+from lightcat.utils.distributed import (
+    all_gather_object,
+    get_gloo_group,
+    get_local_rank,
+    is_distributed,
+)
+from lightcat.utils.factory import setup_object
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from lightcat.datamodule.packing import TensorSpec
+
+logger = logging.getLogger(__name__)
+
+SPLITS = ("train", "val", "test", "predict")
+
+
+class SharedMemoryDataset(Dataset):
+    r"""Implement a dataset where the tensors are stored in a POSIX
+    shared memory segment.
+
+    The data is a mapping or a sequence of tensors with the same
+    first dimension, like the tensors of a
+    ``torch.utils.data.TensorDataset``. A dataset is usually created
+    with ``SharedMemoryDataset.create``, and the other processes
+    attach to the same segment by using ``metadata``, so the tensors
+    are not copied. When the dataset is sent to a dataloader worker,
+    the worker attaches to the segment instead of receiving a copy of
+    the data.
+
+    Args:
+        name: The name of the shared memory segment.
+        specs: The location, data type and shape of each tensor in
+            the segment.
+        structure: The data structure where the tensors are replaced
+            by placeholders.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.datamodule import SharedMemoryDataset
+    >>> dataset = SharedMemoryDataset.create(
+    ...     {"input": torch.arange(10).view(5, 2), "target": torch.arange(5)}
+    ... )
+    >>> len(dataset)
+    5
+    >>> dataset[1]
+    {'input': tensor([2, 3]), 'target': tensor(1)}
+    >>> other = SharedMemoryDataset(**dataset.metadata)
+    >>> other[1]
+    {'input': tensor([2, 3]), 'target': tensor(1)}
+    >>> other.close()
+    >>> dataset.close()
+
+    ```
+    """
+
+    def __init__(self, name: str, specs: Sequence[TensorSpec], structure: Any) -> None:
+        self._specs = tuple(specs)
+        self._structure = structure
+        self._shm = _attach_shared_memory(name)
+        self._is_owner = False
+        self._data = self._create_views()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(name={self.name}, num_samples={len(self):,}, "
+            f"nbytes={self._shm.size:,})"
+        )
+
+    def __len__(self) -> int:
+        tensors = self._data.values() if isinstance(self._data, Mapping) else self._data
+        return next(iter(tensors)).shape[0]
+
+    def __getitem__(self, index: int) -> Any:
+        if isinstance(self._data, Mapping):
+            return {key: tensor[index] for key, tensor in self._data.items()}
+        return tuple(tensor[index] for tensor in self._data)
+
+    def __reduce__(self) -> tuple:
+        # The other processes attach to the segment instead of
+        # receiving a copy of the data.
+        return self.__class__, (self.name, self._specs, self._structure)
+
+    @property
+    def data(self) -> Mapping[str, torch.Tensor] | Sequence[torch.Tensor]:
+        r"""The tensors of the dataset."""
+        return self._data
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        r"""The picklable metadata to attach to the shared memory
+        segment in another process."""
+        return {"name": self.name, "specs": self._specs, "structure": self._structure}
+
+    @property
+    def name(self) -> str:
+        r"""The name of the shared memory segment."""
+        return self._shm.name
+
+    @classmethod
+    def create(
+        cls, data: Mapping[str, torch.Tensor] | Sequence[torch.Tensor]
+    ) -> SharedMemoryDataset:
+        r"""Create a dataset by copying tensors to a new shared memory
+        segment.
+
+        The process that creates the dataset owns the segment, and
+        the segment is removed when ``close`` is called, or when the
+        process exits.
+
+        Args:
+            data: The mapping or sequence of CPU tensors. The tensors
+                must have the same first dimension.
+
+        Returns:
+            The dataset.
+
+        Raises:
+            ValueError: if the data is empty or if the tensors do not
+                have the same first dimension.
+
+        Example usage:
+
+        ```pycon
+
+        >>> import torch
+        >>> from lightcat.datamodule import SharedMemoryDataset
+        >>> dataset = SharedMemoryDataset.create((torch.ones(5, 2), torch.arange(5)))
+        >>> dataset[0]
+        (tensor([1., 1.]), tensor(0))
+        >>> dataset.close()
+
+        ```
+        """
+        tensors = list(data.values()) if isinstance(data, Mapping) else list(data)
+        if not tensors:
+            msg = "data must contain at least one tensor"
+            raise ValueError(msg)
+        if len({tensor.shape[0] for tensor in tensors}) > 1:
+            msg = (
+                "All the tensors must have the same first dimension "
+                f"(received: {[tuple(tensor.shape) for tensor in tensors]})"
+            )
+            raise ValueError(msg)
+
+        extracted = []
+        structure = _extract_tensors(
+            dict(data) if isinstance(data, Mapping) else list(data), extracted
+        )
+        specs, nbytes = _compute_layout(extracted)
+        # A segment cannot be empty.
+        shm = SharedMemory(create=True, size=max(nbytes, 1))
+        logger.info(f"Created the shared memory segment {shm.name} ({nbytes:,} bytes)")
+        _copy_to_buffer(_as_tensor(shm), extracted, specs)
+
+        dataset = cls.__new__(cls)
+        dataset._specs = tuple(specs)
+        dataset._structure = structure
+        dataset._shm = shm
+        dataset._is_owner = True
+        dataset._data = dataset._create_views()
+        return dataset
+
+    def close(self) -> None:
+        r"""Detach the dataset from the shared memory segment.
+
+        The segment is also removed if the current process owns it. The
+        dataset cannot be used after this method is called.
+        """
+        if self._shm is None:
+            return
+        # The views must be deleted before the segment is closed.
+        self._data = None
+        try:
+            self._shm.close()
+        except BufferError:  # pragma: no cover
+            logger.warning(
+                f"The shared memory segment {self._shm.name} is still used by some tensors, "
+                "and it will be closed when the process exits"
+            )
+        if self._is_owner:
+            logger.info(f"Removing the shared memory segment {self._shm.name}")
+            self._shm.unlink()
+        self._shm = None
+
+    def _create_views(self) -> Mapping[str, torch.Tensor] | Sequence[torch.Tensor]:
+        r"""Create the tensors as views of the shared memory segment.
+
+        Returns:
+            The tensors of the dataset.
+        """
+        return PackedBatch(_as_tensor(self._shm), self._specs, self._structure).unpack()
+
+
+class SharedMemoryDataModule(LightningDataModule):
+    r"""Implement a ``lightning.LightningDataModule`` where the datasets
+    are loaded once per node and shared between the processes of the
+    node.
+
+    In ``setup``, the process with local rank 0 of each node loads the
+    datasets and copies them to POSIX shared memory segments. The
+    metadata of the segments are exchanged with a ``gloo`` process
+    group, and the other processes of the node attach to the segments
+    without copying the data. The segments are removed in
+    ``teardown``, or when the process with local rank 0 exits. If the
+    default process group is not initialized, the datasets are loaded
+    by the current process.
+
+    Args:
+        datasets: The functions that load the datasets, or their
+            configurations. The keys are the data splits and must be
+            ``'train'``, ``'val'``, ``'test'`` or ``'predict'``. Each
+            function returns a mapping or a sequence of CPU tensors
+            with the same first dimension. A configuration is
+            instantiated with the ``objectory`` library, so its
+            target is usually a function that loads the data.
+        dataloader_kwargs: The keyword arguments used to create the
+            ``torch.utils.data.DataLoader``s.
+
+    Raises:
+        ValueError: if a split is invalid.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.datamodule import SharedMemoryDataModule
+    >>> datamodule = SharedMemoryDataModule(
+    ...     datasets={"train": lambda: {"input": torch.ones(10, 3), "target": torch.arange(10)}},
+    ...     dataloader_kwargs={"batch_size": 4},
+    ... )
+    >>> datamodule.setup("fit")
+    >>> next(iter(datamodule.train_dataloader()))
+    {'input': tensor([[1., 1., 1.], [1., 1., 1.], [1., 1., 1.], [1., 1., 1.]]),
+     'target': tensor([0, 1, 2, 3])}
+    >>> datamodule.teardown("fit")
+
+    ```
+    """
+
+    def __init__(
+        self,
+        datasets: Mapping[str, Callable[[], Any] | dict],
+        dataloader_kwargs: dict[str, Any] | None = None,
+    ) -> None:
+        super().__init__()
+        for split in datasets:
+            if split not in SPLITS:
+                msg = f"Incorrect split '{split}'. The valid splits are: {SPLITS}"
+                raise ValueError(msg)
+        self._loaders = dict(datasets)
+        self._dataloader_kwargs = dataloader_kwargs or {}
+        self._datasets: dict[str, SharedMemoryDataset] = {}
+
+    @property
+    def datasets(self) -> dict[str, SharedMemoryDataset]:
+        r"""The datasets that are loaded."""
+        return self._datasets
+
+    def setup(self, stage: str) -> None:  # noqa: ARG002
+        for split, loader in self._loaders.items():
+            if split not in self._datasets:
+                self._datasets[split] = self._setup_dataset(split, loader)
+
+    def teardown(self, stage: str) -> None:  # noqa: ARG002
+        if is_distributed():
+            # The segments are removed only when all the processes are
+            # done with them.
+            dist.barrier(group=get_gloo_group())
+        for dataset in self._datasets.values():
+            dataset.close()
+        self._datasets.clear()
+
+    def train_dataloader(self) -> DataLoader:
+        return self._create_dataloader("train")
+
+    def val_dataloader(self) -> DataLoader:
+        return self._create_dataloader("val")
+
+    def test_dataloader(self) -> DataLoader:
+        return self._create_dataloader("test")
+
+    def predict_dataloader(self) -> DataLoader:
+        return self._create_dataloader("predict")
+
+    def _setup_dataset(self, split: str, loader: Callable[[], Any] | dict) -> SharedMemoryDataset:
+        r"""Set up the dataset of a data split.
+
+        Args:
+            split: The data split.
+            loader: The function that loads the dataset, or its
+                configuration.
+
+        Returns:
+            The dataset.
+
+        Raises:
+            RuntimeError: if no process with local rank 0 is found on
+                the node.
+        """
+        local_rank = self._get_local_rank()
+        dataset = None
+        if local_rank == 0:
+            logger.info(f"Loading the '{split}' dataset...")
+            data = setup_object(loader) if isinstance(loader, dict) else loader()
+            dataset = SharedMemoryDataset.create(data)
+        if not is_distributed():
+            return dataset
+
+        node_rank = self._get_node_rank()
+        metadata = dataset.metadata if dataset is not None else None
+        node_metadata = {
+            rank_node: rank_metadata
+            for rank_node, rank_local, rank_metadata in all_gather_object(
+                (node_rank, local_rank, metadata)
+            )
+            if rank_local == 0
+        }
+        if node_rank not in node_metadata:
+            msg = f"Cannot find the process with local rank 0 on the node {node_rank}"
+            raise RuntimeError(msg)
+        if dataset is None:
+            logger.info(f"Attaching to the '{split}' dataset {node_metadata[node_rank]['name']}...")
+            dataset = SharedMemoryDataset(**node_metadata[node_rank])
+        return dataset
+
+    def _get_local_rank(self) -> int:
+        r"""Get the rank of the current process on its node.
+
+        Returns:
+            The local rank.
+        """
+        trainer = getattr(self, "trainer", None)
+        return trainer.local_rank if trainer is not None else get_local_rank()
+
+    def _get_node_rank(self) -> int:
+        r"""Get the rank of the node of the current process.
+
+        Returns:
+            The node rank.
+        """
+        trainer = getattr(self, "trainer", None)
+        return trainer.node_rank if trainer is not None else 0
+
+    def _create_dataloader(self, split: str) -> DataLoader:
+        r"""Create the dataloader of a data split.
+
+        Args:
+            split: The data split.
+
+        Returns:
+            The dataloader.
+
+        Raises:
+            RuntimeError: if the dataset of the split is not
+                available.
+        """
+        if split not in self._datasets:
+            msg = (
+                f"The '{split}' dataset is not available. Make sure a '{split}' dataset is "
+                "defined and setup was called"
+            )
+            raise RuntimeError(msg)
+        return DataLoader(self._datasets[split], **self._dataloader_kwargs)
+
+
+def _as_tensor(shm: SharedMemory) -> torch.Tensor:
+    r"""Create a ``torch.uint8`` tensor that shares the memory of a
+    shared memory segment.
+
+    Args:
+        shm: The shared memory segment.
+
+    Returns:
+        The 1-d tensor.
+    """
+    return torch.frombuffer(shm.buf, dtype=torch.uint8)
+
+
+def _attach_shared_memory(name: str) -> SharedMemory:
+    r"""Attach to an existing shared memory segment.
+
+    Only the process that creates a segment removes it, so the
+    segment is not tracked by the resource tracker of the current
+    process.
+
+    Args:
+        name: The name of the shared memory segment.
+
+    Returns:
+        The shared memory segment.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    # The segment cannot be unregistered after it is attached because
+    # the resource tracker can be shared with the process that owns the
+    # segment, so the registration is disabled.
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None  # noqa: ARG005
+    try:
+        return SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
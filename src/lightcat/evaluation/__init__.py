@@ -0,0 +1,7 @@
+r"""Contain the tools to evaluate the checkpoints of a run."""
+
+from __future__ import annotations
+
+__all__ = ["CheckpointEvaluator", "load_evaluation_results"]
+
+from lightcat.evaluation.evaluator import CheckpointEvaluator, load_evaluation_results
@@ -0,0 +1,487 @@
+r"""Contain an evaluator that evaluates the checkpoints of a run in a
+pool of processes."""
+
+from __future__ import annotations
+
+__all__ = ["CheckpointEvaluator", "load_evaluation_results"]
+
+import fnmatch
+import json
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import torch
+from coola.utils import str_indent, str_mapping
+from lightning import Trainer
+
+from lightcat.datamodule.creator import setup_datamodule_creator
+from lightcat.model.creator import setup_model_creator
+from lightcat.trainer.creator import setup_trainer_creator
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from concurrent.futures import Future
+    from types import TracebackType
+
+    from lightcat.datamodule.creator import BaseDataModuleCreator
+    from lightcat.model.creator import BaseModelCreator
+    from lightcat.trainer.creator import BaseTrainerCreator
+
+logger = logging.getLogger(__name__)
+
+RESULTS_NAME = "evaluation.jsonl"
+STAGES = ("validate", "test")
+
+
+class CheckpointEvaluator:
+    r"""Implement an evaluator that evaluates the checkpoints of a run
+    in a pool of processes.
+
+    The evaluator watches the checkpoint directory of a run. Each new
+    checkpoint is evaluated by a worker process: the model and the
+    datamodule are created with their creators, the weights are
+    loaded from the checkpoint, and the model is evaluated with
+    ``Trainer.validate`` or ``Trainer.test``. The evaluation runs
+    while the training continues, so the expensive evaluation suites
+    do not slow down the training loop. The results are appended to
+    a JSON Lines file with one row per checkpoint, and the
+    checkpoints already in this file are not evaluated again, so the
+    evaluation can be resumed after an interruption.
+
+    A checkpoint is identified by its path and its modification time,
+    so a checkpoint that is overwritten, for example ``last.ckpt``, is
+    evaluated again unless it matches a pattern of ``exclude``. If the
+    evaluation of a checkpoint fails, for example because the
+    checkpoint is truncated, the error is logged and written in the
+    ``'error'`` field of its row, and the other checkpoints are still
+    evaluated. The checkpoint is evaluated again if it is modified.
+
+    Args:
+        model: The model creator or its configuration.
+        datamodule: The datamodule creator or its configuration.
+        dirpath: The directory with the checkpoints.
+        trainer: The creator of the trainer used to evaluate the
+            checkpoints, or its configuration. If ``None``, a CPU
+            trainer without logger and callbacks is used.
+        stage: The evaluation stage. The valid stages are
+            ``'validate'`` and ``'test'``.
+        pattern: The pattern of the checkpoint file names.
+        exclude: The patterns of the checkpoint file names that are
+            not evaluated.
+        results_path: The path to the JSON Lines file with the
+            results. If ``None``, the results are written in
+            ``<dirpath>/evaluation.jsonl``.
+        min_age: The minimum time in seconds since the last
+            modification of a checkpoint before it is evaluated. It
+            avoids reading a checkpoint that is being written by
+            another process.
+        num_workers: The number of worker processes. If ``0``, the
+            checkpoints are evaluated in the main process.
+        num_threads: The number of PyTorch threads in each worker
+            process.
+        start_method: The start method of the worker processes.
+
+    Raises:
+        ValueError: if the stage is not valid, if ``num_workers`` is
+            negative, or if ``num_threads`` is lower than 1.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import tempfile
+    >>> from lightcat.evaluation import CheckpointEvaluator
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     evaluator = CheckpointEvaluator(
+    ...         model={
+    ...             "_target_": "lightcat.model.creator.ModelCreator",
+    ...             "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+    ...         },
+    ...         datamodule={
+    ...             "_target_": "lightcat.datamodule.creator.DataModuleCreator",
+    ...             "datamodule": {
+    ...                 "_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"
+    ...             },
+    ...         },
+    ...         dirpath=tmpdir,
+    ...         num_workers=0,
+    ...     )
+    ...     evaluator.poll()
+    ...
+    0
+
+    ```
+    """
+
+    def __init__(
+        self,
+        model: BaseModelCreator | dict,
+        datamodule: BaseDataModuleCreator | dict,
+        dirpath: Path | str,
+        trainer: BaseTrainerCreator | dict | None = None,
+        stage: str = "validate",
+        pattern: str = "*.ckpt",
+        exclude: Sequence[str] = ("last*.ckpt",),
+        results_path: Path | str | None = None,
+        min_age: float = 10.0,
+        num_workers: int = 1,
+        num_threads: int = 1,
+        start_method: str = "spawn",
+    ) -> None:
+        if stage not in STAGES:
+            msg = f"Incorrect stage: {stage}. The valid stages are: {STAGES}"
+            raise ValueError(msg)
+        if num_workers < 0:
+            msg = f"num_workers must be greater or equal to 0 (received: {num_workers})"
+            raise ValueError(msg)
+        if num_threads < 1:
+            msg = f"num_threads must be greater than 0 (received: {num_threads})"
+            raise ValueError(msg)
+        self._model = model
+        self._datamodule = datamodule
+        self._dirpath = Path(dirpath)
+        self._trainer = trainer
+        self._stage = stage
+        self._pattern = pattern
+        self._exclude = tuple(exclude)
+        self._results_path = (
+            self._dirpath.joinpath(RESULTS_NAME) if results_path is None else Path(results_path)
+        )
+        self._min_age = float(min_age)
+        self._num_workers = int(num_workers)
+        self._num_threads = int(num_threads)
+        self._start_method = start_method
+
+        self._executor: ProcessPoolExecutor | None = None
+        # The submitted checkpoints, identified by their path and their
+        # modification time, the futures of the running evaluations, and
+        # the results that are not collected yet.
+        self._submitted: set[tuple[str, int]] = {
+            _get_checkpoint_key(Path(row["checkpoint"]))
+            for row in self._read_results()
+            if Path(row["checkpoint"]).is_file()
+        }
+        self._futures: dict[str, Future] = {}
+        self._results: list[dict[str, Any]] = []
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}(dirpath={self._dirpath}, stage={self._stage})"
+
+    def __str__(self) -> str:
+        args = str_indent(
+            str_mapping(
+                {
+                    "dirpath": self._dirpath,
+                    "stage": self._stage,
+                    "pattern": self._pattern,
+                    "exclude": self._exclude,
+                    "results_path": self._results_path,
+                    "min_age": self._min_age,
+                    "num_workers": self._num_workers,
+                    "num_threads": self._num_threads,
+                    "start_method": self._start_method,
+                }
+            )
+        )
+        return f"{self.__class__.__qualname__}(\n  {args}\n)"
+
+    def __enter__(self) -> CheckpointEvaluator:  # noqa: PYI034
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.shutdown(wait=exc_type is None)
+
+    @property
+    def results_path(self) -> Path:
+        r"""The path to the JSON Lines file with the results."""
+        return self._results_path
+
+    @property
+    def num_pending(self) -> int:
+        r"""The number of checkpoints that are being evaluated."""
+        return len(self._futures)
+
+    def poll(self, min_age: float | None = None) -> int:
+        r"""Submit the new checkpoints of the directory.
+
+        If ``num_workers`` is ``0``, the new checkpoints are evaluated
+        before this method returns. The results are returned by the
+        next call to ``collect``.
+
+        Args:
+            min_age: The minimum time in seconds since the last
+                modification of a checkpoint before it is evaluated.
+                If ``None``, ``min_age`` of the evaluator is used.
+                ``0`` can be used when the checkpoints are known to be
+                fully written, for example at the end of the training.
+
+        Returns:
+            The number of submitted checkpoints.
+        """
+        num_submitted = 0
+        for path in self._find_new_checkpoints(self._min_age if min_age is None else min_age):
+            self._submitted.add(_get_checkpoint_key(path))
+            args = (self._model, self._datamodule, self._trainer, self._stage, str(path))
+            logger.info(f"Evaluating {path}...")
+            if self._num_workers == 0:
+                try:
+                    result = _evaluate_checkpoint(*args)
+                except Exception as exc:  # noqa: BLE001
+                    result = _get_error_result(str(path), exc)
+                self._results.append(self._write_result(str(path), result))
+            else:
+                self._futures[str(path)] = self._get_executor().submit(_evaluate_checkpoint, *args)
+            num_submitted += 1
+        return num_submitted
+
+    def collect(self, wait: bool = False) -> list[dict[str, Any]]:
+        r"""Collect the results of the finished evaluations.
+
+        The results are appended to the results file.
+
+        Args:
+            wait: If ``True``, wait until all the submitted
+                checkpoints are evaluated.
+
+        Returns:
+            The results of the evaluations finished since the last
+                call. Each result contains the path to the checkpoint,
+                its epoch, its step, and the metric values, or the
+                error if the evaluation failed.
+        """
+        results, self._results = self._results, []
+        for path, future in list(self._futures.items()):
+            if not wait and not future.done():
+                continue
+            del self._futures[path]
+            try:
+                result = future.result()
+            except BrokenProcessPool as exc:
+                # A worker process died, so a new pool is created for
+                # the next checkpoints.
+                result = _get_error_result(path, exc)
+                self._reset_executor()
+            except Exception as exc:  # noqa: BLE001
+                result = _get_error_result(path, exc)
+            results.append(self._write_result(path, result))
+        return results
+
+    def watch(
+        self, interval: float = 60.0, timeout: float | None = None, stop_file: str | None = None
+    ) -> list[dict[str, Any]]:
+        r"""Watch the checkpoint directory and evaluate the new
+        checkpoints until a stop condition is met.
+
+        Args:
+            interval: The time in seconds between two polls of the
+                checkpoint directory.
+            timeout: The maximum time in seconds without a new
+                checkpoint. If ``None``, there is no timeout.
+            stop_file: The name of a file in the checkpoint directory
+                that stops the watch when it exists, for example a
+                file written at the end of the training.
+
+        Returns:
+            The results of all the evaluations.
+        """
+        results = []
+        idle = 0.0
+        while True:
+            stop = stop_file is not None and self._dirpath.joinpath(stop_file).exists()
+            # The last checkpoints are written before the stop file, so
+            # they are evaluated without waiting for min_age.
+            idle = 0.0 if self.poll(min_age=0.0 if stop else None) else idle + interval
+            results.extend(self.collect())
+            if stop or (timeout is not None and idle >= timeout and not self._futures):
+                break
+            time.sleep(interval)
+        results.extend(self.collect(wait=True))
+        return results
+
+    def shutdown(self, wait: bool = True) -> None:
+        r"""Shut down the worker processes.
+
+        Args:
+            wait: If ``True``, wait until the submitted checkpoints are
+                evaluated and write their results. Otherwise, the
+                evaluations that are not started are cancelled.
+        """
+        if wait:
+            self.collect(wait=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+        self._futures.clear()
+
+    def _find_new_checkpoints(self, min_age: float) -> list[Path]:
+        r"""Find the checkpoints that are not evaluated yet.
+
+        Args:
+            min_age: The minimum time in seconds since the last
+                modification of a checkpoint.
+
+        Returns:
+            The paths to the new checkpoints, sorted by modification
+                time.
+        """
+        if not self._dirpath.is_dir():
+            return []
+        now = time.time()
+        paths = []
+        for path in self._dirpath.rglob(self._pattern):
+            if not path.is_file() or any(
+                fnmatch.fnmatch(path.name, pattern) for pattern in self._exclude
+            ):
+                continue
+            if _get_checkpoint_key(path) in self._submitted or now - path.stat().st_mtime < min_age:
+                continue
+            paths.append(path)
+        return sorted(paths, key=lambda path: path.stat().st_mtime_ns)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        r"""Get the pool of worker processes.
+
+        The worker processes are started the first time a checkpoint
+        is submitted.
+
+        Returns:
+            The pool of worker processes.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._num_workers,
+                mp_context=multiprocessing.get_context(self._start_method),
+                initializer=torch.set_num_threads,
+                initargs=(self._num_threads,),
+            )
+        return self._executor
+
+    def _reset_executor(self) -> None:
+        r"""Shut down a broken pool of worker processes.
+
+        A new pool is started when the next checkpoint is submitted.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _read_results(self) -> list[dict[str, Any]]:
+        r"""Read the results of the previous evaluations.
+
+        Returns:
+            The results.
+        """
+        if not self._results_path.is_file():
+            return []
+        return load_evaluation_results(self._results_path)
+
+    def _write_result(self, path: str, result: dict[str, Any]) -> dict[str, Any]:
+        r"""Append the result of a checkpoint to the results file.
+
+        Args:
+            path: The path to the checkpoint.
+            result: The result of the evaluation.
+
+        Returns:
+            The result with the path to the checkpoint.
+        """
+        result = {"checkpoint": path, **result}
+        self._results_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._results_path.open(mode="a") as file:
+            file.write(json.dumps(result) + "\n")
+        logger.info(f"The evaluation of {path} is finished: {result}")
+        return result
+
+
+def load_evaluation_results(path: Path | str) -> list[dict[str, Any]]:
+    r"""Load the results written by a ``CheckpointEvaluator``.
+
+    Args:
+        path: The path to the JSON Lines file with the results.
+
+    Returns:
+        The result of each checkpoint, in the order of the end of
+            their evaluation.
+    """
+    with Path(path).open() as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def _evaluate_checkpoint(
+    model: BaseModelCreator | dict,
+    datamodule: BaseDataModuleCreator | dict,
+    trainer: BaseTrainerCreator | dict | None,
+    stage: str,
+    path: str,
+) -> dict[str, Any]:
+    r"""Evaluate a checkpoint.
+
+    Args:
+        model: The model creator or its configuration.
+        datamodule: The datamodule creator or its configuration.
+        trainer: The trainer creator or its configuration. If
+            ``None``, a CPU trainer without logger and callbacks is
+            used.
+        stage: The evaluation stage.
+        path: The path to the checkpoint.
+
+    Returns:
+        The epoch and the step of the checkpoint, and the metric
+            values.
+    """
+    pl_module = setup_model_creator(model).create()
+    dm = setup_datamodule_creator(datamodule).create()
+    checkpoint = torch.load(path, map_location="cpu", weights_only=False)
+    pl_module.load_state_dict(checkpoint["state_dict"])
+    if trainer is None:
+        evaluator = Trainer(
+            accelerator="cpu",
+            devices=1,
+            logger=False,
+            enable_checkpointing=False,
+            enable_progress_bar=False,
+            enable_model_summary=False,
+        )
+    else:
+        evaluator = setup_trainer_creator(trainer).create()
+    outputs = getattr(evaluator, stage)(pl_module, datamodule=dm, verbose=False)
+    metrics = {}
+    for output in outputs:
+        metrics.update({key: float(value) for key, value in output.items()})
+    return {"epoch": checkpoint.get("epoch"), "step": checkpoint.get("global_step"), **metrics}
+
+
+def _get_error_result(path: str, exc: BaseException) -> dict[str, Any]:
+    r"""Log the error of a failed evaluation and get its result.
+
+    Args:
+        path: The path to the checkpoint.
+        exc: The exception raised by the evaluation.
+
+    Returns:
+        The result with the error.
+    """
+    logger.error(f"The evaluation of {path} failed", exc_info=exc)
+    return {"error": f"{exc.__class__.__qualname__}: {exc}"}
+
+
+def _get_checkpoint_key(path: Path) -> tuple[str, int]:
+    r"""Get the key that identifies a version of a checkpoint.
+
+    Args:
+        path: The path to the checkpoint.
+
+    Returns:
+        The path and the modification time of the checkpoint.
+    """
+    return str(path), path.stat().st_mtime_ns
@@ -0,0 +1,8 @@
+r"""Contain the tools to export models for inference."""
+
+from __future__ import annotations
+
+__all__ = ["ExportPipeline", "export_model", "get_artifact_name", "load_exported_model"]
+
+from lightcat.export.exporter import export_model, get_artifact_name, load_exported_model
+from lightcat.export.pipeline import ExportPipeline
@@ -0,0 +1,225 @@
+r"""Contain functions to export a model for inference and to load the
+exported model."""
+
+from __future__ import annotations
+
+__all__ = ["FORMATS", "export_model", "get_artifact_name", "load_exported_model"]
+
+import contextlib
+import inspect
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import torch
+
+from lightcat.utils.imports import check_onnx, check_onnxruntime, is_onnxruntime_available
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+if is_onnxruntime_available():
+    import onnxruntime
+else:  # pragma: no cover
+    onnxruntime = None
+
+logger = logging.getLogger(__name__)
+
+# The file name of the exported model for each format.
+FORMATS = {"torchscript": "model.pt", "export": "model.pt2", "onnx": "model.onnx"}
+
+
+def export_model(
+    model: torch.nn.Module,
+    example_inputs: tuple[torch.Tensor, ...],
+    path: Path | str,
+    format: str = "torchscript",  # noqa: A002
+) -> None:
+    r"""Export a model for inference.
+
+    The supported formats are:
+
+    - ``'torchscript'``: the model is traced with ``torch.jit.trace``
+      and saved with ``torch.jit.save``.
+    - ``'export'``: the model is exported with ``torch.export.export``
+      and saved with ``torch.export.save``.
+    - ``'onnx'``: the model is exported with ``torch.onnx.export``.
+      This format requires the ``onnx`` package.
+
+    The model is traced with the example inputs, so the control flow
+    that depends on the input values is not captured.
+
+    Args:
+        model: The model to export. It should be in evaluation mode.
+        example_inputs: The example inputs of the model.
+        path: The path to the file of the exported model.
+        format: The export format.
+
+    Raises:
+        ValueError: if the format is not supported.
+        RuntimeError: if the format is ``'onnx'`` and the ``onnx``
+            package is not installed.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import tempfile
+    >>> import torch
+    >>> from pathlib import Path
+    >>> from lightcat.export import export_model, load_exported_model
+    >>> model = torch.nn.Linear(4, 2).eval()
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     path = Path(tmpdir).joinpath("model.pt")
+    ...     export_model(model, (torch.randn(3, 4),), path, format="torchscript")
+    ...     exported = load_exported_model(path, format="torchscript")
+    ...     exported(torch.randn(3, 4)).shape
+    ...
+    torch.Size([3, 2])
+
+    ```
+    """
+    _check_format(format)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Exporting the model to {path} with the {format!r} format...")
+    with torch.no_grad(), _disable_trainer_check():
+        if format == "torchscript":
+            torch.jit.save(torch.jit.trace(model, example_inputs), path)
+        elif format == "export":
+            torch.export.save(torch.export.export(model, example_inputs), path)
+        else:
+            check_onnx()
+            kwargs = {}
+            if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+                # The TorchScript-based exporter only requires onnx.
+                kwargs["dynamo"] = False
+            torch.onnx.export(model, example_inputs, str(path), **kwargs)
+
+
+def load_exported_model(path: Path | str, format: str = "torchscript") -> Callable:  # noqa: A002
+    r"""Load a model exported with ``export_model``.
+
+    The ``'onnx'`` format requires the ``onnxruntime`` package. The
+    ONNX model runs on CPU, and its inputs and outputs are tensors.
+
+    Args:
+        path: The path to the file of the exported model.
+        format: The export format.
+
+    Returns:
+        The exported model.
+
+    Raises:
+        ValueError: if the format is not supported.
+        RuntimeError: if the format is ``'onnx'`` and the
+            ``onnxruntime`` package is not installed.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import tempfile
+    >>> import torch
+    >>> from pathlib import Path
+    >>> from lightcat.export import export_model, load_exported_model
+    >>> model = torch.nn.Linear(4, 2).eval()
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     path = Path(tmpdir).joinpath("model.pt2")
+    ...     export_model(model, (torch.randn(3, 4),), path, format="export")
+    ...     exported = load_exported_model(path, format="export")
+    ...     exported(torch.randn(3, 4)).shape
+    ...
+    torch.Size([3, 2])
+
+    ```
+    """
+    _check_format(format)
+    if format == "torchscript":
+        return torch.jit.load(str(path)).eval()
+    if format == "export":
+        return torch.export.load(path).module()
+    check_onnxruntime()
+    return _OnnxModel(onnxruntime.InferenceSession(str(path), providers=["CPUExecutionProvider"]))
+
+
+def get_artifact_name(format: str) -> str:  # noqa: A002
+    r"""Get the file name of an exported model.
+
+    Args:
+        format: The export format.
+
+    Returns:
+        The file name.
+
+    Raises:
+        ValueError: if the format is not supported.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.export import get_artifact_name
+    >>> get_artifact_name("onnx")
+    'model.onnx'
+
+    ```
+    """
+    _check_format(format)
+    return FORMATS[format]
+
+
+class _OnnxModel:
+    r"""Implement a wrapper around an ONNX Runtime session to use it like
+    a PyTorch model.
+
+    Args:
+        session: The ONNX Runtime inference session.
+    """
+
+    def __init__(self, session: Any) -> None:
+        self._session = session
+        self._input_names = [node.name for node in session.get_inputs()]
+
+    def __call__(self, *args: torch.Tensor) -> torch.Tensor | tuple[torch.Tensor, ...]:
+        inputs = {name: arg.detach().cpu().numpy() for name, arg in zip(self._input_names, args)}
+        outputs = tuple(torch.from_numpy(output) for output in self._session.run(None, inputs))
+        return outputs[0] if len(outputs) == 1 else outputs
+
+
+def _disable_trainer_check() -> contextlib.AbstractContextManager:
+    r"""Get a context manager that disables the error raised by the
+    ``trainer`` property of a ``LightningModule`` that is not attached
+    to a trainer.
+
+    The tracing reads the attributes of the modules, so it raises this
+    error for the ``LightningModule`` objects. Lightning only provides
+    a private context manager to disable the error, so it is imported
+    here and the tracing of the other modules does not depend on it.
+
+    Returns:
+        The context manager.
+    """
+    try:
+        from lightning.pytorch.core.module import _jit_is_scripting  # noqa: PLC0415
+    except ImportError:  # pragma: no cover
+        logger.warning(
+            "Lightning does not provide '_jit_is_scripting', so the tracing of a "
+            "'LightningModule' that is not attached to a trainer may fail"
+        )
+        return contextlib.nullcontext()
+    return _jit_is_scripting()
+
+
+def _check_format(format: str) -> None:  # noqa: A002
+    r"""Check if an export format is supported.
+
+    Args:
+        format: The export format.
+
+    Raises:
+        ValueError: if the format is not supported.
+    """
+    if format not in FORMATS:
+        msg = f"Incorrect format: {format}. The supported formats are: {tuple(FORMATS)}"
+        raise ValueError(msg)
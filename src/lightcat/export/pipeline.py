@@ -0,0 +1,424 @@
+r"""Contain a pipeline to export a model and cache the exported
+artifacts."""
+
+from __future__ import annotations
+
+__all__ = ["ExportPipeline"]
+
+import hashlib
+import json
+import logging
+import os
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import torch
+from coola.utils import str_indent, str_mapping
+
+from lightcat.export.exporter import export_model, get_artifact_name, load_exported_model
+from lightcat.model.creator import setup_model_creator
+from lightcat.utils.hashing import hash_state_dict
+from lightcat.utils.timing import measure
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from lightcat.model.creator import BaseModelCreator
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+
+class ExportPipeline:
+    r"""Implement a pipeline to export a model and cache the exported
+    artifacts.
+
+    The model is created with its creator, the weights of the
+    checkpoint are loaded if a checkpoint is given, and the model is
+    exported with ``export_model``. The outputs of the exported model
+    are compared to the outputs of the eager model on the example
+    inputs and on ``num_random_inputs`` inputs where the floating
+    point tensors of the example inputs are replaced by random values.
+    The exported model is stored in a sub-directory of ``cache_dir``
+    named after the fingerprint of the pipeline, which is computed
+    from the model configuration, the hash of the model weights, the
+    export format, the shapes and data types of the example inputs,
+    and the PyTorch version. The weights are hashed from the
+    checkpoint file if a checkpoint is given, otherwise from the
+    state dict of the created model, so the model is created to
+    compute the fingerprint. The model is not exported again if an
+    artifact with the same fingerprint is already in the cache.
+
+    Args:
+        model: The model creator or its configuration.
+        example_inputs: The example inputs of the model.
+        cache_dir: The directory where the exported models are
+            cached.
+        format: The export format. The supported formats are
+            ``'torchscript'``, ``'export'`` and ``'onnx'``.
+        checkpoint_path: The path to a Lightning checkpoint with the
+            weights of the model. If ``None``, the weights of the
+            created model are used.
+        rtol: The relative tolerance of the parity check.
+        atol: The absolute tolerance of the parity check.
+        num_random_inputs: The number of random inputs used in the
+            parity check in addition to the example inputs.
+        name: An optional name to identify the model in the
+            fingerprint. By default, the configuration of the model
+            is used if it is a configuration, otherwise the string
+            representation of the model creator is used. The weights
+            are always part of the fingerprint.
+
+    Raises:
+        ValueError: if ``num_random_inputs`` is negative.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import tempfile
+    >>> import torch
+    >>> from lightcat.export import ExportPipeline
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     pipeline = ExportPipeline(
+    ...         model={
+    ...             "_target_": "lightcat.model.creator.ModelCreator",
+    ...             "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+    ...         },
+    ...         example_inputs=torch.randn(4, 32),
+    ...         cache_dir=tmpdir,
+    ...     )
+    ...     manifest = pipeline.run()
+    ...     pipeline.is_complete()
+    ...     model = pipeline.load()
+    ...     model(torch.randn(4, 32)).shape
+    ...
+    True
+    torch.Size([4, 2])
+
+    ```
+    """
+
+    def __init__(
+        self,
+        model: BaseModelCreator | dict,
+        example_inputs: torch.Tensor | Sequence[torch.Tensor],
+        cache_dir: Path | str,
+        format: str = "torchscript",  # noqa: A002
+        checkpoint_path: Path | str | None = None,
+        rtol: float = 1e-5,
+        atol: float = 1e-6,
+        num_random_inputs: int = 2,
+        name: str | None = None,
+    ) -> None:
+        if num_random_inputs < 0:
+            msg = f"num_random_inputs must be greater or equal to 0 (received: {num_random_inputs})"
+            raise ValueError(msg)
+        self._model_config = model if isinstance(model, dict) else None
+        self._model_creator = setup_model_creator(model)
+        if torch.is_tensor(example_inputs):
+            example_inputs = (example_inputs,)
+        self._example_inputs = tuple(example_inputs)
+        self._cache_dir = Path(cache_dir)
+        self._artifact_name = get_artifact_name(format)
+        self._format = format
+        self._checkpoint_path = None if checkpoint_path is None else Path(checkpoint_path)
+        self._rtol = float(rtol)
+        self._atol = float(atol)
+        self._num_random_inputs = int(num_random_inputs)
+        self._name = name
+        self._fingerprint = None
+        self._model = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}(fingerprint={self.fingerprint})"
+
+    def __str__(self) -> str:
+        args = str_indent(
+            str_mapping(
+                {
+                    "model": self._model_creator,
+                    "format": self._format,
+                    "checkpoint_path": self._checkpoint_path,
+                    "cache_dir": self._cache_dir,
+                    "rtol": self._rtol,
+                    "atol": self._atol,
+                    "num_random_inputs": self._num_random_inputs,
+                    "fingerprint": self.fingerprint,
+                }
+            )
+        )
+        return f"{self.__class__.__qualname__}(\n  {args}\n)"
+
+    @property
+    def fingerprint(self) -> str:
+        r"""The fingerprint of the pipeline."""
+        if self._fingerprint is None:
+            config = json.dumps(self.get_config(), sort_keys=True, default=str)
+            self._fingerprint = hashlib.sha256(config.encode()).hexdigest()[:16]
+        return self._fingerprint
+
+    @property
+    def output_dir(self) -> Path:
+        r"""The directory where the exported model is stored."""
+        return self._cache_dir.joinpath(self.fingerprint)
+
+    @property
+    def artifact_path(self) -> Path:
+        r"""The path to the exported model."""
+        return self.output_dir.joinpath(self._artifact_name)
+
+    @property
+    def manifest_path(self) -> Path:
+        r"""The path to the manifest of the exported model."""
+        return self.output_dir.joinpath(MANIFEST_NAME)
+
+    def get_config(self) -> dict[str, Any]:
+        r"""Get the configuration used to fingerprint the pipeline.
+
+        The model is created the first time this method is called if
+        no checkpoint is given.
+
+        Returns:
+            The configuration of the pipeline.
+        """
+        if self._name is not None:
+            model = self._name
+        elif self._model_config is not None:
+            model = self._model_config
+        else:
+            model = str(self._model_creator)
+        return {
+            "model": model,
+            "weights": (
+                hash_state_dict(self._create_model())
+                if self._checkpoint_path is None
+                else _hash_file(self._checkpoint_path)
+            ),
+            "format": self._format,
+            "inputs": [
+                {"shape": list(tensor.shape), "dtype": str(tensor.dtype)}
+                for tensor in self._example_inputs
+            ],
+            "torch": torch.__version__,
+        }
+
+    def is_complete(self) -> bool:
+        r"""Indicate if the model is exported.
+
+        Returns:
+            ``True`` if the manifest exists, otherwise ``False``.
+        """
+        return self.manifest_path.is_file()
+
+    def run(self) -> dict[str, Any]:
+        r"""Export the model if it is not in the cache.
+
+        Returns:
+            The manifest of the exported model. ``'parity'`` contains
+                the maximum absolute difference between the outputs of
+                the exported model and the eager model.
+
+        Raises:
+            RuntimeError: if the outputs of the exported model do not
+                match the outputs of the eager model.
+        """
+        if self.is_complete():
+            logger.info(f"The exported model is already available in {self.output_dir}")
+            return json.loads(self.manifest_path.read_text())
+
+        model = self._create_model()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.artifact_path.with_name(f"{os.getpid()}.{self._artifact_name}")
+        try:
+            export_model(model, self._example_inputs, tmp_path, format=self._format)
+            max_abs_diff = self._check_parity(
+                model, load_exported_model(tmp_path, format=self._format)
+            )
+            tmp_path.replace(self.artifact_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        manifest = {
+            "fingerprint": self.fingerprint,
+            "config": self.get_config(),
+            "file": self._artifact_name,
+            "parity": {"max_abs_diff": max_abs_diff, "rtol": self._rtol, "atol": self._atol},
+        }
+        _atomic_write_text(
+            self.manifest_path, json.dumps(manifest, indent=2, sort_keys=True, default=str)
+        )
+        logger.info(f"The exported model is available in {self.output_dir}")
+        return manifest
+
+    def load(self) -> Callable:
+        r"""Load the exported model.
+
+        The model is exported if it is not in the cache.
+
+        Returns:
+            The exported model.
+        """
+        self.run()
+        return load_exported_model(self.artifact_path, format=self._format)
+
+    def benchmark(
+        self, number: int = 10, repeat: int = 5, warmup: int = 1, num_threads: int | None = None
+    ) -> dict[str, Any]:
+        r"""Compare the CPU latency of the exported model and the eager
+        model on the example inputs.
+
+        The model is exported if it is not in the cache.
+
+        Args:
+            number: The number of calls in each measurement.
+            repeat: The number of measurements.
+            warmup: The number of calls before the measurements.
+            num_threads: The number of threads used by PyTorch. If
+                ``None``, the default value is used.
+
+        Returns:
+            The statistics of the latency in seconds of the eager
+                model (``'eager'``) and the exported model
+                (``'exported'``), and the ratio of the median latencies
+                (``'speedup'``).
+        """
+        if num_threads is not None:
+            torch.set_num_threads(num_threads)
+        eager = self._create_model()
+        exported = self.load()
+        with torch.inference_mode():
+            eager_stats = measure(
+                lambda: eager(*self._example_inputs), number=number, repeat=repeat, warmup=warmup
+            )
+        # The ONNX Runtime and some exported models do not support the
+        # inference tensors.
+        with torch.no_grad():
+            exported_stats = measure(
+                lambda: exported(*self._example_inputs),
+                number=number,
+                repeat=repeat,
+                warmup=warmup,
+            )
+        return {
+            "format": self._format,
+            "num_threads": torch.get_num_threads(),
+            "eager": eager_stats,
+            "exported": exported_stats,
+            "speedup": eager_stats["median"] / exported_stats["median"],
+        }
+
+    def _create_model(self) -> torch.nn.Module:
+        r"""Create the eager model in evaluation mode.
+
+        The model is created once, so the exported model has the
+        weights used to compute the fingerprint.
+
+        Returns:
+            The model.
+        """
+        if self._model is None:
+            model = self._model_creator.create()
+            if self._checkpoint_path is not None:
+                checkpoint = torch.load(
+                    self._checkpoint_path, map_location="cpu", weights_only=False
+                )
+                model.load_state_dict(checkpoint.get("state_dict", checkpoint))
+            self._model = model.eval()
+        return self._model
+
+    def _check_parity(self, model: torch.nn.Module, exported: Callable) -> float:
+        r"""Check that the exported model and the eager model have the
+        same outputs.
+
+        Args:
+            model: The eager model.
+            exported: The exported model.
+
+        Returns:
+            The maximum absolute difference between the outputs.
+
+        Raises:
+            RuntimeError: if the outputs do not match.
+        """
+        max_abs_diff = 0.0
+        inputs = [self._example_inputs] + [
+            tuple(
+                torch.randn_like(tensor) if tensor.is_floating_point() else tensor
+                for tensor in self._example_inputs
+            )
+            for _ in range(self._num_random_inputs)
+        ]
+        with torch.no_grad():
+            for args in inputs:
+                expected = _flatten_tensors(model(*args))
+                output = _flatten_tensors(exported(*args))
+                if len(output) != len(expected) or any(
+                    a.shape != b.shape for a, b in zip(output, expected)
+                ):
+                    msg = (
+                        f"The exported model does not have the same outputs as the eager model: "
+                        f"{[tuple(t.shape) for t in output]} vs "
+                        f"{[tuple(t.shape) for t in expected]}"
+                    )
+                    raise RuntimeError(msg)
+                for a, b in zip(output, expected):
+                    a = a.to(device=b.device, dtype=b.dtype)  # noqa: PLW2901
+                    diff = (a.double() - b.double()).abs().max().item() if a.numel() else 0.0
+                    if not torch.allclose(a, b, rtol=self._rtol, atol=self._atol):
+                        msg = (
+                            "The outputs of the exported model do not match the outputs of the "
+                            f"eager model (max absolute difference: {diff:.3e})"
+                        )
+                        raise RuntimeError(msg)
+                    max_abs_diff = max(max_abs_diff, diff)
+        return max_abs_diff
+
+
+def _flatten_tensors(output: Any) -> list[torch.Tensor]:
+    r"""Get the tensors of a nested output in the order of the output.
+
+    Args:
+        output: The output of a model.
+
+    Returns:
+        The tensors.
+    """
+    if torch.is_tensor(output):
+        return [output]
+    if isinstance(output, Mapping):
+        return [tensor for value in output.values() for tensor in _flatten_tensors(value)]
+    if isinstance(output, Sequence) and not isinstance(output, str):
+        return [tensor for item in output for tensor in _flatten_tensors(item)]
+    return []
+
+
+def _hash_file(path: Path, chunk_size: int = 2**20) -> str:
+    r"""Compute the SHA-256 hash of a file.
+
+    Args:
+        path: The path to the file.
+        chunk_size: The number of bytes read at once.
+
+    Returns:
+        The hexadecimal hash.
+    """
+    sha = hashlib.sha256()
+    with Path(path).open("rb") as file:
+        while chunk := file.read(chunk_size):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    r"""Write a text file atomically.
+
+    Args:
+        path: The path to the file.
+        text: The text to write.
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(text)
+    tmp_path.replace(path)
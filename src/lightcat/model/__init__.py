@@ -2,6 +2,23 @@ r"""Contain ``lightning.LightningModule`` and code to manage them."""
 
 from __future__ import annotations
 
-__all__ = ["is_model_config", "setup_model"]
+__all__ = [
+    "EnsembleModel",
+    "FanOutModel",
+    "apply_activation_checkpointing",
+    "estimate_model_resources",
+    "get_checkpointed_modules",
+    "is_model_config",
+    "profile_activation_checkpointing",
+    "setup_model",
+]
 
+from lightcat.model.checkpointing import (
+    apply_activation_checkpointing,
+    get_checkpointed_modules,
+    profile_activation_checkpointing,
+)
+from lightcat.model.ensemble import EnsembleModel
+from lightcat.model.estimator import estimate_model_resources
+from lightcat.model.fanout import FanOutModel
 from lightcat.model.factory import is_model_config, setup_model
@@ -0,0 +1,358 @@
+r"""Contain functions to apply activation checkpointing to some
+submodules of a model and to measure its effect."""
+
+from __future__ import annotations
+
+__all__ = [
+    "apply_activation_checkpointing",
+    "get_checkpointed_modules",
+    "profile_activation_checkpointing",
+]
+
+import logging
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
+
+import torch
+from torch.utils.checkpoint import checkpoint
+
+from lightcat.utils.modules import ModuleMatcher
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class _CheckpointedForward:
+    r"""Implement a forward function that recomputes the activations of a
+    module in the backward pass instead of storing them.
+
+    The activations are only recomputed if the module is in training
+    mode and the gradient computation is enabled.
+
+    Args:
+        module: The module.
+    """
+
+    def __init__(self, module: torch.nn.Module) -> None:
+        self.module = module
+        self.enabled = True
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        if self.enabled and self.module.training and torch.is_grad_enabled():
+            return checkpoint(self._forward, *args, use_reentrant=False, **kwargs)
+        return self._forward(*args, **kwargs)
+
+    def _forward(self, *args: Any, **kwargs: Any) -> Any:
+        return type(self.module).forward(self.module, *args, **kwargs)
+
+
+def apply_activation_checkpointing(
+    model: torch.nn.Module,
+    names: Sequence[str] = (),
+    types: Sequence[type | str] = (),
+) -> list[str]:
+    r"""Apply activation checkpointing to some submodules of a model.
+
+    The activations of the selected submodules are not stored in the
+    forward pass, and they are recomputed in the backward pass, which
+    reduces the memory usage at the cost of an extra forward pass of the
+    selected submodules. A submodule is selected if its name fully
+    matches one of the regular expressions in ``names``, or if it is an
+    instance of one of the types in ``types``. A type can be given by
+    its import path, for example ``'torch.nn.TransformerEncoderLayer'``,
+    or by its class name, for example ``'TransformerEncoderLayer'``. The
+    submodules of a selected submodule are not selected. The inputs of
+    each selected submodule are stored, so selecting blocks of several
+    layers usually saves more memory than selecting individual layers.
+    The forward function of the selected submodules is replaced, so the
+    names of the parameters are not changed and the checkpoints of the
+    model are compatible with the original model. The activations are
+    only recomputed in training mode when the gradient computation is
+    enabled.
+
+    Args:
+        model: The model.
+        names: The regular expressions to select the submodules by
+            name.
+        types: The types of the submodules to select.
+
+    Returns:
+        The names of the selected submodules.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.model.checkpointing import apply_activation_checkpointing
+    >>> model = torch.nn.Sequential(
+    ...     torch.nn.Linear(4, 8), torch.nn.ReLU(), torch.nn.Linear(8, 8), torch.nn.ReLU()
+    ... )
+    >>> apply_activation_checkpointing(model, types=["torch.nn.Linear"])
+    ['0', '2']
+    >>> apply_activation_checkpointing(model, names=[r"[13]"])
+    ['1', '3']
+
+    ```
+    """
+    matcher = ModuleMatcher(names=names, types=types, fullmatch=True)
+    selected = []
+    for name, module in model.named_modules():
+        if not name or any(name.startswith(f"{parent}.") for parent in selected):
+            continue
+        if matcher.match(name, module):
+            if not isinstance(module.__dict__.get("forward"), _CheckpointedForward):
+                module.forward = _CheckpointedForward(module)
+            selected.append(name)
+    logger.info(f"Activation checkpointing is applied to {len(selected):,} submodules")
+    return selected
+
+
+def get_checkpointed_modules(model: torch.nn.Module) -> list[str]:
+    r"""Get the names of the submodules with activation checkpointing.
+
+    Args:
+        model: The model.
+
+    Returns:
+        The names of the submodules with activation checkpointing.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.model.checkpointing import (
+    ...     apply_activation_checkpointing,
+    ...     get_checkpointed_modules,
+    ... )
+    >>> model = torch.nn.Sequential(torch.nn.Linear(4, 8), torch.nn.ReLU())
+    >>> get_checkpointed_modules(model)
+    []
+    >>> _ = apply_activation_checkpointing(model, names=["0"])
+    >>> get_checkpointed_modules(model)
+    ['0']
+
+    ```
+    """
+    return [
+        name
+        for name, module in model.named_modules()
+        if isinstance(module.__dict__.get("forward"), _CheckpointedForward)
+    ]
+
+
+def profile_activation_checkpointing(
+    model: torch.nn.Module,
+    batch: Any,
+    step_fn: Callable[[torch.nn.Module, Any], Any] | None = None,
+    repeat: int = 3,
+) -> dict[str, float | int]:
+    r"""Measure the activation memory saved by the activation
+    checkpointing and its recompute cost on a sample batch.
+
+    The training step is run with and without activation checkpointing.
+    The activation memory is the total size of the tensors saved for
+    the backward pass, where the tensors sharing the same storage are
+    counted once. The time is the median time of the forward and
+    backward passes over ``repeat`` runs, after one warmup run. The
+    gradients of the model are reset after each run.
+
+    Args:
+        model: The model with activation checkpointing.
+        batch: The sample batch.
+        step_fn: The function that computes the loss from the model
+            and the batch. The output can be the loss or a mapping
+            with a ``'loss'`` key. If ``None``, the
+            ``training_step(batch, 0)`` method of the model is used if
+            it exists, otherwise the model is called with the batch
+            and its output is summed.
+        repeat: The number of timed runs.
+
+    Returns:
+        The report: the activation memory in bytes without
+            (``'activation_bytes'``) and with
+            (``'checkpointed_activation_bytes'``) checkpointing, the
+            saved memory in bytes (``'saved_bytes'``), the time in
+            seconds without (``'step_time'``) and with
+            (``'checkpointed_step_time'``) checkpointing, and the
+            relative time overhead (``'recompute_overhead'``).
+
+    Raises:
+        ValueError: if ``repeat`` is lower than 1.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.model.checkpointing import (
+    ...     apply_activation_checkpointing,
+    ...     profile_activation_checkpointing,
+    ... )
+    >>> block = torch.nn.Sequential(
+    ...     torch.nn.Linear(4, 8), torch.nn.Tanh(), torch.nn.Linear(8, 8), torch.nn.Tanh()
+    ... )
+    >>> model = torch.nn.Sequential(block, torch.nn.Linear(8, 1))
+    >>> apply_activation_checkpointing(model, names=["0"])
+    ['0']
+    >>> report = profile_activation_checkpointing(model, torch.randn(16, 4))
+    >>> report["saved_bytes"] > 0
+    True
+
+    ```
+    """
+    if repeat < 1:
+        msg = f"repeat must be greater than 0 (received: {repeat})"
+        raise ValueError(msg)
+    step_fn = step_fn or _default_step
+    was_training = model.training
+    model.train()
+    try:
+        with _enable_checkpointing(model, enabled=False):
+            activation_bytes = _measure_saved_bytes(model, batch, step_fn)
+            step_time = _measure_step_time(model, batch, step_fn, repeat)
+        checkpointed_activation_bytes = _measure_saved_bytes(model, batch, step_fn)
+        checkpointed_step_time = _measure_step_time(model, batch, step_fn, repeat)
+    finally:
+        model.train(was_training)
+        model.zero_grad(set_to_none=True)
+    return {
+        "activation_bytes": activation_bytes,
+        "checkpointed_activation_bytes": checkpointed_activation_bytes,
+        "saved_bytes": activation_bytes - checkpointed_activation_bytes,
+        "step_time": step_time,
+        "checkpointed_step_time": checkpointed_step_time,
+        "recompute_overhead": (
+            checkpointed_step_time / step_time - 1.0 if step_time > 0 else float("nan")
+        ),
+    }
+
+
+@contextmanager
+def _enable_checkpointing(model: torch.nn.Module, enabled: bool) -> Generator[None]:
+    r"""Enable or disable the activation checkpointing of the submodules
+    of a model in the context.
+
+    Args:
+        model: The model.
+        enabled: If ``True``, the activation checkpointing is enabled,
+            otherwise it is disabled.
+    """
+    forwards = [
+        module.__dict__["forward"]
+        for module in model.modules()
+        if isinstance(module.__dict__.get("forward"), _CheckpointedForward)
+    ]
+    states = [forward.enabled for forward in forwards]
+    for forward in forwards:
+        forward.enabled = enabled
+    try:
+        yield
+    finally:
+        for forward, state in zip(forwards, states):
+            forward.enabled = state
+
+
+def _measure_saved_bytes(
+    model: torch.nn.Module, batch: Any, step_fn: Callable[[torch.nn.Module, Any], Any]
+) -> int:
+    r"""Measure the size of the tensors saved for the backward pass.
+
+    Args:
+        model: The model.
+        batch: The batch.
+        step_fn: The function that computes the loss.
+
+    Returns:
+        The size in bytes.
+    """
+    storages = {}
+
+    def pack(tensor: torch.Tensor) -> torch.Tensor:
+        storage = tensor.untyped_storage()
+        storages[storage.data_ptr()] = storage.nbytes()
+        return tensor
+
+    # The parameters are saved for the backward pass, but they are not
+    # activations.
+    parameters = {param.untyped_storage().data_ptr() for param in model.parameters()}
+    with torch.autograd.graph.saved_tensors_hooks(pack, lambda tensor: tensor):
+        loss = _get_loss(step_fn(model, batch))
+    loss.backward()
+    model.zero_grad(set_to_none=True)
+    return sum(nbytes for ptr, nbytes in storages.items() if ptr not in parameters)
+
+
+def _measure_step_time(
+    model: torch.nn.Module,
+    batch: Any,
+    step_fn: Callable[[torch.nn.Module, Any], Any],
+    repeat: int,
+) -> float:
+    r"""Measure the time of the forward and backward passes.
+
+    Args:
+        model: The model.
+        batch: The batch.
+        step_fn: The function that computes the loss.
+        repeat: The number of timed runs.
+
+    Returns:
+        The median time in seconds.
+    """
+    times = []
+    for i in range(repeat + 1):
+        _synchronize(model)
+        start_time = time.perf_counter()
+        _get_loss(step_fn(model, batch)).backward()
+        _synchronize(model)
+        if i > 0:
+            times.append(time.perf_counter() - start_time)
+        model.zero_grad(set_to_none=True)
+    return sorted(times)[len(times) // 2]
+
+
+def _default_step(model: torch.nn.Module, batch: Any) -> Any:
+    r"""Compute the loss of a model on a batch.
+
+    Args:
+        model: The model.
+        batch: The batch.
+
+    Returns:
+        The output of ``training_step`` if the model has this method,
+            otherwise the sum of the output of the model.
+    """
+    if hasattr(model, "training_step"):
+        return model.training_step(batch, 0)
+    return model(batch).sum()
+
+
+def _get_loss(output: Any) -> torch.Tensor:
+    r"""Get the loss from the output of a training step.
+
+    Args:
+        output: The output of a training step.
+
+    Returns:
+        The loss.
+    """
+    if isinstance(output, Mapping):
+        return output["loss"]
+    return output
+
+
+def _synchronize(model: torch.nn.Module) -> None:
+    r"""Wait for the kernels on the device of the model to finish.
+
+    Args:
+        model: The model.
+    """
+    param = next(model.parameters(), None)
+    if param is not None and param.device.type == "cuda":
+        torch.cuda.synchronize(param.device)
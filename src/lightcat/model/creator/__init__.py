@@ -2,11 +2,24 @@ r"""Contain the model creators."""
 
 from __future__ import annotations
 
-__all__ = ["BaseModelCreator", "ModelCreator", "is_model_creator_config", "setup_model_creator"]
+__all__ = [
+    "ActivationCheckpointingModelCreator",
+    "BaseModelCreator",
+    "BroadcastModelCreator",
+    "EnsembleModelCreator",
+    "FanOutModelCreator",
+    "ModelCreator",
+    "is_model_creator_config",
+    "setup_model_creator",
+]
 
 from lightcat.model.creator.base import (
     BaseModelCreator,
     is_model_creator_config,
     setup_model_creator,
 )
+from lightcat.model.creator.broadcast import BroadcastModelCreator
+from lightcat.model.creator.checkpointing import ActivationCheckpointingModelCreator
+from lightcat.model.creator.ensemble import EnsembleModelCreator
+from lightcat.model.creator.fanout import FanOutModelCreator
 from lightcat.model.creator.vanilla import ModelCreator
@@ -0,0 +1,76 @@
+r"""Contain a model creator that creates the model in a single process
+and broadcasts it to the other processes."""
+
+from __future__ import annotations
+
+__all__ = ["BroadcastModelCreator"]
+
+import logging
+from typing import TYPE_CHECKING
+
+from coola.utils import repr_indent, repr_mapping, str_indent, str_mapping
+
+from lightcat.model.creator.base import BaseModelCreator, setup_model_creator
+from lightcat.utils.distributed import build_and_broadcast
+
+if TYPE_CHECKING:
+    from lightning import LightningModule
+
+logger = logging.getLogger(__name__)
+
+
+class BroadcastModelCreator(BaseModelCreator):
+    r"""Create a model in the process with rank ``src`` and broadcast it
+    to the other processes.
+
+    In a distributed run, each process usually creates its own model,
+    so an expensive initialization, for example loading pretrained
+    weights, is repeated in each process. With this creator, only the
+    source process creates the model, and the other processes receive
+    a copy of the model and its initial weights through the ``gloo``
+    process group. The model must be picklable. The default process
+    group must be initialized before the model is created, for
+    example with ``torch.distributed.init_process_group`` in a script
+    started by ``torchrun``. Lightning uses the existing default
+    process group. If the default process group is not initialized,
+    the model is created by the current process.
+
+    Args:
+        model: The model creator or its configuration.
+        src: The global rank of the process that creates the model.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.model.creator import BroadcastModelCreator
+    >>> creator = BroadcastModelCreator(
+    ...     model={
+    ...         "_target_": "lightcat.model.creator.ModelCreator",
+    ...         "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+    ...     },
+    ... )
+    >>> model = creator.create()
+    >>> model
+    BoringModel(
+      (layer): Linear(in_features=32, out_features=2, bias=True)
+    )
+
+    ```
+    """
+
+    def __init__(self, model: BaseModelCreator | dict, src: int = 0) -> None:
+        self._model = model
+        self._src = src
+
+    def __repr__(self) -> str:
+        args = repr_indent(repr_mapping({"model": self._model, "src": self._src}))
+        return f"{self.__class__.__qualname__}(\n  {args}\n)"
+
+    def __str__(self) -> str:
+        args = str_indent(str_mapping({"model": self._model, "src": self._src}))
+        return f"{self.__class__.__qualname__}(\n  {args}\n)"
+
+    def create(self) -> LightningModule:
+        logger.info(f"Creating the model in the process with rank {self._src}...")
+        return build_and_broadcast(setup_model_creator(self._model).create, src=self._src)
@@ -0,0 +1,95 @@
+r"""Contain a model creator that applies activation checkpointing to
+some submodules of the created model."""
+
+from __future__ import annotations
+
+__all__ = ["ActivationCheckpointingModelCreator"]
+
+import logging
+from typing import TYPE_CHECKING
+
+from coola.utils import repr_indent, repr_mapping, str_indent, str_mapping
+
+from lightcat.model.checkpointing import apply_activation_checkpointing
+from lightcat.model.creator.base import BaseModelCreator, setup_model_creator
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from lightning import LightningModule
+
+logger = logging.getLogger(__name__)
+
+
+class ActivationCheckpointingModelCreator(BaseModelCreator):
+    r"""Create a model and apply activation checkpointing to some of its
+    submodules.
+
+    The submodules are selected with ``apply_activation_checkpointing``
+    by name or by type, so the code of the model is not changed. The
+    names of the parameters are not changed, so the checkpoints of the
+    model can be loaded in the original model.
+
+    Args:
+        model: The model creator or its configuration.
+        names: The regular expressions to select the submodules by
+            name.
+        types: The types of the submodules to select. A type can be
+            given by its import path or by its class name.
+
+    Raises:
+        ValueError: if no submodule is selected.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.model import get_checkpointed_modules
+    >>> from lightcat.model.creator import ActivationCheckpointingModelCreator
+    >>> creator = ActivationCheckpointingModelCreator(
+    ...     model={
+    ...         "_target_": "lightcat.model.creator.ModelCreator",
+    ...         "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+    ...     },
+    ...     names=["layer"],
+    ... )
+    >>> model = creator.create()
+    >>> get_checkpointed_modules(model)
+    ['layer']
+
+    ```
+    """
+
+    def __init__(
+        self,
+        model: BaseModelCreator | dict,
+        names: Sequence[str] = (),
+        types: Sequence[type | str] = (),
+    ) -> None:
+        self._model = model
+        self._names = tuple(names)
+        self._types = tuple(types)
+
+    def __repr__(self) -> str:
+        args = repr_indent(
+            repr_mapping({"model": self._model, "names": self._names, "types": self._types})
+        )
+        return f"{self.__class__.__qualname__}(\n  {args}\n)"
+
+    def __str__(self) -> str:
+        args = str_indent(
+            str_mapping({"model": self._model, "names": self._names, "types": self._types})
+        )
+        return f"{self.__class__.__qualname__}(\n  {args}\n)"
+
+    def create(self) -> LightningModule:
+        model = setup_model_creator(self._model).create()
+        selected = apply_activation_checkpointing(model, names=self._names, types=self._types)
+        if not selected:
+            msg = (
+                f"No submodule matches the names {self._names} or the types {self._types}. "
+                "Please check the activation checkpointing configuration"
+            )
+            raise ValueError(msg)
+        logger.info(f"Activation checkpointing is applied to: {selected}")
+        return model
@@ -0,0 +1,126 @@
+r"""Contain a creator of an ensemble of models trained in a single
+``lightning.LightningModule``."""
+
+from __future__ import annotations
+
+__all__ = ["EnsembleModelCreator"]
+
+import copy
+import logging
+from typing import TYPE_CHECKING
+
+import torch
+from coola.utils import repr_indent, repr_mapping, str_indent, str_mapping
+
+from lightcat.model.creator.base import BaseModelCreator
+from lightcat.model.ensemble import EnsembleModel
+from lightcat.utils.factory import setup_object
+
+if TYPE_CHECKING:
+    from torch import nn
+
+logger = logging.getLogger(__name__)
+
+
+class EnsembleModelCreator(BaseModelCreator):
+    r"""Create an ``EnsembleModel`` with several copies of a model.
+
+    Each copy is instantiated from the model configuration, so each
+    copy has its own random initialization. If the model is a
+    ``torch.nn.Module`` object, the copies are deep copies of the
+    model whose parameters are reset with the ``reset_parameters``
+    method of their submodules.
+
+    Args:
+        model: The ``torch.nn.Module`` or its configuration.
+        num_models: The number of models in the ensemble.
+        loss: The loss module or its configuration.
+        optimizer: The optimizer configuration, without the
+            parameters. If ``None``, ``torch.optim.Adam`` is used.
+        seed: The random seed used to initialize the models. The
+            model ``i`` is initialized with the seed ``seed + i``. If
+            ``None``, the current random state is used.
+
+    Raises:
+        ValueError: if ``num_models`` is lower than 1.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.model.creator import EnsembleModelCreator
+    >>> creator = EnsembleModelCreator(
+    ...     {"_target_": "torch.nn.Linear", "in_features": 4, "out_features": 2},
+    ...     num_models=3,
+    ...     loss={"_target_": "torch.nn.MSELoss"},
+    ... )
+    >>> creator
+    EnsembleModelCreator(
+      (model): {'_target_': 'torch.nn.Linear', 'in_features': 4, 'out_features': 2}
+      (num_models): 3
+      (loss): {'_target_': 'torch.nn.MSELoss'}
+      (optimizer): None
+      (seed): None
+    )
+    >>> model = creator.create()
+    >>> model.num_models
+    3
+
+    ```
+    """
+
+    def __init__(
+        self,
+        model: nn.Module | dict,
+        num_models: int,
+        loss: nn.Module | dict,
+        optimizer: dict | None = None,
+        seed: int | None = None,
+    ) -> None:
+        if num_models < 1:
+            msg = f"num_models must be greater than 0 (received: {num_models})"
+            raise ValueError(msg)
+        self._model = model
+        self._num_models = num_models
+        self._loss = loss
+        self._optimizer = optimizer
+        self._seed = seed
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}(\n  {repr_indent(repr_mapping(self._get_args()))}\n)"
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__qualname__}(\n  {str_indent(str_mapping(self._get_args()))}\n)"
+
+    def create(self) -> EnsembleModel:
+        logger.info(f"Creating 'EnsembleModel' with {self._num_models:,} models...")
+        with torch.random.fork_rng(devices=[], enabled=self._seed is not None):
+            models = []
+            for i in range(self._num_models):
+                if self._seed is not None:
+                    torch.manual_seed(self._seed + i)
+                models.append(self._create_model())
+        return EnsembleModel(models, loss=copy.deepcopy(self._loss), optimizer=self._optimizer)
+
+    def _create_model(self) -> nn.Module:
+        r"""Create a copy of the model.
+
+        Returns:
+            The new model.
+        """
+        if isinstance(self._model, dict):
+            return setup_object(copy.deepcopy(self._model))
+        model = copy.deepcopy(self._model)
+        for module in model.modules():
+            if hasattr(module, "reset_parameters"):
+                module.reset_parameters()
+        return model
+
+    def _get_args(self) -> dict:
+        return {
+            "model": self._model,
+            "num_models": self._num_models,
+            "loss": self._loss,
+            "optimizer": self._optimizer,
+            "seed": self._seed,
+        }
@@ -0,0 +1,66 @@
+r"""Contain a creator of a model that trains several models on the same
+batches."""
+
+from __future__ import annotations
+
+__all__ = ["FanOutModelCreator"]
+
+import logging
+from typing import TYPE_CHECKING
+
+from coola.utils import repr_indent, repr_mapping, str_indent, str_mapping
+
+from lightcat.model.creator.base import BaseModelCreator, setup_model_creator
+from lightcat.model.fanout import FanOutModel
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+logger = logging.getLogger(__name__)
+
+
+class FanOutModelCreator(BaseModelCreator):
+    r"""Create a ``FanOutModel`` that trains several models on the same
+    batches.
+
+    Args:
+        models: The model creators or their configurations, indexed
+            by model name.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.model.creator import FanOutModelCreator, ModelCreator
+    >>> creator = FanOutModelCreator(
+    ...     {
+    ...         "model1": ModelCreator(
+    ...             {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"}
+    ...         ),
+    ...         "model2": {
+    ...             "_target_": "lightcat.model.creator.ModelCreator",
+    ...             "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+    ...         },
+    ...     }
+    ... )
+    >>> model = creator.create()
+    >>> list(model.models)
+    ['model1', 'model2']
+
+    ```
+    """
+
+    def __init__(self, models: Mapping[str, BaseModelCreator | dict]) -> None:
+        self._models = models
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}(\n  {repr_indent(repr_mapping(self._models))}\n)"
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__qualname__}(\n  {str_indent(str_mapping(self._models))}\n)"
+
+    def create(self) -> FanOutModel:
+        logger.info(f"Creating 'FanOutModel' with {len(self._models):,} models...")
+        return FanOutModel(
+            {name: setup_model_creator(creator).create() for name, creator in self._models.items()}
+        )
@@ -0,0 +1,241 @@
+r"""Contain a ``lightning.LightningModule`` that trains an ensemble of
+models with the same architecture in a single training loop."""
+
+from __future__ import annotations
+
+__all__ = ["EnsembleModel"]
+
+import copy
+import logging
+from typing import TYPE_CHECKING, Any
+
+import torch
+from lightning import LightningModule
+from torch import nn
+from torch.func import functional_call, replace_all_batch_norm_modules_, stack_module_state
+
+from lightcat.utils.factory import setup_object
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class EnsembleModel(LightningModule):
+    r"""Implement a ``lightning.LightningModule`` that trains an
+    ensemble of models with the same architecture in a single training
+    loop.
+
+    The parameters and buffers of the models are stacked along a new
+    first dimension with ``torch.func.stack_module_state``, and the
+    forward pass of all the models is computed with ``torch.func.vmap``,
+    so the models are trained with batched kernels instead of one
+    training loop per model. All the models receive the same batch.
+    The training loss is the sum of the losses of the models, so the
+    gradients of each model only depend on its own loss.
+
+    The batch norm modules are converted to not use running
+    statistics because the running statistics cannot be updated in
+    place inside ``torch.func.vmap``.
+
+    Args:
+        models: The models to train. They must have the same
+            architecture.
+        loss: The loss module or its configuration. It is called
+            with the predictions and targets of one model and must
+            return a scalar.
+        optimizer: The optimizer configuration, without the
+            parameters. If ``None``, ``torch.optim.Adam`` is used.
+
+    Raises:
+        ValueError: if ``models`` is empty or if the models do not
+            have the same architecture.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.model import EnsembleModel
+    >>> model = EnsembleModel(
+    ...     [torch.nn.Linear(4, 2) for _ in range(3)], loss=torch.nn.MSELoss()
+    ... )
+    >>> model.num_models
+    3
+    >>> model(torch.randn(5, 4)).shape
+    torch.Size([3, 5, 2])
+
+    ```
+    """
+
+    def __init__(
+        self,
+        models: Sequence[nn.Module],
+        loss: nn.Module | dict,
+        optimizer: dict | None = None,
+    ) -> None:
+        super().__init__()
+        if not models:
+            msg = "models cannot be empty"
+            raise ValueError(msg)
+        _check_same_architecture(models)
+        for model in models:
+            replace_all_batch_norm_modules_(model)
+        params, buffers = stack_module_state(list(models))
+        self._num_models = len(models)
+        self._param_names = list(params)
+        self._buffer_names = list(buffers)
+        self.ensemble_params = nn.ParameterList(
+            [nn.Parameter(params[name]) for name in self._param_names]
+        )
+        for i, name in enumerate(self._buffer_names):
+            self.register_buffer(f"ensemble_buffer_{i}", buffers[name])
+        # The stateless copy of the architecture is not registered as a
+        # submodule, so its parameters are not part of the ensemble.
+        object.__setattr__(self, "_base_model", copy.deepcopy(models[0]).to("meta"))
+        self.loss = setup_object(loss)
+        self._optimizer = optimizer or {"_target_": "torch.optim.Adam"}
+
+    @property
+    def num_models(self) -> int:
+        r"""The number of models in the ensemble."""
+        return self._num_models
+
+    def forward(self, inputs: torch.Tensor) -> torch.Tensor:
+        r"""Compute the predictions of all the models.
+
+        Args:
+            inputs: The inputs, which are the same for all the models.
+
+        Returns:
+            The predictions of the models, stacked along the first
+                dimension.
+        """
+        return torch.func.vmap(self._call_model, in_dims=(0, 0, None), randomness="different")(
+            self.get_params(), self.get_buffers(), inputs
+        )
+
+    def training_step(self, batch: Any, batch_idx: int) -> torch.Tensor:  # noqa: ARG002
+        losses = self._compute_losses(batch)[0]
+        self.log("train/loss", losses.mean())
+        return losses.sum()
+
+    def validation_step(self, batch: Any, batch_idx: int) -> None:  # noqa: ARG002
+        self._evaluate(batch, prefix="val")
+
+    def test_step(self, batch: Any, batch_idx: int) -> None:  # noqa: ARG002
+        self._evaluate(batch, prefix="test")
+
+    def predict_step(self, batch: Any, batch_idx: int) -> torch.Tensor:  # noqa: ARG002
+        return self(batch[0] if isinstance(batch, (list, tuple)) else batch)
+
+    def configure_optimizers(self) -> torch.optim.Optimizer:
+        return setup_object({**copy.deepcopy(self._optimizer), "params": self.parameters()})
+
+    def get_params(self) -> dict[str, torch.Tensor]:
+        r"""Get the stacked parameters of the models.
+
+        Returns:
+            The stacked parameters, where the first dimension is the
+                model index.
+        """
+        return dict(zip(self._param_names, self.ensemble_params))
+
+    def get_buffers(self) -> dict[str, torch.Tensor]:
+        r"""Get the stacked buffers of the models.
+
+        Returns:
+            The stacked buffers, where the first dimension is the
+                model index.
+        """
+        return {
+            name: getattr(self, f"ensemble_buffer_{i}") for i, name in enumerate(self._buffer_names)
+        }
+
+    def get_model(self, index: int) -> nn.Module:
+        r"""Get a model of the ensemble as a standalone module.
+
+        Args:
+            index: The model index.
+
+        Returns:
+            A copy of the model, on the same device as the ensemble.
+        """
+        model = copy.deepcopy(self._base_model).to_empty(device=self.device)
+        state = {name: value[index] for name, value in self.get_params().items()}
+        state.update({name: value[index] for name, value in self.get_buffers().items()})
+        model.load_state_dict(state)
+        return model
+
+    def _call_model(
+        self,
+        params: dict[str, torch.Tensor],
+        buffers: dict[str, torch.Tensor],
+        inputs: torch.Tensor,
+    ) -> torch.Tensor:
+        r"""Compute the predictions of one model.
+
+        Args:
+            params: The parameters of the model.
+            buffers: The buffers of the model.
+            inputs: The inputs.
+
+        Returns:
+            The predictions.
+        """
+        return functional_call(self._base_model, (params, buffers), (inputs,))
+
+    def _compute_losses(self, batch: Any) -> tuple[torch.Tensor, torch.Tensor]:
+        r"""Compute the loss of each model.
+
+        Args:
+            batch: The batch, with the inputs and targets.
+
+        Returns:
+            The loss of each model and the predictions.
+        """
+        inputs, targets = batch[0], batch[1]
+        preds = self(inputs)
+        losses = torch.func.vmap(self.loss, in_dims=(0, None))(preds, targets)
+        return losses, preds
+
+    def _evaluate(self, batch: Any, prefix: str) -> None:
+        r"""Evaluate the models and the ensemble on a batch.
+
+        Args:
+            batch: The batch, with the inputs and targets.
+            prefix: The prefix of the metric names.
+        """
+        losses, preds = self._compute_losses(batch)
+        self.log(f"{prefix}/loss", losses.mean())
+        self.log(f"{prefix}/ensemble_loss", self.loss(preds.mean(dim=0), batch[1]))
+
+
+def _check_same_architecture(models: Sequence[nn.Module]) -> None:
+    r"""Check that the models have the same architecture.
+
+    Args:
+        models: The models to check.
+
+    Raises:
+        ValueError: if the models do not have the same parameter and
+            buffer names and shapes.
+    """
+    reference = _get_state_shapes(models[0])
+    for i, model in enumerate(models[1:], start=1):
+        if _get_state_shapes(model) != reference:
+            msg = f"The model {i} does not have the same architecture as the model 0"
+            raise ValueError(msg)
+
+
+def _get_state_shapes(model: nn.Module) -> dict[str, torch.Size]:
+    r"""Get the shape of each parameter and buffer of a model.
+
+    Args:
+        model: The model.
+
+    Returns:
+        The shape of each parameter and buffer.
+    """
+    return {name: value.shape for name, value in model.state_dict().items()}
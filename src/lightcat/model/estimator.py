@@ -0,0 +1,228 @@
+r"""Contain a function to estimate the memory and compute requirements
+of a model without allocating its tensors."""
+
+from __future__ import annotations
+
+__all__ = ["estimate_model_resources"]
+
+import copy
+import logging
+from collections.abc import Mapping, Sequence
+from typing import TYPE_CHECKING, Any
+
+import torch
+from torch.utils.flop_counter import FlopCounterMode
+
+from lightcat.model.creator import setup_model_creator
+from lightcat.utils.factory import setup_object
+
+if TYPE_CHECKING:
+    from lightcat.model.creator import BaseModelCreator
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_model_resources(
+    model: BaseModelCreator | dict,
+    input_shape: Sequence[int] | Sequence[Sequence[int]] | None = None,
+    input_dtype: torch.dtype = torch.float32,
+    optimizer: dict | None = None,
+) -> dict[str, int]:
+    r"""Estimate the memory and compute requirements of a model without
+    allocating its tensors.
+
+    The model is created on the ``meta`` device, so its parameters and
+    buffers have a shape and a data type but no data. The model must
+    not move its tensors to a specific device or read data during its
+    creation. The optimizer states are created by running an optimizer
+    step on the ``meta`` device. The forward FLOPs are counted with
+    ``torch.utils.flop_counter.FlopCounterMode``. The activation memory
+    is the total size of the tensors saved for the backward pass in
+    training mode, excluding the parameters and buffers. It is an
+    upper bound because some saved tensors can share memory.
+
+    Args:
+        model: The model creator or its configuration.
+        input_shape: The shape of the input of the model, or the
+            shapes of the inputs if the model has several inputs. If
+            ``None``, the forward FLOPs and activation memory are not
+            estimated.
+        input_dtype: The data type of the inputs.
+        optimizer: The optimizer configuration, without the
+            parameters. If ``None``, the optimizers returned by the
+            ``configure_optimizers`` method of the model are used if
+            the model has this method.
+
+    Returns:
+        The estimates. The sizes are in bytes. ``'forward_flops'`` and
+            ``'activation_bytes'`` are only available if
+            ``input_shape`` is given. ``'total_bytes'`` is the sum of
+            the sizes of the parameters, buffers, gradients, optimizer
+            states and activations.
+
+    Raises:
+        ValueError: if some tensors of the created model are not on
+            the ``meta`` device, for example if the model creator
+            returns an existing model.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.model.estimator import estimate_model_resources
+    >>> estimates = estimate_model_resources(
+    ...     model={
+    ...         "_target_": "lightcat.model.creator.ModelCreator",
+    ...         "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+    ...     },
+    ...     input_shape=(8, 32),
+    ...     optimizer={"_target_": "torch.optim.Adam", "lr": 0.001},
+    ... )
+    >>> estimates["num_parameters"]
+    66
+    >>> estimates["optimizer_state_bytes"]
+    536
+    >>> estimates["forward_flops"]
+    1024
+
+    ```
+    """
+    with torch.device("meta"):
+        module = setup_model_creator(model).create()
+    if any(not tensor.is_meta for tensor in [*module.parameters(), *module.buffers()]):
+        msg = (
+            "The model must be created on the meta device, but some of its tensors are "
+            "allocated. The model creator should create the model from a configuration"
+        )
+        raise ValueError(msg)
+    parameters = list(module.parameters())
+    trainable = [param for param in parameters if param.requires_grad]
+    estimates = {
+        "num_parameters": sum(param.numel() for param in parameters),
+        "num_trainable_parameters": sum(param.numel() for param in trainable),
+        "parameter_bytes": sum(_get_nbytes(param) for param in parameters),
+        "buffer_bytes": sum(_get_nbytes(buffer) for buffer in module.buffers()),
+        "gradient_bytes": sum(_get_nbytes(param) for param in trainable),
+        "optimizer_state_bytes": _estimate_optimizer_state_bytes(module, trainable, optimizer),
+    }
+    if input_shape is not None:
+        estimates.update(_estimate_forward(module, input_shape, input_dtype))
+    estimates["total_bytes"] = sum(
+        estimates.get(key, 0)
+        for key in (
+            "parameter_bytes",
+            "buffer_bytes",
+            "gradient_bytes",
+            "optimizer_state_bytes",
+            "activation_bytes",
+        )
+    )
+    return estimates
+
+
+def _estimate_optimizer_state_bytes(
+    module: torch.nn.Module, trainable: list[torch.nn.Parameter], optimizer: dict | None
+) -> int:
+    r"""Estimate the size of the optimizer states.
+
+    Args:
+        module: The model on the ``meta`` device.
+        trainable: The trainable parameters of the model.
+        optimizer: The optimizer configuration, or ``None`` to use the
+            ``configure_optimizers`` method of the model.
+
+    Returns:
+        The size of the optimizer states in bytes.
+    """
+    if optimizer is not None:
+        optimizers = [setup_object({**copy.deepcopy(optimizer), "params": trainable})]
+    elif hasattr(module, "configure_optimizers"):
+        optimizers = _get_optimizers(module.configure_optimizers())
+    else:
+        return 0
+    for param in trainable:
+        param.grad = torch.empty_like(param)
+    nbytes = 0
+    for opt in optimizers:
+        opt.step()
+        nbytes += sum(
+            _get_nbytes(value)
+            for state in opt.state.values()
+            for value in state.values()
+            if torch.is_tensor(value)
+        )
+    for param in trainable:
+        param.grad = None
+    return nbytes
+
+
+def _estimate_forward(
+    module: torch.nn.Module,
+    input_shape: Sequence[int] | Sequence[Sequence[int]],
+    input_dtype: torch.dtype,
+) -> dict[str, int]:
+    r"""Estimate the FLOPs and activation memory of the forward pass.
+
+    Args:
+        module: The model on the ``meta`` device.
+        input_shape: The shape or shapes of the inputs.
+        input_dtype: The data type of the inputs.
+
+    Returns:
+        The forward FLOPs and the activation memory in bytes.
+    """
+    shapes = input_shape if isinstance(input_shape[0], Sequence) else [input_shape]
+    inputs = [torch.empty(shape, dtype=input_dtype, device="meta") for shape in shapes]
+    # The parameters and buffers are saved for the backward pass, but
+    # they are not activations.
+    excluded = {id(tensor) for tensor in [*module.parameters(), *module.buffers()]}
+    saved = {}
+
+    def pack(tensor: torch.Tensor) -> torch.Tensor:
+        base = tensor if tensor._base is None else tensor._base
+        if id(base) not in excluded:
+            saved[id(base)] = _get_nbytes(base)
+        return tensor
+
+    was_training = module.training
+    module.train()
+    counter = FlopCounterMode(display=False)
+    try:
+        with counter, torch.autograd.graph.saved_tensors_hooks(pack, lambda tensor: tensor):
+            module(*inputs)
+    finally:
+        module.train(was_training)
+    return {"forward_flops": counter.get_total_flops(), "activation_bytes": sum(saved.values())}
+
+
+def _get_optimizers(output: Any) -> list[torch.optim.Optimizer]:
+    r"""Get the optimizers from the output of ``configure_optimizers``.
+
+    Args:
+        output: The output of ``configure_optimizers``.
+
+    Returns:
+        The optimizers.
+    """
+    if isinstance(output, torch.optim.Optimizer):
+        return [output]
+    if isinstance(output, Mapping):
+        return _get_optimizers(output.get("optimizer"))
+    if isinstance(output, Sequence):
+        if len(output) == 2 and isinstance(output[0], Sequence):
+            # The output is a list of optimizers and a list of schedulers.
+            return _get_optimizers(output[0])
+        return [opt for item in output for opt in _get_optimizers(item)]
+    return []
+
+
+def _get_nbytes(tensor: torch.Tensor) -> int:
+    r"""Get the size of the data of a tensor.
+
+    Args:
+        tensor: The tensor.
+
+    Returns:
+        The size in bytes.
+    """
+    return tensor.numel() * tensor.element_size()
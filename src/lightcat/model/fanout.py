@@ -0,0 +1,308 @@
+r"""Contain a ``lightning.LightningModule`` that trains several models
+on the same batches."""
+
+from __future__ import annotations
+
+__all__ = ["FanOutModel"]
+
+import functools
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import lightning
+import torch
+from lightning import LightningModule
+from torch import nn
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Mapping
+
+logger = logging.getLogger(__name__)
+
+
+class FanOutModel(LightningModule):
+    r"""Implement a ``lightning.LightningModule`` that trains several
+    models on the same batches.
+
+    Each batch is loaded once and fed to all the models, so the cost
+    of the input pipeline is shared by the models. Each model keeps
+    its own ``training_step``, ``validation_step``, ``test_step``,
+    ``predict_step`` and ``configure_optimizers`` methods, and it is
+    optimized with its own optimizer and learning rate scheduler.
+    The models must use the automatic optimization with a single
+    optimizer. The metrics logged by a model are prefixed with the
+    model name, for example ``'model1/train_loss'``.
+
+    The batch is not copied, so the models must not modify it in
+    place. Because the models are optimized with the manual
+    optimization, ``trainer.global_step`` is incremented once per
+    model for each batch, and the trainer gradient clipping and
+    gradient accumulation options are not supported.
+
+    Args:
+        models: The models to train, indexed by name.
+
+    Raises:
+        ValueError: if ``models`` is empty.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightning.pytorch.demos.boring_classes import BoringModel
+    >>> from lightcat.model import FanOutModel
+    >>> model = FanOutModel({"model1": BoringModel(), "model2": BoringModel()})
+    >>> model
+    FanOutModel(
+      (models): ModuleDict(
+        (model1): BoringModel(
+          (layer): Linear(in_features=32, out_features=2, bias=True)
+        )
+        (model2): BoringModel(
+          (layer): Linear(in_features=32, out_features=2, bias=True)
+        )
+      )
+    )
+
+    ```
+    """
+
+    def __init__(self, models: Mapping[str, LightningModule]) -> None:
+        super().__init__()
+        if not models:
+            msg = "models cannot be empty"
+            raise ValueError(msg)
+        self.automatic_optimization = False
+        self.models = nn.ModuleDict(models)
+        self._scheduler_configs: dict[str, list[dict[str, Any]]] = {}
+
+    def forward(self, *args: Any, **kwargs: Any) -> dict[str, Any]:
+        return {name: model(*args, **kwargs) for name, model in self.models.items()}
+
+    def training_step(self, batch: Any, batch_idx: int) -> None:
+        optimizers = self.optimizers()
+        if not isinstance(optimizers, list):
+            optimizers = [optimizers]
+        for (name, model), optimizer in zip(self.models.items(), optimizers):
+            with self._prefix_logs(name, model):
+                output = model.training_step(batch, batch_idx)
+            loss = output["loss"] if isinstance(output, dict) else output
+            if loss is None:
+                continue
+            optimizer.zero_grad()
+            self.manual_backward(loss)
+            optimizer.step()
+            self._step_schedulers(name, interval="step", counter=batch_idx + 1)
+
+    def validation_step(self, batch: Any, batch_idx: int, *args: Any) -> None:
+        for name, model in self.models.items():
+            with self._prefix_logs(name, model):
+                model.validation_step(batch, batch_idx, *args)
+
+    def test_step(self, batch: Any, batch_idx: int, *args: Any) -> None:
+        for name, model in self.models.items():
+            with self._prefix_logs(name, model):
+                model.test_step(batch, batch_idx, *args)
+
+    def predict_step(self, batch: Any, batch_idx: int, *args: Any) -> dict[str, Any]:
+        return {
+            name: model.predict_step(batch, batch_idx, *args) for name, model in self.models.items()
+        }
+
+    def configure_optimizers(self) -> tuple[list[torch.optim.Optimizer], list[Any]]:
+        optimizers, schedulers = [], []
+        for name, model in self.models.items():
+            optimizer, configs = _configure_optimizer(name, model)
+            optimizers.append(optimizer)
+            self._scheduler_configs[name] = configs
+            schedulers.extend(config["scheduler"] for config in configs)
+        # The schedulers are returned to save their states in the
+        # checkpoints, but they are stepped by this module.
+        return optimizers, schedulers
+
+    def on_train_epoch_start(self) -> None:
+        self._call_models_hook("on_train_epoch_start")
+
+    def on_train_epoch_end(self) -> None:
+        self._call_models_hook("on_train_epoch_end")
+        for name in self.models:
+            self._step_schedulers(name, interval="epoch", counter=self.current_epoch + 1)
+
+    def on_validation_epoch_start(self) -> None:
+        self._call_models_hook("on_validation_epoch_start")
+
+    def on_validation_epoch_end(self) -> None:
+        self._call_models_hook("on_validation_epoch_end")
+
+    def on_test_epoch_start(self) -> None:
+        self._call_models_hook("on_test_epoch_start")
+
+    def on_test_epoch_end(self) -> None:
+        self._call_models_hook("on_test_epoch_end")
+
+    def save_model_checkpoints(self, dirpath: Path | str) -> dict[str, Path]:
+        r"""Save a checkpoint for each model.
+
+        The checkpoint of a model can be loaded with the
+        ``load_from_checkpoint`` method of the model class.
+
+        Args:
+            dirpath: The directory where the checkpoints are saved.
+                The checkpoint of a model is named ``<name>.ckpt``.
+
+        Returns:
+            The path to the checkpoint of each model.
+        """
+        dirpath = Path(dirpath)
+        dirpath.mkdir(parents=True, exist_ok=True)
+        optimizers = dict(zip(self.models, self._get_optimizers()))
+        paths = {}
+        for name, model in self.models.items():
+            checkpoint = {
+                "pytorch-lightning_version": lightning.__version__,
+                "epoch": self.current_epoch,
+                "global_step": self.global_step,
+                "state_dict": model.state_dict(),
+                "optimizer_states": ([optimizers[name].state_dict()] if name in optimizers else []),
+                "lr_schedulers": [
+                    config["scheduler"].state_dict()
+                    for config in self._scheduler_configs.get(name, [])
+                ],
+            }
+            if model.hparams:
+                checkpoint[model.CHECKPOINT_HYPER_PARAMS_KEY] = dict(model.hparams)
+            paths[name] = dirpath.joinpath(f"{name}.ckpt")
+            torch.save(checkpoint, paths[name])
+        return paths
+
+    def _get_optimizers(self) -> list[torch.optim.Optimizer]:
+        r"""Get the optimizers of the models.
+
+        Returns:
+            The optimizers, or an empty list if the optimizers are
+                not configured yet.
+        """
+        if self._trainer is None or not self._trainer.optimizers:
+            return []
+        return self._trainer.optimizers
+
+    def _call_models_hook(self, hook: str) -> None:
+        r"""Call a hook of all the models.
+
+        Args:
+            hook: The hook name.
+        """
+        for name, model in self.models.items():
+            with self._prefix_logs(name, model):
+                getattr(model, hook)()
+
+    def _step_schedulers(self, name: str, interval: str, counter: int) -> None:
+        r"""Step the learning rate schedulers of a model.
+
+        Args:
+            name: The model name.
+            interval: The current interval, ``'step'`` or ``'epoch'``.
+            counter: The number of steps or epochs in the current
+                interval.
+        """
+        for config in self._scheduler_configs.get(name, []):
+            if config["interval"] != interval or counter % config["frequency"]:
+                continue
+            if config["monitor"] is None:
+                config["scheduler"].step()
+                continue
+            metric = f"{name}/{config['monitor']}"
+            if metric not in self.trainer.callback_metrics:
+                msg = (
+                    f"The learning rate scheduler of '{name}' monitors '{metric}' but it is "
+                    f"not logged. The logged metrics are: {sorted(self.trainer.callback_metrics)}"
+                )
+                raise RuntimeError(msg)
+            config["scheduler"].step(self.trainer.callback_metrics[metric])
+
+    @contextmanager
+    def _prefix_logs(self, name: str, model: LightningModule) -> Generator[None, None, None]:
+        r"""Log the metrics of a model with this module, and prefix the
+        metric names with the model name.
+
+        Args:
+            name: The model name.
+            model: The model.
+        """
+        model.log = functools.partial(self._log_model_metric, name)
+        try:
+            yield
+        finally:
+            del model.log
+
+    def _log_model_metric(self, prefix: str, name: str, value: Any, **kwargs: Any) -> None:
+        r"""Log a metric of a model.
+
+        Args:
+            prefix: The model name.
+            name: The metric name.
+            value: The metric value.
+            **kwargs: The other arguments of ``LightningModule.log``.
+        """
+        self.log(f"{prefix}/{name}", value, **kwargs)
+
+
+def _configure_optimizer(
+    name: str, model: LightningModule
+) -> tuple[torch.optim.Optimizer, list[dict[str, Any]]]:
+    r"""Configure the optimizer and learning rate schedulers of a model.
+
+    Args:
+        name: The model name.
+        model: The model.
+
+    Returns:
+        The optimizer and the configurations of the learning rate
+            schedulers.
+
+    Raises:
+        ValueError: if the model does not have exactly one optimizer.
+    """
+    output = model.configure_optimizers()
+    schedulers = []
+    if isinstance(output, dict):
+        optimizers = [output["optimizer"]]
+        if "lr_scheduler" in output:
+            schedulers = [output["lr_scheduler"]]
+    elif isinstance(output, torch.optim.Optimizer):
+        optimizers = [output]
+    elif (
+        isinstance(output, (list, tuple))
+        and len(output) == 2
+        and isinstance(output[0], (list, tuple))
+    ):
+        optimizers, schedulers = list(output[0]), list(output[1])
+    else:
+        optimizers = list(output or [])
+    if len(optimizers) != 1:
+        msg = (
+            f"The model '{name}' must have exactly one optimizer "
+            f"(received: {len(optimizers)} optimizers)"
+        )
+        raise ValueError(msg)
+    return optimizers[0], [_get_scheduler_config(scheduler) for scheduler in schedulers]
+
+
+def _get_scheduler_config(scheduler: Any) -> dict[str, Any]:
+    r"""Get the configuration of a learning rate scheduler.
+
+    Args:
+        scheduler: The scheduler or its configuration.
+
+    Returns:
+        The scheduler configuration.
+    """
+    config = dict(scheduler) if isinstance(scheduler, dict) else {"scheduler": scheduler}
+    return {
+        "scheduler": config["scheduler"],
+        "interval": config.get("interval", "epoch"),
+        "frequency": config.get("frequency", 1),
+        "monitor": config.get("monitor"),
+    }
@@ -0,0 +1,23 @@
+r"""Contain code to create and configure ``torch.optim.Optimizer``
+objects."""
+
+from __future__ import annotations
+
+__all__ = [
+    "IMPLEMENTATIONS",
+    "cast_optimizer_state",
+    "get_implementation_kwargs",
+    "get_param_groups",
+    "is_optimizer_config",
+    "register_state_dtype_hooks",
+    "setup_optimizer",
+]
+
+from lightcat.optimizer.factory import is_optimizer_config, setup_optimizer
+from lightcat.optimizer.utils import (
+    IMPLEMENTATIONS,
+    cast_optimizer_state,
+    get_implementation_kwargs,
+    get_param_groups,
+    register_state_dtype_hooks,
+)
@@ -0,0 +1,17 @@
+r"""Contain the optimizer creators."""
+
+from __future__ import annotations
+
+__all__ = [
+    "BaseOptimizerCreator",
+    "OptimizerCreator",
+    "is_optimizer_creator_config",
+    "setup_optimizer_creator",
+]
+
+from lightcat.optimizer.creator.base import (
+    BaseOptimizerCreator,
+    is_optimizer_creator_config,
+    setup_optimizer_creator,
+)
+from lightcat.optimizer.creator.vanilla import OptimizerCreator
@@ -0,0 +1,159 @@
+r"""Contain the ``torch.optim.Optimizer`` creator base class."""
+
+from __future__ import annotations
+
+__all__ = ["BaseOptimizerCreator", "is_optimizer_creator_config", "setup_optimizer_creator"]
+
+import logging
+from abc import ABC, ABCMeta, abstractmethod
+from typing import TYPE_CHECKING
+from unittest.mock import Mock
+
+from lightcat.utils.factory import str_target_object
+from lightcat.utils.imports import check_objectory, is_objectory_available
+
+if is_objectory_available():
+    import objectory
+    from objectory import AbstractFactory
+else:  # pragma: no cover
+    objectory = Mock()
+    AbstractFactory = ABCMeta
+
+
+if TYPE_CHECKING:
+    import torch
+
+logger = logging.getLogger(__name__)
+
+
+class BaseOptimizerCreator(ABC, metaclass=AbstractFactory):
+    r"""Define the base class to create a ``torch.optim.Optimizer`` for
+    a model.
+
+    The optimizer creator can be used in the ``configure_optimizers``
+    method of a ``lightning.LightningModule``.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.optimizer.creator import OptimizerCreator
+    >>> creator = OptimizerCreator({"_target_": "torch.optim.SGD", "lr": 0.01})
+    >>> creator
+    OptimizerCreator(
+      (optimizer): {'_target_': 'torch.optim.SGD', 'lr': 0.01}
+      (param_groups): ()
+      (implementation): auto
+      (state_dtype): None
+    )
+    >>> optimizer = creator.create(torch.nn.Linear(4, 2))
+    >>> optimizer.__class__.__qualname__
+    'SGD'
+
+    ```
+    """
+
+    @abstractmethod
+    def create(self, model: torch.nn.Module) -> torch.optim.Optimizer:
+        r"""Create a ``torch.optim.Optimizer`` for a model.
+
+        Args:
+            model: The model to optimize.
+
+        Returns:
+            The created ``torch.optim.Optimizer``.
+
+        Example usage:
+
+        ```pycon
+
+        >>> import torch
+        >>> from lightcat.optimizer.creator import OptimizerCreator
+        >>> creator = OptimizerCreator({"_target_": "torch.optim.SGD", "lr": 0.01})
+        >>> optimizer = creator.create(torch.nn.Linear(4, 2))
+        >>> optimizer.__class__.__qualname__
+        'SGD'
+
+        ```
+        """
+
+
+def is_optimizer_creator_config(config: dict) -> bool:
+    r"""Indicate if the input configuration is a configuration for a
+    ``BaseOptimizerCreator``.
+
+    This function only checks if the value of the key  ``_target_``
+    is valid. It does not check the other values. If ``_target_``
+    indicates a function, the returned type hint is used to check
+    the class.
+
+    Args:
+        config: The configuration to check.
+
+    Returns:
+        ``True`` if the input configuration is a configuration
+            for a ``BaseOptimizerCreator`` object.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.optimizer.creator import is_optimizer_creator_config
+    >>> is_optimizer_creator_config(
+    ...     {
+    ...         "_target_": "lightcat.optimizer.creator.OptimizerCreator",
+    ...         "optimizer": {"_target_": "torch.optim.SGD", "lr": 0.01},
+    ...     }
+    ... )
+    True
+
+    ```
+    """
+    check_objectory()
+    return objectory.utils.is_object_config(config, BaseOptimizerCreator)
+
+
+def setup_optimizer_creator(creator: BaseOptimizerCreator | dict) -> BaseOptimizerCreator:
+    r"""Set up the optimizer creator.
+
+    The optimizer creator is instantiated from its configuration by
+    using the ``BaseOptimizerCreator`` factory function.
+
+    Args:
+        creator: The optimizer creator or its configuration.
+
+    Returns:
+        The instantiated optimizer creator.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.optimizer.creator import setup_optimizer_creator
+    >>> creator = setup_optimizer_creator(
+    ...     {
+    ...         "_target_": "lightcat.optimizer.creator.OptimizerCreator",
+    ...         "optimizer": {"_target_": "torch.optim.SGD", "lr": 0.01},
+    ...     }
+    ... )
+    >>> creator
+    OptimizerCreator(
+      (optimizer): {'_target_': 'torch.optim.SGD', 'lr': 0.01}
+      (param_groups): ()
+      (implementation): auto
+      (state_dtype): None
+    )
+
+    ```
+    """
+    if isinstance(creator, dict):
+        logger.info(
+            f"Initializing a 'torch.optim.Optimizer' creator from its configuration... "
+            f"{str_target_object(creator)}"
+        )
+        check_objectory()
+        creator = BaseOptimizerCreator.factory(**creator)
+    if not isinstance(creator, BaseOptimizerCreator):
+        logger.warning(f"creator is not a 'BaseOptimizerCreator' (received: {type(creator)})")
+    return creator
@@ -0,0 +1,151 @@
+r"""Contain a ``torch.optim.Optimizer`` creator that configures the
+parameter groups, the implementation and the state data type of the
+optimizer."""
+
+from __future__ import annotations
+
+__all__ = ["OptimizerCreator"]
+
+import copy
+import logging
+from typing import TYPE_CHECKING, Any
+from unittest.mock import Mock
+
+import torch
+from coola.utils import repr_indent, repr_mapping, str_indent, str_mapping
+
+from lightcat.optimizer.creator.base import BaseOptimizerCreator
+from lightcat.optimizer.factory import setup_optimizer
+from lightcat.optimizer.utils import (
+    IMPLEMENTATIONS,
+    get_implementation_kwargs,
+    get_param_groups,
+    register_state_dtype_hooks,
+)
+from lightcat.utils.imports import check_objectory, is_objectory_available
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+
+if is_objectory_available():
+    import objectory
+    from objectory import OBJECT_TARGET
+else:  # pragma: no cover
+    objectory = Mock()
+    OBJECT_TARGET = "_target_"
+
+logger = logging.getLogger(__name__)
+
+# The keyword arguments that select the implementation of an optimizer.
+_IMPLEMENTATION_KEYS = frozenset({"fused", "foreach"})
+
+
+class OptimizerCreator(BaseOptimizerCreator):
+    r"""Create a ``torch.optim.Optimizer`` for a model from its
+    configuration.
+
+    The parameters are assigned to the parameter groups with
+    ``get_param_groups``, for example to disable the weight decay of
+    the normalization layers and biases. The implementation of the
+    optimizer is selected with ``get_implementation_kwargs``, so the
+    fused or foreach implementation is used on CUDA when the
+    optimizer supports it. If the optimizer configuration has a
+    ``fused`` or ``foreach`` value, it has priority and the
+    implementation is not selected, so the two values cannot be
+    ``True`` together.
+
+    Args:
+        optimizer: The optimizer configuration, without the
+            parameters.
+        param_groups: The rules to assign the parameters to the
+            groups. Each rule has a ``'names'`` and/or ``'types'`` key
+            to match the parameters, and the options of the parameter
+            group.
+        implementation: The optimizer implementation. The valid values
+            are ``'auto'``, ``'fused'``, ``'foreach'``, and
+            ``'for-loop'``.
+        state_dtype: The data type of the optimizer state between the
+            steps, for example ``'bfloat16'`` to halve the memory of
+            the state of ``torch.optim.Adam``. If ``None``, the state
+            has the data type of the parameters.
+
+    Raises:
+        ValueError: if the implementation is not valid.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.optimizer.creator import OptimizerCreator
+    >>> creator = OptimizerCreator(
+    ...     optimizer={"_target_": "torch.optim.AdamW", "lr": 0.001, "weight_decay": 0.01},
+    ...     param_groups=[{"names": [r"bias$"], "types": ["LayerNorm"], "weight_decay": 0.0}],
+    ...     state_dtype="bfloat16",
+    ... )
+    >>> model = torch.nn.Sequential(torch.nn.Linear(4, 8), torch.nn.LayerNorm(8))
+    >>> optimizer = creator.create(model)
+    >>> [group["weight_decay"] for group in optimizer.param_groups]
+    [0.0, 0.01]
+
+    ```
+    """
+
+    def __init__(
+        self,
+        optimizer: dict,
+        param_groups: Sequence[Mapping[str, Any]] = (),
+        implementation: str = "auto",
+        state_dtype: torch.dtype | str | None = None,
+    ) -> None:
+        if implementation not in IMPLEMENTATIONS:
+            msg = (
+                f"Incorrect implementation: {implementation}. "
+                f"The valid implementations are: {IMPLEMENTATIONS}"
+            )
+            raise ValueError(msg)
+        self._optimizer = optimizer
+        self._param_groups = tuple(param_groups)
+        self._implementation = implementation
+        self._state_dtype = (
+            getattr(torch, state_dtype) if isinstance(state_dtype, str) else state_dtype
+        )
+
+    def __repr__(self) -> str:
+        args = repr_indent(repr_mapping(self._get_args()))
+        return f"{self.__class__.__qualname__}(\n  {args}\n)"
+
+    def __str__(self) -> str:
+        args = str_indent(str_mapping(self._get_args()))
+        return f"{self.__class__.__qualname__}(\n  {args}\n)"
+
+    def create(self, model: torch.nn.Module) -> torch.optim.Optimizer:
+        logger.info("Creating 'torch.optim.Optimizer'...")
+        groups = get_param_groups(model, self._param_groups)
+        check_objectory()
+        optimizer_cls = objectory.utils.import_object(self._optimizer[OBJECT_TARGET])
+        if _IMPLEMENTATION_KEYS.isdisjoint(self._optimizer):
+            kwargs = get_implementation_kwargs(
+                optimizer_cls,
+                params=[param for group in groups for param in group["params"]],
+                implementation=self._implementation,
+            )
+        else:
+            kwargs = {}
+            logger.info(
+                "The implementation is not selected because the optimizer configuration "
+                "has a 'fused' or 'foreach' value"
+            )
+        logger.info(f"Optimizer implementation: {kwargs or 'default'}")
+        optimizer = setup_optimizer({**kwargs, **copy.deepcopy(self._optimizer)}, params=groups)
+        if self._state_dtype is not None:
+            register_state_dtype_hooks(optimizer, dtype=self._state_dtype)
+        return optimizer
+
+    def _get_args(self) -> dict[str, Any]:
+        return {
+            "optimizer": self._optimizer,
+            "param_groups": self._param_groups,
+            "implementation": self._implementation,
+            "state_dtype": self._state_dtype,
+        }
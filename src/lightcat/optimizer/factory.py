@@ -0,0 +1,94 @@
+r"""Contain functions to instantiate a ``torch.optim.Optimizer`` object
+from its configuration."""
+
+from __future__ import annotations
+
+__all__ = ["is_optimizer_config", "setup_optimizer"]
+
+import logging
+from typing import TYPE_CHECKING, Any
+from unittest.mock import Mock
+
+from torch.optim import Optimizer
+
+from lightcat.utils.imports import check_objectory, is_objectory_available
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+if is_objectory_available():
+    import objectory
+else:  # pragma: no cover
+    objectory = Mock()
+
+
+logger = logging.getLogger(__name__)
+
+
+def is_optimizer_config(config: dict) -> bool:
+    r"""Indicate if the input configuration is a configuration for a
+    ``torch.optim.Optimizer``.
+
+    This function only checks if the value of the key  ``_target_``
+    is valid. It does not check the other values. If ``_target_``
+    indicates a function, the returned type hint is used to check
+    the class.
+
+    Args:
+        config: The configuration to check.
+
+    Returns:
+        ``True`` if the input configuration is a configuration
+            for a ``torch.optim.Optimizer`` object,
+            otherwise ``False``.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.optimizer import is_optimizer_config
+    >>> is_optimizer_config({"_target_": "torch.optim.SGD", "lr": 0.01})
+    True
+
+    ```
+    """
+    check_objectory()
+    return objectory.utils.is_object_config(config, Optimizer)
+
+
+def setup_optimizer(optimizer: Optimizer | dict, params: Iterable[Any] | None = None) -> Optimizer:
+    r"""Set up a ``torch.optim.Optimizer`` object.
+
+    Args:
+        optimizer: The optimizer or its configuration. The
+            configuration should not contain the parameters.
+        params: The parameters or parameter groups to optimize. It is
+            only used if ``optimizer`` is a configuration.
+
+    Returns:
+        The instantiated ``torch.optim.Optimizer`` object.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.optimizer import setup_optimizer
+    >>> model = torch.nn.Linear(4, 2)
+    >>> optimizer = setup_optimizer(
+    ...     {"_target_": "torch.optim.SGD", "lr": 0.01}, params=model.parameters()
+    ... )
+    >>> optimizer.__class__.__qualname__
+    'SGD'
+
+    ```
+    """
+    if isinstance(optimizer, dict):
+        logger.info("Initializing a 'torch.optim.Optimizer' from its configuration... ")
+        check_objectory()
+        optimizer = objectory.factory(**optimizer, params=params)
+    if not isinstance(optimizer, Optimizer):
+        logger.warning(
+            f"optimizer is not a 'torch.optim.Optimizer' object (received: {type(optimizer)})"
+        )
+    return optimizer
@@ -0,0 +1,248 @@
+r"""Contain utility functions to configure the parameter groups, the
+implementation and the state data type of an optimizer."""
+
+from __future__ import annotations
+
+__all__ = [
+    "IMPLEMENTATIONS",
+    "cast_optimizer_state",
+    "get_implementation_kwargs",
+    "get_param_groups",
+    "register_state_dtype_hooks",
+]
+
+import inspect
+import logging
+from typing import TYPE_CHECKING, Any
+
+import torch
+
+from lightcat.utils.modules import ModuleMatcher
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+    from torch.utils.hooks import RemovableHandle
+
+logger = logging.getLogger(__name__)
+
+# The optimizer implementations, from the fastest to the slowest.
+IMPLEMENTATIONS = ("auto", "fused", "foreach", "for-loop")
+
+
+def get_param_groups(
+    model: torch.nn.Module, rules: Sequence[Mapping[str, Any]] = ()
+) -> list[dict[str, Any]]:
+    r"""Get the parameter groups of a model from some rules.
+
+    Each rule defines a parameter group. A parameter is assigned to
+    the first rule that matches it. A rule matches a parameter if
+    the parameter name contains a match of one of the regular
+    expressions in ``'names'``, or if the module that owns the
+    parameter is an instance of one of the types in ``'types'``. A
+    type can be given by its import path, for example
+    ``'torch.nn.LayerNorm'``, or by its class name, for example
+    ``'LayerNorm'``. The other keys of the rule are the options of the
+    parameter group, for example ``'weight_decay'``. The parameters
+    that do not match any rule are in the last group, which uses the
+    default options of the optimizer. A parameter shared by several
+    modules, for example tied embedding weights, is matched once with
+    its first name and module. The frozen parameters are ignored and
+    the empty groups are removed.
+
+    Args:
+        model: The model.
+        rules: The rules to assign the parameters to the groups.
+
+    Returns:
+        The parameter groups.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.optimizer import get_param_groups
+    >>> model = torch.nn.Sequential(torch.nn.Linear(4, 8), torch.nn.LayerNorm(8))
+    >>> groups = get_param_groups(
+    ...     model, rules=[{"names": [r"bias$"], "types": ["LayerNorm"], "weight_decay": 0.0}]
+    ... )
+    >>> [(len(group["params"]), group.get("weight_decay")) for group in groups]
+    [(3, 0.0), (1, None)]
+
+    ```
+    """
+    matchers = [
+        ModuleMatcher(names=rule.get("names", ()), types=rule.get("types", ())) for rule in rules
+    ]
+    groups = [
+        {key: value for key, value in rule.items() if key not in {"names", "types"}}
+        | {"params": []}
+        for rule in rules
+    ]
+    default_group = {"params": []}
+    # named_parameters yields a shared parameter only once, under the
+    # name of its first owner, so it is added to a single group.
+    for name, param in model.named_parameters():
+        if not param.requires_grad:
+            continue
+        module = model.get_submodule(name.rpartition(".")[0])
+        for matcher, group in zip(matchers, groups):
+            if matcher.match(name, module):
+                group["params"].append(param)
+                break
+        else:
+            default_group["params"].append(param)
+    groups = [group for group in [*groups, default_group] if group["params"]]
+    logger.info(
+        "The parameter groups have the following sizes: "
+        f"{[len(group['params']) for group in groups]}"
+    )
+    return groups
+
+
+def get_implementation_kwargs(
+    optimizer_cls: type[torch.optim.Optimizer],
+    params: Iterable[torch.Tensor],
+    implementation: str = "auto",
+) -> dict[str, bool]:
+    r"""Get the keyword arguments to select the implementation of an
+    optimizer.
+
+    The PyTorch optimizers have up to three implementations:
+    ``'fused'`` uses a single kernel for all the parameters,
+    ``'foreach'`` uses the multi-tensor kernels, and ``'for-loop'``
+    updates the parameters one by one. If ``implementation`` is
+    ``'auto'``, the fused implementation is selected if the
+    optimizer supports it and all the parameters are floating-point
+    tensors on CUDA, otherwise the foreach implementation is selected
+    if the optimizer supports it and all the parameters are on CUDA.
+    In the other cases, the default implementation of the optimizer
+    is used.
+
+    Args:
+        optimizer_cls: The optimizer class.
+        params: The parameters to optimize.
+        implementation: The implementation. The valid values are
+            ``'auto'``, ``'fused'``, ``'foreach'``, and ``'for-loop'``.
+
+    Returns:
+        The keyword arguments to pass to the optimizer.
+
+    Raises:
+        ValueError: if the implementation is not valid or is not
+            supported by the optimizer.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.optimizer import get_implementation_kwargs
+    >>> model = torch.nn.Linear(4, 2)
+    >>> get_implementation_kwargs(torch.optim.AdamW, model.parameters(), "foreach")
+    {'foreach': True}
+    >>> get_implementation_kwargs(torch.optim.AdamW, model.parameters(), "auto")
+    {}
+
+    ```
+    """
+    if implementation not in IMPLEMENTATIONS:
+        msg = (
+            f"Incorrect implementation: {implementation}. "
+            f"The valid implementations are: {IMPLEMENTATIONS}"
+        )
+        raise ValueError(msg)
+    supported = inspect.signature(optimizer_cls.__init__).parameters
+    if implementation == "auto":
+        params = list(params)
+        on_cuda = bool(params) and all(param.device.type == "cuda" for param in params)
+        if on_cuda and "fused" in supported and all(param.is_floating_point() for param in params):
+            return {"fused": True}
+        if on_cuda and "foreach" in supported:
+            return {"foreach": True}
+        return {}
+    name = "foreach" if implementation == "for-loop" else implementation
+    if name not in supported:
+        msg = f"{optimizer_cls.__qualname__} does not support the {implementation!r} implementation"
+        raise ValueError(msg)
+    return {name: implementation != "for-loop"}
+
+
+def cast_optimizer_state(optimizer: torch.optim.Optimizer, dtype: torch.dtype | None) -> None:
+    r"""Cast the floating-point state tensors of an optimizer.
+
+    The ``'step'`` tensors are not cast.
+
+    Args:
+        optimizer: The optimizer to update in-place.
+        dtype: The target data type. If ``None``, each state tensor is
+            cast to the data type of its parameter.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.optimizer import cast_optimizer_state
+    >>> model = torch.nn.Linear(4, 2)
+    >>> optimizer = torch.optim.Adam(model.parameters())
+    >>> model(torch.randn(3, 4)).sum().backward()
+    >>> optimizer.step()
+    >>> cast_optimizer_state(optimizer, torch.bfloat16)
+    >>> optimizer.state[model.weight]["exp_avg"].dtype
+    torch.bfloat16
+
+    ```
+    """
+    for param, state in optimizer.state.items():
+        for key, value in state.items():
+            if key == "step" or not torch.is_tensor(value) or not value.is_floating_point():
+                continue
+            state[key] = value.to(dtype=param.dtype if dtype is None else dtype)
+
+
+def register_state_dtype_hooks(
+    optimizer: torch.optim.Optimizer, dtype: torch.dtype = torch.bfloat16
+) -> list[RemovableHandle]:
+    r"""Register hooks to store the state of an optimizer in a given
+    data type between the optimization steps.
+
+    The state tensors are cast to the data type of their parameter
+    before each step, and to ``dtype`` after each step and after
+    loading a state dict. Storing the state of ``torch.optim.Adam``
+    in ``torch.bfloat16`` halves its memory between the steps, but
+    the state is temporarily stored in the data type of the parameters
+    during the step. The rounding of the state to a lower precision
+    can slightly change the optimization.
+
+    Args:
+        optimizer: The optimizer.
+        dtype: The data type of the state between the steps.
+
+    Returns:
+        The handles to remove the hooks.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.optimizer import register_state_dtype_hooks
+    >>> model = torch.nn.Linear(4, 2)
+    >>> optimizer = torch.optim.Adam(model.parameters())
+    >>> handles = register_state_dtype_hooks(optimizer, torch.bfloat16)
+    >>> model(torch.randn(3, 4)).sum().backward()
+    >>> optimizer.step()
+    >>> optimizer.state[model.weight]["exp_avg"].dtype
+    torch.bfloat16
+
+    ```
+    """
+    return [
+        optimizer.register_step_pre_hook(lambda opt, *_: cast_optimizer_state(opt, dtype=None)),
+        optimizer.register_step_post_hook(lambda opt, *_: cast_optimizer_state(opt, dtype=dtype)),
+        optimizer.register_load_state_dict_post_hook(
+            lambda opt: cast_optimizer_state(opt, dtype=dtype)
+        ),
+    ]
@@ -0,0 +1,7 @@
+r"""Contain the tools to score datasets in batch."""
+
+from __future__ import annotations
+
+__all__ = ["ParallelPredictor", "load_predictions"]
+
+from lightcat.scoring.parallel import ParallelPredictor, load_predictions
@@ -0,0 +1,504 @@
+r"""Contain a predictor that scores a dataset with a pool of
+processes."""
+
+from __future__ import annotations
+
+__all__ = ["ParallelPredictor", "load_predictions"]
+
+import json
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import torch
+from coola.utils import str_indent, str_mapping
+from torch.utils.data import DataLoader, IterableDataset, Subset
+
+from lightcat.datamodule.creator import setup_datamodule_creator
+from lightcat.model.creator import setup_model_creator
+from lightcat.utils.hashing import hash_config, hash_state_dict
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from lightning import LightningModule
+    from torch.utils.data import Dataset
+
+    from lightcat.datamodule.creator import BaseDataModuleCreator
+    from lightcat.model.creator import BaseModelCreator
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+CONFIG_NAME = "config.json"
+
+# The model and dataset used by the current worker process.
+_worker_state: dict[str, Any] = {}
+
+
+class ParallelPredictor:
+    r"""Implement a predictor that scores a dataset with a pool of
+    processes.
+
+    The model and the datamodule are created with their creators. The
+    prediction dataset and the collate function are taken from
+    ``datamodule.predict_dataloader()``. The dataset is split into
+    shards of ``shard_size`` consecutive examples, and each shard is
+    scored by a worker process with ``model.predict_step``. The
+    outputs of the batches of a shard are saved in a shard file, so
+    the shards can be read in the same order as the dataset with
+    ``load_predictions``. A manifest is written when all the shards
+    are scored. The shards already scored by a previous run in the
+    same output directory are skipped, so the scoring can be resumed
+    after an interruption. The fingerprint of the model weights, the
+    model and datamodule configurations, the number of examples and
+    the scoring options is saved in the output directory, and a run
+    fails if the output directory contains predictions with another
+    fingerprint, so the predictions of another model or dataset are
+    never reused.
+
+    The weights of the model are moved to shared memory before the
+    workers are started, so all the workers read the same copy of the
+    weights instead of one copy per worker. Each worker uses
+    ``num_threads`` PyTorch threads to avoid oversubscribing the CPUs.
+
+    Args:
+        model: The model creator or its configuration.
+        datamodule: The datamodule creator or its configuration.
+        output_dir: The directory where the predictions are saved.
+        shard_size: The number of examples in each shard.
+        num_workers: The number of worker processes. If ``None``, the
+            number of CPUs divided by ``num_threads`` is used. If
+            ``0``, the shards are scored in the main process.
+        num_threads: The number of PyTorch threads in each worker
+            process.
+        batch_size: The batch size. If ``None``, the batch size of
+            the prediction dataloader is used.
+        start_method: The start method of the worker processes.
+
+    Raises:
+        ValueError: if ``shard_size`` or ``num_threads`` is lower than
+            1, or if ``num_workers`` is negative.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import tempfile
+    >>> from lightcat.scoring import ParallelPredictor, load_predictions
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     predictor = ParallelPredictor(
+    ...         model={
+    ...             "_target_": "lightcat.model.creator.ModelCreator",
+    ...             "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+    ...         },
+    ...         datamodule={
+    ...             "_target_": "lightcat.datamodule.creator.DataModuleCreator",
+    ...             "datamodule": {
+    ...                 "_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"
+    ...             },
+    ...         },
+    ...         output_dir=tmpdir,
+    ...         shard_size=16,
+    ...         num_workers=0,
+    ...     )
+    ...     predictor.run()
+    ...     outputs = load_predictions(tmpdir)
+    ...
+    >>> len(outputs)
+    64
+
+    ```
+    """
+
+    def __init__(
+        self,
+        model: BaseModelCreator | dict,
+        datamodule: BaseDataModuleCreator | dict,
+        output_dir: Path | str,
+        shard_size: int = 10000,
+        num_workers: int | None = None,
+        num_threads: int = 1,
+        batch_size: int | None = None,
+        start_method: str = "spawn",
+    ) -> None:
+        if shard_size < 1:
+            msg = f"shard_size must be greater than 0 (received: {shard_size})"
+            raise ValueError(msg)
+        if num_threads < 1:
+            msg = f"num_threads must be greater than 0 (received: {num_threads})"
+            raise ValueError(msg)
+        if num_workers is None:
+            num_workers = max((os.cpu_count() or 1) // num_threads, 1)
+        if num_workers < 0:
+            msg = f"num_workers must be greater or equal to 0 (received: {num_workers})"
+            raise ValueError(msg)
+        self._model = model
+        self._datamodule = datamodule
+        self._output_dir = Path(output_dir)
+        self._shard_size = int(shard_size)
+        self._num_workers = int(num_workers)
+        self._num_threads = int(num_threads)
+        self._batch_size = batch_size
+        self._start_method = start_method
+        self._state = None
+        self._fingerprint = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}(output_dir={self._output_dir})"
+
+    def __str__(self) -> str:
+        args = str_indent(
+            str_mapping(
+                {
+                    "output_dir": self._output_dir,
+                    "shard_size": self._shard_size,
+                    "num_workers": self._num_workers,
+                    "num_threads": self._num_threads,
+                    "batch_size": self._batch_size,
+                    "start_method": self._start_method,
+                }
+            )
+        )
+        return f"{self.__class__.__qualname__}(\n  {args}\n)"
+
+    @property
+    def fingerprint(self) -> str:
+        r"""The fingerprint of the predictions.
+
+        The model and the datamodule are created the first time the
+        fingerprint is computed.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = hash_config(self.get_config())[:16]
+        return self._fingerprint
+
+    @property
+    def manifest_path(self) -> Path:
+        r"""The path to the manifest of the predictions."""
+        return self._output_dir.joinpath(MANIFEST_NAME)
+
+    def get_config(self) -> dict[str, Any]:
+        r"""Get the configuration used to fingerprint the predictions.
+
+        The model and the datamodule are created the first time this
+        method is called.
+
+        Returns:
+            The configuration of the predictions.
+
+        Raises:
+            ValueError: if the prediction dataset is an iterable
+                dataset.
+        """
+        state = self._get_state()
+        return {
+            "model": _get_creator_config(self._model),
+            "weights": hash_state_dict(state["model"]),
+            "datamodule": _get_creator_config(self._datamodule),
+            "num_examples": len(state["dataset"]),
+            "shard_size": self._shard_size,
+            "batch_size": state["batch_size"],
+        }
+
+    def is_complete(self) -> bool:
+        r"""Indicate if all the shards are scored.
+
+        Returns:
+            ``True`` if the manifest exists and the predictions have
+                the same fingerprint, otherwise ``False``.
+        """
+        return self.manifest_path.is_file() and _read_fingerprint(self._output_dir) == (
+            self.fingerprint
+        )
+
+    def run(self) -> list[Path]:
+        r"""Score the dataset.
+
+        The shards that are already scored are skipped.
+
+        Returns:
+            The paths to the shard files, in the order of the dataset.
+
+        Raises:
+            ValueError: if the prediction dataset is an iterable
+                dataset, or if the output directory contains
+                predictions with another fingerprint.
+        """
+        self._check_fingerprint()
+        if self.is_complete():
+            logger.info(f"The predictions are already available in {self._output_dir}")
+            return _get_shard_paths(self.manifest_path)
+
+        state = self._get_state()
+        model, dataset = state["model"], state["dataset"]
+        num_shards = max(math.ceil(len(dataset) / self._shard_size), 1)
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        _atomic_write_text(
+            self._output_dir.joinpath(CONFIG_NAME),
+            json.dumps(
+                {"fingerprint": self.fingerprint, "config": self.get_config()},
+                indent=2,
+                sort_keys=True,
+                default=str,
+            ),
+        )
+        todo = [
+            index
+            for index in range(num_shards)
+            if not self._output_dir.joinpath(_shard_name(index)).is_file()
+        ]
+        logger.info(
+            f"Scoring {len(todo):,}/{num_shards:,} shards in {self._output_dir} "
+            f"with {self._num_workers:,} worker(s)..."
+        )
+        num_examples = {}
+        if self._num_workers == 0:
+            for index in todo:
+                num_examples[index] = _score_shard(index, state)
+        else:
+            # The weights are shared with the workers instead of being
+            # copied in each worker.
+            model.share_memory()
+            with ProcessPoolExecutor(
+                max_workers=self._num_workers,
+                mp_context=multiprocessing.get_context(self._start_method),
+                initializer=_init_worker,
+                initargs=(state, self._num_threads),
+            ) as executor:
+                futures = {index: executor.submit(_score_shard, index) for index in todo}
+                for index, future in futures.items():
+                    num_examples[index] = future.result()
+
+        shards = []
+        for index in range(num_shards):
+            start = index * self._shard_size
+            shards.append(
+                {
+                    "file": _shard_name(index),
+                    "num_examples": min(start + self._shard_size, len(dataset)) - start,
+                }
+            )
+        _atomic_write_text(
+            self.manifest_path,
+            json.dumps(
+                {"fingerprint": self.fingerprint, "num_examples": len(dataset), "shards": shards},
+                indent=2,
+                sort_keys=True,
+            ),
+        )
+        logger.info(f"The predictions are available in {self._output_dir}")
+        return _get_shard_paths(self.manifest_path)
+
+    def _check_fingerprint(self) -> None:
+        r"""Check that the predictions in the output directory have the
+        same fingerprint.
+
+        Raises:
+            ValueError: if the output directory contains predictions
+                with another fingerprint.
+        """
+        has_predictions = self.manifest_path.is_file() or any(self._output_dir.glob("shard-*.pt"))
+        if not has_predictions:
+            return
+        fingerprint = _read_fingerprint(self._output_dir)
+        if fingerprint != self.fingerprint:
+            msg = (
+                f"The predictions in {self._output_dir} were computed with another model, "
+                f"dataset or scoring options (fingerprint: {fingerprint} vs {self.fingerprint}). "
+                "Please use another output directory or remove the previous predictions"
+            )
+            raise ValueError(msg)
+
+    def _get_state(self) -> dict[str, Any]:
+        r"""Get the model, the dataset and the scoring options.
+
+        The model and the datamodule are created the first time this
+        method is called.
+
+        Returns:
+            The model, dataset and scoring options.
+
+        Raises:
+            ValueError: if the prediction dataset is an iterable
+                dataset.
+        """
+        if self._state is None:
+            model = setup_model_creator(self._model).create().eval()
+            dataset, collate_fn, batch_size = self._get_dataset()
+            self._state = {
+                "model": model,
+                "dataset": dataset,
+                "collate_fn": collate_fn,
+                "batch_size": batch_size,
+                "shard_size": self._shard_size,
+                "output_dir": self._output_dir,
+            }
+        return self._state
+
+    def _get_dataset(self) -> tuple[Dataset, Callable | None, int]:
+        r"""Get the prediction dataset of the datamodule.
+
+        Returns:
+            The dataset, the collate function and the batch size.
+
+        Raises:
+            ValueError: if the dataset is an iterable dataset.
+        """
+        datamodule = setup_datamodule_creator(self._datamodule).create()
+        datamodule.prepare_data()
+        datamodule.setup("predict")
+        dataloader = datamodule.predict_dataloader()
+        if isinstance(dataloader.dataset, IterableDataset):
+            msg = "ParallelPredictor does not support iterable datasets"
+            raise ValueError(msg)  # noqa: TRY004
+        batch_size = self._batch_size or dataloader.batch_size or 1
+        return dataloader.dataset, dataloader.collate_fn, batch_size
+
+
+def load_predictions(output_dir: Path | str) -> list[Any]:
+    r"""Load the predictions saved by a ``ParallelPredictor``.
+
+    Args:
+        output_dir: The directory where the predictions are saved.
+
+    Returns:
+        The outputs of ``predict_step`` for each batch, in the order
+            of the dataset.
+
+    Raises:
+        FileNotFoundError: if the predictions are not complete.
+    """
+    manifest_path = Path(output_dir).joinpath(MANIFEST_NAME)
+    if not manifest_path.is_file():
+        msg = f"The predictions are not complete: {manifest_path} does not exist"
+        raise FileNotFoundError(msg)
+    outputs = []
+    for path in _get_shard_paths(manifest_path):
+        outputs.extend(torch.load(path, weights_only=False))
+    return outputs
+
+
+def _init_worker(state: dict[str, Any], num_threads: int) -> None:
+    r"""Initialize a worker process.
+
+    Args:
+        state: The model, dataset and scoring options.
+        num_threads: The number of PyTorch threads.
+    """
+    torch.set_num_threads(num_threads)
+    _worker_state.update(state)
+
+
+def _score_shard(index: int, state: dict[str, Any] | None = None) -> int:
+    r"""Score a shard and save its predictions.
+
+    Args:
+        index: The index of the shard.
+        state: The model, dataset and scoring options. If ``None``,
+            the state of the worker process is used.
+
+    Returns:
+        The number of scored examples.
+    """
+    state = state or _worker_state
+    model: LightningModule = state["model"]
+    dataset = state["dataset"]
+    start = index * state["shard_size"]
+    end = min(start + state["shard_size"], len(dataset))
+    dataloader = DataLoader(
+        Subset(dataset, range(start, end)),
+        batch_size=state["batch_size"],
+        collate_fn=state["collate_fn"],
+    )
+    # The batch indices are unique across the shards.
+    offset = index * math.ceil(state["shard_size"] / state["batch_size"])
+    with torch.inference_mode():
+        outputs = [
+            model.predict_step(batch, offset + batch_idx)
+            for batch_idx, batch in enumerate(dataloader)
+        ]
+    path = state["output_dir"].joinpath(_shard_name(index))
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    torch.save(outputs, tmp_path)
+    tmp_path.replace(path)
+    return end - start
+
+
+def _get_shard_paths(manifest_path: Path) -> list[Path]:
+    r"""Get the paths to the shard files of a manifest.
+
+    Args:
+        manifest_path: The path to the manifest.
+
+    Returns:
+        The paths to the shard files.
+    """
+    manifest = json.loads(manifest_path.read_text())
+    return [manifest_path.parent.joinpath(shard["file"]) for shard in manifest["shards"]]
+
+
+def _shard_name(index: int) -> str:
+    r"""Get the file name of a shard.
+
+    Args:
+        index: The index of the shard.
+
+    Returns:
+        The file name.
+    """
+    return f"shard-{index:06d}.pt"
+
+
+def _get_creator_config(creator: Any) -> Any:
+    r"""Get the configuration of a creator used in the fingerprint.
+
+    The creators that are not a configuration are represented by
+    their ``repr``, so two creators of different datasets do not share
+    a fingerprint. If the ``repr`` of a wrapped object contains its
+    memory address, the fingerprint changes in each run and the
+    predictions cannot be resumed, but they are never reused for
+    another dataset.
+
+    Args:
+        creator: The creator or its configuration.
+
+    Returns:
+        The configuration, or the representation of the creator if it
+            is not a configuration. The weights of the model are hashed
+            separately.
+    """
+    if isinstance(creator, dict):
+        return creator
+    return repr(creator)
+
+
+def _read_fingerprint(output_dir: Path) -> str | None:
+    r"""Read the fingerprint of the predictions in a directory.
+
+    Args:
+        output_dir: The directory where the predictions are saved.
+
+    Returns:
+        The fingerprint, or ``None`` if it is not available.
+    """
+    path = output_dir.joinpath(CONFIG_NAME)
+    if not path.is_file():
+        return None
+    return json.loads(path.read_text()).get("fingerprint")
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    r"""Write a text file atomically.
+
+    Args:
+        path: The path to the file.
+        text: The text to write.
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(text)
+    tmp_path.replace(path)
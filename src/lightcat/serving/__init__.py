@@ -0,0 +1,9 @@
+r"""Contain the tools to serve models."""
+
+from __future__ import annotations
+
+__all__ = ["Histogram", "InferenceEngine", "InferenceServer"]
+
+from lightcat.serving.engine import InferenceEngine
+from lightcat.serving.metrics import Histogram
+from lightcat.serving.server import InferenceServer
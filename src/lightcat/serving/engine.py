@@ -0,0 +1,375 @@
+r"""Contain an inference engine that coalesces the requests in
+batches."""
+
+from __future__ import annotations
+
+__all__ = ["InferenceEngine"]
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+import torch
+from torch.utils.data import default_collate
+
+from lightcat.model.creator import setup_model_creator
+from lightcat.serving.metrics import Histogram
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from types import TracebackType
+
+    from lightning import LightningModule
+
+    from lightcat.model.creator import BaseModelCreator
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BOUNDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class InferenceEngine:
+    r"""Implement an inference engine that coalesces the requests in
+    batches.
+
+    The requests are queued, and a background task collects them in
+    batches of at most ``max_batch_size`` requests. A batch is run as
+    soon as it is full or when the oldest request of the batch has
+    waited ``max_latency`` seconds. The model is run in a dedicated
+    thread, so the event loop keeps accepting requests while a batch
+    is running. These requests are queued, and the next batch is
+    collected from the queue when the running batch is finished.
+
+    Each request is a single example without batch dimension. The
+    examples are collated with ``collate_fn``, and the output of the
+    model is split along its first dimension, so each request receives
+    its own output. The output can be a tensor or a nested structure
+    of mappings, lists and tuples of tensors.
+
+    Args:
+        model: The model creator or its configuration.
+        max_batch_size: The maximum number of requests in a batch.
+        max_latency: The maximum time in seconds that a request
+            waits for other requests before its batch is run.
+        device: The device where the model is run.
+        collate_fn: The function to collate the requests in a batch.
+            If ``None``, ``torch.utils.data.default_collate`` is used.
+
+    Raises:
+        ValueError: if ``max_batch_size`` is lower than 1 or
+            ``max_latency`` is negative.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import asyncio
+    >>> import torch
+    >>> from lightcat.serving import InferenceEngine
+    >>> async def main():
+    ...     engine = InferenceEngine(
+    ...         {
+    ...             "_target_": "lightcat.model.creator.ModelCreator",
+    ...             "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+    ...         },
+    ...         max_batch_size=8,
+    ...     )
+    ...     async with engine:
+    ...         outputs = await asyncio.gather(
+    ...             *[engine.predict(torch.randn(32)) for _ in range(4)]
+    ...         )
+    ...     return outputs, engine.get_metrics()
+    ...
+    >>> outputs, metrics = asyncio.run(main())
+    >>> outputs[0].shape
+    torch.Size([2])
+    >>> metrics["batch_size"]["count"]
+    1
+
+    ```
+    """
+
+    def __init__(
+        self,
+        model: BaseModelCreator | dict,
+        max_batch_size: int = 32,
+        max_latency: float = 0.005,
+        device: torch.device | str = "cpu",
+        collate_fn: Callable[[list], Any] | None = None,
+    ) -> None:
+        if max_batch_size < 1:
+            msg = f"max_batch_size must be greater than 0 (received: {max_batch_size})"
+            raise ValueError(msg)
+        if max_latency < 0:
+            msg = f"max_latency must be greater or equal to 0 (received: {max_latency})"
+            raise ValueError(msg)
+        self._model_creator = model
+        self._max_batch_size = max_batch_size
+        self._max_latency = max_latency
+        self._device = torch.device(device)
+        self._collate_fn = collate_fn or default_collate
+
+        self._model: LightningModule | None = None
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        # The requests of the batch that is collected or running.
+        self._requests: list[tuple[Any, asyncio.Future, float]] = []
+
+        self._batch_size = Histogram(bounds=_get_batch_size_bounds(max_batch_size))
+        self._queue_depth = Histogram(bounds=_get_batch_size_bounds(max(max_batch_size, 64)))
+        self._latency = Histogram(bounds=LATENCY_BOUNDS)
+        self._batch_latency = Histogram(bounds=LATENCY_BOUNDS)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(max_batch_size={self._max_batch_size}, "
+            f"max_latency={self._max_latency}, device={self._device}, "
+            f"running={self.is_running()})"
+        )
+
+    async def __aenter__(self) -> InferenceEngine:  # noqa: PYI034
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        await self.stop()
+
+    @property
+    def model(self) -> LightningModule | None:
+        r"""The model, or ``None`` if the engine was never started."""
+        return self._model
+
+    def is_running(self) -> bool:
+        r"""Indicate if the engine is running.
+
+        Returns:
+            ``True`` if the engine is running, otherwise ``False``.
+        """
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        r"""Start the engine.
+
+        The model is created the first time the engine is started.
+        """
+        if self.is_running():
+            return
+        if self._model is None:
+            self._model = setup_model_creator(self._model_creator).create()
+            self._model.eval().to(self._device)
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lightcat-serving")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        r"""Stop the engine.
+
+        The queued requests and the requests of the batch that is
+        collected or running are cancelled. The engine waits for the
+        running batch to finish in another thread, so the event loop is
+        not blocked.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        _cancel_requests(self._requests)
+        self._requests = []
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            future.cancel()
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        self._task = None
+
+    async def predict(self, inputs: Any) -> Any:
+        r"""Compute the output of the model for an example.
+
+        Args:
+            inputs: The example, without batch dimension.
+
+        Returns:
+            The output of the model for the example.
+
+        Raises:
+            RuntimeError: if the engine is not running.
+        """
+        if not self.is_running():
+            msg = "The engine is not running. Please call 'start' before 'predict'"
+            raise RuntimeError(msg)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((inputs, future, time.perf_counter()))
+        self._queue_depth.observe(self._queue.qsize())
+        return await future
+
+    def get_metrics(self) -> dict[str, Any]:
+        r"""Get the metrics of the engine.
+
+        Returns:
+            The current queue depth, and the histograms of the queue
+                depth when a request arrives, of the batch size, of
+                the request latency in seconds, and of the model
+                latency per batch in seconds.
+        """
+        return {
+            "queue_depth": 0 if self._queue is None else self._queue.qsize(),
+            "queue_depth_histogram": self._queue_depth.to_dict(),
+            "batch_size": self._batch_size.to_dict(),
+            "latency": self._latency.to_dict(),
+            "batch_latency": self._batch_latency.to_dict(),
+        }
+
+    def reset_metrics(self) -> None:
+        r"""Reset the histograms of the metrics."""
+        for histogram in (self._queue_depth, self._batch_size, self._latency, self._batch_latency):
+            histogram.reset()
+
+    async def _run(self) -> None:
+        r"""Collect the requests in batches and run the batches."""
+        try:
+            while True:
+                self._requests = []
+                await self._collect_batch()
+                await self._run_batch(
+                    [request for request in self._requests if not request[1].cancelled()]
+                )
+        except asyncio.CancelledError:
+            _cancel_requests(self._requests)
+            raise
+
+    async def _collect_batch(self) -> None:
+        r"""Wait for the requests of the next batch.
+
+        The requests are added to ``self._requests`` as soon as they are
+        taken from the queue, so they can be cancelled if the engine is
+        stopped before the batch is run.
+        """
+        self._requests.append(await self._queue.get())
+        deadline = self._requests[0][2] + self._max_latency
+        while len(self._requests) < self._max_batch_size:
+            if not self._queue.empty():
+                self._requests.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                self._requests.append(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run_batch(self, requests: list[tuple[Any, asyncio.Future, float]]) -> None:
+        r"""Run a batch and set the results of its requests.
+
+        Args:
+            requests: The requests of the batch.
+        """
+        if not requests:
+            return
+        self._batch_size.observe(len(requests))
+        start_time = time.perf_counter()
+        try:
+            outputs = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._predict_batch, [request[0] for request in requests]
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(f"The batch of {len(requests):,} requests failed: {exc}")
+            for _, future, _ in requests:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        end_time = time.perf_counter()
+        self._batch_latency.observe(end_time - start_time)
+        for i, (_, future, arrival_time) in enumerate(requests):
+            self._latency.observe(end_time - arrival_time)
+            if not future.done():
+                future.set_result(_get_item(outputs, i))
+
+    def _predict_batch(self, examples: list) -> Any:
+        r"""Run the model on a batch of examples.
+
+        Args:
+            examples: The examples.
+
+        Returns:
+            The output of the model for the batch.
+        """
+        batch = _to_device(self._collate_fn(examples), self._device)
+        with torch.inference_mode():
+            return _to_device(self._model(batch), torch.device("cpu"))
+
+
+def _cancel_requests(requests: list[tuple[Any, asyncio.Future, float]]) -> None:
+    r"""Cancel the futures of some requests.
+
+    Args:
+        requests: The requests to cancel.
+    """
+    for _, future, _ in requests:
+        future.cancel()
+
+
+def _get_batch_size_bounds(max_batch_size: int) -> list[int]:
+    r"""Get the bucket bounds of a batch size histogram.
+
+    Args:
+        max_batch_size: The maximum batch size.
+
+    Returns:
+        The powers of 2 lower than ``max_batch_size``, and
+            ``max_batch_size``.
+    """
+    bounds = [1]
+    while bounds[-1] * 2 < max_batch_size:
+        bounds.append(bounds[-1] * 2)
+    if bounds[-1] < max_batch_size:
+        bounds.append(max_batch_size)
+    return bounds
+
+
+def _get_item(outputs: Any, index: int) -> Any:
+    r"""Get the output of an example from the output of a batch.
+
+    Args:
+        outputs: The output of the batch.
+        index: The example index in the batch.
+
+    Returns:
+        The output of the example.
+    """
+    if torch.is_tensor(outputs):
+        return outputs[index]
+    if isinstance(outputs, Mapping):
+        return {key: _get_item(value, index) for key, value in outputs.items()}
+    if isinstance(outputs, (list, tuple)):
+        return type(outputs)(_get_item(value, index) for value in outputs)
+    return outputs
+
+
+def _to_device(data: Any, device: torch.device) -> Any:
+    r"""Move the tensors of some data to a device.
+
+    Args:
+        data: The data.
+        device: The target device.
+
+    Returns:
+        The data on the target device.
+    """
+    if torch.is_tensor(data):
+        return data.to(device)
+    if isinstance(data, Mapping):
+        return {key: _to_device(value, device) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return type(data)(_to_device(value, device) for value in data)
+    return data
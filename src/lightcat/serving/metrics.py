@@ -0,0 +1,94 @@
+r"""Contain the metrics to monitor an inference engine."""
+
+from __future__ import annotations
+
+__all__ = ["Histogram"]
+
+import bisect
+import math
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+
+class Histogram:
+    r"""Implement a histogram with fixed bucket boundaries.
+
+    A value is counted in the first bucket whose upper bound is
+    greater than or equal to the value. The last bucket has an
+    infinite upper bound.
+
+    Args:
+        bounds: The upper bounds of the buckets, in increasing order.
+
+    Raises:
+        ValueError: if ``bounds`` is not in strictly increasing order.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.serving import Histogram
+    >>> hist = Histogram(bounds=[1, 2, 4])
+    >>> for value in [1, 2, 3, 8]:
+    ...     hist.observe(value)
+    ...
+    >>> hist
+    Histogram(count=4, sum=14.0)
+    >>> hist.to_dict()
+    {'bounds': [1, 2, 4, inf], 'counts': [1, 1, 1, 1], 'count': 4, 'sum': 14.0, 'min': 1, 'max': 8}
+
+    ```
+    """
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        if any(left >= right for left, right in zip(bounds, bounds[1:])):
+            msg = f"bounds must be in strictly increasing order (received: {bounds})"
+            raise ValueError(msg)
+        self._bounds = [*bounds, math.inf]
+        self.reset()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}(count={self._count:,}, sum={self._sum})"
+
+    @property
+    def count(self) -> int:
+        r"""The number of observed values."""
+        return self._count
+
+    def observe(self, value: float) -> None:
+        r"""Observe a value.
+
+        Args:
+            value: The value to observe.
+        """
+        self._counts[bisect.bisect_left(self._bounds, value)] += 1
+        self._count += 1
+        self._sum += value
+        self._min = value if self._min is None else min(self._min, value)
+        self._max = value if self._max is None else max(self._max, value)
+
+    def reset(self) -> None:
+        r"""Reset the histogram."""
+        self._counts = [0] * len(self._bounds)
+        self._count = 0
+        self._sum = 0.0
+        self._min = None
+        self._max = None
+
+    def to_dict(self) -> dict[str, Any]:
+        r"""Get the state of the histogram.
+
+        Returns:
+            The bucket upper bounds and counts, and the number, sum,
+                minimum and maximum of the observed values.
+        """
+        return {
+            "bounds": list(self._bounds),
+            "counts": list(self._counts),
+            "count": self._count,
+            "sum": self._sum,
+            "min": self._min,
+            "max": self._max,
+        }
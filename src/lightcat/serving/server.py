@@ -0,0 +1,252 @@
+r"""Contain a minimal HTTP front end for an inference engine."""
+
+from __future__ import annotations
+
+__all__ = ["InferenceServer"]
+
+import asyncio
+import json
+import logging
+import math
+from http import HTTPStatus
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import torch
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from lightcat.serving.engine import InferenceEngine
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceServer:
+    r"""Implement a minimal HTTP front end for an inference engine.
+
+    The server listens on a TCP socket, or on a Unix socket if
+    ``path`` is given. It is designed for local testing and it
+    supports the following endpoints:
+
+    - ``POST /predict``: the body is a JSON object with the example
+      in ``'inputs'``, which is converted to a tensor with
+      ``torch.tensor``. The response is a JSON object with the model
+      output in ``'outputs'``.
+    - ``GET /metrics``: the response is the JSON object returned by
+      ``InferenceEngine.get_metrics``.
+    - ``GET /health``: the response is ``{"status": "ok"}``.
+
+    Each connection handles a single request. The engine is started
+    and stopped with the server.
+
+    Args:
+        engine: The inference engine.
+        host: The host of the TCP socket.
+        port: The port of the TCP socket. If ``0``, a free port is
+            used.
+        path: The path to the Unix socket. If not ``None``, ``host``
+            and ``port`` are ignored.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.serving import InferenceEngine, InferenceServer
+    >>> server = InferenceServer(
+    ...     InferenceEngine(
+    ...         {
+    ...             "_target_": "lightcat.model.creator.ModelCreator",
+    ...             "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+    ...         }
+    ...     ),
+    ...     port=8080,
+    ... )
+    >>> server
+    InferenceServer(host=127.0.0.1, port=8080, path=None)
+
+    ```
+    """
+
+    def __init__(
+        self,
+        engine: InferenceEngine,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        path: Path | str | None = None,
+    ) -> None:
+        self._engine = engine
+        self._host = host
+        self._port = port
+        self._path = None if path is None else Path(path)
+        self._server: asyncio.AbstractServer | None = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(host={self._host}, port={self._port}, "
+            f"path={self._path})"
+        )
+
+    async def __aenter__(self) -> InferenceServer:  # noqa: PYI034
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        await self.stop()
+
+    @property
+    def address(self) -> tuple[str, int] | Path:
+        r"""The address of the server: the path to the Unix socket, or
+        the host and port of the TCP socket.
+
+        The port is the port used by the server, which can be
+        different from the requested port if the requested port is
+        ``0``.
+        """
+        if self._path is not None:
+            return self._path
+        if self._server is not None:
+            return self._server.sockets[0].getsockname()[:2]
+        return self._host, self._port
+
+    async def start(self) -> None:
+        r"""Start the engine and the server."""
+        await self._engine.start()
+        if self._path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path=str(self._path))
+        else:
+            self._server = await asyncio.start_server(self._handle, self._host, self._port)
+        logger.info(f"Serving on {self.address}")
+
+    async def stop(self) -> None:
+        r"""Stop the server and the engine."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self._engine.stop()
+
+    async def serve_forever(self) -> None:
+        r"""Start the server and serve the requests until the task is
+        cancelled."""
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        r"""Handle a connection.
+
+        The response is ``503 Service Unavailable`` if the request is
+        cancelled, for example because the engine is stopped. The
+        connection is always closed.
+
+        Args:
+            reader: The stream to read the request.
+            writer: The stream to write the response.
+        """
+        try:
+            try:
+                status, payload = await self._handle_request(reader)
+            except asyncio.CancelledError:
+                logger.warning("The request was cancelled")
+                status, payload = HTTPStatus.SERVICE_UNAVAILABLE, {
+                    "error": "The request was cancelled"
+                }
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"The request failed: {exc}")
+                status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)}
+            body = json.dumps(_replace_non_finite(payload), allow_nan=False).encode()
+            writer.write(
+                (
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: close\r\n\r\n"
+                ).encode()
+                + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _handle_request(self, reader: asyncio.StreamReader) -> tuple[HTTPStatus, Any]:
+        r"""Read a request and compute its response.
+
+        Args:
+            reader: The stream to read the request.
+
+        Returns:
+            The status and payload of the response.
+        """
+        request_line = (await reader.readline()).decode().split()
+        if len(request_line) != 3:
+            return HTTPStatus.BAD_REQUEST, {"error": "Invalid request line"}
+        method, target, _ = request_line
+        headers = {}
+        while (line := (await reader.readline()).decode().strip()) != "":
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+        if method == "GET" and target == "/health":
+            return HTTPStatus.OK, {"status": "ok"}
+        if method == "GET" and target == "/metrics":
+            return HTTPStatus.OK, self._engine.get_metrics()
+        if method == "POST" and target == "/predict":
+            try:
+                inputs = torch.tensor(json.loads(body)["inputs"])
+            except (ValueError, KeyError, TypeError) as exc:
+                return HTTPStatus.BAD_REQUEST, {"error": f"Invalid inputs: {exc}"}
+            outputs = await self._engine.predict(inputs)
+            return HTTPStatus.OK, {"outputs": _to_list(outputs)}
+        return HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint: {method} {target}"}
+
+
+def _to_list(data: Any) -> Any:
+    r"""Convert the tensors of some data to lists.
+
+    Args:
+        data: The data.
+
+    Returns:
+        The data with the tensors converted to lists.
+    """
+    if torch.is_tensor(data):
+        return data.tolist()
+    if isinstance(data, dict):
+        return {key: _to_list(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_to_list(value) for value in data]
+    return data
+
+
+def _replace_non_finite(data: Any) -> Any:
+    r"""Replace the non-finite floats of some data, which are not valid
+    JSON values.
+
+    The infinite values are replaced by ``'+Inf'`` and ``'-Inf'``,
+    like in the Prometheus format, and the NaN values are replaced by
+    ``None``.
+
+    Args:
+        data: The data.
+
+    Returns:
+        The data without non-finite floats.
+    """
+    if isinstance(data, float) and not math.isfinite(data):
+        if math.isnan(data):
+            return None
+        return "+Inf" if data > 0 else "-Inf"
+    if isinstance(data, dict):
+        return {key: _replace_non_finite(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_replace_non_finite(value) for value in data]
+    return data
@@ -0,0 +1,19 @@
+r"""Contain the tools to run hyperparameter sweeps."""
+
+from __future__ import annotations
+
+__all__ = [
+    "ASHAScheduler",
+    "ASHASearch",
+    "SweepExecutor",
+    "TrialReportCallback",
+    "TrialStorage",
+    "run_trial",
+]
+
+from lightcat.sweep.callback import TrialReportCallback
+from lightcat.sweep.executor import SweepExecutor
+from lightcat.sweep.scheduler import ASHAScheduler
+from lightcat.sweep.search import ASHASearch
+from lightcat.sweep.storage import TrialStorage
+from lightcat.sweep.trial import run_trial
@@ -0,0 +1,96 @@
+r"""Contain a callback to report the intermediate values of a trial to a
+scheduler."""
+
+from __future__ import annotations
+
+__all__ = ["TrialReportCallback"]
+
+import logging
+from typing import TYPE_CHECKING
+
+import torch
+from lightning import Callback
+
+if TYPE_CHECKING:
+    from lightning import LightningModule, Trainer
+
+    from lightcat.sweep.scheduler import ASHAScheduler
+    from lightcat.sweep.storage import TrialStorage
+
+logger = logging.getLogger(__name__)
+
+
+class TrialReportCallback(Callback):
+    r"""Implement a callback to report the validation metric of a trial
+    and stop the training if the scheduler decides so.
+
+    The metric is reported at the end of each validation loop, and
+    the amount of resource is the number of validation loops run
+    since the start of the training. The sanity check is ignored.
+
+    Args:
+        storage: The storage where the values are reported.
+        scheduler: The scheduler that decides if the trial should be
+            stopped.
+        trial_id: The trial ID.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import tempfile
+    >>> from pathlib import Path
+    >>> from lightcat.sweep import ASHAScheduler, TrialReportCallback, TrialStorage
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     storage = TrialStorage(Path(tmpdir).joinpath("sweep.db"))
+    ...     callback = TrialReportCallback(
+    ...         storage, ASHAScheduler(metric="val_loss"), trial_id=storage.add_trial({})
+    ...     )
+    ...
+    >>> callback
+    TrialReportCallback(trial_id=1, metric=val_loss, num_reports=0, pruned=False)
+
+    ```
+    """
+
+    def __init__(self, storage: TrialStorage, scheduler: ASHAScheduler, trial_id: int) -> None:
+        self._storage = storage
+        self._scheduler = scheduler
+        self._trial_id = trial_id
+        self._num_reports = 0
+        self._pruned = False
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(trial_id={self._trial_id}, "
+            f"metric={self._scheduler.metric}, num_reports={self._num_reports}, "
+            f"pruned={self._pruned})"
+        )
+
+    @property
+    def pruned(self) -> bool:
+        r"""``True`` if the trial was stopped by the scheduler,
+        otherwise ``False``."""
+        return self._pruned
+
+    def on_validation_end(
+        self, trainer: Trainer, pl_module: LightningModule  # noqa: ARG002
+    ) -> None:
+        if trainer.sanity_checking:
+            return
+        metric = self._scheduler.metric
+        if metric not in trainer.callback_metrics:
+            msg = (
+                f"The metric '{metric}' is not logged. The logged metrics are: "
+                f"{sorted(trainer.callback_metrics)}"
+            )
+            raise RuntimeError(msg)
+        value = trainer.callback_metrics[metric]
+        value = float(value.item() if torch.is_tensor(value) else value)
+        self._num_reports += 1
+        self._storage.report(self._trial_id, resource=self._num_reports, value=value)
+        if self._scheduler.should_stop(
+            self._storage, trial_id=self._trial_id, resource=self._num_reports, value=value
+        ):
+            self._pruned = True
+            trainer.should_stop = True
@@ -0,0 +1,183 @@
+r"""Contain an executor that runs the trials of a sweep in a pool of
+warm worker processes."""
+
+from __future__ import annotations
+
+__all__ = ["SweepExecutor"]
+
+import importlib
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+import torch
+
+from lightcat.sweep.trial import run_trial
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping, Sequence
+    from concurrent.futures import Future
+    from types import TracebackType
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRELOAD = ("torch", "lightning", "lightcat.sweep.trial")
+
+
+class SweepExecutor:
+    r"""Implement an executor that runs the trials of a sweep in a pool
+    of warm worker processes.
+
+    The worker processes are started with the ``forkserver`` start
+    method, so each worker is forked from a server process that has
+    already imported the ``preload`` modules, and the workers are
+    reused across trials. The import cost of ``torch`` and
+    ``lightning`` is paid once by the server process instead of once
+    per trial. The ``spawn`` start method is used if ``forkserver`` is
+    not available on the platform, in which case each worker imports
+    the ``preload`` modules when it starts.
+
+    Note that the forkserver process is shared by all the
+    ``forkserver`` pools of the current process, so ``preload`` is
+    only used if the forkserver process is not started yet.
+
+    Args:
+        max_workers: The maximum number of worker processes. If
+            ``None``, the number of CPUs is used.
+        preload: The modules to import in the worker processes
+            before running the trials.
+        num_threads: The number of threads used by PyTorch in each
+            worker process. If ``None``, the default value is used.
+            Setting it to the number of CPUs divided by
+            ``max_workers`` avoids oversubscription.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.sweep import SweepExecutor
+    >>> with SweepExecutor(max_workers=2) as executor:
+    ...     executor
+    ...
+    SweepExecutor(max_workers=2, start_method=forkserver, num_threads=None)
+
+    ```
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        preload: Sequence[str] = DEFAULT_PRELOAD,
+        num_threads: int | None = None,
+    ) -> None:
+        self._max_workers = max_workers
+        self._preload = tuple(preload)
+        self._num_threads = num_threads
+
+        context = _get_mp_context()
+        if context.get_start_method() == "forkserver":
+            context.set_forkserver_preload(list(self._preload))
+        self._start_method = context.get_start_method()
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._preload, num_threads),
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(max_workers={self._max_workers}, "
+            f"start_method={self._start_method}, num_threads={self._num_threads})"
+        )
+
+    def __enter__(self) -> SweepExecutor:  # noqa: PYI034
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.shutdown()
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        r"""Submit a function to run in a worker process.
+
+        Args:
+            fn: The function to run. It must be picklable.
+            *args: The positional arguments of the function.
+            **kwargs: The keyword arguments of the function.
+
+        Returns:
+            The future of the function result.
+        """
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def submit_trial(self, config: Mapping[str, Any]) -> Future:
+        r"""Submit a trial to run in a worker process.
+
+        Args:
+            config: The trial configuration. See ``run_trial`` for
+                more information.
+
+        Returns:
+            The future of the trial results.
+        """
+        return self.submit(run_trial, config)
+
+    def map_trials(self, configs: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]:
+        r"""Run some trials in the worker processes.
+
+        Args:
+            configs: The trial configurations. See ``run_trial`` for
+                more information.
+
+        Returns:
+            The results of each trial, in the same order as the
+                configurations.
+
+        Raises:
+            Exception: if a trial fails.
+        """
+        futures = [self.submit_trial(config) for config in configs]
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        r"""Shut down the worker processes.
+
+        Args:
+            wait: If ``True``, wait until the running trials are
+                finished.
+            cancel_futures: If ``True``, cancel the trials that are
+                not started.
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+def _get_mp_context() -> multiprocessing.context.BaseContext:
+    r"""Get the multiprocessing context used to start the workers.
+
+    Returns:
+        The ``forkserver`` context if it is available, otherwise the
+            ``spawn`` context.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")  # pragma: no cover
+
+
+def _init_worker(preload: Sequence[str], num_threads: int | None) -> None:
+    r"""Initialize a worker process.
+
+    Args:
+        preload: The modules to import. They are already imported if
+            the worker is forked from the forkserver process.
+        num_threads: The number of threads used by PyTorch.
+    """
+    for name in preload:
+        importlib.import_module(name)
+    if num_threads is not None:
+        torch.set_num_threads(num_threads)
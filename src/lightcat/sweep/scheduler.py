@@ -0,0 +1,147 @@
+r"""Contain a trial scheduler that implements the asynchronous
+successive halving algorithm (ASHA)."""
+
+from __future__ import annotations
+
+__all__ = ["ASHAScheduler"]
+
+import logging
+import math
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from lightcat.sweep.storage import TrialStorage
+
+logger = logging.getLogger(__name__)
+
+
+class ASHAScheduler:
+    r"""Implement a trial scheduler that stops the underperforming
+    trials with the asynchronous successive halving algorithm (ASHA).
+
+    The rungs are the amounts of resource
+    ``min_resource * reduction_factor ** k`` for ``k >= 0``. When a
+    trial reaches a rung, its value is compared to the values of all
+    the trials that have already reached this rung, and the trial
+    continues only if its value is in the top ``1 / reduction_factor``
+    of these values. The decision does not wait for the other trials,
+    so the trials can run asynchronously. The first trial that reaches
+    a rung always continues.
+
+    Reference: Li et al., A System for Massively Parallel
+    Hyperparameter Tuning. MLSys 2020.
+
+    Args:
+        metric: The name of the metric used to compare the trials.
+        mode: ``'min'`` if a lower value is better, or ``'max'`` if a
+            higher value is better.
+        min_resource: The amount of resource of the first rung.
+        reduction_factor: The reduction factor between two
+            consecutive rungs.
+
+    Raises:
+        ValueError: if ``mode`` is not ``'min'`` or ``'max'``, if
+            ``min_resource`` is lower than 1, or if
+            ``reduction_factor`` is lower than 2.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.sweep import ASHAScheduler
+    >>> scheduler = ASHAScheduler(metric="val_loss", min_resource=1, reduction_factor=2)
+    >>> scheduler
+    ASHAScheduler(metric=val_loss, mode=min, min_resource=1, reduction_factor=2)
+    >>> [scheduler.is_rung(resource) for resource in range(1, 9)]
+    [True, True, False, True, False, False, False, True]
+
+    ```
+    """
+
+    def __init__(
+        self, metric: str, mode: str = "min", min_resource: int = 1, reduction_factor: int = 3
+    ) -> None:
+        if mode not in {"min", "max"}:
+            msg = f"Incorrect mode '{mode}'. The valid modes are: 'min' and 'max'"
+            raise ValueError(msg)
+        if min_resource < 1:
+            msg = f"min_resource must be greater than 0 (received: {min_resource})"
+            raise ValueError(msg)
+        if reduction_factor < 2:
+            msg = f"reduction_factor must be greater than 1 (received: {reduction_factor})"
+            raise ValueError(msg)
+        self._metric = metric
+        self._mode = mode
+        self._min_resource = min_resource
+        self._reduction_factor = reduction_factor
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(metric={self._metric}, mode={self._mode}, "
+            f"min_resource={self._min_resource}, reduction_factor={self._reduction_factor})"
+        )
+
+    @property
+    def metric(self) -> str:
+        r"""The name of the metric used to compare the trials."""
+        return self._metric
+
+    @property
+    def mode(self) -> str:
+        r"""``'min'`` if a lower value is better, or ``'max'`` if a
+        higher value is better."""
+        return self._mode
+
+    def is_rung(self, resource: int) -> bool:
+        r"""Indicate if an amount of resource is a rung.
+
+        Args:
+            resource: The amount of resource.
+
+        Returns:
+            ``True`` if the amount of resource is a rung, otherwise
+                ``False``.
+        """
+        if resource < self._min_resource or resource % self._min_resource:
+            return False
+        ratio = resource // self._min_resource
+        while ratio % self._reduction_factor == 0:
+            ratio //= self._reduction_factor
+        return ratio == 1
+
+    def should_stop(
+        self, storage: TrialStorage, trial_id: int, resource: int, value: float
+    ) -> bool:
+        r"""Indicate if a trial should be stopped.
+
+        The value must be reported to the storage before calling this
+        method.
+
+        Args:
+            storage: The storage with the values reported by the
+                trials.
+            trial_id: The trial ID.
+            resource: The amount of resource used by the trial.
+            value: The value reported by the trial.
+
+        Returns:
+            ``True`` if the trial should be stopped, otherwise
+                ``False``.
+        """
+        if math.isnan(value):
+            return True
+        if not self.is_rung(resource):
+            return False
+        values = sorted(
+            (v for v in storage.get_values(resource).values() if not math.isnan(v)),
+            reverse=self._mode == "max",
+        )
+        num_promoted = max(len(values) // self._reduction_factor, 1)
+        threshold = values[num_promoted - 1]
+        stop = value > threshold if self._mode == "min" else value < threshold
+        if stop:
+            logger.info(
+                f"Stopping the trial {trial_id} at rung {resource}: {self._metric}={value} "
+                f"is not in the top {num_promoted} of {len(values)} trials"
+            )
+        return stop
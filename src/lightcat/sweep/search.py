@@ -0,0 +1,189 @@
+r"""Contain a hyperparameter search that runs the trials in a process
+pool and stops the underperforming trials with ASHA."""
+
+from __future__ import annotations
+
+__all__ = ["ASHASearch"]
+
+import json
+import logging
+import math
+from typing import TYPE_CHECKING, Any
+
+from lightcat.sweep.callback import TrialReportCallback
+from lightcat.sweep.executor import SweepExecutor
+from lightcat.sweep.storage import (
+    COMPLETED,
+    FAILED,
+    PENDING,
+    PRUNED,
+    RUNNING,
+    TrialStorage,
+)
+from lightcat.sweep.trial import run_trial
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+    from pathlib import Path
+
+    from lightcat.sweep.scheduler import ASHAScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class ASHASearch:
+    r"""Implement a hyperparameter search that runs the trials in a
+    process pool and stops the underperforming trials with ASHA.
+
+    Each trial is a configuration with the trainer, model and
+    datamodule creators (see ``run_trial``), and the model must log
+    the metric of the scheduler during the validation. The state of
+    the trials is persisted in a SQLite file, so an interrupted
+    search can be resumed by running a search with the same storage:
+    the completed, pruned and failed trials are not run again, and
+    the trials that were running are restarted from the beginning.
+
+    Args:
+        configs: The trial configurations. They must be JSON
+            serializable.
+        storage: The storage or the path to its SQLite file.
+        scheduler: The scheduler that stops the underperforming
+            trials.
+        max_workers: The maximum number of trials that run at the
+            same time. If ``None``, the number of CPUs is used.
+        num_threads: The number of threads used by PyTorch in each
+            worker process. If ``None``, the default value is used.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import tempfile
+    >>> from pathlib import Path
+    >>> from lightcat.sweep import ASHAScheduler, ASHASearch
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     search = ASHASearch(
+    ...         configs=[],
+    ...         storage=Path(tmpdir).joinpath("sweep.db"),
+    ...         scheduler=ASHAScheduler(metric="val_loss"),
+    ...     )
+    ...     search.run()
+    ...
+    []
+
+    ```
+    """
+
+    def __init__(
+        self,
+        configs: Sequence[Mapping[str, Any]],
+        storage: TrialStorage | Path | str,
+        scheduler: ASHAScheduler,
+        max_workers: int | None = None,
+        num_threads: int | None = None,
+    ) -> None:
+        self._configs = configs
+        self._storage = storage if isinstance(storage, TrialStorage) else TrialStorage(storage)
+        self._scheduler = scheduler
+        self._max_workers = max_workers
+        self._num_threads = num_threads
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__qualname__}(num_configs={len(self._configs):,}, "
+            f"storage={self._storage}, scheduler={self._scheduler})"
+        )
+
+    @property
+    def storage(self) -> TrialStorage:
+        r"""The storage of the trials."""
+        return self._storage
+
+    def run(self) -> list[dict[str, Any]]:
+        r"""Run the trials that are not finished.
+
+        Returns:
+            All the trials of the storage.
+        """
+        self._prepare_trials()
+        pending = self._storage.get_trials(status=PENDING)
+        logger.info(f"Running {len(pending):,} trials...")
+        if pending:
+            with SweepExecutor(
+                max_workers=self._max_workers, num_threads=self._num_threads
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        _run_trial,
+                        self._storage,
+                        self._scheduler,
+                        trial["trial_id"],
+                        trial["config"],
+                    )
+                    for trial in pending
+                ]
+                for future in futures:
+                    future.result()
+        return self._storage.get_trials()
+
+    def best_trial(self) -> dict[str, Any] | None:
+        r"""Get the completed trial with the best final metric value.
+
+        Returns:
+            The best trial, or ``None`` if no trial is completed.
+        """
+        best, best_value = None, None
+        for trial in self._storage.get_trials(status=COMPLETED):
+            value = trial["result"]["metrics"].get(self._scheduler.metric)
+            if value is None or math.isnan(value):
+                continue
+            if (
+                best_value is None
+                or (self._scheduler.mode == "min" and value < best_value)
+                or (self._scheduler.mode == "max" and value > best_value)
+            ):
+                best, best_value = trial, value
+        return best
+
+    def _prepare_trials(self) -> None:
+        r"""Add the configurations that are not in the storage, and
+        reset the trials that were interrupted."""
+        trials = self._storage.get_trials()
+        existing = {json.dumps(trial["config"], sort_keys=True) for trial in trials}
+        for config in self._configs:
+            key = json.dumps(config, sort_keys=True)
+            if key not in existing:
+                self._storage.add_trial(config)
+                existing.add(key)
+        for trial in trials:
+            if trial["status"] == RUNNING:
+                logger.info(f"Restarting the interrupted trial {trial['trial_id']}")
+                self._storage.reset_trial(trial["trial_id"])
+
+
+def _run_trial(
+    storage: TrialStorage, scheduler: ASHAScheduler, trial_id: int, config: Mapping[str, Any]
+) -> str:
+    r"""Run a trial in a worker process and persist its state.
+
+    Args:
+        storage: The storage of the trials.
+        scheduler: The scheduler that stops the underperforming
+            trials.
+        trial_id: The trial ID.
+        config: The trial configuration.
+
+    Returns:
+        The final status of the trial.
+    """
+    storage.set_status(trial_id, RUNNING)
+    callback = TrialReportCallback(storage, scheduler, trial_id)
+    try:
+        result = run_trial(config, callbacks=[callback])
+    except Exception as exc:
+        logger.exception(f"The trial {trial_id} failed")
+        storage.set_status(trial_id, FAILED, error=f"{exc.__class__.__qualname__}: {exc}")
+        return FAILED
+    status = PRUNED if callback.pruned else COMPLETED
+    storage.set_status(trial_id, status, result=result)
+    return status
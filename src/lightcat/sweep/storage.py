@@ -0,0 +1,284 @@
+r"""Contain a SQLite storage to persist the state of the trials of a
+sweep."""
+
+from __future__ import annotations
+
+__all__ = ["TrialStorage"]
+
+import json
+import logging
+import math
+import sqlite3
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Mapping
+
+logger = logging.getLogger(__name__)
+
+
+# The status of the trials.
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+PRUNED = "pruned"
+FAILED = "failed"
+
+
+# SQLite stores NaN as NULL, so the value of a report is NULL when the
+# reported value is NaN, for example when the training diverged.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    trial_id INTEGER PRIMARY KEY,
+    config TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS reports (
+    trial_id INTEGER NOT NULL,
+    resource INTEGER NOT NULL,
+    value REAL,
+    PRIMARY KEY (trial_id, resource)
+);
+"""
+
+
+class TrialStorage:
+    r"""Implement a storage to persist the state of the trials of a
+    sweep in a local SQLite file.
+
+    The storage only keeps the path to the SQLite file, and a new
+    connection is opened for each operation, so the storage can be
+    sent to the worker processes and used by several processes at
+    the same time. The configurations and results of the trials are
+    stored as JSON, so they must be JSON serializable.
+
+    Args:
+        path: The path to the SQLite file. It is created if it does
+            not exist.
+        timeout: The number of seconds to wait for the lock of the
+            database when it is used by another process.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import tempfile
+    >>> from pathlib import Path
+    >>> from lightcat.sweep import TrialStorage
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     storage = TrialStorage(Path(tmpdir).joinpath("sweep.db"))
+    ...     trial_id = storage.add_trial({"lr": 0.1})
+    ...     storage.report(trial_id, resource=1, value=0.5)
+    ...     storage.get_trial(trial_id)
+    ...
+    {'trial_id': 1, 'config': {'lr': 0.1}, 'status': 'pending', 'result': None, 'error': None,
+     'reports': {1: 0.5}}
+
+    ```
+    """
+
+    def __init__(self, path: Path | str, timeout: float = 60.0) -> None:
+        self._path = Path(path)
+        self._timeout = timeout
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}(path={self._path})"
+
+    @property
+    def path(self) -> Path:
+        r"""The path to the SQLite file."""
+        return self._path
+
+    def add_trial(self, config: Mapping[str, Any]) -> int:
+        r"""Add a pending trial.
+
+        Args:
+            config: The trial configuration.
+
+        Returns:
+            The trial ID.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO trials (config, status) VALUES (?, ?)",
+                (json.dumps(config, sort_keys=True), PENDING),
+            )
+            return cursor.lastrowid
+
+    def get_trial(self, trial_id: int) -> dict[str, Any]:
+        r"""Get a trial.
+
+        Args:
+            trial_id: The trial ID.
+
+        Returns:
+            The trial ID, configuration, status, result, error and
+                reported values.
+
+        Raises:
+            KeyError: if the trial does not exist.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT trial_id, config, status, result, error FROM trials WHERE trial_id = ?",
+                (trial_id,),
+            ).fetchone()
+            if row is None:
+                msg = f"The trial {trial_id} does not exist"
+                raise KeyError(msg)
+            reports = conn.execute(
+                "SELECT resource, value FROM reports WHERE trial_id = ? ORDER BY resource",
+                (trial_id,),
+            ).fetchall()
+        return _row_to_trial(row, {resource: _to_value(value) for resource, value in reports})
+
+    def get_trials(self, status: str | None = None) -> list[dict[str, Any]]:
+        r"""Get the trials.
+
+        Args:
+            status: If not ``None``, only the trials with this status
+                are returned.
+
+        Returns:
+            The trials, ordered by trial ID.
+        """
+        query = "SELECT trial_id, config, status, result, error FROM trials"
+        params: tuple = ()
+        if status is not None:
+            query += " WHERE status = ?"
+            params = (status,)
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY trial_id", params).fetchall()
+            reports: dict[int, dict[int, float]] = {row[0]: {} for row in rows}
+            for trial_id, resource, value in conn.execute(
+                "SELECT trial_id, resource, value FROM reports ORDER BY resource"
+            ):
+                if trial_id in reports:
+                    reports[trial_id][resource] = _to_value(value)
+        return [_row_to_trial(row, reports[row[0]]) for row in rows]
+
+    def set_status(
+        self,
+        trial_id: int,
+        status: str,
+        result: Mapping[str, Any] | None = None,
+        error: str | None = None,
+    ) -> None:
+        r"""Set the status of a trial.
+
+        Args:
+            trial_id: The trial ID.
+            status: The new status.
+            result: The trial result, if any.
+            error: The error message if the trial failed.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE trials SET status = ?, result = ?, error = ? WHERE trial_id = ?",
+                (
+                    status,
+                    None if result is None else json.dumps(result, sort_keys=True),
+                    error,
+                    trial_id,
+                ),
+            )
+
+    def reset_trial(self, trial_id: int) -> None:
+        r"""Reset a trial to the pending status and delete its reported
+        values.
+
+        Args:
+            trial_id: The trial ID.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE trials SET status = ?, result = NULL, error = NULL WHERE trial_id = ?",
+                (PENDING, trial_id),
+            )
+            conn.execute("DELETE FROM reports WHERE trial_id = ?", (trial_id,))
+
+    def report(self, trial_id: int, resource: int, value: float) -> None:
+        r"""Report an intermediate value of a trial.
+
+        Args:
+            trial_id: The trial ID.
+            resource: The amount of resource used by the trial when
+                the value is computed, for example the number of
+                validation rounds.
+            value: The reported value. It can be NaN.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO reports (trial_id, resource, value) VALUES (?, ?, ?)",
+                (trial_id, resource, value),
+            )
+
+    def get_values(self, resource: int) -> dict[int, float]:
+        r"""Get the values reported by all the trials for a given amount
+        of resource.
+
+        Args:
+            resource: The amount of resource.
+
+        Returns:
+            The reported value of each trial.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT trial_id, value FROM reports WHERE resource = ?", (resource,)
+            ).fetchall()
+        return {trial_id: _to_value(value) for trial_id, value in rows}
+
+    @contextmanager
+    def _connect(self) -> Generator[sqlite3.Connection, None, None]:
+        r"""Open a connection to the database.
+
+        The transaction is committed if no exception is raised,
+        otherwise it is rolled back, and the connection is closed.
+
+        Yields:
+            The connection.
+        """
+        with closing(sqlite3.connect(self._path, timeout=self._timeout)) as conn, conn:
+            yield conn
+
+
+def _row_to_trial(row: tuple, reports: dict[int, float]) -> dict[str, Any]:
+    r"""Convert a row of the ``trials`` table to a trial.
+
+    Args:
+        row: The row.
+        reports: The reported values of the trial.
+
+    Returns:
+        The trial.
+    """
+    trial_id, config, status, result, error = row
+    return {
+        "trial_id": trial_id,
+        "config": json.loads(config),
+        "status": status,
+        "result": None if result is None else json.loads(result),
+        "error": error,
+        "reports": reports,
+    }
+
+
+def _to_value(value: float | None) -> float:
+    r"""Convert a value read from the database to a reported value.
+
+    Args:
+        value: The value read from the database. ``None`` is the
+            value stored for a NaN.
+
+    Returns:
+        The reported value.
+    """
+    return math.nan if value is None else value
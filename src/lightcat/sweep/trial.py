@@ -0,0 +1,118 @@
+r"""Contain a function to run a trial of a sweep."""
+
+from __future__ import annotations
+
+__all__ = ["run_trial"]
+
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+import torch
+from lightning import seed_everything
+
+from lightcat.datamodule.creator import setup_datamodule_creator
+from lightcat.model.creator import setup_model_creator
+from lightcat.trainer.creator import setup_trainer_creator
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+
+    from lightning import Callback
+
+logger = logging.getLogger(__name__)
+
+
+def run_trial(config: Mapping[str, Any], callbacks: Sequence[Callback] = ()) -> dict[str, Any]:
+    r"""Run a trial of a sweep.
+
+    The trainer, model and datamodule are created with their creators,
+    then the model is trained on the datamodule.
+
+    Args:
+        config: The trial configuration. ``'trainer'``, ``'model'``
+            and ``'datamodule'`` are the creators or their
+            configurations. ``'seed'`` is an optional random seed.
+        callbacks: Some callbacks to add to the trainer in addition
+            to the callbacks of the trainer configuration.
+
+    Returns:
+        The trial results. ``'metrics'`` contains the scalar metrics
+            of the trainer at the end of the training,
+            ``'global_step'`` and ``'current_epoch'`` are the
+            training progress, and ``'duration'`` is the trial
+            duration in seconds.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.sweep import run_trial
+    >>> results = run_trial(
+    ...     {
+    ...         "trainer": {
+    ...             "_target_": "lightcat.trainer.creator.TrainerCreator",
+    ...             "trainer": {
+    ...                 "_target_": "lightning.Trainer",
+    ...                 "max_steps": 5,
+    ...                 "logger": False,
+    ...                 "enable_checkpointing": False,
+    ...                 "enable_progress_bar": False,
+    ...                 "enable_model_summary": False,
+    ...             },
+    ...         },
+    ...         "model": {
+    ...             "_target_": "lightcat.model.creator.ModelCreator",
+    ...             "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+    ...         },
+    ...         "datamodule": {
+    ...             "_target_": "lightcat.datamodule.creator.DataModuleCreator",
+    ...             "datamodule": {
+    ...                 "_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"
+    ...             },
+    ...         },
+    ...         "seed": 42,
+    ...     }
+    ... )
+    >>> results["global_step"]
+    5
+
+    ```
+    """
+    start_time = time.perf_counter()
+    if config.get("seed") is not None:
+        seed_everything(config["seed"])
+    trainer = setup_trainer_creator(config["trainer"]).create()
+    model = setup_model_creator(config["model"]).create()
+    datamodule = setup_datamodule_creator(config["datamodule"]).create()
+    trainer.callbacks.extend(callbacks)
+    trainer.fit(model, datamodule=datamodule)
+    return {
+        "metrics": _get_scalar_metrics(trainer.callback_metrics),
+        "global_step": trainer.global_step,
+        "current_epoch": trainer.current_epoch,
+        "duration": time.perf_counter() - start_time,
+    }
+
+
+def _get_scalar_metrics(metrics: Mapping[str, Any]) -> dict[str, float]:
+    r"""Get the scalar metrics as floats.
+
+    The results of a trial are sent to the main process, so the
+    tensors are converted to floats.
+
+    Args:
+        metrics: The metrics.
+
+    Returns:
+        The scalar metrics.
+    """
+    scalars = {}
+    for name, value in metrics.items():
+        if torch.is_tensor(value):
+            if value.numel() != 1:
+                continue
+            value = value.item()  # noqa: PLW2901
+        if isinstance(value, (int, float)):
+            scalars[name] = float(value)
+    return scalars
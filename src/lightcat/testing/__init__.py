@@ -8,7 +8,10 @@ __all__ = [
     "gloo_available",
     "karbonn_available",
     "nccl_available",
+    "numpy_available",
     "objectory_available",
+    "onnx_available",
+    "onnxruntime_available",
     "torchmetrics_available",
     "two_gpus_available",
 ]
@@ -19,7 +22,10 @@ from lightcat.testing.fixtures import (
     gloo_available,
     karbonn_available,
     nccl_available,
+    numpy_available,
     objectory_available,
+    onnx_available,
+    onnxruntime_available,
     torchmetrics_available,
     two_gpus_available,
 )
@@ -8,7 +8,10 @@ __all__ = [
     "gloo_available",
     "karbonn_available",
     "nccl_available",
+    "numpy_available",
     "objectory_available",
+    "onnx_available",
+    "onnxruntime_available",
     "torchmetrics_available",
     "two_gpus_available",
 ]
@@ -18,7 +21,10 @@ import torch
 
 from lightcat.utils.imports import (
     is_karbonn_available,
+    is_numpy_available,
     is_objectory_available,
+    is_onnx_available,
+    is_onnxruntime_available,
     is_torchmetrics_available,
 )
 
@@ -41,7 +47,12 @@ nccl_available = pytest.mark.skipif(
 )
 
 karbonn_available = pytest.mark.skipif(not is_karbonn_available(), reason="Require karbonn")
+numpy_available = pytest.mark.skipif(not is_numpy_available(), reason="Require numpy")
 objectory_available = pytest.mark.skipif(not is_objectory_available(), reason="Require objectory")
+onnx_available = pytest.mark.skipif(not is_onnx_available(), reason="Require onnx")
+onnxruntime_available = pytest.mark.skipif(
+    not is_onnxruntime_available(), reason="Require onnxruntime"
+)
 torchmetrics_available = pytest.mark.skipif(
     not is_torchmetrics_available(), reason="Require tabulate"
 )
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 __all__ = [
     "BaseTrainerCreator",
+    "DDPTrainerCreator",
     "TrainerCreator",
     "is_trainer_creator_config",
     "setup_trainer_creator",
@@ -14,4 +15,5 @@ from lightcat.trainer.creator.base import (
     is_trainer_creator_config,
     setup_trainer_creator,
 )
+from lightcat.trainer.creator.ddp import DDPTrainerCreator
 from lightcat.trainer.creator.vanilla import TrainerCreator
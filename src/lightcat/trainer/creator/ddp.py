@@ -0,0 +1,133 @@
+r"""Contain a trainer creator that configures the gradient communication
+of the DDP strategy."""
+
+from __future__ import annotations
+
+__all__ = ["DDPTrainerCreator"]
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+from coola.utils import repr_indent, repr_mapping, str_indent, str_mapping
+
+from lightcat.trainer.creator.base import BaseTrainerCreator
+from lightcat.trainer.ddp import get_ddp_strategy
+from lightcat.trainer.factory import setup_trainer
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from lightning import Trainer
+
+logger = logging.getLogger(__name__)
+
+
+class DDPTrainerCreator(BaseTrainerCreator):
+    r"""Create a ``lightning.Trainer`` object with a DDP strategy that
+    uses a communication hook and a custom bucket size.
+
+    The strategy is created with ``lightcat.trainer.ddp.get_ddp_strategy``
+    and added to the trainer configuration, so the trainer
+    configuration must not have a strategy.
+
+    Args:
+        trainer: The ``lightning.Trainer`` configuration.
+        comm_hook: The name of the communication hook. If ``None``,
+            the default all-reduce is used. The valid names are
+            ``'fp16'``, ``'bf16'``, and ``'powersgd'``.
+        comm_wrapper: The name of the communication hook wrapper, for
+            example ``'fp16'`` to compress the PowerSGD matrices. If
+            ``None``, the hook is not wrapped.
+        bucket_cap_mb: The maximum size of a gradient bucket in MB. If
+            ``None``, the default size is used.
+        powersgd: The keyword arguments of ``PowerSGDState``.
+        strategy: The other keyword arguments of ``DDPStrategy``, for
+            example ``{"process_group_backend": "gloo"}``.
+
+    Raises:
+        ValueError: if the trainer configuration has a strategy.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.trainer.creator import DDPTrainerCreator
+    >>> creator = DDPTrainerCreator(
+    ...     {"_target_": "lightning.Trainer", "accelerator": "cpu", "devices": 1},
+    ...     comm_hook="bf16",
+    ...     bucket_cap_mb=50,
+    ... )
+    >>> creator
+    DDPTrainerCreator(
+      (trainer): {'_target_': 'lightning.Trainer', 'accelerator': 'cpu', 'devices': 1}
+      (comm_hook): bf16
+      (comm_wrapper): None
+      (bucket_cap_mb): 50
+      (powersgd): None
+      (strategy): None
+    )
+    >>> trainer = creator.create()
+    >>> trainer.strategy
+    <lightning.pytorch.strategies.ddp.DDPStrategy object at 0x...>
+
+    ```
+    """
+
+    def __init__(
+        self,
+        trainer: dict,
+        comm_hook: str | None = None,
+        comm_wrapper: str | None = None,
+        bucket_cap_mb: float | None = None,
+        powersgd: Mapping[str, Any] | None = None,
+        strategy: Mapping[str, Any] | None = None,
+    ) -> None:
+        if "strategy" in trainer:
+            msg = (
+                "The trainer configuration must not have a strategy because the DDP strategy "
+                f"is created by {self.__class__.__qualname__} (received: {trainer['strategy']})"
+            )
+            raise ValueError(msg)
+        self._trainer = trainer
+        self._comm_hook = comm_hook
+        self._comm_wrapper = comm_wrapper
+        self._bucket_cap_mb = bucket_cap_mb
+        self._powersgd = powersgd
+        self._strategy = strategy
+
+    def __repr__(self) -> str:
+        args = repr_indent(repr_mapping(self._get_args()))
+        return f"{self.__class__.__qualname__}(\n  {args}\n)"
+
+    def __str__(self) -> str:
+        args = str_indent(str_mapping(self._get_args()))
+        return f"{self.__class__.__qualname__}(\n  {args}\n)"
+
+    def create(self) -> Trainer:
+        logger.info(
+            f"Creating 'Trainer' with a DDP strategy (comm_hook={self._comm_hook}, "
+            f"comm_wrapper={self._comm_wrapper}, bucket_cap_mb={self._bucket_cap_mb})..."
+        )
+        strategy = get_ddp_strategy(
+            comm_hook=self._comm_hook,
+            comm_wrapper=self._comm_wrapper,
+            bucket_cap_mb=self._bucket_cap_mb,
+            powersgd=self._powersgd,
+            **(self._strategy or {}),
+        )
+        return setup_trainer(trainer={**self._trainer, "strategy": strategy})
+
+    def _get_args(self) -> dict[str, Any]:
+        r"""Get the arguments of the creator.
+
+        Returns:
+            The arguments.
+        """
+        return {
+            "trainer": self._trainer,
+            "comm_hook": self._comm_hook,
+            "comm_wrapper": self._comm_wrapper,
+            "bucket_cap_mb": self._bucket_cap_mb,
+            "powersgd": self._powersgd,
+            "strategy": self._strategy,
+        }
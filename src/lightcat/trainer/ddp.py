@@ -0,0 +1,261 @@
+r"""Contain utility functions to configure the gradient communication of
+``DistributedDataParallel``."""
+
+from __future__ import annotations
+
+__all__ = [
+    "COMM_HOOKS",
+    "COMM_WRAPPERS",
+    "get_comm_hook",
+    "get_comm_wrapper",
+    "get_ddp_strategy",
+    "register_comm_hook",
+]
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+import torch
+from lightning.pytorch.strategies import DDPStrategy
+from torch.distributed.algorithms.ddp_comm_hooks import default_hooks, powerSGD_hook
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+    from torch.nn.parallel import DistributedDataParallel
+
+logger = logging.getLogger(__name__)
+
+
+# ``DistributedDataParallel`` checks the annotations of the hooks at
+# runtime, so the arguments of the hooks are not annotated.
+def _bf16_compress_hook(process_group, bucket):  # noqa: ANN001, ANN202
+    r"""Compress the gradients to ``bfloat16`` before the all-reduce.
+
+    ``torch.distributed.algorithms.ddp_comm_hooks.default_hooks.bf16_compress_hook``
+    is rejected by ``DistributedDataParallel`` if PyTorch is not built
+    with CUDA, even with the ``gloo`` backend.
+    """
+    return default_hooks._compress_hook(torch.bfloat16, process_group, bucket)
+
+
+def _powersgd_hook(state, bucket):  # noqa: ANN001, ANN202
+    r"""Run the PowerSGD hook with a state created at the first call."""
+    return powerSGD_hook.powerSGD_hook(state.get(), bucket)
+
+
+# The communication hooks. The gradients are compressed to ``float16``
+# or ``bfloat16`` before the all-reduce, or approximated by low-rank
+# matrices with PowerSGD.
+COMM_HOOKS = {
+    "fp16": default_hooks.fp16_compress_hook,
+    "bf16": _bf16_compress_hook,
+    "powersgd": _powersgd_hook,
+}
+# The wrappers that compress the gradients communicated by another
+# communication hook, for example PowerSGD.
+COMM_WRAPPERS = {"fp16": default_hooks.fp16_compress_wrapper}
+
+
+class _PowerSGDState:
+    r"""Implement a PowerSGD state that creates the
+    ``PowerSGDState`` at the first call of the hook.
+
+    ``PowerSGDState`` cannot be unpickled before the default process
+    group is initialized, so it cannot be sent to the processes
+    started by the DDP strategy.
+
+    Args:
+        process_group: The process group. If ``None``, the default
+            process group is used.
+        **kwargs: The other keyword arguments of ``PowerSGDState``.
+    """
+
+    def __init__(self, process_group: Any = None, **kwargs: Any) -> None:
+        self._process_group = process_group
+        self._kwargs = kwargs
+        self._state: powerSGD_hook.PowerSGDState | None = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {**self.__dict__, "_state": None}
+
+    def get(self) -> powerSGD_hook.PowerSGDState:
+        r"""Get the ``PowerSGDState``.
+
+        Returns:
+            The ``PowerSGDState``.
+        """
+        if self._state is None:
+            self._state = powerSGD_hook.PowerSGDState(
+                process_group=self._process_group, **self._kwargs
+            )
+        return self._state
+
+
+def get_comm_hook(
+    name: str, powersgd: Mapping[str, Any] | None = None, process_group: Any = None
+) -> tuple[Any, Callable]:
+    r"""Get a ``DistributedDataParallel`` communication hook and its
+    state.
+
+    Args:
+        name: The name of the communication hook. The valid names are
+            ``'fp16'``, ``'bf16'``, and ``'powersgd'``.
+        powersgd: The keyword arguments of ``PowerSGDState``, for
+            example ``{"matrix_approximation_rank": 2,
+            "start_powerSGD_iter": 1000}``. It is only used by the
+            PowerSGD hook, whose ``PowerSGDState`` is created at the
+            first call of the hook.
+        process_group: The process group. If ``None``, the default
+            process group is used.
+
+    Returns:
+        The state and the communication hook.
+
+    Raises:
+        ValueError: if the name is not valid.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.trainer.ddp import get_comm_hook
+    >>> state, hook = get_comm_hook("fp16")
+    >>> hook.__name__
+    'fp16_compress_hook'
+    >>> state, hook = get_comm_hook("powersgd", powersgd={"matrix_approximation_rank": 2})
+    >>> state.get().matrix_approximation_rank
+    2
+
+    ```
+    """
+    if name not in COMM_HOOKS:
+        msg = f"Incorrect communication hook: {name}. The valid hooks are: {tuple(COMM_HOOKS)}"
+        raise ValueError(msg)
+    state = process_group
+    if name == "powersgd":
+        state = _PowerSGDState(process_group=process_group, **(powersgd or {}))
+    return state, COMM_HOOKS[name]
+
+
+def get_comm_wrapper(name: str) -> Callable:
+    r"""Get a ``DistributedDataParallel`` communication hook wrapper.
+
+    Args:
+        name: The name of the wrapper. The valid name is ``'fp16'``.
+
+    Returns:
+        The communication hook wrapper.
+
+    Raises:
+        ValueError: if the name is not valid.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.trainer.ddp import get_comm_wrapper
+    >>> get_comm_wrapper("fp16").__name__
+    'fp16_compress_wrapper'
+
+    ```
+    """
+    if name not in COMM_WRAPPERS:
+        msg = (
+            f"Incorrect communication hook wrapper: {name}. "
+            f"The valid wrappers are: {tuple(COMM_WRAPPERS)}"
+        )
+        raise ValueError(msg)
+    return COMM_WRAPPERS[name]
+
+
+def register_comm_hook(
+    model: DistributedDataParallel,
+    comm_hook: str,
+    comm_wrapper: str | None = None,
+    powersgd: Mapping[str, Any] | None = None,
+) -> None:
+    r"""Register a communication hook on a ``DistributedDataParallel``
+    model.
+
+    Args:
+        model: The model.
+        comm_hook: The name of the communication hook. See
+            ``get_comm_hook`` for the valid names.
+        comm_wrapper: The name of the communication hook wrapper. If
+            ``None``, the hook is not wrapped. See
+            ``get_comm_wrapper`` for the valid names.
+        powersgd: The keyword arguments of ``PowerSGDState``.
+
+    Raises:
+        ValueError: if the name of the hook or the wrapper is not
+            valid.
+    """
+    state, hook = get_comm_hook(comm_hook, powersgd=powersgd, process_group=model.process_group)
+    if comm_wrapper is not None:
+        hook = get_comm_wrapper(comm_wrapper)(hook)
+    model.register_comm_hook(state=state, hook=hook)
+
+
+def get_ddp_strategy(
+    comm_hook: str | None = None,
+    comm_wrapper: str | None = None,
+    bucket_cap_mb: float | None = None,
+    powersgd: Mapping[str, Any] | None = None,
+    **kwargs: Any,
+) -> DDPStrategy:
+    r"""Get a ``DDPStrategy`` with a communication hook and a bucket
+    size.
+
+    On CPU, the gradient all-reduce over ``gloo`` is often limited by
+    the bandwidth. The communication hooks reduce the communicated
+    bytes: ``'fp16'`` and ``'bf16'`` halve them, and PowerSGD sends
+    low-rank approximations of the gradients. Larger buckets reduce
+    the number of all-reduce calls, while smaller buckets start the
+    communication earlier during the backward pass.
+
+    Args:
+        comm_hook: The name of the communication hook. If ``None``,
+            the default all-reduce is used. See ``get_comm_hook`` for
+            the valid names.
+        comm_wrapper: The name of the communication hook wrapper. If
+            ``None``, the hook is not wrapped. See
+            ``get_comm_wrapper`` for the valid names.
+        bucket_cap_mb: The maximum size of a gradient bucket in MB. If
+            ``None``, the default size of ``DistributedDataParallel``
+            is used.
+        powersgd: The keyword arguments of ``PowerSGDState``.
+        **kwargs: The other keyword arguments of ``DDPStrategy``.
+
+    Returns:
+        The strategy.
+
+    Raises:
+        ValueError: if the name of the hook or the wrapper is not
+            valid, or if a wrapper is given without a hook.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.trainer.ddp import get_ddp_strategy
+    >>> strategy = get_ddp_strategy(comm_hook="bf16", bucket_cap_mb=50)
+    >>> strategy
+    <lightning.pytorch.strategies.ddp.DDPStrategy object at 0x...>
+
+    ```
+    """
+    if comm_wrapper is not None and comm_hook is None:
+        msg = f"A communication hook is required to use the wrapper {comm_wrapper}"
+        raise ValueError(msg)
+    if comm_hook is not None:
+        # The process group is created by the strategy, so the default
+        # process group is used.
+        kwargs["ddp_comm_state"], kwargs["ddp_comm_hook"] = get_comm_hook(
+            comm_hook, powersgd=powersgd
+        )
+    if comm_wrapper is not None:
+        kwargs["ddp_comm_wrapper"] = get_comm_wrapper(comm_wrapper)
+    if bucket_cap_mb is not None:
+        kwargs["bucket_cap_mb"] = bucket_cap_mb
+    return DDPStrategy(**kwargs)
@@ -0,0 +1,317 @@
+r"""Contain utility functions to manage distributed training."""
+
+from __future__ import annotations
+
+__all__ = [
+    "all_gather_object",
+    "all_reduce",
+    "broadcast_object",
+    "build_and_broadcast",
+    "get_gloo_group",
+    "get_local_rank",
+    "get_rank",
+    "get_world_size",
+    "is_distributed",
+]
+
+import logging
+import os
+from typing import TYPE_CHECKING, Any
+
+from torch import distributed as dist
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    import torch
+
+logger = logging.getLogger(__name__)
+
+_gloo_groups: dict[Any, Any] = {}
+
+
+def is_distributed() -> bool:
+    r"""Indicate if the default process group is initialized.
+
+    Returns:
+        ``True`` if the default process group is initialized,
+            otherwise ``False``.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.distributed import is_distributed
+    >>> is_distributed()
+    False
+
+    ```
+    """
+    return dist.is_available() and dist.is_initialized()
+
+
+def get_rank() -> int:
+    r"""Get the global rank of the current process.
+
+    Returns:
+        The global rank, or ``0`` if the default process group is not
+            initialized.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.distributed import get_rank
+    >>> get_rank()
+    0
+
+    ```
+    """
+    return dist.get_rank() if is_distributed() else 0
+
+
+def get_world_size() -> int:
+    r"""Get the number of processes in the default process group.
+
+    Returns:
+        The world size, or ``1`` if the default process group is not
+            initialized.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.distributed import get_world_size
+    >>> get_world_size()
+    1
+
+    ```
+    """
+    return dist.get_world_size() if is_distributed() else 1
+
+
+def get_local_rank() -> int:
+    r"""Get the rank of the current process on its node.
+
+    The local rank is read from the ``LOCAL_RANK`` environment
+    variable, which is set by ``torchrun`` and Lightning.
+
+    Returns:
+        The local rank, or ``0`` if the ``LOCAL_RANK`` environment
+            variable is not set.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.distributed import get_local_rank
+    >>> get_local_rank()
+    0
+
+    ```
+    """
+    return int(os.environ.get("LOCAL_RANK", "0"))
+
+
+def get_gloo_group() -> Any:
+    r"""Get a process group with the ``gloo`` backend and all the
+    processes.
+
+    The default process group is returned if its backend is
+    ``gloo``, otherwise a new ``gloo`` process group is created the
+    first time this function is called. This function must be called
+    by all the processes because creating a process group is a
+    collective operation.
+
+    Returns:
+        The ``gloo`` process group.
+
+    Raises:
+        RuntimeError: if the default process group is not
+            initialized.
+    """
+    if not is_distributed():
+        msg = "The default process group is not initialized"
+        raise RuntimeError(msg)
+    if dist.get_backend() == dist.Backend.GLOO:
+        return dist.group.WORLD
+    default_group = dist.group.WORLD
+    if default_group not in _gloo_groups:
+        logger.info("Creating a 'gloo' process group...")
+        _gloo_groups[default_group] = dist.new_group(backend=dist.Backend.GLOO)
+    return _gloo_groups[default_group]
+
+
+def all_gather_object(obj: Any, group: Any = None) -> list[Any]:
+    r"""Gather a picklable object from all the processes.
+
+    Args:
+        obj: The object to send from the current process.
+        group: The process group. If ``None``, the ``gloo`` process
+            group returned by ``get_gloo_group`` is used.
+
+    Returns:
+        The objects of all the processes, ordered by rank. If the
+            default process group is not initialized, a list with
+            only the input object is returned.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.distributed import all_gather_object
+    >>> all_gather_object({"key": 1})
+    [{'key': 1}]
+
+    ```
+    """
+    if not is_distributed():
+        return [obj]
+    if group is None:
+        group = get_gloo_group()
+    objects = [None] * dist.get_world_size(group)
+    dist.all_gather_object(objects, obj, group=group)
+    return objects
+
+
+def broadcast_object(obj: Any, src: int = 0, group: Any = None) -> Any:
+    r"""Broadcast a picklable object from a process to all the processes.
+
+    Args:
+        obj: The object to send. It is only used by the source
+            process, so the other processes can give ``None``.
+        src: The global rank of the source process.
+        group: The process group. If ``None``, the ``gloo`` process
+            group returned by ``get_gloo_group`` is used.
+
+    Returns:
+        The object of the source process. If the default process
+            group is not initialized, the input object is returned.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.distributed import broadcast_object
+    >>> broadcast_object({"key": 1})
+    {'key': 1}
+
+    ```
+    """
+    if not is_distributed():
+        return obj
+    if group is None:
+        group = get_gloo_group()
+    objects = [obj]
+    dist.broadcast_object_list(objects, src=src, group=group)
+    return objects[0]
+
+
+class _BuildError:
+    r"""Implement the object broadcast by the source process when the
+    build fails, so the other processes do not wait for an object that
+    is never sent.
+
+    Args:
+        message: The message of the exception raised by the build.
+    """
+
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+
+def build_and_broadcast(builder: Callable[[], Any], src: int = 0, group: Any = None) -> Any:
+    r"""Build an object in a process and broadcast it to all the
+    processes.
+
+    Only the source process calls ``builder``, so an expensive object,
+    for example an index or a vocabulary, is built once instead of
+    once per process. The other processes wait until the object is
+    received. If the build fails in the source process, the other
+    processes raise a ``RuntimeError`` instead of waiting.
+
+    Args:
+        builder: The function that builds the object. The object must
+            be picklable.
+        src: The global rank of the process that builds the object.
+        group: The process group. If ``None``, the ``gloo`` process
+            group returned by ``get_gloo_group`` is used.
+
+    Returns:
+        The object built by the source process. If the default process
+            group is not initialized, the object is built by the
+            current process.
+
+    Raises:
+        RuntimeError: if the build fails in the source process.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.distributed import build_and_broadcast
+    >>> build_and_broadcast(lambda: {"vocab": ["a", "b"]})
+    {'vocab': ['a', 'b']}
+
+    ```
+    """
+    if not is_distributed():
+        return builder()
+    if get_rank() == src:
+        try:
+            obj = builder()
+        except Exception as exc:
+            broadcast_object(_BuildError(repr(exc)), src=src, group=group)
+            raise
+        return broadcast_object(obj, src=src, group=group)
+    obj = broadcast_object(None, src=src, group=group)
+    if isinstance(obj, _BuildError):
+        msg = f"The build failed in the process with rank {src}: {obj.message}"
+        raise RuntimeError(msg)  # noqa: TRY004
+    return obj
+
+
+def all_reduce(tensor: torch.Tensor, op: str = "sum", group: Any = None) -> torch.Tensor:
+    r"""Reduce a tensor across all the processes.
+
+    The tensor is reduced in-place. Packing several values in a single
+    tensor reduces them with a single collective operation.
+
+    Args:
+        tensor: The tensor to reduce. It must be on a device supported
+            by the backend of the process group.
+        op: The reduction operation. The valid values are ``'sum'``,
+            ``'min'``, ``'max'``, and ``'product'``.
+        group: The process group. If ``None``, the default process
+            group is used.
+
+    Returns:
+        The reduced tensor. If the default process group is not
+            initialized, the input tensor is returned unchanged.
+
+    Raises:
+        ValueError: if the reduction operation is not valid.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.utils.distributed import all_reduce
+    >>> all_reduce(torch.tensor([1.0, 2.0]))
+    tensor([1., 2.])
+
+    ```
+    """
+    ops = {
+        "sum": dist.ReduceOp.SUM,
+        "min": dist.ReduceOp.MIN,
+        "max": dist.ReduceOp.MAX,
+        "product": dist.ReduceOp.PRODUCT,
+    }
+    if op not in ops:
+        msg = f"Incorrect reduction operation: {op}. The valid operations are: {tuple(ops)}"
+        raise ValueError(msg)
+    if is_distributed():
+        dist.all_reduce(tensor, op=ops[op], group=group)
+    return tensor
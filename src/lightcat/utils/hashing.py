@@ -0,0 +1,90 @@
+r"""Contain utility functions to compute the hashes used to fingerprint
+cached outputs."""
+
+from __future__ import annotations
+
+__all__ = ["hash_config", "hash_state_dict"]
+
+import hashlib
+import json
+import logging
+from typing import TYPE_CHECKING, Any
+
+import torch
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+logger = logging.getLogger(__name__)
+
+
+def hash_config(config: Any) -> str:
+    r"""Compute the SHA-256 hash of a configuration.
+
+    The configuration is serialized to JSON with sorted keys, and the
+    values that are not JSON serializable are replaced by their
+    string representation.
+
+    Args:
+        config: The configuration.
+
+    Returns:
+        The hexadecimal hash.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.hashing import hash_config
+    >>> hash_config({"b": 1, "a": [1, 2]}) == hash_config({"a": [1, 2], "b": 1})
+    True
+
+    ```
+    """
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def hash_state_dict(state_dict: torch.nn.Module | Mapping[str, Any]) -> str:
+    r"""Compute the SHA-256 hash of the tensors of a state dict.
+
+    The hash depends on the names, the data types, the shapes and the
+    values of the tensors, but not on their devices. The values that
+    are not tensors are hashed by their string representation.
+
+    Args:
+        state_dict: The state dict, or a module whose state dict is
+            hashed.
+
+    Returns:
+        The hexadecimal hash.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.utils.hashing import hash_state_dict
+    >>> module = torch.nn.Linear(4, 2)
+    >>> hash_state_dict(module) == hash_state_dict(module.state_dict())
+    True
+    >>> with torch.no_grad():
+    ...     _ = module.weight.add_(1)
+    ...
+    >>> hash_state_dict(module) == hash_state_dict(torch.nn.Linear(4, 2))
+    False
+
+    ```
+    """
+    if isinstance(state_dict, torch.nn.Module):
+        state_dict = state_dict.state_dict()
+    sha = hashlib.sha256()
+    for key in sorted(state_dict):
+        value = state_dict[key]
+        sha.update(key.encode())
+        if torch.is_tensor(value):
+            tensor = value.detach().cpu().contiguous().reshape(-1)
+            sha.update(f"{tensor.dtype}{tuple(value.shape)}".encode())
+            sha.update(tensor.view(torch.uint8).numpy().tobytes())
+        else:
+            sha.update(str(value).encode())
+    return sha.hexdigest()
@@ -4,13 +4,22 @@ from __future__ import annotations
 
 __all__ = [
     "check_karbonn",
+    "check_numpy",
     "check_objectory",
+    "check_onnx",
+    "check_onnxruntime",
     "check_torchmetrics",
     "is_karbonn_available",
+    "is_numpy_available",
     "is_objectory_available",
+    "is_onnx_available",
+    "is_onnxruntime_available",
     "is_torchmetrics_available",
     "karbonn_available",
+    "numpy_available",
     "objectory_available",
+    "onnx_available",
+    "onnxruntime_available",
     "torchmetrics_available",
 ]
 
@@ -96,6 +105,80 @@ def karbonn_available(fn: Callable[..., Any]) -> Callable[..., Any]:
     return decorator_package_available(fn, is_karbonn_available)
 
 
+#################
+#     numpy     #
+#################
+
+
+def is_numpy_available() -> bool:
+    r"""Indicate if the ``numpy`` package is installed or not.
+
+    Returns:
+        ``True`` if ``numpy`` is available otherwise ``False``.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.imports import is_numpy_available
+    >>> is_numpy_available()
+
+    ```
+    """
+    return package_available("numpy")
+
+
+def check_numpy() -> None:
+    r"""Check if the ``numpy`` package is installed.
+
+    Raises:
+        RuntimeError: if the ``numpy`` package is not installed.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.imports import check_numpy
+    >>> check_numpy()
+
+    ```
+    """
+    if not is_numpy_available():
+        msg = (
+            "'numpy' package is required but not installed. "
+            "You can install 'numpy' package with the command:\n\n"
+            "pip install numpy\n"
+        )
+        raise RuntimeError(msg)
+
+
+def numpy_available(fn: Callable[..., Any]) -> Callable[..., Any]:
+    r"""Implement a decorator to execute a function only if ``numpy``
+    package is installed.
+
+    Args:
+        fn: The function to execute.
+
+    Returns:
+        A wrapper around ``fn`` if ``numpy`` package is installed,
+            otherwise ``None``.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.imports import numpy_available
+    >>> @numpy_available
+    ... def my_function(n: int = 0) -> int:
+    ...     return 42 + n
+    ...
+    >>> my_function()
+
+    ```
+    """
+    return decorator_package_available(fn, is_numpy_available)
+
+
 #####################
 #     objectory     #
 #####################
@@ -170,6 +253,154 @@ def objectory_available(fn: Callable[..., Any]) -> Callable[..., Any]:
     return decorator_package_available(fn, is_objectory_available)
 
 
+################
+#     onnx     #
+################
+
+
+def is_onnx_available() -> bool:
+    r"""Indicate if the ``onnx`` package is installed or not.
+
+    Returns:
+        ``True`` if ``onnx`` is available otherwise ``False``.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.imports import is_onnx_available
+    >>> is_onnx_available()
+
+    ```
+    """
+    return package_available("onnx")
+
+
+def check_onnx() -> None:
+    r"""Check if the ``onnx`` package is installed.
+
+    Raises:
+        RuntimeError: if the ``onnx`` package is not installed.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.imports import check_onnx
+    >>> check_onnx()
+
+    ```
+    """
+    if not is_onnx_available():
+        msg = (
+            "'onnx' package is required but not installed. "
+            "You can install 'onnx' package with the command:\n\n"
+            "pip install onnx\n"
+        )
+        raise RuntimeError(msg)
+
+
+def onnx_available(fn: Callable[..., Any]) -> Callable[..., Any]:
+    r"""Implement a decorator to execute a function only if
+    ``onnx`` package is installed.
+
+    Args:
+        fn: The function to execute.
+
+    Returns:
+        A wrapper around ``fn`` if ``onnx`` package is installed,
+            otherwise ``None``.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.imports import onnx_available
+    >>> @onnx_available
+    ... def my_function(n: int = 0) -> int:
+    ...     return 42 + n
+    ...
+    >>> my_function()
+
+    ```
+    """
+    return decorator_package_available(fn, is_onnx_available)
+
+
+#######################
+#     onnxruntime     #
+#######################
+
+
+def is_onnxruntime_available() -> bool:
+    r"""Indicate if the ``onnxruntime`` package is installed or not.
+
+    Returns:
+        ``True`` if ``onnxruntime`` is available otherwise ``False``.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.imports import is_onnxruntime_available
+    >>> is_onnxruntime_available()
+
+    ```
+    """
+    return package_available("onnxruntime")
+
+
+def check_onnxruntime() -> None:
+    r"""Check if the ``onnxruntime`` package is installed.
+
+    Raises:
+        RuntimeError: if the ``onnxruntime`` package is not installed.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.imports import check_onnxruntime
+    >>> check_onnxruntime()
+
+    ```
+    """
+    if not is_onnxruntime_available():
+        msg = (
+            "'onnxruntime' package is required but not installed. "
+            "You can install 'onnxruntime' package with the command:\n\n"
+            "pip install onnxruntime\n"
+        )
+        raise RuntimeError(msg)
+
+
+def onnxruntime_available(fn: Callable[..., Any]) -> Callable[..., Any]:
+    r"""Implement a decorator to execute a function only if
+    ``onnxruntime`` package is installed.
+
+    Args:
+        fn: The function to execute.
+
+    Returns:
+        A wrapper around ``fn`` if ``onnxruntime`` package is installed,
+            otherwise ``None``.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.imports import onnxruntime_available
+    >>> @onnxruntime_available
+    ... def my_function(n: int = 0) -> int:
+    ...     return 42 + n
+    ...
+    >>> my_function()
+
+    ```
+    """
+    return decorator_package_available(fn, is_onnxruntime_available)
+
+
 ########################
 #     torchmetrics     #
 ########################
@@ -0,0 +1,165 @@
+r"""Contain utility functions to synchronize the states of
+``torchmetrics.Metric`` objects across processes."""
+
+from __future__ import annotations
+
+__all__ = ["supports_fused_sync", "sync_metric_states"]
+
+import logging
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any
+
+import torch
+
+from lightcat.utils.distributed import all_reduce, get_world_size, is_distributed
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from torchmetrics import Metric
+
+logger = logging.getLogger(__name__)
+
+# The collective operation used to reduce the states of each
+# ``torchmetrics`` reduction function. The states reduced with the mean
+# are summed and divided by the number of processes.
+_REDUCTION_OPS = {
+    "dim_zero_sum": "sum",
+    "dim_zero_mean": "sum",
+    "dim_zero_max": "max",
+    "dim_zero_min": "min",
+}
+
+
+def supports_fused_sync(metric: Metric) -> bool:
+    r"""Indicate if the states of a metric can be synchronized with
+    ``sync_metric_states``.
+
+    The states must be tensors reduced with a sum, a mean, a maximum
+    or a minimum. The list states, for example the predictions
+    concatenated by ``torchmetrics.classification.BinaryAUROC``, and
+    the states with a custom reduction function are not supported.
+
+    Args:
+        metric: The metric.
+
+    Returns:
+        ``True`` if the states of the metric can be synchronized with
+            ``sync_metric_states``, otherwise ``False``.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from torchmetrics.classification import BinaryAccuracy, BinaryAUROC
+    >>> from lightcat.utils.metric import supports_fused_sync
+    >>> supports_fused_sync(BinaryAccuracy())
+    True
+    >>> supports_fused_sync(BinaryAUROC())
+    False
+
+    ```
+    """
+    return all(
+        _get_reduction_name(reduction) in _REDUCTION_OPS and torch.is_tensor(getattr(metric, name))
+        for name, reduction in metric._reductions.items()
+    )
+
+
+def sync_metric_states(metrics: Sequence[Metric], group: Any = None) -> None:
+    r"""Synchronize the states of some metrics across all the
+    processes with one collective operation per reduction type.
+
+    ``torchmetrics`` synchronizes each state of each metric with a
+    separate ``all_gather``. This function packs all the states that are
+    reduced with the same operation in a flat ``float64`` buffer, so the
+    states of all the metrics are usually synchronized with a single
+    ``all_reduce``. The states are replaced in-place by the reduced
+    states. The metrics should not synchronize their states again in
+    ``compute``, so ``sync_on_compute`` should be ``False``. The numbers
+    of updates are also summed, so ``update_called`` is ``True`` on all
+    the processes if a process updated the metric. All the processes
+    must synchronize the same metrics, even the metrics they did not
+    update. This function does nothing if the default process group is
+    not initialized.
+
+    Args:
+        metrics: The metrics to synchronize.
+        group: The process group. If ``None``, the default process
+            group is used.
+
+    Raises:
+        ValueError: if the states of a metric are not supported. The
+            metrics can be checked with ``supports_fused_sync``.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from torchmetrics.classification import BinaryAccuracy
+    >>> from lightcat.utils.metric import sync_metric_states
+    >>> metric = BinaryAccuracy(sync_on_compute=False)
+    >>> metric.update(torch.tensor([0.9, 0.2]), torch.tensor([1, 1]))
+    >>> sync_metric_states([metric])
+    >>> metric.compute()
+    tensor(0.5000)
+
+    ```
+    """
+    for metric in metrics:
+        if not supports_fused_sync(metric):
+            msg = (
+                f"The states of {metric.__class__.__qualname__} cannot be synchronized with "
+                "a fused all-reduce because some of its states are lists or use a custom "
+                "reduction function"
+            )
+            raise ValueError(msg)
+    if not is_distributed() or not metrics:
+        return
+    buckets = defaultdict(list)
+    for metric in metrics:
+        for name, reduction in metric._reductions.items():
+            buckets[_REDUCTION_OPS[_get_reduction_name(reduction)]].append((metric, name))
+    world_size = get_world_size()
+    # The numbers of updates are summed with the states, so
+    # ``update_called`` is the same on all the processes.
+    buckets.setdefault("sum", [])
+    for op, states in buckets.items():
+        values = [getattr(metric, name) for metric, name in states]
+        tensors = [value.detach().reshape(-1).to(dtype=torch.float64) for value in values]
+        if op == "sum":
+            tensors.append(
+                torch.tensor(
+                    [metric._update_count for metric in metrics],
+                    dtype=torch.float64,
+                    device=metrics[0].device,
+                )
+            )
+        buffer = all_reduce(torch.cat(tensors), op=op, group=group)
+        if op == "sum":
+            buffer, counts = buffer.split([buffer.numel() - len(metrics), len(metrics)])
+            for metric, count in zip(metrics, counts.tolist()):
+                metric._update_count = round(count)
+        for (metric, name), value, reduced in zip(
+            states, values, buffer.split([value.numel() for value in values])
+        ):
+            value_ = reduced
+            if _get_reduction_name(metric._reductions[name]) == "dim_zero_mean":
+                value_ = value_ / world_size
+            if not value.is_floating_point():
+                value_ = value_.round()
+            setattr(metric, name, value_.reshape(value.shape).to(dtype=value.dtype))
+
+
+def _get_reduction_name(reduction: Any) -> str | None:
+    r"""Get the name of a ``torchmetrics`` reduction function.
+
+    Args:
+        reduction: The reduction function.
+
+    Returns:
+        The name of the reduction function, or ``None`` if there is no
+            reduction function.
+    """
+    return getattr(reduction, "__name__", None)
@@ -0,0 +1,116 @@
+r"""Contain utility functions to select the submodules of a model by
+name or by type."""
+
+from __future__ import annotations
+
+__all__ = ["ModuleMatcher", "get_class"]
+
+import importlib
+import logging
+import re
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    import torch
+
+logger = logging.getLogger(__name__)
+
+
+class ModuleMatcher:
+    r"""Implement a matcher to select the submodules of a model by name
+    or by type.
+
+    A submodule matches if its name matches one of the regular
+    expressions in ``names``, or if it is an instance of one of the
+    types in ``types``. A type can be given by the class, by its import
+    path, for example ``'torch.nn.LayerNorm'``, or by its class name,
+    for example ``'LayerNorm'``. A class name matches the class of the
+    submodule and its base classes.
+
+    Args:
+        names: The regular expressions to select the submodules by
+            name.
+        types: The types of the submodules to select.
+        fullmatch: If ``True``, the regular expressions must match
+            the whole name, otherwise they can match any part of the
+            name.
+
+    Example usage:
+
+    ```pycon
+
+    >>> import torch
+    >>> from lightcat.utils.modules import ModuleMatcher
+    >>> matcher = ModuleMatcher(names=[r"bias$"], types=["LayerNorm"])
+    >>> matcher.match("0.bias", torch.nn.Linear(4, 8))
+    True
+    >>> matcher.match("1.weight", torch.nn.LayerNorm(8))
+    True
+    >>> matcher.match("0.weight", torch.nn.Linear(4, 8))
+    False
+
+    ```
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str] = (),
+        types: Sequence[type | str] = (),
+        fullmatch: bool = False,
+    ) -> None:
+        self._patterns = [re.compile(name) for name in names]
+        self._classes = tuple(
+            get_class(cls) for cls in types if not isinstance(cls, str) or "." in cls
+        )
+        self._class_names = {cls for cls in types if isinstance(cls, str) and "." not in cls}
+        self._fullmatch = bool(fullmatch)
+
+    def match(self, name: str, module: torch.nn.Module) -> bool:
+        r"""Indicate if a submodule, or a parameter of this submodule,
+        matches.
+
+        Args:
+            name: The name of the submodule or of the parameter.
+            module: The submodule, or the submodule that owns the
+                parameter.
+
+        Returns:
+            ``True`` if the name or the type matches, otherwise
+                ``False``.
+        """
+        if self._fullmatch:
+            name_match = any(pattern.fullmatch(name) for pattern in self._patterns)
+        else:
+            name_match = any(pattern.search(name) for pattern in self._patterns)
+        return (
+            name_match
+            or isinstance(module, self._classes)
+            or any(cls.__name__ in self._class_names for cls in type(module).__mro__)
+        )
+
+
+def get_class(cls: type | str) -> type:
+    r"""Get a class from the class or its import path.
+
+    Args:
+        cls: The class or its import path.
+
+    Returns:
+        The class.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.modules import get_class
+    >>> get_class("torch.nn.Linear")
+    <class 'torch.nn.modules.linear.Linear'>
+
+    ```
+    """
+    if not isinstance(cls, str):
+        return cls
+    module_name, name = cls.rsplit(".", maxsplit=1)
+    return getattr(importlib.import_module(module_name), name)
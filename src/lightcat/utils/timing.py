@@ -0,0 +1,68 @@
+r"""Contain utility functions to measure the execution time."""
+
+from __future__ import annotations
+
+__all__ = ["measure"]
+
+import logging
+import statistics
+import timeit
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+
+def measure(
+    fn: Callable[[], Any], number: int = 10, repeat: int = 5, warmup: int = 1
+) -> dict[str, float | int]:
+    r"""Measure the execution time of a function.
+
+    The function is called ``number`` times in each of the ``repeat``
+    measurements, and the statistics are computed on the average time
+    per call of each measurement. The garbage collector is disabled
+    during the measurements.
+
+    Args:
+        fn: The function to measure.
+        number: The number of calls in each measurement.
+        repeat: The number of measurements.
+        warmup: The number of calls before the measurements.
+
+    Returns:
+        The statistics of the time per call in seconds.
+
+    Raises:
+        ValueError: if ``number`` or ``repeat`` is lower than 1.
+
+    Example usage:
+
+    ```pycon
+
+    >>> from lightcat.utils.timing import measure
+    >>> stats = measure(lambda: sum(range(100)), number=10, repeat=3)
+    >>> sorted(stats)
+    ['max', 'mean', 'median', 'min', 'number', 'repeat', 'stdev']
+
+    ```
+    """
+    if number < 1:
+        msg = f"number must be greater than 0 (received: {number})"
+        raise ValueError(msg)
+    if repeat < 1:
+        msg = f"repeat must be greater than 0 (received: {repeat})"
+        raise ValueError(msg)
+    for _ in range(warmup):
+        fn()
+    times = [total / number for total in timeit.Timer(fn).repeat(repeat=repeat, number=number)]
+    return {
+        "min": min(times),
+        "max": max(times),
+        "mean": statistics.fmean(times),
+        "median": statistics.median(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "number": number,
+        "repeat": repeat,
+    }
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+import torch
+from lightning.pytorch.demos.boring_classes import BoringModel
+
+from lightcat.benchmark import run_allreduce_benchmark
+from lightcat.benchmark.allreduce import _terminate_processes, _TrainingStepModule
+from lightcat.testing import objectory_available
+
+MODEL = {
+    "_target_": "lightcat.model.creator.ModelCreator",
+    "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+}
+DATAMODULE = {
+    "_target_": "lightcat.datamodule.creator.DataModuleCreator",
+    "datamodule": {"_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"},
+}
+
+
+def run_benchmark(**kwargs: Any) -> dict[str, Any]:
+    return run_allreduce_benchmark(
+        MODEL, DATAMODULE, **({"warmup_steps": 0, "num_steps": 1} | kwargs)
+    )
+
+
+#############################################
+#     Tests for run_allreduce_benchmark     #
+#############################################
+
+
+@objectory_available
+@pytest.mark.timeout(120)
+def test_run_allreduce_benchmark() -> None:
+    results = run_benchmark(num_steps=2)
+    assert sorted(results) == ["benchmarks", "config", "environment", "gradients"]
+    assert sorted(results["benchmarks"]) == [
+        "allreduce.bf16.bucket_25mb.comm_time",
+        "allreduce.bf16.bucket_25mb.step_time",
+        "allreduce.fp16.bucket_25mb.comm_time",
+        "allreduce.fp16.bucket_25mb.step_time",
+        "allreduce.no_sync.step_time",
+        "allreduce.none.bucket_25mb.comm_time",
+        "allreduce.none.bucket_25mb.step_time",
+        "allreduce.powersgd.bucket_25mb.comm_time",
+        "allreduce.powersgd.bucket_25mb.step_time",
+    ]
+    assert results["benchmarks"]["allreduce.no_sync.step_time"]["number"] == 2
+    assert results["gradients"]["num_parameters"] == 66
+
+
+@objectory_available
+@pytest.mark.timeout(120)
+def test_run_allreduce_benchmark_bucket_cap_mb() -> None:
+    results = run_benchmark(comm_hooks=["fp16"], bucket_cap_mb=[1, 0.5], num_processes=3)
+    assert sorted(results["benchmarks"]) == [
+        "allreduce.fp16.bucket_0.5mb.comm_time",
+        "allreduce.fp16.bucket_0.5mb.step_time",
+        "allreduce.fp16.bucket_1mb.comm_time",
+        "allreduce.fp16.bucket_1mb.step_time",
+        "allreduce.no_sync.step_time",
+    ]
+    assert results["config"]["num_processes"] == 3
+
+
+@objectory_available
+@pytest.mark.timeout(120)
+def test_run_allreduce_benchmark_worker_failure() -> None:
+    model = {"_target_": "lightcat.model.creator.ModelCreator", "model": {"_target_": "missing"}}
+    with pytest.raises(Exception, match="missing"):
+        run_allreduce_benchmark(model, DATAMODULE, comm_hooks=[None], warmup_steps=0, num_steps=1)
+
+
+def test_run_allreduce_benchmark_incorrect_comm_hook() -> None:
+    with pytest.raises(ValueError, match="Incorrect communication hook: int8"):
+        run_benchmark(comm_hooks=["int8"])
+
+
+def test_run_allreduce_benchmark_incorrect_num_processes() -> None:
+    with pytest.raises(ValueError, match="num_processes must be greater than 0"):
+        run_benchmark(num_processes=0)
+
+
+def test_run_allreduce_benchmark_incorrect_warmup_steps() -> None:
+    with pytest.raises(ValueError, match="warmup_steps must be greater or equal to 0"):
+        run_allreduce_benchmark(MODEL, DATAMODULE, warmup_steps=-1)
+
+
+def test_run_allreduce_benchmark_incorrect_num_steps() -> None:
+    with pytest.raises(ValueError, match="num_steps must be greater than 0"):
+        run_allreduce_benchmark(MODEL, DATAMODULE, num_steps=0)
+
+
+##########################################
+#     Tests for _terminate_processes     #
+##########################################
+
+
+def test_terminate_processes() -> None:
+    running = Mock(is_alive=Mock(return_value=True))
+    finished = Mock(is_alive=Mock(return_value=False))
+    _terminate_processes([running, finished])
+    running.terminate.assert_called_once_with()
+    finished.terminate.assert_not_called()
+    running.join.assert_called_once_with()
+    finished.join.assert_called_once_with()
+
+
+#########################################
+#     Tests for _TrainingStepModule     #
+#########################################
+
+
+def test_training_step_module() -> None:
+    model = BoringModel()
+    batch = torch.randn(4, 32)
+    assert _TrainingStepModule(model)(batch).equal(model.training_step(batch, 0)["loss"])
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from lightcat.benchmark import load_results, save_results
+from lightcat.benchmark.cli import main
+from lightcat.testing import objectory_available
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+##########################
+#     Tests for main     #
+##########################
+
+
+@objectory_available
+def test_main_factory(capsys: pytest.CaptureFixture) -> None:
+    assert main(["factory", "--benchmarks", "setup_object", "--number", "1", "--repeat", "1"]) == 0
+    assert list(json.loads(capsys.readouterr().out)) == ["setup_object"]
+
+
+@objectory_available
+def test_main_factory_output(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("results.json")
+    main(["factory", "--benchmarks", "setup_object", "--repeat", "1", "--output", str(path)])
+    assert list(load_results(path)["benchmarks"]) == ["setup_object"]
+
+
+@objectory_available
+def test_main_factory_baseline_ok(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    path = tmp_path.joinpath("baseline.json")
+    save_results({"benchmarks": {"setup_object": {"median": 1e6}}}, path)
+    assert main(["factory", "--benchmarks", "setup_object", "--baseline", str(path)]) == 0
+    assert "improvement" in capsys.readouterr().out
+
+
+@objectory_available
+def test_main_factory_baseline_regression(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    path = tmp_path.joinpath("baseline.json")
+    save_results({"benchmarks": {"setup_object": {"median": 1e-12}}}, path)
+    assert main(["factory", "--benchmarks", "setup_object", "--baseline", str(path)]) == 1
+    assert "regression" in capsys.readouterr().out
+
+
+@objectory_available
+def test_main_factory_incorrect_benchmark() -> None:
+    with pytest.raises(SystemExit):
+        main(["factory", "--benchmarks", "missing"])
+
+
+@objectory_available
+def test_main_training(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    config_path = tmp_path.joinpath("config.json")
+    save_results(
+        {
+            "trainer": {
+                "_target_": "lightcat.trainer.creator.TrainerCreator",
+                "trainer": {
+                    "_target_": "lightning.Trainer",
+                    "max_steps": 10,
+                    "default_root_dir": str(tmp_path),
+                    "logger": False,
+                    "enable_checkpointing": False,
+                    "enable_progress_bar": False,
+                },
+            },
+            "model": {
+                "_target_": "lightcat.model.creator.ModelCreator",
+                "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+            },
+            "datamodule": {
+                "_target_": "lightcat.datamodule.creator.DataModuleCreator",
+                "datamodule": {
+                    "_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"
+                },
+            },
+        },
+        config_path,
+    )
+    output_path = tmp_path.joinpath("results.json")
+    assert (
+        main(
+            [
+                "training",
+                "--config",
+                str(config_path),
+                "--warmup-steps",
+                "1",
+                "--num-steps",
+                "3",
+                "--output",
+                str(output_path),
+            ]
+        )
+        == 0
+    )
+    assert "steps_per_sec" in capsys.readouterr().out
+    assert load_results(output_path)["benchmarks"]["training.step_time"]["number"] == 3
+
+
+def test_main_training_missing_config() -> None:
+    with pytest.raises(SystemExit):
+        main(["training"])
+
+
+def test_main_missing_command() -> None:
+    with pytest.raises(SystemExit):
+        main([])
+
+
+@objectory_available
+@pytest.mark.timeout(120)
+def test_main_allreduce(tmp_path: Path) -> None:
+    config_path = tmp_path.joinpath("config.json")
+    save_results(
+        {
+            "model": {
+                "_target_": "lightcat.model.creator.ModelCreator",
+                "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+            },
+            "datamodule": {
+                "_target_": "lightcat.datamodule.creator.DataModuleCreator",
+                "datamodule": {
+                    "_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"
+                },
+            },
+        },
+        config_path,
+    )
+    output_path = tmp_path.joinpath("results.json")
+    assert (
+        main(
+            [
+                "allreduce",
+                "--config",
+                str(config_path),
+                "--comm-hooks",
+                "none",
+                "fp16",
+                "--warmup-steps",
+                "0",
+                "--num-steps",
+                "1",
+                "--output",
+                str(output_path),
+            ]
+        )
+        == 0
+    )
+    results = load_results(output_path)
+    assert results["config"]["comm_hooks"] == [None, "fp16"]
+    assert "allreduce.fp16.bucket_25mb.comm_time" in results["benchmarks"]
+
+
+def test_main_allreduce_incorrect_comm_hook() -> None:
+    with pytest.raises(SystemExit):
+        main(["allreduce", "--config", "config.json", "--comm-hooks", "int8"])
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import pytest
+
+from lightcat.benchmark import get_factory_benchmarks, run_factory_benchmarks
+from lightcat.testing import objectory_available
+
+NAMES = [
+    "DataModuleCreator.create",
+    "ModelCreator.create",
+    "TrainerCreator.create",
+    "setup_callback",
+    "setup_datamodule",
+    "setup_list_callbacks",
+    "setup_model",
+    "setup_object",
+    "setup_trainer",
+]
+
+############################################
+#     Tests for get_factory_benchmarks     #
+############################################
+
+
+@objectory_available
+def test_get_factory_benchmarks() -> None:
+    assert sorted(get_factory_benchmarks()) == NAMES
+
+
+@objectory_available
+@pytest.mark.parametrize("name", NAMES)
+def test_get_factory_benchmarks_call(name: str) -> None:
+    assert get_factory_benchmarks()[name]() is not None
+
+
+############################################
+#     Tests for run_factory_benchmarks     #
+############################################
+
+
+@objectory_available
+def test_run_factory_benchmarks() -> None:
+    results = run_factory_benchmarks(["setup_object", "setup_model"], number=2, repeat=2)
+    assert sorted(results["benchmarks"]) == ["setup_model", "setup_object"]
+    assert results["benchmarks"]["setup_object"]["number"] == 2
+    assert results["benchmarks"]["setup_object"]["repeat"] == 2
+    assert "packages" in results["environment"]
+
+
+@objectory_available
+def test_run_factory_benchmarks_all() -> None:
+    results = run_factory_benchmarks(number=1, repeat=1, warmup=0)
+    assert sorted(results["benchmarks"]) == NAMES
+
+
+@objectory_available
+def test_run_factory_benchmarks_incorrect_name() -> None:
+    with pytest.raises(ValueError, match="Incorrect benchmark name 'missing'"):
+        run_factory_benchmarks(["missing"])
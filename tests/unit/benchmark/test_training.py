@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from lightcat.benchmark import get_peak_rss, run_training_benchmark
+from lightcat.benchmark.training import _compute_distribution, _percentile
+from lightcat.testing import objectory_available
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def get_configs(root_dir: Path, max_steps: int = 20) -> dict:
+    return {
+        "trainer": {
+            "_target_": "lightcat.trainer.creator.TrainerCreator",
+            "trainer": {
+                "_target_": "lightning.Trainer",
+                "accelerator": "cpu",
+                "max_steps": max_steps,
+                "default_root_dir": str(root_dir),
+                "logger": False,
+                "enable_checkpointing": False,
+                "enable_progress_bar": False,
+                "enable_model_summary": False,
+                "num_sanity_val_steps": 0,
+            },
+        },
+        "model": {
+            "_target_": "lightcat.model.creator.ModelCreator",
+            "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+        },
+        "datamodule": {
+            "_target_": "lightcat.datamodule.creator.DataModuleCreator",
+            "datamodule": {"_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"},
+        },
+    }
+
+
+############################################
+#     Tests for run_training_benchmark     #
+############################################
+
+
+@objectory_available
+def test_run_training_benchmark(tmp_path: Path) -> None:
+    results = run_training_benchmark(**get_configs(tmp_path), warmup_steps=2, num_steps=5)
+    assert sorted(results) == ["benchmarks", "config", "environment", "memory", "throughput"]
+    assert sorted(results["benchmarks"]) == [
+        "training.startup.create_datamodule",
+        "training.startup.create_model",
+        "training.startup.create_trainer",
+        "training.startup.first_batch",
+        "training.startup.fit_setup",
+        "training.step_time",
+    ]
+    step_time = results["benchmarks"]["training.step_time"]
+    assert step_time["number"] == 5
+    assert 0 < step_time["min"] <= step_time["median"] <= step_time["max"]
+    assert results["throughput"]["steps_per_sec"] > 0
+    # BoringModel uses batches of 1 sample.
+    assert results["throughput"]["samples_per_sec"] == pytest.approx(
+        results["throughput"]["steps_per_sec"]
+    )
+    assert results["memory"]["peak_rss_mb"] > 0
+
+
+@objectory_available
+def test_run_training_benchmark_no_warmup(tmp_path: Path) -> None:
+    results = run_training_benchmark(**get_configs(tmp_path), warmup_steps=0, num_steps=3)
+    assert results["benchmarks"]["training.step_time"]["number"] == 3
+
+
+@objectory_available
+def test_run_training_benchmark_config(tmp_path: Path) -> None:
+    results = run_training_benchmark(
+        **get_configs(tmp_path), warmup_steps=1, num_steps=2, num_threads=1, seed=42
+    )
+    assert results["config"] == {"warmup_steps": 1, "num_steps": 2, "num_threads": 1, "seed": 42}
+
+
+@objectory_available
+def test_run_training_benchmark_stops_training(tmp_path: Path) -> None:
+    results = run_training_benchmark(
+        **get_configs(tmp_path, max_steps=1000), warmup_steps=1, num_steps=2
+    )
+    assert results["benchmarks"]["training.step_time"]["number"] == 2
+
+
+@objectory_available
+def test_run_training_benchmark_not_enough_steps(tmp_path: Path) -> None:
+    with pytest.raises(RuntimeError, match="The training stopped after 3 steps but 5 steps"):
+        run_training_benchmark(**get_configs(tmp_path, max_steps=3), warmup_steps=1, num_steps=4)
+
+
+def test_run_training_benchmark_incorrect_warmup_steps(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="warmup_steps must be greater or equal to 0"):
+        run_training_benchmark(**get_configs(tmp_path), warmup_steps=-1)
+
+
+@pytest.mark.parametrize("num_steps", [0, -1])
+def test_run_training_benchmark_incorrect_num_steps(tmp_path: Path, num_steps: int) -> None:
+    with pytest.raises(ValueError, match="num_steps must be greater than 0"):
+        run_training_benchmark(**get_configs(tmp_path), num_steps=num_steps)
+
+
+##################################
+#     Tests for get_peak_rss     #
+##################################
+
+
+def test_get_peak_rss() -> None:
+    assert get_peak_rss() > 0
+
+
+###########################################
+#     Tests for _compute_distribution     #
+###########################################
+
+
+def test_compute_distribution() -> None:
+    assert _compute_distribution([3.0, 1.0, 2.0, 4.0]) == {
+        "min": 1.0,
+        "max": 4.0,
+        "mean": 2.5,
+        "median": 2.5,
+        "stdev": pytest.approx(1.2909944487358056),
+        "p90": 4.0,
+        "p99": 4.0,
+        "number": 4,
+    }
+
+
+def test_compute_distribution_one_value() -> None:
+    assert _compute_distribution([1.0])["stdev"] == 0.0
+
+
+#################################
+#     Tests for _percentile     #
+#################################
+
+
+@pytest.mark.parametrize(
+    ("q", "expected"), [(0.0, 1.0), (0.1, 1.0), (0.5, 5.0), (0.9, 9.0), (0.99, 10.0), (1.0, 10.0)]
+)
+def test_percentile(q: float, expected: float) -> None:
+    assert _percentile([float(i) for i in range(1, 11)], q) == expected
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from importlib.metadata import PackageNotFoundError
+from typing import TYPE_CHECKING
+from unittest.mock import Mock, patch
+
+from lightcat.benchmark import (
+    compare_results,
+    format_comparison,
+    get_environment_info,
+    load_results,
+    save_results,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+##########################################
+#     Tests for get_environment_info     #
+##########################################
+
+
+def test_get_environment_info() -> None:
+    info = get_environment_info()
+    assert info["packages"]["torch"] is not None
+    assert info["torch_num_threads"] >= 1
+
+
+def test_get_environment_info_missing_package() -> None:
+    with patch("lightcat.benchmark.utils.version", Mock(side_effect=PackageNotFoundError)):
+        assert get_environment_info()["packages"]["torch"] is None
+
+
+###################################################
+#     Tests for save_results and load_results     #
+###################################################
+
+
+def test_save_and_load_results(tmp_path: Path) -> None:
+    results = {"benchmarks": {"a": {"median": 1.0}}, "environment": {"python": "3.11"}}
+    path = tmp_path.joinpath("results", "results.json")
+    save_results(results, path)
+    assert load_results(path) == results
+
+
+#####################################
+#     Tests for compare_results     #
+#####################################
+
+
+def test_compare_results() -> None:
+    assert compare_results(
+        {"benchmarks": {"a": {"median": 1.5}, "b": {"median": 1.1}, "c": {"median": 0.5}}},
+        {"benchmarks": {"a": {"median": 1.0}, "b": {"median": 1.0}, "c": {"median": 1.0}}},
+    ) == {
+        "a": {"baseline": 1.0, "current": 1.5, "ratio": 1.5, "status": "regression"},
+        "b": {"baseline": 1.0, "current": 1.1, "ratio": 1.1, "status": "ok"},
+        "c": {"baseline": 1.0, "current": 0.5, "ratio": 0.5, "status": "improvement"},
+    }
+
+
+def test_compare_results_threshold() -> None:
+    assert (
+        compare_results(
+            {"benchmarks": {"a": {"median": 1.1}}},
+            {"benchmarks": {"a": {"median": 1.0}}},
+            threshold=0.05,
+        )["a"]["status"]
+        == "regression"
+    )
+
+
+def test_compare_results_key() -> None:
+    assert (
+        compare_results(
+            {"benchmarks": {"a": {"median": 1.0, "min": 2.0}}},
+            {"benchmarks": {"a": {"median": 1.0, "min": 1.0}}},
+            key="min",
+        )["a"]["status"]
+        == "regression"
+    )
+
+
+def test_compare_results_new_and_missing() -> None:
+    assert compare_results(
+        {"benchmarks": {"a": {"median": 1.0}}}, {"benchmarks": {"b": {"median": 2.0}}}
+    ) == {"a": {"current": 1.0, "status": "new"}, "b": {"baseline": 2.0, "status": "missing"}}
+
+
+def test_compare_results_zero_baseline() -> None:
+    assert (
+        compare_results(
+            {"benchmarks": {"a": {"median": 1.0}}}, {"benchmarks": {"a": {"median": 0}}}
+        )["a"]["status"]
+        == "regression"
+    )
+
+
+#######################################
+#     Tests for format_comparison     #
+#######################################
+
+
+def test_format_comparison() -> None:
+    assert format_comparison(
+        {
+            "a": {"baseline": 1.0, "current": 1.5, "ratio": 1.5, "status": "regression"},
+            "long_name": {"current": 2.0, "status": "new"},
+        }
+    ) == (
+        "name       baseline     current      ratio    status\n"
+        "a          1.000e+00 s  1.500e+00 s  1.50x    regression\n"
+        "long_name  -            2.000e+00 s  -        new"
+    )
+
+
+def test_format_comparison_empty() -> None:
+    assert format_comparison({}) == "name  baseline     current      ratio    status"
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any
+from unittest.mock import Mock, patch
+
+import pytest
+import torch
+from lightning import Trainer
+from lightning.pytorch.demos.boring_classes import BoringModel
+
+from lightcat.callback import MetricCollectionCallback
+from lightcat.testing import objectory_available, torchmetrics_available
+from lightcat.utils.imports import is_objectory_available, is_torchmetrics_available
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+if is_objectory_available():
+    from objectory import OBJECT_TARGET
+else:  # pragma: no cover
+    OBJECT_TARGET = "_target_"
+
+if is_torchmetrics_available():
+    from torchmetrics import Metric
+    from torchmetrics.classification import BinaryAccuracy, BinaryPrecision
+else:  # pragma: no cover
+    Metric = object
+
+
+class MyModel(BoringModel):
+    def __init__(self) -> None:
+        super().__init__()
+        self.preds = {"train": [], "validation": [], "test": []}
+        self.targets = {"train": [], "validation": [], "test": []}
+
+    def _step(self, stage: str, batch: Any) -> dict[str, torch.Tensor]:
+        output = self(batch)
+        preds = output[:, 0].sigmoid().detach()
+        target = (batch[:, 0] > 0).long()
+        self.preds[stage].append(preds)
+        self.targets[stage].append(target)
+        return {"loss": self.loss(output), "preds": preds, "target": target}
+
+    def training_step(self, batch: Any, batch_idx: int) -> dict[str, torch.Tensor]:  # noqa: ARG002
+        return self._step("train", batch)
+
+    def validation_step(
+        self, batch: Any, batch_idx: int  # noqa: ARG002
+    ) -> dict[str, torch.Tensor]:
+        return self._step("validation", batch)
+
+    def test_step(self, batch: Any, batch_idx: int) -> dict[str, torch.Tensor]:  # noqa: ARG002
+        return self._step("test", batch)
+
+    def get_accuracy(self, stage: str) -> torch.Tensor:
+        metric = BinaryAccuracy()
+        metric.update(torch.cat(self.preds[stage]), torch.cat(self.targets[stage]))
+        return metric.compute()
+
+
+class DictMetric(Metric):
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.add_state("total", default=torch.tensor(0.0), dist_reduce_fx="sum")
+
+    def update(self, preds: torch.Tensor, target: torch.Tensor) -> None:  # noqa: ARG002
+        self.total += preds.sum()
+
+    def compute(self) -> dict[str, torch.Tensor]:
+        return {"total": self.total, "double": 2 * self.total}
+
+
+def create_trainer(tmp_path: Path, callback: MetricCollectionCallback) -> Trainer:
+    return Trainer(
+        default_root_dir=tmp_path,
+        logger=False,
+        max_epochs=1,
+        limit_train_batches=4,
+        limit_val_batches=3,
+        limit_test_batches=2,
+        num_sanity_val_steps=0,
+        enable_checkpointing=False,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        callbacks=[callback],
+    )
+
+
+def create_accuracy_config() -> dict:
+    return {OBJECT_TARGET: "torchmetrics.classification.BinaryAccuracy"}
+
+
+##############################################
+#     Tests for MetricCollectionCallback     #
+##############################################
+
+
+@torchmetrics_available
+def test_metric_collection_callback_repr() -> None:
+    assert repr(MetricCollectionCallback({"accuracy": BinaryAccuracy()})).startswith(
+        "MetricCollectionCallback("
+    )
+
+
+@torchmetrics_available
+def test_metric_collection_callback_incorrect_stage() -> None:
+    with pytest.raises(ValueError, match="Incorrect stage: predict"):
+        MetricCollectionCallback({"accuracy": BinaryAccuracy()}, stages=["predict"])
+
+
+@torchmetrics_available
+def test_metric_collection_callback_get_metrics() -> None:
+    callback = MetricCollectionCallback({"accuracy": BinaryAccuracy()})
+    metrics = callback.get_metrics("validation")
+    assert isinstance(metrics["accuracy"], BinaryAccuracy)
+    assert not metrics["accuracy"].sync_on_compute
+    assert callback.get_metrics("validation") is metrics
+    # Each stage has its own copy of the metrics.
+    assert callback.get_metrics("train")["accuracy"] is not metrics["accuracy"]
+
+
+@torchmetrics_available
+def test_metric_collection_callback_get_metrics_incorrect_stage() -> None:
+    callback = MetricCollectionCallback({"accuracy": BinaryAccuracy()})
+    with pytest.raises(ValueError, match="Incorrect stage: predict"):
+        callback.get_metrics("predict")
+
+
+@torchmetrics_available
+def test_metric_collection_callback_get_metrics_list_states() -> None:
+    callback = MetricCollectionCallback(
+        {"auroc": {OBJECT_TARGET: "torchmetrics.classification.BinaryAUROC"}}
+    )
+    # The list states are synchronized by torchmetrics.
+    assert callback.get_metrics("validation")["auroc"].sync_on_compute
+
+
+@objectory_available
+@torchmetrics_available
+def test_metric_collection_callback_validation(tmp_path: Path) -> None:
+    model = MyModel()
+    trainer = create_trainer(
+        tmp_path, MetricCollectionCallback({"accuracy": create_accuracy_config()})
+    )
+    trainer.fit(model)
+    assert trainer.callback_metrics["val/accuracy"].allclose(model.get_accuracy("validation"))
+    assert "train/accuracy" not in trainer.callback_metrics
+
+
+@objectory_available
+@torchmetrics_available
+def test_metric_collection_callback_stages(tmp_path: Path) -> None:
+    model = MyModel()
+    trainer = create_trainer(
+        tmp_path,
+        MetricCollectionCallback(
+            {"accuracy": create_accuracy_config()}, stages=["train", "validation", "test"]
+        ),
+    )
+    trainer.fit(model)
+    assert trainer.callback_metrics["train/accuracy"].allclose(model.get_accuracy("train"))
+    assert trainer.callback_metrics["val/accuracy"].allclose(model.get_accuracy("validation"))
+    trainer.test(model)
+    assert trainer.callback_metrics["test/accuracy"].allclose(model.get_accuracy("test"))
+
+
+@objectory_available
+@torchmetrics_available
+def test_metric_collection_callback_reset(tmp_path: Path) -> None:
+    callback = MetricCollectionCallback({"accuracy": create_accuracy_config()})
+    create_trainer(tmp_path, callback).fit(MyModel())
+    assert not callback.get_metrics("validation")["accuracy"].update_called
+
+
+@objectory_available
+@torchmetrics_available
+def test_metric_collection_callback_single_sync(tmp_path: Path) -> None:
+    callback = MetricCollectionCallback(
+        {
+            "accuracy": create_accuracy_config(),
+            "precision": {OBJECT_TARGET: "torchmetrics.classification.BinaryPrecision"},
+            "auroc": {OBJECT_TARGET: "torchmetrics.classification.BinaryAUROC"},
+        }
+    )
+    with patch("lightcat.callback.collection.sync_metric_states") as sync:
+        create_trainer(tmp_path, callback).fit(MyModel())
+    sync.assert_called_once()
+    assert [type(metric).__name__ for metric in sync.call_args.args[0]] == [
+        "BinaryAccuracy",
+        "BinaryPrecision",
+    ]
+
+
+@torchmetrics_available
+def test_metric_collection_callback_sync_not_updated() -> None:
+    callback = MetricCollectionCallback(
+        {"accuracy": BinaryAccuracy(), "precision": BinaryPrecision()}
+    )
+    metrics = callback.get_metrics("validation")
+    metrics["accuracy"].update(torch.tensor([0.9, 0.2]), torch.tensor([1, 1]))
+    with patch("lightcat.callback.collection.sync_metric_states") as sync:
+        callback._compute_and_log("validation", Mock())
+    # The metrics not updated by this process are also synchronized, so
+    # all the processes run the same collective operations.
+    assert sync.call_args.args[0] == [metrics["accuracy"], metrics["precision"]]
+
+
+@torchmetrics_available
+def test_metric_collection_callback_mapping(tmp_path: Path) -> None:
+    model = MyModel()
+    trainer = create_trainer(tmp_path, MetricCollectionCallback({"metric": DictMetric()}))
+    trainer.fit(model)
+    total = torch.cat(model.preds["validation"]).sum()
+    assert trainer.callback_metrics["val/metric/total"].allclose(total)
+    assert trainer.callback_metrics["val/metric/double"].allclose(2 * total)
+
+
+@objectory_available
+@torchmetrics_available
+def test_metric_collection_callback_not_scalar(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    trainer = create_trainer(
+        tmp_path,
+        MetricCollectionCallback(
+            {"confmat": {OBJECT_TARGET: "torchmetrics.classification.BinaryConfusionMatrix"}}
+        ),
+    )
+    with caplog.at_level(level=logging.WARNING):
+        trainer.fit(MyModel())
+    assert "val/confmat" not in trainer.callback_metrics
+    assert any("val/confmat is not logged" in message for message in caplog.messages)
+
+
+@torchmetrics_available
+def test_metric_collection_callback_missing_keys(tmp_path: Path) -> None:
+    trainer = create_trainer(
+        tmp_path, MetricCollectionCallback({"accuracy": BinaryAccuracy()}, input_keys=["x"])
+    )
+    with pytest.raises(ValueError, match="must be a mapping with the keys"):
+        trainer.fit(MyModel())
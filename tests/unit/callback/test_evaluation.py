@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from lightning import Trainer
+from lightning.pytorch.callbacks import ModelCheckpoint
+from lightning.pytorch.demos.boring_classes import BoringModel
+from lightning.pytorch.loggers import Logger
+
+from lightcat.callback import AsyncCheckpointEvaluation
+from lightcat.evaluation import CheckpointEvaluator, load_evaluation_results
+from lightcat.testing import objectory_available
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+MODEL = {
+    "_target_": "lightcat.model.creator.ModelCreator",
+    "model": {"_target_": "tests.unit.evaluation.test_evaluator.LoggingModel"},
+}
+DATAMODULE = {
+    "_target_": "lightcat.datamodule.creator.DataModuleCreator",
+    "datamodule": {"_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"},
+}
+
+
+class RecordingLogger(Logger):
+    def __init__(self) -> None:
+        super().__init__()
+        self.metrics = []
+
+    @property
+    def name(self) -> str:
+        return "recording"
+
+    @property
+    def version(self) -> int:
+        return 0
+
+    def log_hyperparams(self, params: Any, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def log_metrics(self, metrics: dict[str, float], step: int | None = None) -> None:
+        self.metrics.append((step, metrics))
+
+
+def fit(
+    tmp_path: Path, callback: AsyncCheckpointEvaluation, max_epochs: int = 3
+) -> RecordingLogger:
+    pl_logger = RecordingLogger()
+    Trainer(
+        default_root_dir=tmp_path,
+        logger=pl_logger,
+        max_epochs=max_epochs,
+        limit_train_batches=2,
+        limit_val_batches=0,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        callbacks=[callback, ModelCheckpoint(dirpath=tmp_path, save_top_k=-1)],
+    ).fit(BoringModel())
+    return pl_logger
+
+
+###############################################
+#     Tests for AsyncCheckpointEvaluation     #
+###############################################
+
+
+def test_async_checkpoint_evaluation_repr(tmp_path: Path) -> None:
+    assert repr(
+        AsyncCheckpointEvaluation(CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path))
+    ).startswith("AsyncCheckpointEvaluation(")
+
+
+@objectory_available
+def test_async_checkpoint_evaluation_config(tmp_path: Path) -> None:
+    callback = AsyncCheckpointEvaluation(
+        {
+            "_target_": "lightcat.evaluation.CheckpointEvaluator",
+            "model": MODEL,
+            "datamodule": DATAMODULE,
+            "dirpath": tmp_path,
+        }
+    )
+    assert isinstance(callback.evaluator, CheckpointEvaluator)
+
+
+@objectory_available
+def test_async_checkpoint_evaluation_fit(tmp_path: Path) -> None:
+    callback = AsyncCheckpointEvaluation(
+        CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path, num_workers=0)
+    )
+    pl_logger = fit(tmp_path, callback)
+    results = load_evaluation_results(callback.evaluator.results_path)
+    assert [(result["epoch"], result["step"]) for result in results] == [(0, 2), (1, 4), (2, 6)]
+    logged = [(step, metrics) for step, metrics in pl_logger.metrics if "eval/val_loss" in metrics]
+    assert [step for step, _ in logged] == [2, 4, 6]
+    assert [metrics["eval/val_loss"] for _, metrics in logged] == [
+        result["val_loss"] for result in results
+    ]
+
+
+@objectory_available
+def test_async_checkpoint_evaluation_fit_failed_evaluation(tmp_path: Path) -> None:
+    tmp_path.joinpath("truncated.ckpt").write_bytes(b"PK\x03\x04")
+    callback = AsyncCheckpointEvaluation(
+        CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path, min_age=0, num_workers=0)
+    )
+    pl_logger = fit(tmp_path, callback, max_epochs=2)
+    results = load_evaluation_results(callback.evaluator.results_path)
+    assert [("error" in result, result.get("step")) for result in results] == [
+        (True, None),
+        (False, 2),
+        (False, 4),
+    ]
+    steps = [step for step, metrics in pl_logger.metrics if "eval/val_loss" in metrics]
+    assert steps == [2, 4]
+
+
+@objectory_available
+def test_async_checkpoint_evaluation_fit_worker_process(tmp_path: Path) -> None:
+    callback = AsyncCheckpointEvaluation(
+        CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path, num_workers=1),
+        prefix="async/",
+    )
+    pl_logger = fit(tmp_path, callback, max_epochs=2)
+    steps = [step for step, metrics in pl_logger.metrics if "async/val_loss" in metrics]
+    assert sorted(steps) == [2, 4]
+    assert callback.evaluator.num_pending == 0
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from lightning import Trainer
+from lightning.pytorch.demos.boring_classes import BoringDataModule, BoringModel
+
+from lightcat.callback import FanOutCheckpoint
+from lightcat.model import FanOutModel
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def create_trainer(tmp_path: Path, callback: FanOutCheckpoint) -> Trainer:
+    return Trainer(
+        max_epochs=3,
+        limit_train_batches=2,
+        limit_val_batches=1,
+        default_root_dir=tmp_path,
+        logger=False,
+        enable_checkpointing=False,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        callbacks=[callback],
+    )
+
+
+######################################
+#     Tests for FanOutCheckpoint     #
+######################################
+
+
+def test_fanout_checkpoint_repr() -> None:
+    assert repr(FanOutCheckpoint()) == "FanOutCheckpoint(dirpath=None, every_n_epochs=1)"
+
+
+@pytest.mark.parametrize("every_n_epochs", [0, -1])
+def test_fanout_checkpoint_incorrect_every_n_epochs(every_n_epochs: int) -> None:
+    with pytest.raises(ValueError, match="every_n_epochs must be greater than 0"):
+        FanOutCheckpoint(every_n_epochs=every_n_epochs)
+
+
+def test_fanout_checkpoint(tmp_path: Path) -> None:
+    models = {"model1": BoringModel(), "model2": BoringModel()}
+    trainer = create_trainer(tmp_path, FanOutCheckpoint(dirpath=tmp_path.joinpath("ckpts")))
+    trainer.fit(FanOutModel(models), datamodule=BoringDataModule())
+    assert sorted(path.name for path in tmp_path.joinpath("ckpts").iterdir()) == [
+        "epoch=0",
+        "epoch=1",
+        "epoch=2",
+    ]
+    for name, model in models.items():
+        loaded = BoringModel.load_from_checkpoint(
+            tmp_path.joinpath("ckpts", "epoch=2", f"{name}.ckpt")
+        )
+        assert loaded.layer.weight.equal(model.layer.weight)
+
+
+def test_fanout_checkpoint_every_n_epochs(tmp_path: Path) -> None:
+    trainer = create_trainer(tmp_path, FanOutCheckpoint(every_n_epochs=2))
+    trainer.fit(FanOutModel({"model": BoringModel()}), datamodule=BoringDataModule())
+    assert [path.name for path in tmp_path.joinpath("checkpoints").iterdir()] == ["epoch=1"]
+    assert tmp_path.joinpath("checkpoints", "epoch=1", "model.ckpt").is_file()
+
+
+def test_fanout_checkpoint_incorrect_model(tmp_path: Path) -> None:
+    trainer = create_trainer(tmp_path, FanOutCheckpoint())
+    with pytest.raises(TypeError, match="FanOutCheckpoint requires a FanOutModel"):
+        trainer.fit(BoringModel(), datamodule=BoringDataModule())
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Any
+
+import pytest
+import torch
+from lightning import Trainer
+from lightning.pytorch.demos.boring_classes import BoringModel
+from lightning.pytorch.loggers import Logger
+
+from lightcat.callback import GradientMonitor
+from lightcat.callback.gradient import _compute_norm
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class RecordingLogger(Logger):
+    def __init__(self) -> None:
+        super().__init__()
+        self.metrics = []
+
+    @property
+    def name(self) -> str:
+        return "recording"
+
+    @property
+    def version(self) -> int:
+        return 0
+
+    def log_hyperparams(self, params: Any, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def log_metrics(self, metrics: dict[str, float], step: int | None = None) -> None:
+        self.metrics.append((step, metrics))
+
+
+class MyModel(BoringModel):
+    def __init__(self, num_groups: int = 1) -> None:
+        super().__init__()
+        self.num_groups = num_groups
+        self.grad_norms = []
+        self.param_norms = []
+
+    def on_before_optimizer_step(self, optimizer: torch.optim.Optimizer) -> None:
+        self.grad_norms.append(
+            torch.stack([param.grad.norm() for param in self.parameters()]).norm().item()
+        )
+        self.param_norms.append(
+            torch.stack([param.norm() for param in self.parameters()]).norm().item()
+        )
+        super().on_before_optimizer_step(optimizer)
+
+    def configure_optimizers(self) -> torch.optim.Optimizer:
+        if self.num_groups == 1:
+            return torch.optim.SGD(self.parameters(), lr=0.1)
+        return torch.optim.SGD(
+            [{"params": [self.layer.weight]}, {"params": [self.layer.bias], "lr": 0.01}], lr=0.1
+        )
+
+
+class FrozenModel(BoringModel):
+    def __init__(self) -> None:
+        super().__init__()
+        self.frozen = torch.nn.Linear(32, 32).requires_grad_(False)
+
+    def configure_optimizers(self) -> torch.optim.Optimizer:
+        return torch.optim.SGD(
+            [
+                {"params": self.frozen.parameters()},
+                {"params": [self.layer.weight]},
+                {"params": [self.layer.bias]},
+            ],
+            lr=0.1,
+        )
+
+
+def fit(
+    tmp_path: Path, callback: GradientMonitor, model: BoringModel | None = None, **kwargs: Any
+) -> RecordingLogger:
+    logger = RecordingLogger()
+    kwargs.setdefault("max_steps", 4)
+    kwargs.setdefault("log_every_n_steps", 1)
+    Trainer(
+        default_root_dir=tmp_path,
+        logger=logger,
+        enable_checkpointing=False,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        callbacks=[callback],
+        **kwargs,
+    ).fit(model or MyModel())
+    return logger
+
+
+def get_logged_metrics(logger: RecordingLogger) -> list[tuple[int, dict[str, float]]]:
+    return [(step, metrics) for step, metrics in logger.metrics if "optim/grad_norm" in metrics]
+
+
+#####################################
+#     Tests for GradientMonitor     #
+#####################################
+
+
+def test_gradient_monitor_repr() -> None:
+    assert repr(GradientMonitor()).startswith("GradientMonitor(")
+
+
+@pytest.mark.parametrize("log_every_n_steps", [0, -1])
+def test_gradient_monitor_incorrect_log_every_n_steps(log_every_n_steps: int) -> None:
+    with pytest.raises(ValueError, match="log_every_n_steps must be greater than 0"):
+        GradientMonitor(log_every_n_steps=log_every_n_steps)
+
+
+def test_gradient_monitor_metrics(tmp_path: Path) -> None:
+    model = MyModel()
+    logged = get_logged_metrics(fit(tmp_path, GradientMonitor(log_every_n_steps=1), model))
+    assert [step for step, _ in logged] == [0, 1, 2, 3]
+    for i, (_, metrics) in enumerate(logged):
+        assert metrics.keys() == {"optim/grad_norm", "optim/param_norm", "optim/update_ratio"}
+        assert math.isclose(metrics["optim/grad_norm"], model.grad_norms[i], rel_tol=1e-5)
+        assert math.isclose(metrics["optim/param_norm"], model.param_norms[i], rel_tol=1e-5)
+        # The SGD update is -lr * grad.
+        assert math.isclose(
+            metrics["optim/update_ratio"],
+            0.1 * model.grad_norms[i] / model.param_norms[i],
+            rel_tol=1e-4,
+        )
+
+
+def test_gradient_monitor_per_group(tmp_path: Path) -> None:
+    logged = get_logged_metrics(
+        fit(tmp_path, GradientMonitor(log_every_n_steps=1), MyModel(num_groups=2))
+    )
+    assert len(logged) == 4
+    for _, metrics in logged:
+        assert metrics.keys() == {
+            "optim/grad_norm",
+            "optim/grad_norm/group_0",
+            "optim/grad_norm/group_1",
+            "optim/param_norm",
+            "optim/param_norm/group_0",
+            "optim/param_norm/group_1",
+            "optim/update_ratio",
+            "optim/update_ratio/group_0",
+            "optim/update_ratio/group_1",
+        }
+        assert math.isclose(
+            metrics["optim/grad_norm"],
+            math.hypot(metrics["optim/grad_norm/group_0"], metrics["optim/grad_norm/group_1"]),
+            rel_tol=1e-5,
+        )
+
+
+def test_gradient_monitor_per_group_frozen_group(tmp_path: Path) -> None:
+    logged = get_logged_metrics(fit(tmp_path, GradientMonitor(log_every_n_steps=1), FrozenModel()))
+    assert len(logged) == 4
+    for _, metrics in logged:
+        # The first group has no gradients, so the other groups keep
+        # their index in the optimizer.
+        assert metrics.keys() == {
+            "optim/grad_norm",
+            "optim/grad_norm/group_1",
+            "optim/grad_norm/group_2",
+            "optim/param_norm",
+            "optim/param_norm/group_1",
+            "optim/param_norm/group_2",
+            "optim/update_ratio",
+            "optim/update_ratio/group_1",
+            "optim/update_ratio/group_2",
+        }
+
+
+def test_gradient_monitor_per_group_false(tmp_path: Path) -> None:
+    logged = get_logged_metrics(
+        fit(tmp_path, GradientMonitor(log_every_n_steps=1, per_group=False), MyModel(num_groups=2))
+    )
+    for _, metrics in logged:
+        assert metrics.keys() == {"optim/grad_norm", "optim/param_norm", "optim/update_ratio"}
+
+
+def test_gradient_monitor_grad_norm_only(tmp_path: Path) -> None:
+    logged = get_logged_metrics(
+        fit(
+            tmp_path,
+            GradientMonitor(log_every_n_steps=1, log_param_norms=False, log_update_ratios=False),
+        )
+    )
+    assert len(logged) == 4
+    for _, metrics in logged:
+        assert metrics.keys() == {"optim/grad_norm"}
+
+
+def test_gradient_monitor_prefix(tmp_path: Path) -> None:
+    logger = fit(tmp_path, GradientMonitor(log_every_n_steps=1, prefix="train/"))
+    assert "train/grad_norm" in logger.metrics[0][1]
+
+
+def test_gradient_monitor_log_every_n_steps(tmp_path: Path) -> None:
+    logged = get_logged_metrics(fit(tmp_path, GradientMonitor(log_every_n_steps=2), max_steps=5))
+    assert [step for step, _ in logged] == [0, 2, 4]
+
+
+def test_gradient_monitor_trainer_frequency(tmp_path: Path) -> None:
+    logged = get_logged_metrics(fit(tmp_path, GradientMonitor(), log_every_n_steps=2))
+    assert [step for step, _ in logged] == [1, 3]
+
+
+def test_gradient_monitor_trainer_logging_disabled(tmp_path: Path) -> None:
+    logger = fit(tmp_path, GradientMonitor(), log_every_n_steps=0)
+    assert get_logged_metrics(logger) == []
+
+
+def test_gradient_monitor_multiple_optimizers(tmp_path: Path) -> None:
+    class TwoOptimizerModel(BoringModel):
+        def __init__(self) -> None:
+            super().__init__()
+            self.automatic_optimization = False
+
+        def training_step(self, batch: torch.Tensor, batch_idx: int) -> None:  # noqa: ARG002
+            for optimizer in self.optimizers():
+                optimizer.zero_grad()
+                self.manual_backward(self.step(batch))
+                optimizer.step()
+
+        def configure_optimizers(self) -> list[torch.optim.Optimizer]:
+            return [
+                torch.optim.SGD(self.parameters(), lr=0.1),
+                torch.optim.SGD(self.parameters(), lr=0.01),
+            ]
+
+    logger = fit(tmp_path, GradientMonitor(log_every_n_steps=2), TwoOptimizerModel(), max_steps=4)
+    logged = [
+        (step, sorted(metrics))
+        for step, metrics in logger.metrics
+        if "optim/optimizer_0/grad_norm" in metrics
+    ]
+    # The optimizers of a batch are logged together at the step of the batch.
+    assert [step for step, _ in logged] == [0, 2]
+    assert all("optim/optimizer_1/grad_norm" in names for _, names in logged)
+
+
+def test_gradient_monitor_gradient_accumulation(tmp_path: Path) -> None:
+    logged = get_logged_metrics(
+        fit(tmp_path, GradientMonitor(log_every_n_steps=1), accumulate_grad_batches=2)
+    )
+    assert [step for step, _ in logged] == [0, 1, 2, 3]
+
+
+def test_gradient_monitor_no_logger(tmp_path: Path) -> None:
+    callback = GradientMonitor(log_every_n_steps=1)
+    Trainer(
+        default_root_dir=tmp_path,
+        logger=False,
+        max_steps=2,
+        enable_checkpointing=False,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        callbacks=[callback],
+    ).fit(MyModel())
+    assert callback._metrics == {}
+    assert callback._snapshots == []
+
+
+###################################
+#     Tests for _compute_norm     #
+###################################
+
+
+def test_compute_norm() -> None:
+    tensors = [torch.tensor([3.0]), torch.tensor([[4.0]])]
+    assert _compute_norm(tensors, 2.0).equal(torch.tensor(5.0))
+
+
+def test_compute_norm_mixed_dtypes() -> None:
+    tensors = [torch.tensor([3.0]), torch.tensor([4.0], dtype=torch.float64)]
+    norm = _compute_norm(tensors, 2.0)
+    assert norm.equal(torch.tensor(5.0))
+    assert norm.dtype == torch.float32
+
+
+def test_compute_norm_inf() -> None:
+    tensors = [torch.tensor([3.0, -7.0]), torch.tensor([4.0])]
+    assert _compute_norm(tensors, float("inf")).equal(torch.tensor(7.0))
+
+
+def test_compute_norm_l1() -> None:
+    tensors = [torch.tensor([3.0, -7.0]), torch.tensor([4.0])]
+    assert _compute_norm(tensors, 1.0).equal(torch.tensor(14.0))
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import math
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+import torch
+from lightning import Trainer
+from lightning.pytorch.demos.boring_classes import BoringModel
+
+from lightcat.callback import BufferedMetricLogger
+from lightcat.callback.metric import _get_scalar_metrics
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class MyModel(BoringModel):
+    def __init__(self) -> None:
+        super().__init__()
+        self.losses = []
+
+    def training_step(self, batch: Any, batch_idx: int) -> dict[str, Any]:
+        loss = self.loss(self(batch))
+        self.losses.append(loss.item())
+        outputs = {"loss": loss, "double": 2 * loss, "constant": 1.0}
+        if batch_idx % 2 == 0:
+            outputs["even"] = torch.tensor(float(batch_idx))
+        return outputs
+
+
+def fit(tmp_path: Path, callback: BufferedMetricLogger, model: BoringModel, **kwargs: Any) -> None:
+    kwargs.setdefault("max_epochs", 1)
+    kwargs.setdefault("limit_train_batches", 10)
+    Trainer(
+        default_root_dir=tmp_path,
+        logger=False,
+        enable_checkpointing=False,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        limit_val_batches=0,
+        callbacks=[callback],
+        **kwargs,
+    ).fit(model)
+
+
+def read_jsonl(path: Path) -> list[dict]:
+    with path.open() as file:
+        return [json.loads(line) for line in file]
+
+
+def read_csv(path: Path) -> list[dict]:
+    with path.open(newline="") as file:
+        return list(csv.DictReader(file))
+
+
+##########################################
+#     Tests for BufferedMetricLogger     #
+##########################################
+
+
+def test_buffered_metric_logger_repr(tmp_path: Path) -> None:
+    assert repr(BufferedMetricLogger(tmp_path.joinpath("metrics.jsonl"))).startswith(
+        "BufferedMetricLogger("
+    )
+
+
+@pytest.mark.parametrize("log_every_n_steps", [0, -1])
+def test_buffered_metric_logger_incorrect_log_every_n_steps(
+    tmp_path: Path, log_every_n_steps: int
+) -> None:
+    with pytest.raises(ValueError, match="log_every_n_steps must be greater than 0"):
+        BufferedMetricLogger(
+            tmp_path.joinpath("metrics.jsonl"), log_every_n_steps=log_every_n_steps
+        )
+
+
+def test_buffered_metric_logger_incorrect_format(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Incorrect format: txt"):
+        BufferedMetricLogger(tmp_path.joinpath("metrics.txt"))
+
+
+def test_buffered_metric_logger_jsonl(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("metrics.jsonl")
+    model = MyModel()
+    fit(tmp_path, BufferedMetricLogger(path, log_every_n_steps=4), model)
+    rows = read_jsonl(path)
+    assert [(row["step"], row["epoch"], row["num_batches"]) for row in rows] == [
+        (4, 0, 4),
+        (8, 0, 4),
+        (10, 0, 2),
+    ]
+    for row, losses in zip(rows, [model.losses[:4], model.losses[4:8], model.losses[8:]]):
+        assert row.keys() == {
+            "step",
+            "epoch",
+            "num_batches",
+            "loss",
+            "double",
+            "constant",
+            "even",
+        }
+        assert math.isclose(row["loss"], sum(losses) / len(losses), rel_tol=1e-5)
+        assert math.isclose(row["double"], 2 * sum(losses) / len(losses), rel_tol=1e-5)
+        assert row["constant"] == 1.0
+    # The missing values are ignored.
+    assert [row["even"] for row in rows] == [1.0, 5.0, 8.0]
+
+
+def test_buffered_metric_logger_csv(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("metrics.csv")
+    fit(tmp_path, BufferedMetricLogger(path, log_every_n_steps=5), MyModel())
+    rows = read_csv(path)
+    assert [(row["step"], row["num_batches"]) for row in rows] == [("5", "5"), ("10", "5")]
+    assert list(rows[0]) == ["step", "epoch", "num_batches", "loss", "double", "constant", "even"]
+
+
+def test_buffered_metric_logger_format(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("metrics.log")
+    fit(tmp_path, BufferedMetricLogger(path, log_every_n_steps=5, format="csv"), MyModel())
+    assert len(read_csv(path)) == 2
+
+
+def test_buffered_metric_logger_append(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("metrics.csv")
+    fit(tmp_path, BufferedMetricLogger(path, log_every_n_steps=5), MyModel())
+    fit(tmp_path, BufferedMetricLogger(path, log_every_n_steps=5), MyModel())
+    assert len(read_csv(path)) == 4
+
+
+def test_buffered_metric_logger_epochs(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("metrics.jsonl")
+    fit(tmp_path, BufferedMetricLogger(path, log_every_n_steps=4), MyModel(), max_epochs=2)
+    rows = read_jsonl(path)
+    assert [(row["step"], row["epoch"], row["num_batches"]) for row in rows] == [
+        (4, 0, 4),
+        (8, 0, 4),
+        (10, 0, 2),
+        (14, 1, 4),
+        (18, 1, 4),
+        (20, 1, 2),
+    ]
+
+
+def test_buffered_metric_logger_keys(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    path = tmp_path.joinpath("metrics.jsonl")
+    with caplog.at_level(level=logging.WARNING):
+        fit(tmp_path, BufferedMetricLogger(path, log_every_n_steps=5, keys=["loss"]), MyModel())
+    assert [row.keys() for row in read_jsonl(path)] == [
+        {"step", "epoch", "num_batches", "loss"}
+    ] * 2
+    assert len(caplog.messages) == 1
+
+
+def test_buffered_metric_logger_missing_key(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("metrics.jsonl")
+    fit(
+        tmp_path,
+        BufferedMetricLogger(path, log_every_n_steps=5, keys=["loss", "missing"]),
+        MyModel(),
+    )
+    assert [row["missing"] for row in read_jsonl(path)] == [None, None]
+
+
+def test_buffered_metric_logger_single_all_reduce(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("metrics.jsonl")
+    with patch(
+        "lightcat.callback.metric.all_reduce", side_effect=lambda tensor: tensor
+    ) as all_reduce:
+        fit(tmp_path, BufferedMetricLogger(path, log_every_n_steps=4), MyModel())
+    # One all-reduce for all the metrics of each row.
+    assert all_reduce.call_count == 3
+    assert all_reduce.call_args.args[0].shape == (8,)
+
+
+def test_buffered_metric_logger_no_metrics(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("metrics.jsonl")
+    callback = BufferedMetricLogger(path)
+    callback.on_train_batch_end(
+        trainer=None, pl_module=BoringModel(), outputs=None, batch=None, batch_idx=0
+    )
+    assert callback._buffer is None
+    assert not path.exists()
+
+
+def test_buffered_metric_logger_exception(tmp_path: Path) -> None:
+    class FailingModel(MyModel):
+        def training_step(self, batch: Any, batch_idx: int) -> dict[str, Any]:
+            if batch_idx == 6:
+                msg = "training_step failed"
+                raise RuntimeError(msg)
+            return super().training_step(batch, batch_idx)
+
+    path = tmp_path.joinpath("metrics.jsonl")
+    with pytest.raises(RuntimeError, match="training_step failed"):
+        fit(tmp_path, BufferedMetricLogger(path, log_every_n_steps=4), FailingModel())
+    assert len(read_jsonl(path)) == 1
+
+
+#########################################
+#     Tests for _get_scalar_metrics     #
+#########################################
+
+
+def test_get_scalar_metrics() -> None:
+    metrics = _get_scalar_metrics(
+        {
+            "loss": torch.tensor(1.0, requires_grad=True),
+            "accuracy": torch.tensor([0.5]),
+            "count": 3,
+            "flag": True,
+            "vector": torch.ones(2),
+            "name": "abc",
+        }
+    )
+    assert metrics.keys() == {"loss", "accuracy", "count"}
+    assert not metrics["loss"].requires_grad
+    assert metrics["accuracy"].shape == ()
+    assert metrics["count"].equal(torch.tensor(3.0))
+
+
+@pytest.mark.parametrize("outputs", [None, torch.tensor(1.0)])
+def test_get_scalar_metrics_not_mapping(outputs: Any) -> None:
+    assert _get_scalar_metrics(outputs) == {}
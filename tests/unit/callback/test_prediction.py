@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pytest
+import torch
+from lightning import LightningModule, Trainer
+from lightning.pytorch.demos.boring_classes import (
+    BoringDataModule,
+    BoringModel,
+    RandomDataset,
+    RandomIterableDataset,
+)
+from torch.utils.data import DataLoader
+
+from lightcat.callback import StreamingPredictionWriter
+from lightcat.testing import numpy_available
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class DictModel(BoringModel):
+    def predict_step(
+        self, batch: torch.Tensor, batch_idx: int  # noqa: ARG002
+    ) -> dict[str, torch.Tensor]:
+        output = self(batch)
+        return {"score": output, "label": output.argmax(dim=1)}
+
+
+class FailingModel(BoringModel):
+    def predict_step(self, batch: torch.Tensor, batch_idx: int) -> Any:
+        if batch_idx == 1:
+            msg = "predict_step failed"
+            raise RuntimeError(msg)
+        return super().predict_step(batch, batch_idx)
+
+
+def create_trainer(tmp_path: Path, callback: StreamingPredictionWriter) -> Trainer:
+    return Trainer(
+        default_root_dir=tmp_path,
+        logger=False,
+        enable_checkpointing=False,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        callbacks=[callback],
+    )
+
+
+def create_dataloader(num_examples: int = 20, batch_size: int = 8) -> DataLoader:
+    return DataLoader(RandomDataset(32, num_examples), batch_size=batch_size)
+
+
+def predict(
+    tmp_path: Path,
+    callback: StreamingPredictionWriter,
+    model: LightningModule | None = None,
+    dataloaders: Any = None,
+) -> None:
+    create_trainer(tmp_path, callback).predict(
+        model or BoringModel(),
+        dataloaders=create_dataloader() if dataloaders is None else dataloaders,
+        return_predictions=False,
+    )
+
+
+###############################################
+#     Tests for StreamingPredictionWriter     #
+###############################################
+
+
+@numpy_available
+def test_streaming_prediction_writer_repr(tmp_path: Path) -> None:
+    assert repr(StreamingPredictionWriter(tmp_path)) == (
+        f"StreamingPredictionWriter(output_dir={tmp_path}, format=memmap, shard_size=65536)"
+    )
+
+
+@numpy_available
+def test_streaming_prediction_writer_incorrect_format(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Incorrect format: parquet"):
+        StreamingPredictionWriter(tmp_path, format="parquet")
+
+
+@numpy_available
+@pytest.mark.parametrize("shard_size", [0, -1])
+def test_streaming_prediction_writer_incorrect_shard_size(tmp_path: Path, shard_size: int) -> None:
+    with pytest.raises(ValueError, match="shard_size must be greater than 0"):
+        StreamingPredictionWriter(tmp_path, shard_size=shard_size)
+
+
+@numpy_available
+@pytest.mark.parametrize("max_queue_size", [0, -1])
+def test_streaming_prediction_writer_incorrect_max_queue_size(
+    tmp_path: Path, max_queue_size: int
+) -> None:
+    with pytest.raises(ValueError, match="max_queue_size must be greater than 0"):
+        StreamingPredictionWriter(tmp_path, max_queue_size=max_queue_size)
+
+
+@numpy_available
+def test_streaming_prediction_writer_memmap(tmp_path: Path) -> None:
+    model = BoringModel()
+    dataloader = create_dataloader()
+    predict(tmp_path, StreamingPredictionWriter(tmp_path.joinpath("preds")), model, dataloader)
+    output = np.load(tmp_path.joinpath("preds", "output.npy"), mmap_mode="r")
+    with torch.no_grad():
+        expected = torch.cat([model(batch) for batch in dataloader])
+    assert np.allclose(output, expected.numpy())
+    assert np.array_equal(np.load(tmp_path.joinpath("preds", "indices.npy")), np.arange(20))
+    assert json.loads(tmp_path.joinpath("preds", "manifest.json").read_text()) == {
+        "files": {"indices": "indices.npy", "output": "output.npy"},
+        "format": "memmap",
+        "num_examples": 20,
+    }
+
+
+@numpy_available
+def test_streaming_prediction_writer_memmap_dict(tmp_path: Path) -> None:
+    predict(tmp_path, StreamingPredictionWriter(tmp_path), DictModel())
+    score = np.load(tmp_path.joinpath("score.npy"))
+    label = np.load(tmp_path.joinpath("label.npy"))
+    assert score.shape == (20, 2)
+    assert score.dtype == np.float32
+    assert np.array_equal(label, score.argmax(axis=1))
+
+
+@numpy_available
+def test_streaming_prediction_writer_memmap_iterable(tmp_path: Path) -> None:
+    dataloader = DataLoader(RandomIterableDataset(32, 20), batch_size=8)
+    with pytest.raises(ValueError, match="requires dataloaders with a length"):
+        predict(tmp_path, StreamingPredictionWriter(tmp_path), dataloaders=dataloader)
+
+
+@numpy_available
+def test_streaming_prediction_writer_shards(tmp_path: Path) -> None:
+    model = BoringModel()
+    dataloader = create_dataloader()
+    predict(
+        tmp_path,
+        StreamingPredictionWriter(tmp_path, format="shards", shard_size=6),
+        model,
+        dataloader,
+    )
+    manifest = json.loads(tmp_path.joinpath("manifest.json").read_text())
+    assert manifest["format"] == "shards"
+    assert manifest["num_examples"] == 20
+    assert [shard["num_examples"] for shard in manifest["shards"]] == [6, 6, 6, 2]
+    shards = [np.load(tmp_path.joinpath(shard["file"])) for shard in manifest["shards"]]
+    with torch.no_grad():
+        expected = torch.cat([model(batch) for batch in dataloader])
+    assert np.allclose(np.concatenate([shard["output"] for shard in shards]), expected.numpy())
+    assert np.array_equal(np.concatenate([shard["indices"] for shard in shards]), np.arange(20))
+
+
+@numpy_available
+def test_streaming_prediction_writer_multiple_dataloaders(tmp_path: Path) -> None:
+    predict(
+        tmp_path,
+        StreamingPredictionWriter(tmp_path),
+        dataloaders=[create_dataloader(20), create_dataloader(12)],
+    )
+    assert np.load(tmp_path.joinpath("dataloader-0", "output.npy")).shape == (20, 2)
+    assert np.load(tmp_path.joinpath("dataloader-1", "output.npy")).shape == (12, 2)
+
+
+@numpy_available
+def test_streaming_prediction_writer_datamodule(tmp_path: Path) -> None:
+    create_trainer(tmp_path, StreamingPredictionWriter(tmp_path)).predict(
+        BoringModel(), datamodule=BoringDataModule(), return_predictions=False
+    )
+    assert np.load(tmp_path.joinpath("output.npy")).shape == (64, 2)
+
+
+@numpy_available
+def test_streaming_prediction_writer_incorrect_output(tmp_path: Path) -> None:
+    class ListModel(BoringModel):
+        def predict_step(self, batch: torch.Tensor, batch_idx: int) -> list:  # noqa: ARG002
+            return [self(batch)]
+
+    with pytest.raises(TypeError, match="must be a tensor or a mapping of tensors"):
+        predict(tmp_path, StreamingPredictionWriter(tmp_path), ListModel())
+
+
+@numpy_available
+def test_streaming_prediction_writer_writer_error(tmp_path: Path) -> None:
+    class MismatchModel(BoringModel):
+        def predict_step(
+            self, batch: torch.Tensor, batch_idx: int  # noqa: ARG002
+        ) -> dict[str, torch.Tensor]:
+            return {"a": self(batch), "b": torch.zeros(1)}
+
+    with pytest.raises(RuntimeError, match="The prediction writer thread failed"):
+        predict(tmp_path, StreamingPredictionWriter(tmp_path), MismatchModel())
+
+
+@numpy_available
+def test_streaming_prediction_writer_predict_error(tmp_path: Path) -> None:
+    callback = StreamingPredictionWriter(tmp_path, format="shards", shard_size=4)
+    with pytest.raises(RuntimeError, match="predict_step failed"):
+        predict(tmp_path, callback, FailingModel())
+    # The writer thread is stopped and the first batch is written.
+    assert callback._thread is None
+    assert tmp_path.joinpath("shard-000000.npz").is_file()
+
+
+@numpy_available
+def test_streaming_prediction_writer_bfloat16(tmp_path: Path) -> None:
+    class BFloat16Model(BoringModel):
+        def predict_step(self, batch: torch.Tensor, batch_idx: int) -> torch.Tensor:  # noqa: ARG002
+            return self(batch).to(dtype=torch.bfloat16)
+
+    predict(tmp_path, StreamingPredictionWriter(tmp_path), BFloat16Model())
+    assert np.load(tmp_path.joinpath("output.npy")).dtype == np.float32
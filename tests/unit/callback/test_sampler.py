@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import random
+from typing import TYPE_CHECKING, Any
+
+import pytest
+import torch
+from lightning import LightningModule, Trainer
+from lightning.pytorch.callbacks import ModelCheckpoint
+from torch.utils.data import DataLoader, TensorDataset
+
+from lightcat.callback import SamplerCheckpoint
+from lightcat.callback.sampler import _get_rng_states, _set_rng_states
+from lightcat.datamodule.sampler import FeistelSampler
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class MyModel(LightningModule):
+    def __init__(self, num_workers: int = 0) -> None:
+        super().__init__()
+        self.layer = torch.nn.Linear(1, 1)
+        self.num_workers = num_workers
+        self.batches = []
+
+    def training_step(self, batch: Any, batch_idx: int) -> torch.Tensor:  # noqa: ARG002
+        self.batches.append(batch[0].tolist())
+        return self.layer(batch[0].float().unsqueeze(1)).sum()
+
+    def configure_optimizers(self) -> torch.optim.Optimizer:
+        return torch.optim.SGD(self.parameters(), lr=0.0)
+
+    def train_dataloader(self) -> DataLoader:
+        return DataLoader(
+            TensorDataset(torch.arange(40)),
+            batch_size=4,
+            sampler=FeistelSampler(num_samples=40, seed=42),
+            num_workers=self.num_workers,
+        )
+
+
+def create_trainer(root_dir: Path, **kwargs: Any) -> Trainer:
+    kwargs.setdefault("max_epochs", 2)
+    return Trainer(
+        default_root_dir=root_dir.joinpath("root"),
+        logger=False,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        **kwargs,
+    )
+
+
+#######################################
+#     Tests for SamplerCheckpoint     #
+#######################################
+
+
+def test_sampler_checkpoint_repr() -> None:
+    assert repr(SamplerCheckpoint()).startswith("SamplerCheckpoint(")
+
+
+def test_sampler_checkpoint_state_dict() -> None:
+    assert "rng_states" in SamplerCheckpoint().state_dict()
+
+
+def test_sampler_checkpoint_state_dict_without_rng_states() -> None:
+    assert SamplerCheckpoint(save_rng_states=False).state_dict() == {}
+
+
+@pytest.mark.parametrize(("max_steps", "num_workers"), [(13, 0), (13, 2), (10, 0), (10, 2)])
+def test_sampler_checkpoint_resume(tmp_path: Path, max_steps: int, num_workers: int) -> None:
+    model = MyModel(num_workers=num_workers)
+    create_trainer(tmp_path, callbacks=[SamplerCheckpoint()]).fit(model)
+    expected = model.batches
+
+    model = MyModel(num_workers=num_workers)
+    create_trainer(
+        tmp_path,
+        max_steps=max_steps,
+        callbacks=[
+            SamplerCheckpoint(),
+            ModelCheckpoint(dirpath=tmp_path, every_n_train_steps=max_steps),
+        ],
+    ).fit(model)
+    batches = model.batches
+    assert len(batches) == max_steps
+
+    model = MyModel(num_workers=num_workers)
+    create_trainer(tmp_path, callbacks=[SamplerCheckpoint()]).fit(
+        model, ckpt_path=next(tmp_path.glob("*.ckpt"))
+    )
+    assert batches + model.batches == expected
+
+
+def test_sampler_checkpoint_resume_end_of_epoch(tmp_path: Path) -> None:
+    model = MyModel()
+    create_trainer(tmp_path, callbacks=[SamplerCheckpoint()]).fit(model)
+    expected = model.batches
+
+    model = MyModel()
+    create_trainer(
+        tmp_path, max_epochs=1, callbacks=[SamplerCheckpoint(), ModelCheckpoint(dirpath=tmp_path)]
+    ).fit(model)
+    batches = model.batches
+
+    model = MyModel()
+    create_trainer(tmp_path, callbacks=[SamplerCheckpoint()]).fit(
+        model, ckpt_path=next(tmp_path.glob("*.ckpt"))
+    )
+    assert batches + model.batches == expected
+
+
+def test_sampler_checkpoint_saved_state(tmp_path: Path) -> None:
+    callback = SamplerCheckpoint()
+    create_trainer(
+        tmp_path,
+        max_steps=3,
+        callbacks=[callback, ModelCheckpoint(dirpath=tmp_path, every_n_train_steps=3)],
+    ).fit(MyModel())
+    checkpoint = torch.load(next(tmp_path.glob("*.ckpt")), weights_only=True)
+    assert checkpoint["callbacks"][callback.state_key]["samplers"] == [
+        {"num_samples": 40, "seed": 42, "epoch": 0, "start_index": 12}
+    ]
+
+
+######################################
+#     Tests for _get_rng_states     #
+######################################
+
+
+def test_get_set_rng_states() -> None:
+    states = _get_rng_states()
+    values = (random.random(), torch.rand(2))  # noqa: S311
+    _set_rng_states(states)
+    assert random.random() == values[0]  # noqa: S311
+    assert torch.rand(2).equal(values[1])
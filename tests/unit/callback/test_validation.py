@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import pytest
+import torch
+from lightning import Trainer
+from lightning.pytorch.demos.boring_classes import BoringModel
+from torch.utils.data import DataLoader, TensorDataset
+
+from lightcat.callback import SubsetValidation
+from lightcat.callback.validation import _SubsetSampler, get_subset_indices
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class LabeledDataset(TensorDataset):
+    def __init__(self, num_examples: int = 100) -> None:
+        super().__init__(torch.randn(num_examples, 32))
+        self.labels = [0] * (num_examples - 10) + [1] * 10
+
+    def __getitem__(self, index: int) -> torch.Tensor:
+        return super().__getitem__(index)[0]
+
+
+class MyModel(BoringModel):
+    def __init__(self) -> None:
+        super().__init__()
+        self.val_dataset = LabeledDataset()
+        self.num_examples = []
+        self._count = 0
+
+    def val_dataloader(self) -> DataLoader:
+        return DataLoader(self.val_dataset, batch_size=10)
+
+    def validation_step(self, batch: Any, batch_idx: int) -> dict[str, torch.Tensor]:
+        self._count += batch.shape[0]
+        return super().validation_step(batch, batch_idx)
+
+    def on_validation_epoch_end(self) -> None:
+        self.log("val_count", float(self._count))
+        self.num_examples.append(self._count)
+        self._count = 0
+
+
+def create_trainer(tmp_path: Path, callback: SubsetValidation, max_epochs: int = 6) -> Trainer:
+    return Trainer(
+        default_root_dir=tmp_path,
+        logger=False,
+        max_epochs=max_epochs,
+        limit_train_batches=2,
+        num_sanity_val_steps=0,
+        enable_checkpointing=False,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        callbacks=[callback],
+    )
+
+
+######################################
+#     Tests for SubsetValidation     #
+######################################
+
+
+def test_subset_validation_repr() -> None:
+    assert repr(SubsetValidation()).startswith("SubsetValidation(")
+
+
+@pytest.mark.parametrize("fraction", [0.0, -0.1, 1.1])
+def test_subset_validation_incorrect_fraction(fraction: float) -> None:
+    with pytest.raises(ValueError, match="fraction must be in"):
+        SubsetValidation(fraction=fraction)
+
+
+@pytest.mark.parametrize("full_every_n_epochs", [0, {0: 5, 10: 0}])
+def test_subset_validation_incorrect_full_every_n_epochs(
+    full_every_n_epochs: int | dict[int, int],
+) -> None:
+    with pytest.raises(ValueError, match="must be greater than 0"):
+        SubsetValidation(full_every_n_epochs=full_every_n_epochs)
+
+
+def test_subset_validation_incorrect_mode() -> None:
+    with pytest.raises(ValueError, match="Incorrect mode: avg"):
+        SubsetValidation(mode="avg")
+
+
+def test_subset_validation_is_full_epoch() -> None:
+    callback = SubsetValidation(full_every_n_epochs=3)
+    assert [callback.is_full_epoch(epoch, max_epochs=7) for epoch in range(7)] == [
+        False,
+        False,
+        True,
+        False,
+        False,
+        True,
+        True,
+    ]
+
+
+def test_subset_validation_is_full_epoch_not_last_epoch() -> None:
+    callback = SubsetValidation(full_every_n_epochs=3, full_on_last_epoch=False)
+    assert not callback.is_full_epoch(6, max_epochs=7)
+
+
+def test_subset_validation_is_full_epoch_schedule() -> None:
+    callback = SubsetValidation(full_every_n_epochs={0: 4, 6: 2, 9: 1})
+    assert [callback.is_full_epoch(epoch) for epoch in range(11)] == [
+        False,
+        False,
+        False,
+        True,
+        False,
+        False,
+        False,
+        True,
+        False,
+        True,
+        True,
+    ]
+
+
+def test_subset_validation_fit(tmp_path: Path) -> None:
+    model = MyModel()
+    trainer = create_trainer(tmp_path, SubsetValidation(fraction=0.2, full_every_n_epochs=3))
+    trainer.fit(model)
+    assert model.num_examples == [20, 20, 100, 20, 20, 100]
+
+
+def test_subset_validation_validate_after_fit(tmp_path: Path) -> None:
+    model = MyModel()
+    trainer = create_trainer(
+        tmp_path, SubsetValidation(fraction=0.2, full_on_last_epoch=False), max_epochs=2
+    )
+    trainer.fit(model)
+    trainer.validate(model)
+    assert model.num_examples == [20, 20, 100]
+
+
+def test_subset_validation_sanity_check(tmp_path: Path) -> None:
+    model = MyModel()
+    trainer = Trainer(
+        default_root_dir=tmp_path,
+        logger=False,
+        max_epochs=1,
+        limit_train_batches=2,
+        num_sanity_val_steps=-1,
+        enable_checkpointing=False,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        callbacks=[SubsetValidation(fraction=0.2, full_on_last_epoch=False)],
+    )
+    trainer.fit(model)
+    assert model.num_examples == [100, 20]
+
+
+def test_subset_validation_stratified(tmp_path: Path) -> None:
+    model = MyModel()
+    callback = SubsetValidation(fraction=0.05, strata="labels", full_on_last_epoch=False)
+    create_trainer(tmp_path, callback, max_epochs=1).fit(model)
+    # 5% of the 90 examples with the label 0, and 1 example with the
+    # label 1.
+    assert model.num_examples == [5]
+
+
+def test_subset_validation_stratified_callable(tmp_path: Path) -> None:
+    model = MyModel()
+    callback = SubsetValidation(
+        fraction=0.05, strata=lambda dataset: dataset.labels, full_on_last_epoch=False
+    )
+    create_trainer(tmp_path, callback, max_epochs=1).fit(model)
+    assert model.num_examples == [5]
+
+
+def test_subset_validation_threshold(tmp_path: Path) -> None:
+    model = MyModel()
+    callback = SubsetValidation(
+        fraction=0.2,
+        full_every_n_epochs=10,
+        full_on_last_epoch=False,
+        monitor="val_count",
+        threshold=50,
+        mode="min",
+    )
+    create_trainer(tmp_path, callback, max_epochs=4).fit(model)
+    # Each subset validation crosses the threshold, so it is followed by
+    # a full validation.
+    assert model.num_examples == [20, 100, 20, 100]
+
+
+def test_subset_validation_threshold_not_crossed(tmp_path: Path) -> None:
+    model = MyModel()
+    callback = SubsetValidation(
+        fraction=0.2,
+        full_every_n_epochs=10,
+        full_on_last_epoch=False,
+        monitor="val_count",
+        threshold=50,
+        mode="max",
+    )
+    create_trainer(tmp_path, callback, max_epochs=3).fit(model)
+    assert model.num_examples == [20, 20, 20]
+
+
+########################################
+#     Tests for get_subset_indices     #
+########################################
+
+
+def test_get_subset_indices() -> None:
+    indices = get_subset_indices(100, fraction=0.1)
+    assert len(indices) == 10
+    assert indices == sorted(set(indices))
+    assert all(0 <= index < 100 for index in indices)
+
+
+def test_get_subset_indices_deterministic() -> None:
+    assert get_subset_indices(100, fraction=0.1, seed=1) == get_subset_indices(
+        100, fraction=0.1, seed=1
+    )
+    assert get_subset_indices(100, fraction=0.1, seed=1) != get_subset_indices(
+        100, fraction=0.1, seed=2
+    )
+
+
+def test_get_subset_indices_fraction_1() -> None:
+    assert get_subset_indices(10, fraction=1.0) == list(range(10))
+
+
+def test_get_subset_indices_labels() -> None:
+    labels = [0] * 50 + [1] * 30 + [2] * 2
+    indices = get_subset_indices(82, fraction=0.1, labels=labels)
+    assert [sum(labels[index] == label for index in indices) for label in range(3)] == [5, 3, 1]
+
+
+def test_get_subset_indices_labels_tensor() -> None:
+    indices = get_subset_indices(10, fraction=0.5, labels=torch.tensor([0] * 8 + [1] * 2))
+    assert len(indices) == 5
+    assert sum(index >= 8 for index in indices) == 1
+
+
+def test_get_subset_indices_incorrect_labels() -> None:
+    with pytest.raises(ValueError, match="The number of labels"):
+        get_subset_indices(10, fraction=0.5, labels=[0, 1])
+
+
+####################################
+#     Tests for _SubsetSampler     #
+####################################
+
+
+def test_subset_sampler() -> None:
+    sampler = _SubsetSampler([1, 3, 5])
+    assert list(sampler) == [1, 3, 5]
+    assert len(sampler) == 3
+
+
+def test_subset_sampler_distributed() -> None:
+    samplers = [_SubsetSampler([1, 3, 5], rank=rank, world_size=2) for rank in range(2)]
+    assert [list(sampler) for sampler in samplers] == [[1, 5], [3, 1]]
+    assert [len(sampler) for sampler in samplers] == [2, 2]
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+import torch
+from lightning.pytorch.demos.boring_classes import BoringDataModule
+from torch import distributed as dist
+from torch import multiprocessing as mp
+
+from lightcat.datamodule.creator import BroadcastDataModuleCreator, DataModuleCreator
+from lightcat.testing import objectory_available
+from lightcat.utils.distributed import all_gather_object
+from lightcat.utils.imports import is_objectory_available
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+if is_objectory_available():
+    from objectory import OBJECT_TARGET
+else:  # pragma: no cover
+    OBJECT_TARGET = "_target_"
+
+
+def create_worker(rank: int, world_size: int, init_file: str, output_file: str) -> None:
+    dist.init_process_group(
+        "gloo", init_method=f"file://{init_file}", rank=rank, world_size=world_size
+    )
+    try:
+        # Each process has a different seed, so the data are only equal
+        # if the datamodule is created by a single process.
+        torch.manual_seed(rank)
+        datamodule = BroadcastDataModuleCreator(
+            DataModuleCreator(BoringDataModule()), stages=["fit"]
+        ).create()
+        outputs = all_gather_object(
+            {
+                "data": datamodule.random_full.data,
+                "num_train": len(datamodule.random_train),
+            }
+        )
+        if rank == 0:
+            torch.save(outputs, output_file)
+    finally:
+        dist.destroy_process_group()
+
+
+################################################
+#     Tests for BroadcastDataModuleCreator     #
+################################################
+
+
+def test_broadcast_datamodule_creator_repr() -> None:
+    assert repr(BroadcastDataModuleCreator(DataModuleCreator(BoringDataModule()))).startswith(
+        "BroadcastDataModuleCreator("
+    )
+
+
+def test_broadcast_datamodule_creator_str() -> None:
+    assert str(BroadcastDataModuleCreator(DataModuleCreator(BoringDataModule()))).startswith(
+        "BroadcastDataModuleCreator("
+    )
+
+
+def test_broadcast_datamodule_creator_create() -> None:
+    datamodule = BoringDataModule()
+    assert BroadcastDataModuleCreator(DataModuleCreator(datamodule)).create() is datamodule
+    assert not hasattr(datamodule, "random_train")
+
+
+def test_broadcast_datamodule_creator_create_stages() -> None:
+    datamodule = BroadcastDataModuleCreator(
+        DataModuleCreator(BoringDataModule()), stages=["fit", "test"]
+    ).create()
+    assert len(datamodule.random_train) == 64
+    assert len(datamodule.random_val) == 64
+    assert len(datamodule.random_test) == 64
+
+
+@objectory_available
+def test_broadcast_datamodule_creator_create_config() -> None:
+    datamodule = BroadcastDataModuleCreator(
+        {
+            OBJECT_TARGET: "lightcat.datamodule.creator.DataModuleCreator",
+            "datamodule": {
+                OBJECT_TARGET: "lightning.pytorch.demos.boring_classes.BoringDataModule"
+            },
+        }
+    ).create()
+    assert isinstance(datamodule, BoringDataModule)
+
+
+@pytest.mark.timeout(120)
+def test_broadcast_datamodule_creator_create_gloo(tmp_path: Path) -> None:
+    output_file = tmp_path.joinpath("output.pt")
+    # The processes are forked, so they do not import the modules again.
+    mp.start_processes(
+        create_worker,
+        args=(2, str(tmp_path.joinpath("init")), str(output_file)),
+        nprocs=2,
+        start_method="fork",
+    )
+    outputs = torch.load(output_file)
+    assert len(outputs) == 2
+    assert outputs[0]["data"].equal(outputs[1]["data"])
+    assert outputs[1]["num_train"] == 64
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+import torch
+from coola import objects_are_equal
+
+from lightcat.datamodule.creator import DataModuleCreator
+from lightcat.datamodule.preprocessing import (
+    MapStage,
+    PreprocessedDataModule,
+    PreprocessingPipeline,
+)
+from lightcat.testing import objectory_available
+from lightcat.utils.imports import is_objectory_available
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+if is_objectory_available():
+    from objectory import OBJECT_TARGET
+else:  # pragma: no cover
+    OBJECT_TARGET = "_target_"
+
+
+class RangeSource:
+    def __init__(self, num_records: int) -> None:
+        self.num_records = num_records
+
+    def __len__(self) -> int:
+        return self.num_records
+
+    def __getitem__(self, index: int) -> int:
+        return index
+
+
+def create_pipeline(cache_dir: Path, num_records: int = 10) -> PreprocessingPipeline:
+    return PreprocessingPipeline(
+        source=list(range(num_records)), stages=[MapStage(float)], cache_dir=cache_dir
+    )
+
+
+############################################
+#     Tests for PreprocessedDataModule     #
+############################################
+
+
+def test_preprocessed_datamodule_incorrect_split(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Incorrect split 'training'"):
+        PreprocessedDataModule(pipelines={"training": create_pipeline(tmp_path)})
+
+
+def test_preprocessed_datamodule_pipelines(tmp_path: Path) -> None:
+    pipeline = create_pipeline(tmp_path)
+    assert PreprocessedDataModule(pipelines={"train": pipeline}).pipelines == {"train": pipeline}
+
+
+@objectory_available
+def test_preprocessed_datamodule_pipelines_config(tmp_path: Path) -> None:
+    datamodule = PreprocessedDataModule(
+        pipelines={
+            "train": {
+                OBJECT_TARGET: "lightcat.datamodule.preprocessing.PreprocessingPipeline",
+                "source": [1, 2, 3],
+                "stages": [],
+                "cache_dir": tmp_path,
+            }
+        }
+    )
+    assert isinstance(datamodule.pipelines["train"], PreprocessingPipeline)
+
+
+def test_preprocessed_datamodule_prepare_data(tmp_path: Path) -> None:
+    datamodule = PreprocessedDataModule(
+        pipelines={"train": create_pipeline(tmp_path), "val": create_pipeline(tmp_path, 6)}
+    )
+    datamodule.prepare_data()
+    assert all(pipeline.is_complete() for pipeline in datamodule.pipelines.values())
+
+
+@pytest.mark.parametrize("split", ["train", "val", "test", "predict"])
+def test_preprocessed_datamodule_dataloader(tmp_path: Path, split: str) -> None:
+    datamodule = PreprocessedDataModule(
+        pipelines={split: create_pipeline(tmp_path)}, dataloader_kwargs={"batch_size": 4}
+    )
+    datamodule.prepare_data()
+    datamodule.setup("fit")
+    dataloader = getattr(datamodule, f"{split}_dataloader")()
+    assert objects_are_equal(
+        list(dataloader),
+        [
+            torch.tensor([0.0, 1.0, 2.0, 3.0], dtype=torch.float64),
+            torch.tensor([4.0, 5.0, 6.0, 7.0], dtype=torch.float64),
+            torch.tensor([8.0, 9.0], dtype=torch.float64),
+        ],
+    )
+
+
+def test_preprocessed_datamodule_dataloader_missing_split(tmp_path: Path) -> None:
+    datamodule = PreprocessedDataModule(pipelines={"train": create_pipeline(tmp_path)})
+    datamodule.prepare_data()
+    datamodule.setup("fit")
+    with pytest.raises(RuntimeError, match="The 'val' dataset is not available"):
+        datamodule.val_dataloader()
+
+
+def test_preprocessed_datamodule_dataloader_without_setup(tmp_path: Path) -> None:
+    datamodule = PreprocessedDataModule(pipelines={"train": create_pipeline(tmp_path)})
+    with pytest.raises(RuntimeError, match="The 'train' dataset is not available"):
+        datamodule.train_dataloader()
+
+
+@objectory_available
+def test_preprocessed_datamodule_creator_reuse_cache(tmp_path: Path) -> None:
+    config = {
+        OBJECT_TARGET: "lightcat.datamodule.preprocessing.PreprocessedDataModule",
+        "pipelines": {
+            "train": {
+                OBJECT_TARGET: "lightcat.datamodule.preprocessing.PreprocessingPipeline",
+                "source": {OBJECT_TARGET: f"{__name__}.RangeSource", "num_records": 10},
+                "stages": [
+                    {
+                        OBJECT_TARGET: "lightcat.datamodule.preprocessing.MapStage",
+                        "fn": "builtins.float",
+                    }
+                ],
+                "cache_dir": tmp_path,
+            }
+        },
+    }
+    datamodule = DataModuleCreator(config).create()
+    datamodule.prepare_data()
+    output_dir = datamodule.pipelines["train"].output_dir
+    mtime = datamodule.pipelines["train"].manifest_path.stat().st_mtime_ns
+
+    datamodule = DataModuleCreator(config).create()
+    assert datamodule.pipelines["train"].output_dir == output_dir
+    assert datamodule.pipelines["train"].is_complete()
+    datamodule.prepare_data()
+    assert datamodule.pipelines["train"].manifest_path.stat().st_mtime_ns == mtime
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+
+from lightcat.datamodule.preprocessing import (
+    FilterStage,
+    MapStage,
+    PreprocessingPipeline,
+    ShardedDataset,
+)
+from lightcat.datamodule.preprocessing.pipeline import _hash_records
+from lightcat.testing import objectory_available
+from lightcat.utils.imports import is_objectory_available
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+if is_objectory_available():
+    from objectory import OBJECT_TARGET
+else:  # pragma: no cover
+    OBJECT_TARGET = "_target_"
+
+
+class RangeSource:
+    def __init__(self, num_records: int) -> None:
+        self.num_records = num_records
+
+    def __len__(self) -> int:
+        return self.num_records
+
+    def __getitem__(self, index: int) -> int:
+        return index
+
+
+def double(value: int) -> int:
+    return 2 * value
+
+
+def is_not_multiple_of_3(value: int) -> bool:
+    return value % 3 != 0
+
+
+def create_pipeline(cache_dir: Path, **kwargs: Any) -> PreprocessingPipeline:
+    return PreprocessingPipeline(
+        **(
+            {
+                "source": list(range(10)),
+                "stages": [MapStage(double), FilterStage(is_not_multiple_of_3)],
+                "cache_dir": cache_dir,
+                "shard_size": 4,
+            }
+            | kwargs
+        )
+    )
+
+
+###########################################
+#     Tests for PreprocessingPipeline     #
+###########################################
+
+
+def test_preprocessing_pipeline_repr(tmp_path: Path) -> None:
+    assert repr(create_pipeline(tmp_path)).startswith("PreprocessingPipeline(fingerprint=")
+
+
+def test_preprocessing_pipeline_str(tmp_path: Path) -> None:
+    assert str(create_pipeline(tmp_path)).startswith("PreprocessingPipeline(")
+
+
+@pytest.mark.parametrize("shard_size", [0, -1])
+def test_preprocessing_pipeline_incorrect_shard_size(tmp_path: Path, shard_size: int) -> None:
+    with pytest.raises(ValueError, match="shard_size must be greater than 0"):
+        create_pipeline(tmp_path, shard_size=shard_size)
+
+
+def test_preprocessing_pipeline_incorrect_num_workers(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="num_workers must be greater or equal to 0"):
+        create_pipeline(tmp_path, num_workers=-1)
+
+
+def test_preprocessing_pipeline_fingerprint_same_config(tmp_path: Path) -> None:
+    assert create_pipeline(tmp_path).fingerprint == create_pipeline(tmp_path).fingerprint
+
+
+def test_preprocessing_pipeline_fingerprint_num_workers(tmp_path: Path) -> None:
+    assert (
+        create_pipeline(tmp_path).fingerprint
+        == create_pipeline(tmp_path, num_workers=2).fingerprint
+    )
+
+
+def test_preprocessing_pipeline_fingerprint_different_stages(tmp_path: Path) -> None:
+    assert (
+        create_pipeline(tmp_path).fingerprint
+        != PreprocessingPipeline(
+            source=list(range(10)), stages=[MapStage(double)], cache_dir=tmp_path, shard_size=4
+        ).fingerprint
+    )
+
+
+def test_preprocessing_pipeline_fingerprint_different_shard_size(tmp_path: Path) -> None:
+    assert (
+        create_pipeline(tmp_path).fingerprint != create_pipeline(tmp_path, shard_size=5).fingerprint
+    )
+
+
+def test_preprocessing_pipeline_fingerprint_different_source(tmp_path: Path) -> None:
+    assert (
+        create_pipeline(tmp_path).fingerprint
+        != create_pipeline(tmp_path, source=list(range(100, 110))).fingerprint
+    )
+
+
+def test_preprocessing_pipeline_fingerprint_name(tmp_path: Path) -> None:
+    assert (
+        create_pipeline(tmp_path, name="a").fingerprint
+        != create_pipeline(tmp_path, name="b").fingerprint
+    )
+
+
+def test_preprocessing_pipeline_output_dir(tmp_path: Path) -> None:
+    pipeline = create_pipeline(tmp_path)
+    assert pipeline.output_dir == tmp_path.joinpath(pipeline.fingerprint)
+    assert pipeline.manifest_path == tmp_path.joinpath(pipeline.fingerprint, "manifest.json")
+
+
+def test_preprocessing_pipeline_get_config(tmp_path: Path) -> None:
+    assert create_pipeline(tmp_path).get_config() == {
+        "source": (
+            "list(num_records=10, "
+            "sha256=afb27088a6e8c915a597714c77c4a90147f5315265392aac256ee11249f567e6)"
+        ),
+        "stages": [
+            {"stage": "MapStage", "fn": f"{__name__}.double"},
+            {"stage": "FilterStage", "fn": f"{__name__}.is_not_multiple_of_3"},
+        ],
+        "shard_size": 4,
+    }
+
+
+def test_preprocessing_pipeline_get_config_hash_records_once(tmp_path: Path) -> None:
+    pipeline = create_pipeline(tmp_path)
+    with patch(
+        "lightcat.datamodule.preprocessing.pipeline._hash_records", wraps=_hash_records
+    ) as hash_records:
+        pipeline.run()
+        pipeline.get_config()
+    hash_records.assert_called_once()
+
+
+@objectory_available
+def test_preprocessing_pipeline_get_config_source_config(tmp_path: Path) -> None:
+    source = {OBJECT_TARGET: f"{__name__}.RangeSource", "num_records": 5}
+    pipeline = PreprocessingPipeline(source=source, stages=[], cache_dir=tmp_path)
+    assert pipeline.get_config()["source"] == source
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_preprocessing_pipeline_run(tmp_path: Path, num_workers: int) -> None:
+    pipeline = create_pipeline(tmp_path, num_workers=num_workers)
+    assert not pipeline.is_complete()
+    dataset = pipeline.run()
+    assert pipeline.is_complete()
+    assert isinstance(dataset, ShardedDataset)
+    assert list(dataset) == [2, 4, 8, 10, 14, 16]
+    assert sorted(path.name for path in pipeline.output_dir.iterdir()) == [
+        "manifest.json",
+        "shard-000000.pt",
+        "shard-000001.pt",
+        "shard-000002.pt",
+    ]
+
+
+def test_preprocessing_pipeline_run_manifest(tmp_path: Path) -> None:
+    pipeline = create_pipeline(tmp_path)
+    pipeline.run()
+    manifest = json.loads(pipeline.manifest_path.read_text())
+    assert manifest == {
+        "fingerprint": pipeline.fingerprint,
+        "config": pipeline.get_config(),
+        "shards": [
+            {"file": "shard-000000.pt", "num_records": 2},
+            {"file": "shard-000001.pt", "num_records": 3},
+            {"file": "shard-000002.pt", "num_records": 1},
+        ],
+    }
+
+
+def test_preprocessing_pipeline_run_empty_source(tmp_path: Path) -> None:
+    pipeline = PreprocessingPipeline(source=[], stages=[MapStage(double)], cache_dir=tmp_path)
+    assert list(pipeline.run()) == []
+
+
+def test_preprocessing_pipeline_run_complete(tmp_path: Path) -> None:
+    create_pipeline(tmp_path).run()
+    pipeline = create_pipeline(tmp_path)
+    with patch.object(PreprocessingPipeline, "_process_shard") as process_shard:
+        dataset = pipeline.run()
+    process_shard.assert_not_called()
+    assert list(dataset) == [2, 4, 8, 10, 14, 16]
+
+
+def test_preprocessing_pipeline_run_resume(tmp_path: Path) -> None:
+    pipeline = create_pipeline(tmp_path)
+    pipeline.run()
+    # Simulate an interrupted run where the last shard was not processed.
+    pipeline.manifest_path.unlink()
+    pipeline.output_dir.joinpath("shard-000002.pt").unlink()
+
+    pipeline = create_pipeline(tmp_path)
+    with patch.object(
+        PreprocessingPipeline, "_process_shard", autospec=True, return_value=0
+    ) as process_shard:
+        pipeline.run()
+    process_shard.assert_called_once_with(pipeline, 2)
+
+
+def test_preprocessing_pipeline_run_different_config(tmp_path: Path) -> None:
+    create_pipeline(tmp_path).run()
+    pipeline = create_pipeline(tmp_path, shard_size=3)
+    assert not pipeline.is_complete()
+    assert list(pipeline.run()) == [2, 4, 8, 10, 14, 16]
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+####################################
+#     Tests for ShardedDataset     #
+####################################
+
+
+@pytest.fixture
+def dataset(tmp_path: Path) -> ShardedDataset:
+    pipeline = create_pipeline(tmp_path)
+    pipeline.run()
+    return ShardedDataset(pipeline.manifest_path)
+
+
+def test_sharded_dataset_repr(dataset: ShardedDataset) -> None:
+    assert repr(dataset) == "ShardedDataset(num_records=6, num_shards=3)"
+
+
+def test_sharded_dataset_len(dataset: ShardedDataset) -> None:
+    assert len(dataset) == 6
+
+
+@pytest.mark.parametrize(("index", "value"), [(0, 2), (1, 4), (2, 8), (5, 16), (-1, 16)])
+def test_sharded_dataset_getitem(dataset: ShardedDataset, index: int, value: int) -> None:
+    assert dataset[index] == value
+
+
+def test_sharded_dataset_getitem_random_order(dataset: ShardedDataset) -> None:
+    assert [dataset[i] for i in [5, 0, 3, 1, 4, 2]] == [16, 2, 10, 4, 14, 8]
+
+
+@pytest.mark.parametrize("index", [6, -7])
+def test_sharded_dataset_getitem_out_of_range(dataset: ShardedDataset, index: int) -> None:
+    with pytest.raises(IndexError, match="is out of range"):
+        dataset[index]
+
+
+def test_sharded_dataset_getstate(dataset: ShardedDataset) -> None:
+    assert dataset[0] == 2
+    state = dataset.__getstate__()
+    assert state["_shard"] is None
+    assert state["_shard_index"] is None
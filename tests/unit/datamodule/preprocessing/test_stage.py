@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import functools
+import logging
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
+import torch
+
+from lightcat.datamodule.preprocessing import (
+    FilterStage,
+    MapStage,
+    is_stage_config,
+    setup_stage,
+)
+from lightcat.testing import objectory_available
+from lightcat.utils.imports import is_objectory_available
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+if is_objectory_available():
+    from objectory import OBJECT_TARGET
+else:  # pragma: no cover
+    OBJECT_TARGET = "_target_"
+
+
+def double(value: int) -> int:
+    return 2 * value
+
+
+def is_even(value: int) -> bool:
+    return value % 2 == 0
+
+
+def make_multiply(factor: int) -> Callable[[int], int]:
+    def multiply(value: int) -> int:
+        return factor * value
+
+    return multiply
+
+
+class Multiply:
+    def __init__(self, factor: int) -> None:
+        self.factor = factor
+
+    def __call__(self, value: int) -> int:
+        return self.factor * value
+
+
+##############################
+#     Tests for MapStage     #
+##############################
+
+
+def test_map_stage_repr() -> None:
+    assert repr(MapStage(double)) == f"MapStage(fn={__name__}.double)"
+
+
+def test_map_stage_call() -> None:
+    assert list(MapStage(double)([1, 2, 3])) == [2, 4, 6]
+
+
+def test_map_stage_call_empty() -> None:
+    assert list(MapStage(double)([])) == []
+
+
+@objectory_available
+def test_map_stage_fn_str() -> None:
+    assert list(MapStage("builtins.abs")([-1, 2, -3])) == [1, 2, 3]
+
+
+def test_map_stage_get_config() -> None:
+    assert MapStage(double).get_config() == {"stage": "MapStage", "fn": f"{__name__}.double"}
+
+
+def test_map_stage_get_config_partial() -> None:
+    assert MapStage(functools.partial(round, ndigits=2)).get_config() == {
+        "stage": "MapStage",
+        "fn": "builtins.round(ndigits=2)",
+    }
+
+
+@pytest.mark.parametrize("fn", [int, str.upper, torch.abs, functools.partial(round, ndigits=2)])
+def test_map_stage_stable_name(fn: Callable) -> None:
+    assert MapStage(fn).get_config()["fn"]
+
+
+@pytest.mark.parametrize(
+    "fn",
+    [
+        lambda value: value + 1,
+        make_multiply(2),
+        Multiply(2),
+        Multiply(2).__call__,
+        "-".join,
+        functools.partial(lambda value, factor: factor * value, factor=2),
+    ],
+)
+def test_map_stage_unstable_name(fn: Callable) -> None:
+    with pytest.raises(ValueError, match="cannot be identified by its qualified name"):
+        MapStage(fn)
+
+
+def test_map_stage_name() -> None:
+    stage = MapStage(lambda value: value + 1, name="increment-v1")
+    assert repr(stage) == "MapStage(fn=increment-v1)"
+    assert stage.get_config() == {"stage": "MapStage", "fn": "increment-v1"}
+    assert list(stage([1, 2])) == [2, 3]
+
+
+def test_map_stage_lambdas_different_names() -> None:
+    assert (
+        MapStage(lambda value: value + 1, name="increment").get_config()
+        != MapStage(lambda value: value * 100, name="scale").get_config()
+    )
+
+
+#################################
+#     Tests for FilterStage     #
+#################################
+
+
+def test_filter_stage_repr() -> None:
+    assert repr(FilterStage(is_even)) == f"FilterStage(fn={__name__}.is_even)"
+
+
+def test_filter_stage_call() -> None:
+    assert list(FilterStage(is_even)([1, 2, 3, 4, 5])) == [2, 4]
+
+
+def test_filter_stage_call_empty() -> None:
+    assert list(FilterStage(is_even)([1, 3])) == []
+
+
+@objectory_available
+def test_filter_stage_fn_str() -> None:
+    assert list(FilterStage("builtins.bool")([0, 1, 0, 2])) == [1, 2]
+
+
+def test_filter_stage_get_config() -> None:
+    assert FilterStage(is_even).get_config() == {
+        "stage": "FilterStage",
+        "fn": f"{__name__}.is_even",
+    }
+
+
+def test_filter_stage_unstable_name() -> None:
+    with pytest.raises(ValueError, match="cannot be identified by its qualified name"):
+        FilterStage(lambda value: value > 0)
+
+
+def test_filter_stage_name() -> None:
+    stage = FilterStage(lambda value: value > 0, name="positive")
+    assert stage.get_config() == {"stage": "FilterStage", "fn": "positive"}
+    assert list(stage([-1, 2, 0, 3])) == [2, 3]
+
+
+#####################################
+#     Tests for is_stage_config     #
+#####################################
+
+
+@objectory_available
+def test_is_stage_config_true() -> None:
+    assert is_stage_config(
+        {OBJECT_TARGET: "lightcat.datamodule.preprocessing.MapStage", "fn": "builtins.abs"}
+    )
+
+
+@objectory_available
+def test_is_stage_config_false() -> None:
+    assert not is_stage_config({OBJECT_TARGET: "torch.nn.Identity"})
+
+
+#################################
+#     Tests for setup_stage     #
+#################################
+
+
+@objectory_available
+@pytest.mark.parametrize(
+    "stage",
+    [
+        MapStage(abs),
+        {OBJECT_TARGET: "lightcat.datamodule.preprocessing.MapStage", "fn": "builtins.abs"},
+    ],
+)
+def test_setup_stage(stage: MapStage | dict) -> None:
+    assert isinstance(setup_stage(stage), MapStage)
+
+
+@objectory_available
+def test_setup_stage_incorrect_type(caplog: pytest.LogCaptureFixture) -> None:
+    with caplog.at_level(level=logging.WARNING):
+        assert isinstance(setup_stage({OBJECT_TARGET: "torch.nn.Identity"}), torch.nn.Identity)
+        assert caplog.messages
+
+
+def test_setup_stage_no_objectory() -> None:
+    with (
+        patch("lightcat.utils.imports.is_objectory_available", lambda: False),
+        pytest.raises(RuntimeError, match="'objectory' package is required but not installed."),
+    ):
+        setup_stage({OBJECT_TARGET: "lightcat.datamodule.preprocessing.MapStage"})
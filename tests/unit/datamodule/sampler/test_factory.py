@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import logging
+from unittest.mock import patch
+
+import pytest
+import torch
+from torch.utils.data import SequentialSampler
+
+from lightcat.datamodule.sampler import (
+    FeistelSampler,
+    is_sampler_config,
+    setup_sampler,
+)
+from lightcat.testing import objectory_available
+from lightcat.utils.imports import is_objectory_available
+
+if is_objectory_available():
+    from objectory import OBJECT_TARGET
+else:  # pragma: no cover
+    OBJECT_TARGET = "_target_"
+
+
+#######################################
+#     Tests for is_sampler_config     #
+#######################################
+
+
+@objectory_available
+def test_is_sampler_config_true() -> None:
+    assert is_sampler_config(
+        {OBJECT_TARGET: "lightcat.datamodule.sampler.FeistelSampler", "num_samples": 10}
+    )
+
+
+@objectory_available
+def test_is_sampler_config_false() -> None:
+    assert not is_sampler_config({OBJECT_TARGET: "torch.nn.Identity"})
+
+
+###################################
+#     Tests for setup_sampler     #
+###################################
+
+
+@objectory_available
+@pytest.mark.parametrize(
+    "sampler",
+    [
+        FeistelSampler(num_samples=10),
+        {OBJECT_TARGET: "lightcat.datamodule.sampler.FeistelSampler", "num_samples": 10},
+    ],
+)
+def test_setup_sampler(sampler: FeistelSampler | dict) -> None:
+    assert isinstance(setup_sampler(sampler), FeistelSampler)
+
+
+def test_setup_sampler_object() -> None:
+    sampler = SequentialSampler(range(10))
+    assert setup_sampler(sampler) is sampler
+
+
+@objectory_available
+def test_setup_sampler_incorrect_type(caplog: pytest.LogCaptureFixture) -> None:
+    with caplog.at_level(level=logging.WARNING):
+        assert isinstance(setup_sampler({OBJECT_TARGET: "torch.nn.Identity"}), torch.nn.Identity)
+        assert caplog.messages
+
+
+def test_setup_sampler_object_no_objectory() -> None:
+    with (
+        patch("lightcat.utils.imports.is_objectory_available", lambda: False),
+        pytest.raises(RuntimeError, match="'objectory' package is required but not installed."),
+    ):
+        setup_sampler({OBJECT_TARGET: "lightcat.datamodule.sampler.FeistelSampler"})
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import pytest
+import torch
+
+from lightcat.datamodule.sampler import FeistelPermutation, FeistelSampler
+
+########################################
+#     Tests for FeistelPermutation     #
+########################################
+
+
+def test_feistel_permutation_repr() -> None:
+    assert repr(FeistelPermutation(num_items=10)).startswith("FeistelPermutation(")
+
+
+def test_feistel_permutation_len() -> None:
+    assert len(FeistelPermutation(num_items=10)) == 10
+
+
+def test_feistel_permutation_num_items() -> None:
+    assert FeistelPermutation(num_items=10).num_items == 10
+
+
+@pytest.mark.parametrize("num_items", [1, 2, 3, 7, 16, 100, 1001])
+def test_feistel_permutation_call_is_bijection(num_items: int) -> None:
+    perm = FeistelPermutation(num_items=num_items, key=42)
+    assert sorted(perm(i) for i in range(num_items)) == list(range(num_items))
+
+
+@pytest.mark.parametrize("num_items", [1, 2, 3, 7, 16, 100, 1001])
+def test_feistel_permutation_permute_is_bijection(num_items: int) -> None:
+    perm = FeistelPermutation(num_items=num_items, key=42)
+    assert perm.permute(torch.arange(num_items)).sort().values.equal(torch.arange(num_items))
+
+
+def test_feistel_permutation_permute_same_as_call() -> None:
+    perm = FeistelPermutation(num_items=100, key=42)
+    assert perm.permute(torch.arange(100)).tolist() == [perm(i) for i in range(100)]
+
+
+def test_feistel_permutation_same_key() -> None:
+    perm1 = FeistelPermutation(num_items=100, key=42)
+    perm2 = FeistelPermutation(num_items=100, key=42)
+    assert [perm1(i) for i in range(100)] == [perm2(i) for i in range(100)]
+
+
+def test_feistel_permutation_different_keys() -> None:
+    perm1 = FeistelPermutation(num_items=100, key=1)
+    perm2 = FeistelPermutation(num_items=100, key=2)
+    assert [perm1(i) for i in range(100)] != [perm2(i) for i in range(100)]
+
+
+def test_feistel_permutation_shuffles() -> None:
+    perm = FeistelPermutation(num_items=100, key=42)
+    assert [perm(i) for i in range(100)] != list(range(100))
+
+
+def test_feistel_permutation_large() -> None:
+    perm = FeistelPermutation(num_items=2**62, key=42)
+    values = perm.permute(torch.arange(1000))
+    assert values.min() >= 0
+    assert values.max() < 2**62
+    assert values.unique().numel() == 1000
+
+
+@pytest.mark.parametrize("index", [-1, 10])
+def test_feistel_permutation_call_incorrect_index(index: int) -> None:
+    perm = FeistelPermutation(num_items=10)
+    with pytest.raises(IndexError, match="index has to be in"):
+        perm(index)
+
+
+def test_feistel_permutation_incorrect_num_items() -> None:
+    with pytest.raises(ValueError, match="num_items has to be greater than 0"):
+        FeistelPermutation(num_items=0)
+
+
+def test_feistel_permutation_too_many_items() -> None:
+    with pytest.raises(ValueError, match="num_items has to be lower or equal to"):
+        FeistelPermutation(num_items=2**62 + 1)
+
+
+def test_feistel_permutation_incorrect_num_rounds() -> None:
+    with pytest.raises(ValueError, match="num_rounds has to be greater than 0"):
+        FeistelPermutation(num_items=10, num_rounds=0)
+
+
+####################################
+#     Tests for FeistelSampler     #
+####################################
+
+
+def test_feistel_sampler_repr() -> None:
+    assert repr(FeistelSampler(num_samples=10)).startswith("FeistelSampler(")
+
+
+def test_feistel_sampler_len() -> None:
+    assert len(FeistelSampler(num_samples=10)) == 10
+
+
+@pytest.mark.parametrize("num_samples", [1, 5, 100, 1001])
+def test_feistel_sampler_iter(num_samples: int) -> None:
+    indices = list(FeistelSampler(num_samples=num_samples, seed=42))
+    assert len(indices) == num_samples
+    assert sorted(indices) == list(range(num_samples))
+
+
+def test_feistel_sampler_iter_shuffle_false() -> None:
+    assert list(FeistelSampler(num_samples=10, shuffle=False)) == list(range(10))
+
+
+def test_feistel_sampler_iter_small_chunk_size() -> None:
+    assert list(FeistelSampler(num_samples=100, seed=42, chunk_size=7)) == list(
+        FeistelSampler(num_samples=100, seed=42)
+    )
+
+
+def test_feistel_sampler_iter_deterministic() -> None:
+    assert list(FeistelSampler(num_samples=100, seed=42)) == list(
+        FeistelSampler(num_samples=100, seed=42)
+    )
+
+
+def test_feistel_sampler_iter_different_seeds() -> None:
+    assert list(FeistelSampler(num_samples=100, seed=1)) != list(
+        FeistelSampler(num_samples=100, seed=2)
+    )
+
+
+def test_feistel_sampler_set_epoch() -> None:
+    sampler = FeistelSampler(num_samples=100, seed=42)
+    indices0 = list(sampler)
+    sampler.set_epoch(1)
+    assert sampler.epoch == 1
+    indices1 = list(sampler)
+    assert indices0 != indices1
+    assert sorted(indices1) == list(range(100))
+
+
+@pytest.mark.parametrize("num_replicas", [2, 3, 7])
+def test_feistel_sampler_distributed(num_replicas: int) -> None:
+    shards = [
+        list(FeistelSampler(num_samples=100, seed=42, num_replicas=num_replicas, rank=rank))
+        for rank in range(num_replicas)
+    ]
+    assert len({len(shard) for shard in shards}) == 1
+    assert set().union(*shards) == set(range(100))
+
+
+def test_feistel_sampler_distributed_disjoint() -> None:
+    shards = [
+        set(FeistelSampler(num_samples=100, seed=42, num_replicas=4, rank=rank))
+        for rank in range(4)
+    ]
+    assert sum(len(shard) for shard in shards) == 100
+    assert set().union(*shards) == set(range(100))
+
+
+def test_feistel_sampler_distributed_drop_last() -> None:
+    shards = [
+        list(FeistelSampler(num_samples=10, seed=42, num_replicas=3, rank=rank, drop_last=True))
+        for rank in range(3)
+    ]
+    assert [len(shard) for shard in shards] == [3, 3, 3]
+    assert len(set().union(*shards)) == 9
+
+
+def test_feistel_sampler_set_start_index() -> None:
+    sampler = FeistelSampler(num_samples=100, seed=42)
+    indices = list(sampler)
+    sampler.set_start_index(40)
+    assert sampler.start_index == 40
+    assert len(sampler) == 100
+    assert list(sampler) == indices[40:]
+
+
+def test_feistel_sampler_set_start_index_only_next_iteration() -> None:
+    sampler = FeistelSampler(num_samples=100, seed=42)
+    sampler.set_start_index(40)
+    list(sampler)
+    assert sampler.start_index == 0
+    assert len(list(sampler)) == 100
+
+
+def test_feistel_sampler_set_start_index_distributed() -> None:
+    sampler = FeistelSampler(num_samples=100, seed=42, num_replicas=4, rank=1)
+    indices = list(sampler)
+    sampler.set_start_index(10)
+    assert list(sampler) == indices[10:]
+
+
+@pytest.mark.parametrize("index", [-1, 101])
+def test_feistel_sampler_set_start_index_incorrect(index: int) -> None:
+    sampler = FeistelSampler(num_samples=100)
+    with pytest.raises(ValueError, match="index has to be in"):
+        sampler.set_start_index(index)
+
+
+def test_feistel_sampler_state_dict() -> None:
+    sampler = FeistelSampler(num_samples=100, seed=42)
+    sampler.set_epoch(3)
+    sampler.set_start_index(10)
+    assert sampler.state_dict() == {"num_samples": 100, "seed": 42, "epoch": 3, "start_index": 10}
+
+
+def test_feistel_sampler_load_state_dict() -> None:
+    sampler = FeistelSampler(num_samples=100, seed=42)
+    sampler.set_epoch(3)
+    indices = list(sampler)
+    sampler = FeistelSampler(num_samples=100)
+    sampler.load_state_dict({"num_samples": 100, "seed": 42, "epoch": 3, "start_index": 10})
+    assert sampler.epoch == 3
+    assert sampler.start_index == 10
+    assert list(sampler) == indices[10:]
+
+
+def test_feistel_sampler_load_state_dict_round_trip() -> None:
+    sampler = FeistelSampler(num_samples=100, seed=42)
+    sampler.set_epoch(2)
+    sampler.set_start_index(5)
+    other = FeistelSampler(num_samples=100)
+    other.load_state_dict(sampler.state_dict())
+    assert list(other) == list(sampler)
+
+
+def test_feistel_sampler_load_state_dict_incorrect_num_samples() -> None:
+    sampler = FeistelSampler(num_samples=100)
+    with pytest.raises(ValueError, match="Incorrect number of samples"):
+        sampler.load_state_dict({"num_samples": 10, "seed": 42, "epoch": 3, "start_index": 1})
+
+
+def test_feistel_sampler_dataloader() -> None:
+    loader = torch.utils.data.DataLoader(
+        torch.utils.data.TensorDataset(torch.arange(20)),
+        batch_size=4,
+        sampler=FeistelSampler(num_samples=20, seed=42),
+    )
+    assert len(loader) == 5
+    assert torch.cat([batch[0] for batch in loader]).sort().values.equal(torch.arange(20))
+
+
+def test_feistel_sampler_incorrect_num_samples() -> None:
+    with pytest.raises(ValueError, match="num_samples has to be greater than 0"):
+        FeistelSampler(num_samples=0)
+
+
+def test_feistel_sampler_incorrect_num_replicas() -> None:
+    with pytest.raises(ValueError, match="num_replicas has to be greater than 0"):
+        FeistelSampler(num_samples=10, num_replicas=0)
+
+
+def test_feistel_sampler_incorrect_rank() -> None:
+    with pytest.raises(ValueError, match="rank has to be in"):
+        FeistelSampler(num_samples=10, num_replicas=2, rank=2)
+
+
+def test_feistel_sampler_incorrect_chunk_size() -> None:
+    with pytest.raises(ValueError, match="chunk_size has to be greater than 0"):
+        FeistelSampler(num_samples=10, chunk_size=0)
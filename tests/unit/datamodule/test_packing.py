@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+from collections import OrderedDict, namedtuple
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
+import torch
+from coola import objects_are_equal
+from lightning import Trainer
+from lightning.pytorch.demos.boring_classes import BoringModel
+from torch.utils.data import DataLoader, Dataset
+
+from lightcat.datamodule import (
+    BatchPackingMixin,
+    PackedBatch,
+    PackedCollate,
+    pack_batch,
+    unpack_batch,
+)
+from lightcat.datamodule.packing import ALIGNMENT
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+Point = namedtuple("Point", ["x", "y"])  # noqa: PYI024
+
+
+class FeatureDataset(Dataset):
+    def __len__(self) -> int:
+        return 16
+
+    def __getitem__(self, index: int) -> dict:
+        return {
+            "float": torch.full((3,), float(index)),
+            "long": torch.tensor(index),
+            "bool": torch.tensor([index % 2 == 0]),
+            "half": torch.ones(2, dtype=torch.float16) * index,
+            "name": f"item{index}",
+        }
+
+
+class MyModel(BatchPackingMixin, BoringModel):
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches = []
+
+    def training_step(self, batch: dict, batch_idx: int) -> torch.Tensor:  # noqa: ARG002
+        self.batches.append(batch)
+        return self.layer(torch.ones(2, 32, device=self.device) * batch["long"].sum()).sum()
+
+    def train_dataloader(self) -> DataLoader:
+        return DataLoader(FeatureDataset(), batch_size=4, collate_fn=PackedCollate())
+
+
+#################################
+#     Tests for PackedBatch     #
+#################################
+
+
+def test_packed_batch_repr() -> None:
+    assert repr(pack_batch({"x": torch.ones(2, 3)})).startswith("PackedBatch(")
+
+
+def test_packed_batch_buffer() -> None:
+    packed = pack_batch({"x": torch.ones(2, 3), "y": torch.tensor([1, 2])})
+    assert packed.buffer.dtype == torch.uint8
+    assert packed.buffer.dim() == 1
+    assert packed.buffer.numel() == 48
+
+
+def test_packed_batch_device() -> None:
+    assert pack_batch({"x": torch.ones(2, 3)}).device == torch.device("cpu")
+
+
+def test_packed_batch_specs() -> None:
+    packed = pack_batch({"x": torch.ones(2, 3), "y": torch.tensor([1, 2])})
+    assert packed.specs == (
+        (0, torch.float, torch.Size([2, 3])),
+        (32, torch.long, torch.Size([2])),
+    )
+
+
+def test_packed_batch_specs_aligned() -> None:
+    packed = pack_batch(
+        [torch.ones(3, dtype=torch.uint8), torch.ones(1, dtype=torch.complex128), torch.ones(5)]
+    )
+    assert all(spec.offset % ALIGNMENT == 0 for spec in packed.specs)
+
+
+def test_packed_batch_is_pinned_false() -> None:
+    assert not pack_batch({"x": torch.ones(2, 3)}).is_pinned()
+
+
+def test_packed_batch_pin_memory() -> None:
+    packed = pack_batch({"x": torch.ones(2, 3)})
+    with patch.object(torch.Tensor, "pin_memory", lambda self: self.clone()):
+        pinned = packed.pin_memory()
+    assert pinned is not packed
+    assert pinned.specs == packed.specs
+    assert objects_are_equal(pinned.unpack(), {"x": torch.ones(2, 3)})
+
+
+def test_packed_batch_to() -> None:
+    packed = pack_batch({"x": torch.ones(2, 3)}).to(device="cpu")
+    assert isinstance(packed, PackedBatch)
+    assert objects_are_equal(packed.unpack(), {"x": torch.ones(2, 3)})
+
+
+@pytest.mark.parametrize(
+    "dtype",
+    [
+        torch.bool,
+        torch.uint8,
+        torch.int8,
+        torch.int16,
+        torch.int32,
+        torch.int64,
+        torch.float16,
+        torch.bfloat16,
+        torch.float32,
+        torch.float64,
+        torch.complex64,
+    ],
+)
+def test_packed_batch_unpack_dtype(dtype: torch.dtype) -> None:
+    batch = {"a": torch.ones(3, dtype=torch.uint8), "b": torch.arange(6).view(2, 3).to(dtype)}
+    assert objects_are_equal(pack_batch(batch).unpack(), batch)
+
+
+def test_packed_batch_unpack_views() -> None:
+    packed = pack_batch({"x": torch.ones(2, 3), "y": torch.tensor([1, 2])})
+    batch = packed.unpack()
+    assert batch["x"].untyped_storage().data_ptr() == packed.buffer.untyped_storage().data_ptr()
+    assert batch["y"].untyped_storage().data_ptr() == packed.buffer.untyped_storage().data_ptr()
+
+
+###################################
+#     Tests for PackedCollate     #
+###################################
+
+
+def test_packed_collate_repr() -> None:
+    assert repr(PackedCollate()) == "PackedCollate(collate_fn=default_collate)"
+
+
+def test_packed_collate_call() -> None:
+    batch = PackedCollate()([{"x": torch.ones(3), "y": 1}, {"x": torch.zeros(3), "y": 0}])
+    assert isinstance(batch, PackedBatch)
+    assert objects_are_equal(
+        batch.unpack(),
+        {"x": torch.tensor([[1.0, 1.0, 1.0], [0.0, 0.0, 0.0]]), "y": torch.tensor([1, 0])},
+    )
+
+
+def test_packed_collate_collate_fn() -> None:
+    batch = PackedCollate(collate_fn=lambda samples: torch.stack(samples))(
+        [torch.ones(3), torch.zeros(3)]
+    )
+    assert objects_are_equal(batch.unpack(), torch.tensor([[1.0, 1.0, 1.0], [0.0, 0.0, 0.0]]))
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_packed_collate_dataloader(num_workers: int) -> None:
+    dataset = FeatureDataset()
+    dataloader = DataLoader(
+        dataset, batch_size=4, collate_fn=PackedCollate(), num_workers=num_workers
+    )
+    batches = [unpack_batch(batch) for batch in dataloader]
+    expected = list(DataLoader(dataset, batch_size=4))
+    assert objects_are_equal(batches, expected)
+
+
+#######################################
+#     Tests for BatchPackingMixin     #
+#######################################
+
+
+def test_batch_packing_mixin_transfer_batch_to_device_packed() -> None:
+    batch = MyModel().transfer_batch_to_device(
+        pack_batch({"x": torch.ones(2, 3), "y": [torch.tensor([1, 2]), "abc"]}),
+        torch.device("cpu"),
+        dataloader_idx=0,
+    )
+    assert objects_are_equal(batch, {"x": torch.ones(2, 3), "y": [torch.tensor([1, 2]), "abc"]})
+
+
+def test_batch_packing_mixin_transfer_batch_to_device_not_packed() -> None:
+    batch = MyModel().transfer_batch_to_device(
+        {"x": torch.ones(2, 3)}, torch.device("cpu"), dataloader_idx=0
+    )
+    assert objects_are_equal(batch, {"x": torch.ones(2, 3)})
+
+
+def test_batch_packing_mixin_fit(tmp_path: Path) -> None:
+    model = MyModel()
+    trainer = Trainer(
+        default_root_dir=tmp_path,
+        max_epochs=1,
+        logger=False,
+        enable_checkpointing=False,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+    )
+    trainer.fit(model)
+    assert objects_are_equal(model.batches, list(DataLoader(FeatureDataset(), batch_size=4)))
+
+
+################################
+#     Tests for pack_batch     #
+################################
+
+
+def test_pack_batch_tensor() -> None:
+    packed = pack_batch(torch.ones(2, 3))
+    assert objects_are_equal(packed.unpack(), torch.ones(2, 3))
+
+
+def test_pack_batch_nested() -> None:
+    batch = {
+        "a": [torch.ones(2, 3), (torch.zeros(4, dtype=torch.long), 1.5)],
+        "b": {"c": torch.tensor(True), "d": None},
+        "e": "abc",
+    }
+    packed = pack_batch(batch)
+    assert len(packed.specs) == 3
+    assert objects_are_equal(packed.unpack(), batch)
+
+
+def test_pack_batch_preserve_types() -> None:
+    batch = OrderedDict(p=Point(x=torch.ones(2), y=torch.zeros(3)), t=(torch.ones(1),))
+    unpacked = pack_batch(batch).unpack()
+    assert isinstance(unpacked, OrderedDict)
+    assert isinstance(unpacked["p"], Point)
+    assert isinstance(unpacked["t"], tuple)
+    assert objects_are_equal(unpacked, batch)
+
+
+def test_pack_batch_scalar_and_empty_tensors() -> None:
+    batch = [torch.tensor(3.0), torch.ones(0, 4), torch.tensor(7)]
+    assert objects_are_equal(pack_batch(batch).unpack(), batch)
+
+
+def test_pack_batch_non_contiguous() -> None:
+    tensor = torch.arange(12).view(3, 4).t()
+    assert objects_are_equal(pack_batch({"x": tensor}).unpack(), {"x": tensor})
+
+
+def test_pack_batch_requires_grad() -> None:
+    unpacked = pack_batch({"x": torch.ones(2, 3, requires_grad=True)}).unpack()
+    assert not unpacked["x"].requires_grad
+
+
+def test_pack_batch_no_tensor() -> None:
+    packed = pack_batch({"x": 1, "y": "abc"})
+    assert packed.buffer.numel() == 0
+    assert packed.unpack() == {"x": 1, "y": "abc"}
+
+
+def test_pack_batch_copy() -> None:
+    tensor = torch.ones(2, 3)
+    packed = pack_batch({"x": tensor})
+    tensor.add_(1)
+    assert objects_are_equal(packed.unpack(), {"x": torch.ones(2, 3)})
+
+
+def test_pack_batch_incorrect_devices() -> None:
+    with pytest.raises(ValueError, match="All the tensors must be on the same device"):
+        pack_batch([torch.ones(2), torch.ones(2, device="meta")])
+
+
+##################################
+#     Tests for unpack_batch     #
+##################################
+
+
+def test_unpack_batch_packed() -> None:
+    assert objects_are_equal(
+        unpack_batch(pack_batch({"x": torch.ones(2, 3)})), {"x": torch.ones(2, 3)}
+    )
+
+
+def test_unpack_batch_not_packed() -> None:
+    assert objects_are_equal(unpack_batch({"x": torch.ones(2, 3)}), {"x": torch.ones(2, 3)})
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import json
+import os
+import pickle
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+
+import pytest
+import torch
+from coola import objects_are_equal
+from torch import distributed as dist
+from torch import multiprocessing as mp
+
+from lightcat.datamodule import SharedMemoryDataModule, SharedMemoryDataset
+from lightcat.testing import objectory_available
+from lightcat.utils.imports import is_objectory_available
+
+if is_objectory_available():
+    from objectory import OBJECT_TARGET
+else:  # pragma: no cover
+    OBJECT_TARGET = "_target_"
+
+
+def load_data(num_samples: int = 10) -> dict[str, torch.Tensor]:
+    return {
+        "input": torch.arange(num_samples * 3, dtype=torch.float).view(num_samples, 3),
+        "target": torch.arange(num_samples),
+    }
+
+
+@pytest.fixture
+def dataset() -> SharedMemoryDataset:
+    dataset = SharedMemoryDataset.create(load_data())
+    yield dataset
+    dataset.close()
+
+
+#########################################
+#     Tests for SharedMemoryDataset     #
+#########################################
+
+
+def test_shared_memory_dataset_repr(dataset: SharedMemoryDataset) -> None:
+    assert repr(dataset).startswith("SharedMemoryDataset(name=")
+
+
+def test_shared_memory_dataset_len(dataset: SharedMemoryDataset) -> None:
+    assert len(dataset) == 10
+
+
+def test_shared_memory_dataset_getitem_mapping(dataset: SharedMemoryDataset) -> None:
+    assert objects_are_equal(
+        dataset[2], {"input": torch.tensor([6.0, 7.0, 8.0]), "target": torch.tensor(2)}
+    )
+
+
+def test_shared_memory_dataset_getitem_sequence() -> None:
+    dataset = SharedMemoryDataset.create([torch.ones(4, 2), torch.arange(4)])
+    try:
+        assert objects_are_equal(dataset[3], (torch.ones(2), torch.tensor(3)))
+    finally:
+        dataset.close()
+
+
+def test_shared_memory_dataset_data(dataset: SharedMemoryDataset) -> None:
+    assert objects_are_equal(dataset.data, load_data())
+
+
+def test_shared_memory_dataset_metadata(dataset: SharedMemoryDataset) -> None:
+    metadata = dataset.metadata
+    assert metadata["name"] == dataset.name
+    assert len(metadata["specs"]) == 2
+    pickle.dumps(metadata)
+
+
+def test_shared_memory_dataset_attach(dataset: SharedMemoryDataset) -> None:
+    other = SharedMemoryDataset(**dataset.metadata)
+    try:
+        assert other.name == dataset.name
+        assert objects_are_equal(other.data, load_data())
+        # The datasets share the same memory.
+        dataset.data["target"][0] = 42
+        assert other[0]["target"].item() == 42
+    finally:
+        other.close()
+
+
+def test_shared_memory_dataset_pickle(dataset: SharedMemoryDataset) -> None:
+    other = pickle.loads(pickle.dumps(dataset))  # noqa: S301
+    try:
+        assert other.name == dataset.name
+        assert objects_are_equal(other.data, load_data())
+    finally:
+        other.close()
+
+
+def test_shared_memory_dataset_close_owner() -> None:
+    dataset = SharedMemoryDataset.create(load_data())
+    name = dataset.name
+    dataset.close()
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=name)
+
+
+def test_shared_memory_dataset_close_not_owner(dataset: SharedMemoryDataset) -> None:
+    SharedMemoryDataset(**dataset.metadata).close()
+    # The segment is not removed by a process that does not own it.
+    other = SharedMemoryDataset(**dataset.metadata)
+    try:
+        assert objects_are_equal(other.data, load_data())
+    finally:
+        other.close()
+
+
+def test_shared_memory_dataset_close_twice() -> None:
+    dataset = SharedMemoryDataset.create(load_data())
+    dataset.close()
+    dataset.close()
+
+
+def test_shared_memory_dataset_create_empty() -> None:
+    with pytest.raises(ValueError, match="data must contain at least one tensor"):
+        SharedMemoryDataset.create({})
+
+
+def test_shared_memory_dataset_create_incorrect_shapes() -> None:
+    with pytest.raises(ValueError, match="All the tensors must have the same first dimension"):
+        SharedMemoryDataset.create([torch.ones(4, 2), torch.ones(5)])
+
+
+def test_shared_memory_dataset_create_copy() -> None:
+    data = load_data()
+    dataset = SharedMemoryDataset.create(data)
+    try:
+        data["target"].add_(1)
+        assert objects_are_equal(dataset.data, load_data())
+    finally:
+        dataset.close()
+
+
+############################################
+#     Tests for SharedMemoryDataModule     #
+############################################
+
+
+def test_shared_memory_datamodule_incorrect_split() -> None:
+    with pytest.raises(ValueError, match="Incorrect split 'training'"):
+        SharedMemoryDataModule(datasets={"training": load_data})
+
+
+@pytest.mark.parametrize("split", ["train", "val", "test", "predict"])
+def test_shared_memory_datamodule_dataloader(split: str) -> None:
+    datamodule = SharedMemoryDataModule(
+        datasets={split: load_data}, dataloader_kwargs={"batch_size": 4}
+    )
+    datamodule.setup("fit")
+    try:
+        batches = list(getattr(datamodule, f"{split}_dataloader")())
+        assert len(batches) == 3
+        assert objects_are_equal(batches[2]["target"], torch.tensor([8, 9]))
+    finally:
+        datamodule.teardown("fit")
+
+
+@objectory_available
+def test_shared_memory_datamodule_config() -> None:
+    datamodule = SharedMemoryDataModule(
+        datasets={"train": {OBJECT_TARGET: f"{__name__}.load_data", "num_samples": 5}}
+    )
+    datamodule.setup("fit")
+    try:
+        assert len(datamodule.datasets["train"]) == 5
+    finally:
+        datamodule.teardown("fit")
+
+
+def test_shared_memory_datamodule_setup_twice() -> None:
+    datamodule = SharedMemoryDataModule(datasets={"train": load_data})
+    datamodule.setup("fit")
+    try:
+        dataset = datamodule.datasets["train"]
+        datamodule.setup("validate")
+        assert datamodule.datasets["train"] is dataset
+    finally:
+        datamodule.teardown("fit")
+
+
+def test_shared_memory_datamodule_teardown() -> None:
+    datamodule = SharedMemoryDataModule(datasets={"train": load_data})
+    datamodule.setup("fit")
+    name = datamodule.datasets["train"].name
+    datamodule.teardown("fit")
+    assert datamodule.datasets == {}
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=name)
+
+
+def test_shared_memory_datamodule_dataloader_missing_split() -> None:
+    datamodule = SharedMemoryDataModule(datasets={"train": load_data})
+    with pytest.raises(RuntimeError, match="The 'val' dataset is not available"):
+        datamodule.val_dataloader()
+
+
+def test_shared_memory_datamodule_dataloader_workers() -> None:
+    datamodule = SharedMemoryDataModule(
+        datasets={"train": load_data},
+        dataloader_kwargs={
+            "batch_size": 5,
+            "num_workers": 1,
+            "multiprocessing_context": "spawn",
+        },
+    )
+    datamodule.setup("fit")
+    try:
+        batches = list(datamodule.train_dataloader())
+        assert objects_are_equal(
+            [batch["target"] for batch in batches],
+            [torch.tensor([0, 1, 2, 3, 4]), torch.tensor([5, 6, 7, 8, 9])],
+        )
+    finally:
+        datamodule.teardown("fit")
+
+
+def load_data_and_mark(path: str) -> dict[str, torch.Tensor]:
+    Path(path).joinpath(f"loaded-{os.environ['LOCAL_RANK']}").touch()
+    return load_data()
+
+
+def _run_distributed(rank: int, world_size: int, path: str) -> None:
+    os.environ["LOCAL_RANK"] = str(rank)
+    dist.init_process_group(
+        "gloo", init_method=f"file://{path}/init", rank=rank, world_size=world_size
+    )
+    try:
+        datamodule = SharedMemoryDataModule(datasets={"train": lambda: load_data_and_mark(path)})
+        datamodule.setup("fit")
+        dataset = datamodule.datasets["train"]
+        if rank == 0:
+            dataset.data["target"][0] = 42
+        dist.barrier()
+        Path(path).joinpath(f"rank-{rank}.json").write_text(
+            json.dumps({"name": dataset.name, "target": dataset.data["target"].tolist()})
+        )
+        datamodule.teardown("fit")
+    finally:
+        dist.destroy_process_group()
+
+
+@pytest.mark.timeout(120)
+def test_shared_memory_datamodule_distributed(tmp_path: Path) -> None:
+    # The processes are forked, so they do not import the modules again.
+    mp.start_processes(_run_distributed, args=(2, str(tmp_path)), nprocs=2, start_method="fork")
+    results = [json.loads(tmp_path.joinpath(f"rank-{rank}.json").read_text()) for rank in range(2)]
+    # Only the process with local rank 0 loads the data.
+    assert tmp_path.joinpath("loaded-0").is_file()
+    assert not tmp_path.joinpath("loaded-1").is_file()
+    # The processes share the same segment.
+    assert results[0]["name"] == results[1]["name"]
+    assert results[1]["target"] == [42, 1, 2, 3, 4, 5, 6, 7, 8, 9]
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=results[0]["name"])
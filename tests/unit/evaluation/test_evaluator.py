@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from lightning import Trainer
+from lightning.pytorch.callbacks import ModelCheckpoint
+from lightning.pytorch.demos.boring_classes import BoringModel
+
+from lightcat.evaluation import CheckpointEvaluator, load_evaluation_results
+from lightcat.testing import objectory_available
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import torch
+
+MODEL = {
+    "_target_": "lightcat.model.creator.ModelCreator",
+    "model": {"_target_": "tests.unit.evaluation.test_evaluator.LoggingModel"},
+}
+DATAMODULE = {
+    "_target_": "lightcat.datamodule.creator.DataModuleCreator",
+    "datamodule": {"_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"},
+}
+
+
+class LoggingModel(BoringModel):
+    def validation_step(self, batch: Any, batch_idx: int) -> dict[str, torch.Tensor]:
+        output = super().validation_step(batch, batch_idx)
+        self.log("val_loss", output["x"])
+        return output
+
+    def test_step(self, batch: Any, batch_idx: int) -> dict[str, torch.Tensor]:
+        output = super().test_step(batch, batch_idx)
+        self.log("test_loss", output["y"])
+        return output
+
+
+def save_checkpoints(dirpath: Path, max_epochs: int = 2) -> list[Path]:
+    Trainer(
+        default_root_dir=dirpath,
+        logger=False,
+        max_epochs=max_epochs,
+        limit_train_batches=2,
+        limit_val_batches=0,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        callbacks=[ModelCheckpoint(dirpath=dirpath, save_top_k=-1, save_last=True)],
+    ).fit(LoggingModel())
+    return sorted(dirpath.glob("epoch=*.ckpt"))
+
+
+#########################################
+#     Tests for CheckpointEvaluator     #
+#########################################
+
+
+def test_checkpoint_evaluator_repr(tmp_path: Path) -> None:
+    assert repr(CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path)).startswith(
+        "CheckpointEvaluator("
+    )
+
+
+def test_checkpoint_evaluator_str(tmp_path: Path) -> None:
+    assert str(CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path)).startswith(
+        "CheckpointEvaluator("
+    )
+
+
+def test_checkpoint_evaluator_incorrect_stage(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Incorrect stage: predict"):
+        CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path, stage="predict")
+
+
+def test_checkpoint_evaluator_incorrect_num_workers(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="num_workers must be greater or equal to 0"):
+        CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path, num_workers=-1)
+
+
+def test_checkpoint_evaluator_incorrect_num_threads(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="num_threads must be greater than 0"):
+        CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path, num_threads=0)
+
+
+def test_checkpoint_evaluator_results_path(tmp_path: Path) -> None:
+    assert (
+        CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path).results_path
+        == tmp_path / "evaluation.jsonl"
+    )
+
+
+def test_checkpoint_evaluator_poll_missing_dirpath(tmp_path: Path) -> None:
+    assert (
+        CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path / "missing", num_workers=0).poll()
+        == 0
+    )
+
+
+@objectory_available
+def test_checkpoint_evaluator_main_process(tmp_path: Path) -> None:
+    paths = save_checkpoints(tmp_path)
+    evaluator = CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path, min_age=0, num_workers=0)
+    assert evaluator.poll() == 2
+    assert evaluator.num_pending == 0
+    results = load_evaluation_results(evaluator.results_path)
+    assert [result["checkpoint"] for result in results] == [str(path) for path in paths]
+    assert [(result["epoch"], result["step"]) for result in results] == [(0, 2), (1, 4)]
+    assert all(isinstance(result["val_loss"], float) for result in results)
+    # The checkpoints are not evaluated again.
+    assert evaluator.poll() == 0
+
+
+@objectory_available
+def test_checkpoint_evaluator_test_stage(tmp_path: Path) -> None:
+    save_checkpoints(tmp_path, max_epochs=1)
+    evaluator = CheckpointEvaluator(
+        MODEL, DATAMODULE, dirpath=tmp_path, stage="test", min_age=0, num_workers=0
+    )
+    evaluator.poll()
+    results = load_evaluation_results(evaluator.results_path)
+    assert "test_loss" in results[0]
+    assert "val_loss" not in results[0]
+
+
+@objectory_available
+def test_checkpoint_evaluator_resume(tmp_path: Path) -> None:
+    save_checkpoints(tmp_path)
+    CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path, min_age=0, num_workers=0).poll()
+    evaluator = CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path, min_age=0, num_workers=0)
+    assert evaluator.poll() == 0
+    assert len(load_evaluation_results(evaluator.results_path)) == 2
+
+
+@objectory_available
+def test_checkpoint_evaluator_modified_checkpoint(tmp_path: Path) -> None:
+    path = save_checkpoints(tmp_path, max_epochs=1)[0]
+    evaluator = CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path, min_age=0, num_workers=0)
+    assert evaluator.poll() == 1
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 1_000_000_000))
+    assert evaluator.poll() == 1
+
+
+@objectory_available
+def test_checkpoint_evaluator_exclude(tmp_path: Path) -> None:
+    save_checkpoints(tmp_path)
+    evaluator = CheckpointEvaluator(
+        MODEL, DATAMODULE, dirpath=tmp_path, exclude=["epoch=0*"], min_age=0, num_workers=0
+    )
+    assert evaluator.poll() == 2
+    assert [
+        os.path.basename(result["checkpoint"])  # noqa: PTH119
+        for result in load_evaluation_results(evaluator.results_path)
+    ] == ["epoch=1-step=4.ckpt", "last.ckpt"]
+
+
+def test_checkpoint_evaluator_min_age(tmp_path: Path) -> None:
+    tmp_path.joinpath("model.ckpt").touch()
+    assert (
+        CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path, min_age=3600, num_workers=0).poll()
+        == 0
+    )
+
+
+def test_checkpoint_evaluator_min_age_default(tmp_path: Path) -> None:
+    tmp_path.joinpath("model.ckpt").touch()
+    assert CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path, num_workers=0).poll() == 0
+
+
+@objectory_available
+def test_checkpoint_evaluator_poll_min_age(tmp_path: Path) -> None:
+    save_checkpoints(tmp_path)
+    evaluator = CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path, num_workers=0)
+    assert evaluator.poll() == 0
+    assert evaluator.poll(min_age=0) == 2
+
+
+@objectory_available
+def test_checkpoint_evaluator_failed_evaluation(tmp_path: Path) -> None:
+    save_checkpoints(tmp_path, max_epochs=1)
+    tmp_path.joinpath("truncated.ckpt").write_bytes(b"PK\x03\x04")
+    evaluator = CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path, min_age=0, num_workers=0)
+    assert evaluator.poll() == 2
+    results = {
+        os.path.basename(result["checkpoint"]): result  # noqa: PTH119
+        for result in evaluator.collect()
+    }
+    assert "error" in results["truncated.ckpt"]
+    assert "val_loss" in results["epoch=0-step=2.ckpt"]
+    assert len(load_evaluation_results(evaluator.results_path)) == 2
+
+
+@objectory_available
+def test_checkpoint_evaluator_failed_evaluation_worker_process(tmp_path: Path) -> None:
+    save_checkpoints(tmp_path, max_epochs=1)
+    tmp_path.joinpath("truncated.ckpt").write_bytes(b"PK\x03\x04")
+    with CheckpointEvaluator(
+        MODEL, DATAMODULE, dirpath=tmp_path, min_age=0, num_workers=1
+    ) as evaluator:
+        assert evaluator.poll() == 2
+        results = evaluator.collect(wait=True)
+    assert sorted("error" in result for result in results) == [False, True]
+
+
+@objectory_available
+def test_checkpoint_evaluator_worker_process(tmp_path: Path) -> None:
+    save_checkpoints(tmp_path)
+    with CheckpointEvaluator(
+        MODEL, DATAMODULE, dirpath=tmp_path, min_age=0, num_workers=1
+    ) as evaluator:
+        assert evaluator.poll() == 2
+        results = evaluator.collect(wait=True)
+        assert evaluator.num_pending == 0
+    assert [(result["epoch"], result["step"]) for result in results] == [(0, 2), (1, 4)]
+    assert load_evaluation_results(evaluator.results_path) == results
+
+
+@objectory_available
+def test_checkpoint_evaluator_watch(tmp_path: Path) -> None:
+    save_checkpoints(tmp_path)
+    tmp_path.joinpath("done").touch()
+    evaluator = CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path, min_age=0, num_workers=0)
+    assert len(evaluator.watch(interval=0.01, stop_file="done")) == 2
+
+
+def test_checkpoint_evaluator_watch_timeout(tmp_path: Path) -> None:
+    evaluator = CheckpointEvaluator(MODEL, DATAMODULE, dirpath=tmp_path, min_age=0, num_workers=0)
+    assert evaluator.watch(interval=0.01, timeout=0.02) == []
+
+
+#############################################
+#     Tests for load_evaluation_results     #
+#############################################
+
+
+def test_load_evaluation_results(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("evaluation.jsonl")
+    path.write_text(json.dumps({"checkpoint": "a.ckpt", "loss": 1.0}) + "\n\n")
+    assert load_evaluation_results(path) == [{"checkpoint": "a.ckpt", "loss": 1.0}]
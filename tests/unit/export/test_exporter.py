@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
+import torch
+from lightning.pytorch.demos.boring_classes import BoringModel
+
+from lightcat.export import export_model, get_artifact_name, load_exported_model
+from lightcat.testing import onnx_available, onnxruntime_available
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+FORMATS = ["torchscript", "export"]
+
+
+##################################
+#     Tests for export_model     #
+##################################
+
+
+@pytest.mark.parametrize("format", FORMATS)
+def test_export_model(tmp_path: Path, format: str) -> None:  # noqa: A002
+    model = torch.nn.Linear(4, 2).eval()
+    path = tmp_path.joinpath("model", get_artifact_name(format))
+    export_model(model, (torch.randn(3, 4),), path, format=format)
+    assert path.is_file()
+    x = torch.randn(3, 4)
+    with torch.no_grad():
+        assert load_exported_model(path, format=format)(x).allclose(model(x))
+
+
+@pytest.mark.parametrize("format", FORMATS)
+def test_export_model_lightning_module(tmp_path: Path, format: str) -> None:  # noqa: A002
+    model = BoringModel().eval()
+    path = tmp_path.joinpath(get_artifact_name(format))
+    export_model(model, (torch.randn(3, 32),), path, format=format)
+    x = torch.randn(3, 32)
+    with torch.no_grad():
+        assert load_exported_model(path, format=format)(x).allclose(model(x))
+
+
+@onnx_available
+@onnxruntime_available
+def test_export_model_onnx(tmp_path: Path) -> None:
+    model = torch.nn.Linear(4, 2).eval()
+    path = tmp_path.joinpath("model.onnx")
+    export_model(model, (torch.randn(3, 4),), path, format="onnx")
+    x = torch.randn(3, 4)
+    with torch.no_grad():
+        assert load_exported_model(path, format="onnx")(x).allclose(model(x), atol=1e-6)
+
+
+def test_export_model_onnx_without_onnx(tmp_path: Path) -> None:
+    with (
+        patch("lightcat.utils.imports.is_onnx_available", lambda: False),
+        pytest.raises(RuntimeError, match="'onnx' package is required but not installed"),
+    ):
+        export_model(torch.nn.Linear(4, 2), (torch.randn(3, 4),), tmp_path, format="onnx")
+
+
+def test_export_model_incorrect_format(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Incorrect format: tflite"):
+        export_model(torch.nn.Linear(4, 2), (torch.randn(3, 4),), tmp_path, format="tflite")
+
+
+#########################################
+#     Tests for load_exported_model     #
+#########################################
+
+
+def test_load_exported_model_onnx_without_onnxruntime(tmp_path: Path) -> None:
+    with (
+        patch("lightcat.utils.imports.is_onnxruntime_available", lambda: False),
+        pytest.raises(RuntimeError, match="'onnxruntime' package is required but not installed"),
+    ):
+        load_exported_model(tmp_path.joinpath("model.onnx"), format="onnx")
+
+
+def test_load_exported_model_incorrect_format(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Incorrect format: tflite"):
+        load_exported_model(tmp_path, format="tflite")
+
+
+#######################################
+#     Tests for get_artifact_name     #
+#######################################
+
+
+@pytest.mark.parametrize(
+    ("format", "name"),
+    [("torchscript", "model.pt"), ("export", "model.pt2"), ("onnx", "model.onnx")],
+)
+def test_get_artifact_name(format: str, name: str) -> None:  # noqa: A002
+    assert get_artifact_name(format) == name
+
+
+def test_get_artifact_name_incorrect_format() -> None:
+    with pytest.raises(ValueError, match="Incorrect format: tflite"):
+        get_artifact_name("tflite")
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+import torch
+from lightning.pytorch.demos.boring_classes import BoringModel
+
+from lightcat.export import ExportPipeline
+from lightcat.model.creator import ModelCreator
+from lightcat.testing import objectory_available
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+MODEL = {
+    "_target_": "lightcat.model.creator.ModelCreator",
+    "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+}
+
+
+class BranchModel(torch.nn.Module):
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        # The branch is frozen by the tracing.
+        if x.sum() > 0:
+            return x + 1
+        return x - 1
+
+
+def create_pipeline(cache_dir: Path, **kwargs: Any) -> ExportPipeline:
+    # The model is created with the same weights in each pipeline.
+    torch.manual_seed(42)
+    return ExportPipeline(
+        **({"model": MODEL, "example_inputs": torch.randn(2, 32)} | kwargs), cache_dir=cache_dir
+    )
+
+
+def save_checkpoint(model: torch.nn.Module, path: Path) -> Path:
+    torch.save({"state_dict": model.state_dict()}, path)
+    return path
+
+
+####################################
+#     Tests for ExportPipeline     #
+####################################
+
+
+@objectory_available
+def test_export_pipeline_repr(tmp_path: Path) -> None:
+    pipeline = ExportPipeline(MODEL, torch.randn(2, 32), cache_dir=tmp_path)
+    assert repr(pipeline) == f"ExportPipeline(fingerprint={pipeline.fingerprint})"
+
+
+@objectory_available
+def test_export_pipeline_str(tmp_path: Path) -> None:
+    assert str(ExportPipeline(MODEL, torch.randn(2, 32), cache_dir=tmp_path)).startswith(
+        "ExportPipeline("
+    )
+
+
+@objectory_available
+def test_export_pipeline_incorrect_format(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Incorrect format: tflite"):
+        ExportPipeline(MODEL, torch.randn(2, 32), cache_dir=tmp_path, format="tflite")
+
+
+@objectory_available
+def test_export_pipeline_incorrect_num_random_inputs(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="num_random_inputs must be greater or equal to 0"):
+        ExportPipeline(MODEL, torch.randn(2, 32), cache_dir=tmp_path, num_random_inputs=-1)
+
+
+@objectory_available
+def test_export_pipeline_fingerprint(tmp_path: Path) -> None:
+    fingerprint = create_pipeline(tmp_path).fingerprint
+    assert create_pipeline(tmp_path).fingerprint == fingerprint
+    assert create_pipeline(tmp_path, example_inputs=torch.randn(3, 32)).fingerprint != fingerprint
+    assert create_pipeline(tmp_path, format="export").fingerprint != fingerprint
+
+
+def test_export_pipeline_fingerprint_weights(tmp_path: Path) -> None:
+    model = BoringModel()
+    fingerprint = ExportPipeline(
+        ModelCreator(model), torch.randn(2, 32), cache_dir=tmp_path
+    ).fingerprint
+    with torch.no_grad():
+        model.layer.weight.add_(1.0)
+    assert (
+        ExportPipeline(ModelCreator(model), torch.randn(2, 32), cache_dir=tmp_path).fingerprint
+        != fingerprint
+    )
+
+
+@objectory_available
+def test_export_pipeline_fingerprint_random_weights(tmp_path: Path) -> None:
+    # The model configuration creates a model with random weights.
+    assert (
+        ExportPipeline(MODEL, torch.randn(2, 32), cache_dir=tmp_path).fingerprint
+        != ExportPipeline(MODEL, torch.randn(2, 32), cache_dir=tmp_path).fingerprint
+    )
+
+
+def test_export_pipeline_fingerprint_checkpoint(tmp_path: Path) -> None:
+    creator = ModelCreator(BoringModel())
+    path = save_checkpoint(BoringModel(), tmp_path.joinpath("model.ckpt"))
+    fingerprint = ExportPipeline(
+        creator, torch.randn(2, 32), cache_dir=tmp_path, checkpoint_path=path
+    ).fingerprint
+    save_checkpoint(BoringModel(), path)
+    assert (
+        ExportPipeline(
+            creator, torch.randn(2, 32), cache_dir=tmp_path, checkpoint_path=path
+        ).fingerprint
+        != fingerprint
+    )
+
+
+def test_export_pipeline_fingerprint_name(tmp_path: Path) -> None:
+    assert (
+        ExportPipeline(
+            ModelCreator(BoringModel()), torch.randn(2, 32), cache_dir=tmp_path, name="boring"
+        ).get_config()["model"]
+        == "boring"
+    )
+
+
+@objectory_available
+@pytest.mark.parametrize("format", ["torchscript", "export"])
+def test_export_pipeline_run(tmp_path: Path, format: str) -> None:  # noqa: A002
+    pipeline = ExportPipeline(MODEL, torch.randn(2, 32), cache_dir=tmp_path, format=format)
+    assert not pipeline.is_complete()
+    manifest = pipeline.run()
+    assert pipeline.is_complete()
+    assert pipeline.artifact_path.is_file()
+    assert manifest["fingerprint"] == pipeline.fingerprint
+    assert manifest["file"] == pipeline.artifact_path.name
+    assert manifest["parity"]["max_abs_diff"] <= 1e-6
+    # Only the artifact and the manifest are in the output directory.
+    assert sorted(path.name for path in pipeline.output_dir.iterdir()) == sorted(
+        [pipeline.artifact_path.name, "manifest.json"]
+    )
+
+
+@objectory_available
+def test_export_pipeline_run_cached(tmp_path: Path) -> None:
+    manifest = create_pipeline(tmp_path).run()
+    pipeline = create_pipeline(tmp_path)
+    with patch("lightcat.export.pipeline.export_model") as export:
+        assert pipeline.run() == manifest
+        export.assert_not_called()
+
+
+def test_export_pipeline_run_checkpoint(tmp_path: Path) -> None:
+    model = BoringModel().eval()
+    path = save_checkpoint(model, tmp_path.joinpath("model.ckpt"))
+    pipeline = ExportPipeline(
+        ModelCreator(BoringModel()), torch.randn(2, 32), cache_dir=tmp_path, checkpoint_path=path
+    )
+    x = torch.randn(2, 32)
+    with torch.no_grad():
+        assert pipeline.load()(x).allclose(model(x))
+
+
+def test_export_pipeline_run_parity_error(tmp_path: Path) -> None:
+    pipeline = ExportPipeline(ModelCreator(BranchModel()), torch.ones(2, 3), cache_dir=tmp_path)
+    with (
+        patch("lightcat.export.pipeline.torch.randn_like", lambda x: -torch.ones_like(x)),
+        pytest.raises(RuntimeError, match="do not match the outputs of the eager model"),
+    ):
+        pipeline.run()
+    assert not pipeline.is_complete()
+    assert not pipeline.artifact_path.exists()
+
+
+def test_export_pipeline_run_parity_no_random_inputs(tmp_path: Path) -> None:
+    pipeline = ExportPipeline(
+        ModelCreator(BranchModel()), torch.ones(2, 3), cache_dir=tmp_path, num_random_inputs=0
+    )
+    assert pipeline.run()["parity"]["max_abs_diff"] == 0.0
+
+
+@objectory_available
+def test_export_pipeline_load(tmp_path: Path) -> None:
+    model = ExportPipeline(MODEL, torch.randn(2, 32), cache_dir=tmp_path).load()
+    assert model(torch.randn(5, 32)).shape == (5, 2)
+
+
+@objectory_available
+def test_export_pipeline_benchmark(tmp_path: Path) -> None:
+    results = ExportPipeline(MODEL, torch.randn(2, 32), cache_dir=tmp_path).benchmark(
+        number=2, repeat=2
+    )
+    assert results["format"] == "torchscript"
+    assert results["num_threads"] >= 1
+    assert results["eager"]["repeat"] == 2
+    assert results["exported"]["number"] == 2
+    assert results["speedup"] > 0
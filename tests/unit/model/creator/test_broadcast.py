@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+import torch
+from lightning.pytorch.demos.boring_classes import BoringModel
+from torch import distributed as dist
+from torch import multiprocessing as mp
+
+from lightcat.model.creator import BroadcastModelCreator, ModelCreator
+from lightcat.testing import objectory_available
+from lightcat.utils.distributed import all_gather_object
+from lightcat.utils.imports import is_objectory_available
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+if is_objectory_available():
+    from objectory import OBJECT_TARGET
+else:  # pragma: no cover
+    OBJECT_TARGET = "_target_"
+
+
+def create_worker(rank: int, world_size: int, init_file: str, output_file: str) -> None:
+    dist.init_process_group(
+        "gloo", init_method=f"file://{init_file}", rank=rank, world_size=world_size
+    )
+    try:
+        # Each process has a different seed, so the weights are only
+        # equal if the model is created by a single process.
+        torch.manual_seed(rank)
+        model = BroadcastModelCreator(ModelCreator(BoringModel()), src=1).create()
+        weights = all_gather_object(model.layer.weight.detach())
+        if rank == 0:
+            torch.save(weights, output_file)
+    finally:
+        dist.destroy_process_group()
+
+
+###########################################
+#     Tests for BroadcastModelCreator     #
+###########################################
+
+
+def test_broadcast_model_creator_repr() -> None:
+    assert repr(BroadcastModelCreator(ModelCreator(BoringModel()))).startswith(
+        "BroadcastModelCreator("
+    )
+
+
+def test_broadcast_model_creator_str() -> None:
+    assert str(BroadcastModelCreator(ModelCreator(BoringModel()))).startswith(
+        "BroadcastModelCreator("
+    )
+
+
+def test_broadcast_model_creator_create() -> None:
+    module = BoringModel()
+    assert BroadcastModelCreator(ModelCreator(module)).create() is module
+
+
+@objectory_available
+def test_broadcast_model_creator_create_config() -> None:
+    model = BroadcastModelCreator(
+        {
+            OBJECT_TARGET: "lightcat.model.creator.ModelCreator",
+            "model": {OBJECT_TARGET: "lightning.pytorch.demos.boring_classes.BoringModel"},
+        }
+    ).create()
+    assert isinstance(model, BoringModel)
+
+
+@pytest.mark.timeout(120)
+def test_broadcast_model_creator_create_gloo(tmp_path: Path) -> None:
+    output_file = tmp_path.joinpath("output.pt")
+    # The processes are forked, so they do not import the modules again.
+    mp.start_processes(
+        create_worker,
+        args=(2, str(tmp_path.joinpath("init")), str(output_file)),
+        nprocs=2,
+        start_method="fork",
+    )
+    weights = torch.load(output_file)
+    assert len(weights) == 2
+    assert weights[0].equal(weights[1])
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import pytest
+from lightning.pytorch.demos.boring_classes import BoringModel
+
+from lightcat.model import get_checkpointed_modules
+from lightcat.model.creator import ActivationCheckpointingModelCreator, ModelCreator
+from lightcat.testing import objectory_available
+from lightcat.utils.imports import is_objectory_available
+
+if is_objectory_available():
+    from objectory import OBJECT_TARGET
+else:  # pragma: no cover
+    OBJECT_TARGET = "_target_"
+
+
+#########################################################
+#     Tests for ActivationCheckpointingModelCreator     #
+#########################################################
+
+
+def test_activation_checkpointing_model_creator_repr() -> None:
+    assert repr(
+        ActivationCheckpointingModelCreator(ModelCreator(BoringModel()), names=["layer"])
+    ).startswith("ActivationCheckpointingModelCreator(")
+
+
+def test_activation_checkpointing_model_creator_str() -> None:
+    assert str(
+        ActivationCheckpointingModelCreator(ModelCreator(BoringModel()), names=["layer"])
+    ).startswith("ActivationCheckpointingModelCreator(")
+
+
+def test_activation_checkpointing_model_creator_create() -> None:
+    module = BoringModel()
+    model = ActivationCheckpointingModelCreator(
+        ModelCreator(module), types=["torch.nn.Linear"]
+    ).create()
+    assert model is module
+    assert get_checkpointed_modules(model) == ["layer"]
+
+
+@objectory_available
+def test_activation_checkpointing_model_creator_create_config() -> None:
+    model = ActivationCheckpointingModelCreator(
+        {
+            OBJECT_TARGET: "lightcat.model.creator.ModelCreator",
+            "model": {OBJECT_TARGET: "lightning.pytorch.demos.boring_classes.BoringModel"},
+        },
+        names=["layer"],
+    ).create()
+    assert isinstance(model, BoringModel)
+    assert get_checkpointed_modules(model) == ["layer"]
+
+
+def test_activation_checkpointing_model_creator_create_no_match() -> None:
+    creator = ActivationCheckpointingModelCreator(ModelCreator(BoringModel()), names=["missing"])
+    with pytest.raises(ValueError, match="No submodule matches the names"):
+        creator.create()
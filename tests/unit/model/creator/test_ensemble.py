@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import pytest
+import torch
+from torch import nn
+
+from lightcat.model import EnsembleModel
+from lightcat.model.creator import EnsembleModelCreator
+from lightcat.testing import objectory_available
+from lightcat.utils.imports import is_objectory_available
+
+if is_objectory_available():
+    from objectory import OBJECT_TARGET
+else:  # pragma: no cover
+    OBJECT_TARGET = "_target_"
+
+
+LINEAR_CONFIG = {OBJECT_TARGET: "torch.nn.Linear", "in_features": 4, "out_features": 2}
+
+##########################################
+#     Tests for EnsembleModelCreator     #
+##########################################
+
+
+def test_ensemble_model_creator_repr() -> None:
+    assert repr(EnsembleModelCreator(LINEAR_CONFIG, num_models=2, loss=nn.MSELoss())).startswith(
+        "EnsembleModelCreator("
+    )
+
+
+def test_ensemble_model_creator_str() -> None:
+    assert str(EnsembleModelCreator(LINEAR_CONFIG, num_models=2, loss=nn.MSELoss())).startswith(
+        "EnsembleModelCreator("
+    )
+
+
+@pytest.mark.parametrize("num_models", [0, -1])
+def test_ensemble_model_creator_incorrect_num_models(num_models: int) -> None:
+    with pytest.raises(ValueError, match="num_models must be greater than 0"):
+        EnsembleModelCreator(LINEAR_CONFIG, num_models=num_models, loss=nn.MSELoss())
+
+
+@objectory_available
+def test_ensemble_model_creator_create_config() -> None:
+    model = EnsembleModelCreator(
+        LINEAR_CONFIG, num_models=3, loss={OBJECT_TARGET: "torch.nn.MSELoss"}
+    ).create()
+    assert isinstance(model, EnsembleModel)
+    assert model.num_models == 3
+    assert isinstance(model.loss, nn.MSELoss)
+    weight = model.get_params()["weight"]
+    assert weight.shape == (3, 2, 4)
+    # Each model has its own initialization.
+    assert not weight[0].equal(weight[1])
+
+
+def test_ensemble_model_creator_create_module() -> None:
+    linear = nn.Linear(4, 2)
+    model = EnsembleModelCreator(linear, num_models=2, loss=nn.MSELoss()).create()
+    weight = model.get_params()["weight"]
+    assert not weight[0].equal(weight[1])
+    assert not weight[0].equal(linear.weight)
+
+
+def test_ensemble_model_creator_create_seed() -> None:
+    creator = EnsembleModelCreator(nn.Linear(4, 2), num_models=2, loss=nn.MSELoss(), seed=42)
+    assert creator.create().get_params()["weight"].equal(creator.create().get_params()["weight"])
+
+
+def test_ensemble_model_creator_create_seed_does_not_change_random_state() -> None:
+    creator = EnsembleModelCreator(nn.Linear(4, 2), num_models=2, loss=nn.MSELoss(), seed=42)
+    torch.manual_seed(1)
+    x1 = torch.rand(3)
+    torch.manual_seed(1)
+    creator.create()
+    assert torch.rand(3).equal(x1)
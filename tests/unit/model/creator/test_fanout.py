@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from lightning.pytorch.demos.boring_classes import BoringModel
+
+from lightcat.model import FanOutModel
+from lightcat.model.creator import FanOutModelCreator, ModelCreator
+from lightcat.testing import objectory_available
+from lightcat.utils.imports import is_objectory_available
+
+if is_objectory_available():
+    from objectory import OBJECT_TARGET
+else:  # pragma: no cover
+    OBJECT_TARGET = "_target_"
+
+
+########################################
+#     Tests for FanOutModelCreator     #
+########################################
+
+
+def test_fanout_model_creator_repr() -> None:
+    assert repr(FanOutModelCreator({"model": ModelCreator(BoringModel())})).startswith(
+        "FanOutModelCreator("
+    )
+
+
+def test_fanout_model_creator_str() -> None:
+    assert str(FanOutModelCreator({"model": ModelCreator(BoringModel())})).startswith(
+        "FanOutModelCreator("
+    )
+
+
+def test_fanout_model_creator_create() -> None:
+    model1, model2 = BoringModel(), BoringModel()
+    model = FanOutModelCreator(
+        {"model1": ModelCreator(model1), "model2": ModelCreator(model2)}
+    ).create()
+    assert isinstance(model, FanOutModel)
+    assert model.models["model1"] is model1
+    assert model.models["model2"] is model2
+
+
+@objectory_available
+def test_fanout_model_creator_create_config() -> None:
+    model = FanOutModelCreator(
+        {
+            "model": {
+                OBJECT_TARGET: "lightcat.model.creator.ModelCreator",
+                "model": {OBJECT_TARGET: "lightning.pytorch.demos.boring_classes.BoringModel"},
+            }
+        }
+    ).create()
+    assert isinstance(model.models["model"], BoringModel)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import copy
+import pickle
+from typing import Any
+
+import pytest
+import torch
+from lightning.pytorch.demos.boring_classes import BoringModel
+
+from lightcat.model import (
+    apply_activation_checkpointing,
+    get_checkpointed_modules,
+    profile_activation_checkpointing,
+)
+
+
+class Block(torch.nn.Module):
+    def __init__(self) -> None:
+        super().__init__()
+        self.linear1 = torch.nn.Linear(8, 8)
+        self.linear2 = torch.nn.Linear(8, 8)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return torch.tanh(self.linear2(torch.tanh(self.linear1(x))))
+
+
+class Network(torch.nn.Module):
+    def __init__(self) -> None:
+        super().__init__()
+        self.blocks = torch.nn.Sequential(Block(), Block())
+        self.head = torch.nn.Linear(8, 1)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return self.head(self.blocks(x))
+
+
+def get_gradients(model: torch.nn.Module, x: torch.Tensor) -> list[torch.Tensor]:
+    model.zero_grad()
+    model(x).sum().backward()
+    return [param.grad.clone() for param in model.parameters()]
+
+
+####################################################
+#     Tests for apply_activation_checkpointing     #
+####################################################
+
+
+def test_apply_activation_checkpointing_names() -> None:
+    model = Network()
+    assert apply_activation_checkpointing(model, names=[r"blocks\.\d+"]) == [
+        "blocks.0",
+        "blocks.1",
+    ]
+    assert get_checkpointed_modules(model) == ["blocks.0", "blocks.1"]
+
+
+def test_apply_activation_checkpointing_names_fullmatch() -> None:
+    assert apply_activation_checkpointing(Network(), names=["block"]) == []
+
+
+def test_apply_activation_checkpointing_type() -> None:
+    assert apply_activation_checkpointing(Network(), types=[Block]) == ["blocks.0", "blocks.1"]
+
+
+def test_apply_activation_checkpointing_type_path() -> None:
+    assert apply_activation_checkpointing(Network(), types=["torch.nn.Linear"]) == [
+        "blocks.0.linear1",
+        "blocks.0.linear2",
+        "blocks.1.linear1",
+        "blocks.1.linear2",
+        "head",
+    ]
+
+
+def test_apply_activation_checkpointing_type_name() -> None:
+    assert apply_activation_checkpointing(Network(), types=["Block"]) == ["blocks.0", "blocks.1"]
+
+
+def test_apply_activation_checkpointing_nested() -> None:
+    # The submodules of a selected submodule are not selected.
+    assert apply_activation_checkpointing(Network(), names=["blocks"], types=["Linear"]) == [
+        "blocks",
+        "head",
+    ]
+
+
+def test_apply_activation_checkpointing_twice() -> None:
+    model = Network()
+    apply_activation_checkpointing(model, names=["head"])
+    assert apply_activation_checkpointing(model, names=["head"]) == ["head"]
+    assert model.head(torch.ones(2, 8)).shape == (2, 1)
+
+
+def test_apply_activation_checkpointing_same_outputs_and_gradients() -> None:
+    model = Network()
+    checkpointed = copy.deepcopy(model)
+    apply_activation_checkpointing(checkpointed, types=[Block])
+    x = torch.randn(4, 8)
+    assert checkpointed(x).allclose(model(x))
+    for grad1, grad2 in zip(get_gradients(checkpointed, x), get_gradients(model, x)):
+        assert grad1.allclose(grad2)
+
+
+def test_apply_activation_checkpointing_state_dict() -> None:
+    model = Network()
+    keys = list(model.state_dict())
+    apply_activation_checkpointing(model, types=[Block])
+    assert list(model.state_dict()) == keys
+
+
+def test_apply_activation_checkpointing_recompute() -> None:
+    model = Network()
+    apply_activation_checkpointing(model, names=["blocks"])
+    calls = []
+    model.blocks[0].linear1.register_forward_hook(lambda *_: calls.append(1))
+    model(torch.randn(4, 8)).sum().backward()
+    # The forward of the block is recomputed in the backward pass.
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("mode", ["eval", "no_grad"])
+def test_apply_activation_checkpointing_no_recompute(mode: str) -> None:
+    model = Network()
+    apply_activation_checkpointing(model, names=["blocks"])
+    calls = []
+    model.blocks[0].linear1.register_forward_hook(lambda *_: calls.append(1))
+    if mode == "eval":
+        model.eval()
+        model(torch.randn(4, 8)).sum().backward()
+    else:
+        with torch.no_grad():
+            model(torch.randn(4, 8))
+    assert len(calls) == 1
+
+
+def test_apply_activation_checkpointing_copy_and_pickle() -> None:
+    model = Network()
+    apply_activation_checkpointing(model, names=["blocks"])
+    for other in (copy.deepcopy(model), pickle.loads(pickle.dumps(model))):  # noqa: S301
+        assert get_checkpointed_modules(other) == ["blocks"]
+        # The copy uses its own parameters.
+        assert other.blocks.forward.module is other.blocks
+
+
+##############################################
+#     Tests for get_checkpointed_modules     #
+##############################################
+
+
+def test_get_checkpointed_modules_empty() -> None:
+    assert get_checkpointed_modules(Network()) == []
+
+
+######################################################
+#     Tests for profile_activation_checkpointing     #
+######################################################
+
+
+def test_profile_activation_checkpointing() -> None:
+    model = Network()
+    apply_activation_checkpointing(model, names=["blocks"])
+    report = profile_activation_checkpointing(model, torch.randn(32, 8), repeat=2)
+    assert report["checkpointed_activation_bytes"] < report["activation_bytes"]
+    assert report["saved_bytes"] == (
+        report["activation_bytes"] - report["checkpointed_activation_bytes"]
+    )
+    assert report["step_time"] > 0
+    assert report["checkpointed_step_time"] > 0
+    assert report["recompute_overhead"] == pytest.approx(
+        report["checkpointed_step_time"] / report["step_time"] - 1.0
+    )
+
+
+def test_profile_activation_checkpointing_no_checkpointing() -> None:
+    report = profile_activation_checkpointing(Network(), torch.randn(32, 8), repeat=1)
+    assert report["saved_bytes"] == 0
+
+
+def test_profile_activation_checkpointing_training_step() -> None:
+    model = BoringModel()
+    apply_activation_checkpointing(model, names=["layer"])
+    report = profile_activation_checkpointing(model, torch.randn(4, 32), repeat=1)
+    assert report["activation_bytes"] > 0
+
+
+def test_profile_activation_checkpointing_step_fn() -> None:
+    def step_fn(model: torch.nn.Module, batch: Any) -> dict[str, torch.Tensor]:
+        return {"loss": model(batch).pow(2).mean()}
+
+    model = Network()
+    apply_activation_checkpointing(model, names=["blocks"])
+    assert (
+        profile_activation_checkpointing(model, torch.randn(4, 8), step_fn=step_fn)["saved_bytes"]
+        > 0
+    )
+
+
+def test_profile_activation_checkpointing_restore_state() -> None:
+    model = Network().eval()
+    apply_activation_checkpointing(model, names=["blocks"])
+    profile_activation_checkpointing(model, torch.randn(4, 8), repeat=1)
+    assert not model.training
+    assert all(param.grad is None for param in model.parameters())
+    assert model.blocks.forward.enabled
+
+
+@pytest.mark.parametrize("repeat", [0, -1])
+def test_profile_activation_checkpointing_incorrect_repeat(repeat: int) -> None:
+    with pytest.raises(ValueError, match="repeat must be greater than 0"):
+        profile_activation_checkpointing(Network(), torch.randn(4, 8), repeat=repeat)
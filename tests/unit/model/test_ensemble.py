@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import copy
+from typing import TYPE_CHECKING
+
+import pytest
+import torch
+from lightning import Trainer
+from torch import nn
+from torch.utils.data import DataLoader, TensorDataset
+
+from lightcat.model import EnsembleModel
+from lightcat.testing import objectory_available
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def create_models(num_models: int = 3) -> list[nn.Module]:
+    return [nn.Sequential(nn.Linear(4, 8), nn.ReLU(), nn.Linear(8, 2)) for _ in range(num_models)]
+
+
+def create_dataloader() -> DataLoader:
+    return DataLoader(TensorDataset(torch.randn(32, 4), torch.randn(32, 2)), batch_size=8)
+
+
+###################################
+#     Tests for EnsembleModel     #
+###################################
+
+
+def test_ensemble_model_num_models() -> None:
+    assert EnsembleModel(create_models(5), loss=nn.MSELoss()).num_models == 5
+
+
+def test_ensemble_model_empty() -> None:
+    with pytest.raises(ValueError, match="models cannot be empty"):
+        EnsembleModel([], loss=nn.MSELoss())
+
+
+def test_ensemble_model_different_architectures() -> None:
+    with pytest.raises(ValueError, match="The model 1 does not have the same architecture"):
+        EnsembleModel([nn.Linear(4, 2), nn.Linear(4, 3)], loss=nn.MSELoss())
+
+
+def test_ensemble_model_parameters() -> None:
+    model = EnsembleModel(create_models(3), loss=nn.MSELoss())
+    assert [param.shape for param in model.parameters()] == [
+        torch.Size([3, 8, 4]),
+        torch.Size([3, 8]),
+        torch.Size([3, 2, 8]),
+        torch.Size([3, 2]),
+    ]
+
+
+def test_ensemble_model_get_params() -> None:
+    models = create_models(2)
+    params = EnsembleModel(models, loss=nn.MSELoss()).get_params()
+    assert list(params) == ["0.weight", "0.bias", "2.weight", "2.bias"]
+    assert params["0.weight"][1].equal(models[1][0].weight)
+
+
+def test_ensemble_model_get_buffers() -> None:
+    models = [nn.Sequential(nn.Linear(4, 2), nn.BatchNorm1d(2)) for _ in range(2)]
+    buffers = EnsembleModel(models, loss=nn.MSELoss()).get_buffers()
+    # The running statistics are removed from the batch norm modules.
+    assert list(buffers) == []
+
+
+def test_ensemble_model_forward() -> None:
+    models = create_models(3)
+    expected = [copy.deepcopy(model) for model in models]
+    inputs = torch.randn(5, 4)
+    out = EnsembleModel(models, loss=nn.MSELoss())(inputs)
+    assert out.shape == (3, 5, 2)
+    for i, model in enumerate(expected):
+        assert out[i].allclose(model(inputs), atol=1e-6)
+
+
+def test_ensemble_model_forward_dropout_randomness() -> None:
+    models = [nn.Sequential(nn.Linear(4, 4), nn.Dropout(0.5)) for _ in range(2)]
+    state = models[0].state_dict()
+    models[1].load_state_dict(state)
+    model = EnsembleModel(models, loss=nn.MSELoss())
+    model.train()
+    out = model(torch.ones(16, 4))
+    # The two models have the same parameters but different dropout masks.
+    assert not out[0].equal(out[1])
+
+
+def test_ensemble_model_batch_norm() -> None:
+    models = [nn.Sequential(nn.Linear(4, 2), nn.BatchNorm1d(2)) for _ in range(2)]
+    assert EnsembleModel(models, loss=nn.MSELoss())(torch.randn(6, 4)).shape == (2, 6, 2)
+
+
+def test_ensemble_model_gradients() -> None:
+    models = create_models(3)
+    expected = [copy.deepcopy(model) for model in models]
+    model = EnsembleModel(models, loss=nn.MSELoss())
+    inputs, targets = torch.randn(5, 4), torch.randn(5, 2)
+    model.training_step((inputs, targets), batch_idx=0).backward()
+    for i, reference in enumerate(expected):
+        nn.functional.mse_loss(reference(inputs), targets).backward()
+        assert model.get_params()["0.weight"].grad[i].allclose(reference[0].weight.grad, atol=1e-6)
+        assert model.get_params()["2.bias"].grad[i].allclose(reference[2].bias.grad, atol=1e-6)
+
+
+def test_ensemble_model_predict_step() -> None:
+    model = EnsembleModel(create_models(3), loss=nn.MSELoss())
+    assert model.predict_step((torch.randn(5, 4), torch.randn(5, 2)), batch_idx=0).shape == (
+        3,
+        5,
+        2,
+    )
+    assert model.predict_step(torch.randn(5, 4), batch_idx=0).shape == (3, 5, 2)
+
+
+def test_ensemble_model_get_model() -> None:
+    model = EnsembleModel(create_models(3), loss=nn.MSELoss())
+    inputs = torch.randn(5, 4)
+    out = model(inputs)
+    for i in range(3):
+        member = model.get_model(i)
+        assert isinstance(member, nn.Sequential)
+        assert member(inputs).allclose(out[i], atol=1e-6)
+
+
+def test_ensemble_model_get_model_is_copy() -> None:
+    model = EnsembleModel(create_models(2), loss=nn.MSELoss())
+    member = model.get_model(0)
+    with torch.no_grad():
+        member[0].weight.fill_(0.0)
+    assert not model.get_params()["0.weight"][0].eq(0.0).all()
+
+
+@objectory_available
+def test_ensemble_model_configure_optimizers() -> None:
+    optimizer = EnsembleModel(
+        create_models(2), loss=nn.MSELoss(), optimizer={"_target_": "torch.optim.SGD", "lr": 0.1}
+    ).configure_optimizers()
+    assert isinstance(optimizer, torch.optim.SGD)
+    assert optimizer.defaults["lr"] == 0.1
+
+
+@objectory_available
+def test_ensemble_model_configure_optimizers_default() -> None:
+    optimizer = EnsembleModel(create_models(2), loss=nn.MSELoss()).configure_optimizers()
+    assert isinstance(optimizer, torch.optim.Adam)
+
+
+@objectory_available
+def test_ensemble_model_fit(tmp_path: Path) -> None:
+    model = EnsembleModel(
+        create_models(3), loss=nn.MSELoss(), optimizer={"_target_": "torch.optim.SGD", "lr": 0.1}
+    )
+    params = {name: param.detach().clone() for name, param in model.get_params().items()}
+    trainer = Trainer(
+        max_epochs=2,
+        default_root_dir=tmp_path,
+        logger=False,
+        enable_checkpointing=False,
+        enable_progress_bar=False,
+    )
+    trainer.fit(model, train_dataloaders=create_dataloader(), val_dataloaders=create_dataloader())
+    assert trainer.global_step == 8
+    assert not model.get_params()["0.weight"].equal(params["0.weight"])
+    assert sorted(trainer.callback_metrics) == ["train/loss", "val/ensemble_loss", "val/loss"]
+
+
+@objectory_available
+def test_ensemble_model_test(tmp_path: Path) -> None:
+    trainer = Trainer(default_root_dir=tmp_path, logger=False, enable_progress_bar=False)
+    metrics = trainer.test(
+        EnsembleModel(create_models(2), loss=nn.MSELoss()), dataloaders=create_dataloader()
+    )
+    assert sorted(metrics[0]) == ["test/ensemble_loss", "test/loss"]
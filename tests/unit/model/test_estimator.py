@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import pytest
+import torch
+from lightning import LightningModule
+from lightning.pytorch.demos.boring_classes import BoringModel
+
+from lightcat.model import estimate_model_resources
+from lightcat.model.creator import ModelCreator
+from lightcat.testing import objectory_available
+from lightcat.utils.imports import is_objectory_available
+
+if is_objectory_available():
+    from objectory import OBJECT_TARGET
+else:  # pragma: no cover
+    OBJECT_TARGET = "_target_"
+
+
+class MLPModel(LightningModule):
+    def __init__(self) -> None:
+        super().__init__()
+        self.linear1 = torch.nn.Linear(16, 32)
+        self.linear2 = torch.nn.Linear(32, 4)
+        self.norm = torch.nn.BatchNorm1d(4)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return self.norm(self.linear2(torch.relu(self.linear1(x))))
+
+    def configure_optimizers(self) -> dict:
+        return {"optimizer": torch.optim.SGD(self.parameters(), lr=0.1, momentum=0.9)}
+
+
+class FrozenModel(MLPModel):
+    def __init__(self) -> None:
+        super().__init__()
+        self.linear1.requires_grad_(False)
+
+
+class TwoInputsModel(torch.nn.Module):
+    def __init__(self) -> None:
+        super().__init__()
+        self.linear = torch.nn.Linear(8, 2)
+
+    def forward(self, x: torch.Tensor, y: torch.Tensor) -> torch.Tensor:
+        return self.linear(x) + y
+
+
+def create_model(cls: type[torch.nn.Module]) -> ModelCreator:
+    return ModelCreator({OBJECT_TARGET: f"{__name__}.{cls.__qualname__}"})
+
+
+##############################################
+#     Tests for estimate_model_resources     #
+##############################################
+
+
+@objectory_available
+def test_estimate_model_resources() -> None:
+    estimates = estimate_model_resources(create_model(MLPModel), input_shape=(8, 16))
+    num_parameters = 16 * 32 + 32 + 32 * 4 + 4 + 4 + 4
+    assert estimates["num_parameters"] == num_parameters
+    assert estimates["num_trainable_parameters"] == num_parameters
+    assert estimates["parameter_bytes"] == num_parameters * 4
+    # running_mean, running_var and num_batches_tracked
+    assert estimates["buffer_bytes"] == 4 * 4 + 4 * 4 + 8
+    assert estimates["gradient_bytes"] == num_parameters * 4
+    # The momentum buffers of SGD.
+    assert estimates["optimizer_state_bytes"] == num_parameters * 4
+    assert estimates["forward_flops"] == 2 * 8 * 16 * 32 + 2 * 8 * 32 * 4
+    assert estimates["activation_bytes"] > 8 * 16 * 4
+    assert estimates["total_bytes"] == sum(
+        estimates[key]
+        for key in (
+            "parameter_bytes",
+            "buffer_bytes",
+            "gradient_bytes",
+            "optimizer_state_bytes",
+            "activation_bytes",
+        )
+    )
+
+
+@objectory_available
+def test_estimate_model_resources_config() -> None:
+    estimates = estimate_model_resources(
+        {
+            OBJECT_TARGET: "lightcat.model.creator.ModelCreator",
+            "model": {OBJECT_TARGET: "lightning.pytorch.demos.boring_classes.BoringModel"},
+        }
+    )
+    assert estimates["num_parameters"] == 66
+    # The SGD optimizer of BoringModel does not have a state.
+    assert estimates["optimizer_state_bytes"] == 0
+    assert "forward_flops" not in estimates
+    assert "activation_bytes" not in estimates
+
+
+@objectory_available
+@pytest.mark.parametrize(
+    ("optimizer", "num_states"),
+    [
+        ({OBJECT_TARGET: "torch.optim.Adam"}, 2),
+        ({OBJECT_TARGET: "torch.optim.AdamW", "amsgrad": True}, 3),
+        ({OBJECT_TARGET: "torch.optim.SGD", "lr": 0.1}, 0),
+    ],
+)
+def test_estimate_model_resources_optimizer(optimizer: dict, num_states: int) -> None:
+    estimates = estimate_model_resources(create_model(MLPModel), optimizer=optimizer)
+    # The step of Adam is a scalar tensor for each parameter.
+    step_bytes = 6 * 4 if num_states else 0
+    assert estimates["optimizer_state_bytes"] == num_states * estimates["parameter_bytes"] + (
+        step_bytes
+    )
+
+
+@objectory_available
+def test_estimate_model_resources_frozen_parameters() -> None:
+    estimates = estimate_model_resources(create_model(FrozenModel))
+    assert estimates["num_trainable_parameters"] == estimates["num_parameters"] - 16 * 32 - 32
+    assert estimates["gradient_bytes"] == estimates["num_trainable_parameters"] * 4
+
+
+@objectory_available
+def test_estimate_model_resources_multiple_inputs() -> None:
+    estimates = estimate_model_resources(create_model(TwoInputsModel), input_shape=[(4, 8), (4, 2)])
+    assert estimates["forward_flops"] == 2 * 4 * 8 * 2
+    assert estimates["optimizer_state_bytes"] == 0
+
+
+@objectory_available
+def test_estimate_model_resources_input_dtype() -> None:
+    float32 = estimate_model_resources(create_model(TwoInputsModel), input_shape=[(4, 8), (4, 2)])
+    float64 = estimate_model_resources(
+        create_model(TwoInputsModel), input_shape=[(4, 8), (4, 2)], input_dtype=torch.float64
+    )
+    assert float64["activation_bytes"] == 2 * float32["activation_bytes"]
+
+
+@objectory_available
+def test_estimate_model_resources_no_allocation() -> None:
+    estimates = estimate_model_resources(
+        {
+            OBJECT_TARGET: "lightcat.model.creator.ModelCreator",
+            "model": {
+                OBJECT_TARGET: "torch.nn.Linear",
+                "in_features": 100_000,
+                "out_features": 100_000,
+            },
+        },
+        input_shape=(1024, 100_000),
+        optimizer={OBJECT_TARGET: "torch.optim.Adam"},
+    )
+    # The model needs about 160 GB of memory for the training.
+    assert estimates["total_bytes"] > 100 * 2**30
+
+
+def test_estimate_model_resources_model_not_on_meta() -> None:
+    # The model is already created, so its parameters are not on the
+    # meta device.
+    model = BoringModel()
+    with pytest.raises(ValueError, match="The model must be created on the meta device"):
+        estimate_model_resources(ModelCreator(model))
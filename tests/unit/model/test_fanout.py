@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import copy
+from typing import TYPE_CHECKING, Any
+
+import pytest
+import torch
+from lightning import LightningModule, Trainer
+from lightning.pytorch.demos.boring_classes import BoringDataModule, BoringModel
+from torch import nn
+
+from lightcat.model import FanOutModel
+from lightcat.model.fanout import _configure_optimizer, _get_scheduler_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class MyModel(BoringModel):
+    def __init__(self, lr: float = 0.1) -> None:  # noqa: ARG002
+        super().__init__()
+        self.save_hyperparameters()
+        self.batches = []
+        self.epoch_ends = 0
+
+    def training_step(self, batch: Any, batch_idx: int) -> dict:
+        self.batches.append(batch)
+        output = super().training_step(batch, batch_idx)
+        self.log("train_loss", output["loss"])
+        return output
+
+    def validation_step(self, batch: Any, batch_idx: int) -> None:  # noqa: ARG002
+        self.log("val_loss", self.step(batch))
+
+    def test_step(self, batch: Any, batch_idx: int) -> None:  # noqa: ARG002
+        self.log("test_loss", self.step(batch))
+
+    def on_train_epoch_end(self) -> None:
+        self.epoch_ends += 1
+        self.log("epoch_ends", float(self.epoch_ends))
+
+    def configure_optimizers(self) -> torch.optim.Optimizer:
+        return torch.optim.SGD(self.layer.parameters(), lr=self.hparams.lr)
+
+
+class SchedulerModel(MyModel):
+    def __init__(self, scheduler: str = "step", monitor: str = "val_loss") -> None:
+        super().__init__()
+        self.scheduler = scheduler
+        self.monitor = monitor
+
+    def configure_optimizers(self) -> Any:
+        optimizer = torch.optim.SGD(self.layer.parameters(), lr=1.0)
+        if self.scheduler == "step":
+            return {
+                "optimizer": optimizer,
+                "lr_scheduler": {
+                    "scheduler": torch.optim.lr_scheduler.StepLR(optimizer, step_size=1, gamma=0.5),
+                    "interval": "step",
+                    "frequency": 2,
+                },
+            }
+        if self.scheduler == "plateau":
+            return {
+                "optimizer": optimizer,
+                "lr_scheduler": {
+                    "scheduler": torch.optim.lr_scheduler.ReduceLROnPlateau(
+                        optimizer, factor=0.5, patience=0, threshold=1e9
+                    ),
+                    "monitor": self.monitor,
+                },
+            }
+        return [optimizer], [torch.optim.lr_scheduler.StepLR(optimizer, step_size=1, gamma=0.5)]
+
+
+class TwoOptimizersModel(BoringModel):
+    def configure_optimizers(self) -> list[torch.optim.Optimizer]:
+        return [
+            torch.optim.SGD(self.layer.parameters(), lr=0.1),
+            torch.optim.SGD(self.layer.parameters(), lr=0.1),
+        ]
+
+
+def create_trainer(tmp_path: Path, max_epochs: int = 1, **kwargs: Any) -> Trainer:
+    return Trainer(
+        max_epochs=max_epochs,
+        limit_train_batches=4,
+        limit_val_batches=2,
+        limit_test_batches=2,
+        default_root_dir=tmp_path,
+        logger=False,
+        enable_checkpointing=False,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        **kwargs,
+    )
+
+
+#################################
+#     Tests for FanOutModel     #
+#################################
+
+
+def test_fanout_model_empty() -> None:
+    with pytest.raises(ValueError, match="models cannot be empty"):
+        FanOutModel({})
+
+
+def test_fanout_model_forward() -> None:
+    model = FanOutModel({"model1": BoringModel(), "model2": BoringModel()})
+    out = model(torch.randn(4, 32))
+    assert list(out) == ["model1", "model2"]
+    assert out["model1"].shape == (4, 2)
+
+
+def test_fanout_model_fit(tmp_path: Path) -> None:
+    models = {"model1": MyModel(), "model2": MyModel()}
+    params = {name: copy.deepcopy(model.layer.weight) for name, model in models.items()}
+    trainer = create_trainer(tmp_path, max_epochs=2)
+    trainer.fit(FanOutModel(models), datamodule=BoringDataModule())
+    for name, model in models.items():
+        assert not model.layer.weight.equal(params[name])
+    # The global step is incremented by each optimizer step.
+    assert trainer.global_step == 16
+    assert sorted(trainer.callback_metrics) == [
+        "model1/epoch_ends",
+        "model1/train_loss",
+        "model1/val_loss",
+        "model2/epoch_ends",
+        "model2/train_loss",
+        "model2/val_loss",
+    ]
+    assert trainer.callback_metrics["model2/epoch_ends"].item() == 2.0
+
+
+def test_fanout_model_fit_same_batches(tmp_path: Path) -> None:
+    models = {"model1": MyModel(), "model2": MyModel()}
+    create_trainer(tmp_path).fit(FanOutModel(models), datamodule=BoringDataModule())
+    assert len(models["model1"].batches) == 4
+    assert all(
+        batch1 is batch2
+        for batch1, batch2 in zip(models["model1"].batches, models["model2"].batches)
+    )
+
+
+def test_fanout_model_fit_same_as_separate_training(tmp_path: Path) -> None:
+    models = {"model1": MyModel(lr=0.1), "model2": MyModel(lr=0.5)}
+    references = copy.deepcopy(models)
+    datamodule = BoringDataModule()
+    create_trainer(tmp_path, max_epochs=2).fit(FanOutModel(models), datamodule=datamodule)
+    for name, reference in references.items():
+        create_trainer(tmp_path, max_epochs=2).fit(reference, datamodule=datamodule)
+        assert models[name].layer.weight.allclose(reference.layer.weight)
+
+
+def test_fanout_model_fit_skip_none_loss(tmp_path: Path) -> None:
+    class NoneModel(MyModel):
+        def training_step(self, batch: Any, batch_idx: int) -> None:  # noqa: ARG002
+            return
+
+    models = {"model1": MyModel(), "model2": NoneModel()}
+    weight = copy.deepcopy(models["model2"].layer.weight)
+    trainer = create_trainer(tmp_path)
+    trainer.fit(FanOutModel(models), datamodule=BoringDataModule())
+    assert models["model2"].layer.weight.equal(weight)
+    assert trainer.global_step == 4
+
+
+def test_fanout_model_scheduler_step(tmp_path: Path) -> None:
+    model = FanOutModel({"model": SchedulerModel(scheduler="step")})
+    trainer = create_trainer(tmp_path)
+    trainer.fit(model, datamodule=BoringDataModule())
+    # 4 steps with a frequency of 2.
+    assert trainer.optimizers[0].param_groups[0]["lr"] == 0.25
+
+
+def test_fanout_model_scheduler_epoch(tmp_path: Path) -> None:
+    model = FanOutModel({"model": SchedulerModel(scheduler="epoch")})
+    trainer = create_trainer(tmp_path, max_epochs=3)
+    trainer.fit(model, datamodule=BoringDataModule())
+    assert trainer.optimizers[0].param_groups[0]["lr"] == 0.125
+
+
+def test_fanout_model_scheduler_monitor(tmp_path: Path) -> None:
+    model = FanOutModel({"model": SchedulerModel(scheduler="plateau")})
+    trainer = create_trainer(tmp_path, max_epochs=3)
+    trainer.fit(model, datamodule=BoringDataModule())
+    assert trainer.optimizers[0].param_groups[0]["lr"] < 1.0
+
+
+def test_fanout_model_scheduler_monitor_missing(tmp_path: Path) -> None:
+    model = FanOutModel({"model": SchedulerModel(scheduler="plateau", monitor="missing")})
+    trainer = create_trainer(tmp_path)
+    with pytest.raises(RuntimeError, match="monitors 'model/missing' but it is not logged"):
+        trainer.fit(model, datamodule=BoringDataModule())
+
+
+def test_fanout_model_two_optimizers(tmp_path: Path) -> None:
+    trainer = create_trainer(tmp_path)
+    with pytest.raises(ValueError, match="The model 'model' must have exactly one optimizer"):
+        trainer.fit(FanOutModel({"model": TwoOptimizersModel()}), datamodule=BoringDataModule())
+
+
+def test_fanout_model_test(tmp_path: Path) -> None:
+    metrics = create_trainer(tmp_path).test(
+        FanOutModel({"model1": MyModel(), "model2": MyModel()}), datamodule=BoringDataModule()
+    )
+    assert sorted(metrics[0]) == ["model1/test_loss", "model2/test_loss"]
+
+
+def test_fanout_model_predict(tmp_path: Path) -> None:
+    predictions = create_trainer(tmp_path, limit_predict_batches=2).predict(
+        FanOutModel({"model1": MyModel(), "model2": MyModel()}), datamodule=BoringDataModule()
+    )
+    assert len(predictions) == 2
+    assert list(predictions[0]) == ["model1", "model2"]
+
+
+def test_fanout_model_log_is_restored() -> None:
+    model = MyModel()
+    fanout = FanOutModel({"model": model})
+    with fanout._prefix_logs("model", model):
+        assert "log" in model.__dict__
+    assert "log" not in model.__dict__
+
+
+def test_fanout_model_save_model_checkpoints(tmp_path: Path) -> None:
+    models = {"model1": MyModel(lr=0.1), "model2": MyModel(lr=0.2)}
+    model = FanOutModel(models)
+    create_trainer(tmp_path).fit(model, datamodule=BoringDataModule())
+    paths = model.save_model_checkpoints(tmp_path.joinpath("checkpoints"))
+    assert paths == {
+        "model1": tmp_path.joinpath("checkpoints", "model1.ckpt"),
+        "model2": tmp_path.joinpath("checkpoints", "model2.ckpt"),
+    }
+    for name, path in paths.items():
+        loaded = MyModel.load_from_checkpoint(path)
+        assert loaded.hparams.lr == models[name].hparams.lr
+        assert loaded.layer.weight.equal(models[name].layer.weight)
+        assert len(torch.load(path, weights_only=False)["optimizer_states"]) == 1
+
+
+def test_fanout_model_save_model_checkpoints_without_trainer(tmp_path: Path) -> None:
+    paths = FanOutModel({"model": BoringModel()}).save_model_checkpoints(tmp_path)
+    checkpoint = torch.load(paths["model"], weights_only=False)
+    assert checkpoint["optimizer_states"] == []
+    assert "hyper_parameters" not in checkpoint
+
+
+##########################################
+#     Tests for _configure_optimizer     #
+##########################################
+
+
+class OutputModel(LightningModule):
+    def __init__(self, output: Any) -> None:
+        super().__init__()
+        self.output = output
+
+    def configure_optimizers(self) -> Any:
+        return self.output
+
+
+OPTIMIZER = torch.optim.SGD(nn.Linear(2, 2).parameters(), lr=0.1)
+SCHEDULER = torch.optim.lr_scheduler.StepLR(OPTIMIZER, step_size=1)
+
+
+@pytest.mark.parametrize(
+    ("output", "num_schedulers"),
+    [
+        (OPTIMIZER, 0),
+        ([OPTIMIZER], 0),
+        ((OPTIMIZER,), 0),
+        ({"optimizer": OPTIMIZER}, 0),
+        ({"optimizer": OPTIMIZER, "lr_scheduler": SCHEDULER}, 1),
+        (([OPTIMIZER], [SCHEDULER]), 1),
+    ],
+)
+def test_configure_optimizer(output: Any, num_schedulers: int) -> None:
+    optimizer, schedulers = _configure_optimizer("model", OutputModel(output))
+    assert optimizer is OPTIMIZER
+    assert len(schedulers) == num_schedulers
+
+
+@pytest.mark.parametrize("output", [None, [], [OPTIMIZER, OPTIMIZER]])
+def test_configure_optimizer_incorrect(output: Any) -> None:
+    with pytest.raises(ValueError, match="must have exactly one optimizer"):
+        _configure_optimizer("model", OutputModel(output))
+
+
+###########################################
+#     Tests for _get_scheduler_config     #
+###########################################
+
+
+def test_get_scheduler_config() -> None:
+    assert _get_scheduler_config(SCHEDULER) == {
+        "scheduler": SCHEDULER,
+        "interval": "epoch",
+        "frequency": 1,
+        "monitor": None,
+    }
+
+
+def test_get_scheduler_config_dict() -> None:
+    assert _get_scheduler_config(
+        {"scheduler": SCHEDULER, "interval": "step", "frequency": 3, "monitor": "loss"}
+    ) == {"scheduler": SCHEDULER, "interval": "step", "frequency": 3, "monitor": "loss"}
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import logging
+from unittest.mock import patch
+
+import pytest
+import torch
+
+from lightcat.optimizer.creator import (
+    OptimizerCreator,
+    is_optimizer_creator_config,
+    setup_optimizer_creator,
+)
+from lightcat.testing import objectory_available
+from lightcat.utils.imports import is_objectory_available
+
+if is_objectory_available():
+    from objectory import OBJECT_TARGET
+else:  # pragma: no cover
+    OBJECT_TARGET = "_target_"
+
+
+#################################################
+#     Tests for is_optimizer_creator_config     #
+#################################################
+
+
+@objectory_available
+def test_is_optimizer_creator_config_true() -> None:
+    assert is_optimizer_creator_config(
+        {
+            OBJECT_TARGET: "lightcat.optimizer.creator.OptimizerCreator",
+            "optimizer": {OBJECT_TARGET: "torch.optim.SGD", "lr": 0.01},
+        }
+    )
+
+
+@objectory_available
+def test_is_optimizer_creator_config_false() -> None:
+    assert not is_optimizer_creator_config({OBJECT_TARGET: "torch.nn.Identity"})
+
+
+#############################################
+#     Tests for setup_optimizer_creator     #
+#############################################
+
+
+@objectory_available
+@pytest.mark.parametrize(
+    "creator",
+    [
+        OptimizerCreator({OBJECT_TARGET: "torch.optim.SGD", "lr": 0.01}),
+        {
+            OBJECT_TARGET: "lightcat.optimizer.creator.OptimizerCreator",
+            "optimizer": {OBJECT_TARGET: "torch.optim.SGD", "lr": 0.01},
+        },
+    ],
+)
+def test_setup_optimizer_creator(creator: OptimizerCreator | dict) -> None:
+    assert isinstance(setup_optimizer_creator(creator), OptimizerCreator)
+
+
+@objectory_available
+def test_setup_optimizer_creator_incorrect_type(caplog: pytest.LogCaptureFixture) -> None:
+    with caplog.at_level(level=logging.WARNING):
+        assert isinstance(
+            setup_optimizer_creator({OBJECT_TARGET: "torch.nn.Identity"}), torch.nn.Identity
+        )
+        assert caplog.messages
+
+
+def test_setup_optimizer_creator_object_no_objectory() -> None:
+    with (
+        patch("lightcat.utils.imports.is_objectory_available", lambda: False),
+        pytest.raises(RuntimeError, match="'objectory' package is required but not installed."),
+    ):
+        setup_optimizer_creator(
+            {
+                OBJECT_TARGET: "lightcat.optimizer.creator.OptimizerCreator",
+                "optimizer": {OBJECT_TARGET: "torch.optim.SGD", "lr": 0.01},
+            }
+        )
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import pytest
+import torch
+
+from lightcat.optimizer.creator import OptimizerCreator
+from lightcat.testing import objectory_available
+from lightcat.utils.imports import is_objectory_available
+
+if is_objectory_available():
+    from objectory import OBJECT_TARGET
+else:  # pragma: no cover
+    OBJECT_TARGET = "_target_"
+
+
+def create_model() -> torch.nn.Module:
+    return torch.nn.Sequential(torch.nn.Linear(4, 8), torch.nn.LayerNorm(8), torch.nn.Linear(8, 2))
+
+
+######################################
+#     Tests for OptimizerCreator     #
+######################################
+
+
+def test_optimizer_creator_repr() -> None:
+    assert repr(OptimizerCreator({OBJECT_TARGET: "torch.optim.SGD", "lr": 0.01})).startswith(
+        "OptimizerCreator("
+    )
+
+
+def test_optimizer_creator_str() -> None:
+    assert str(OptimizerCreator({OBJECT_TARGET: "torch.optim.SGD", "lr": 0.01})).startswith(
+        "OptimizerCreator("
+    )
+
+
+def test_optimizer_creator_incorrect_implementation() -> None:
+    with pytest.raises(ValueError, match="Incorrect implementation: incorrect"):
+        OptimizerCreator({OBJECT_TARGET: "torch.optim.SGD", "lr": 0.01}, implementation="incorrect")
+
+
+@objectory_available
+def test_optimizer_creator_create() -> None:
+    model = create_model()
+    optimizer = OptimizerCreator({OBJECT_TARGET: "torch.optim.SGD", "lr": 0.01}).create(model)
+    assert isinstance(optimizer, torch.optim.SGD)
+    assert len(optimizer.param_groups) == 1
+    assert optimizer.param_groups[0]["params"] == list(model.parameters())
+    assert optimizer.param_groups[0]["lr"] == 0.01
+
+
+@objectory_available
+def test_optimizer_creator_create_param_groups() -> None:
+    model = create_model()
+    optimizer = OptimizerCreator(
+        {OBJECT_TARGET: "torch.optim.AdamW", "lr": 0.001, "weight_decay": 0.01},
+        param_groups=[{"names": [r"bias$"], "types": ["LayerNorm"], "weight_decay": 0.0}],
+    ).create(model)
+    assert len(optimizer.param_groups) == 2
+    assert optimizer.param_groups[0]["weight_decay"] == 0.0
+    assert optimizer.param_groups[0]["params"] == [
+        model[0].bias,
+        model[1].weight,
+        model[1].bias,
+        model[2].bias,
+    ]
+    assert optimizer.param_groups[1]["weight_decay"] == 0.01
+    assert optimizer.param_groups[1]["params"] == [model[0].weight, model[2].weight]
+
+
+@objectory_available
+@pytest.mark.parametrize(
+    ("implementation", "fused", "foreach"),
+    [
+        ("auto", None, None),
+        ("fused", True, None),
+        ("foreach", None, True),
+        ("for-loop", None, False),
+    ],
+)
+def test_optimizer_creator_create_implementation(
+    implementation: str, fused: bool | None, foreach: bool | None
+) -> None:
+    optimizer = OptimizerCreator(
+        {OBJECT_TARGET: "torch.optim.Adam"}, implementation=implementation
+    ).create(create_model())
+    assert optimizer.defaults["fused"] == fused
+    assert optimizer.defaults["foreach"] == foreach
+
+
+@objectory_available
+def test_optimizer_creator_create_implementation_config_priority() -> None:
+    optimizer = OptimizerCreator(
+        {OBJECT_TARGET: "torch.optim.Adam", "foreach": False}, implementation="foreach"
+    ).create(create_model())
+    assert not optimizer.defaults["foreach"]
+
+
+@objectory_available
+@pytest.mark.parametrize("implementation", ["auto", "fused", "foreach", "for-loop"])
+def test_optimizer_creator_create_implementation_config_other_key(implementation: str) -> None:
+    # The selected implementation is ignored, so fused and foreach are
+    # not both True.
+    optimizer = OptimizerCreator(
+        {OBJECT_TARGET: "torch.optim.Adam", "foreach": True}, implementation=implementation
+    ).create(create_model())
+    assert optimizer.defaults["foreach"]
+    assert optimizer.defaults["fused"] is None
+
+
+@objectory_available
+@pytest.mark.parametrize("state_dtype", [torch.bfloat16, "bfloat16"])
+def test_optimizer_creator_create_state_dtype(state_dtype: torch.dtype | str) -> None:
+    model = create_model()
+    optimizer = OptimizerCreator(
+        {OBJECT_TARGET: "torch.optim.Adam"}, state_dtype=state_dtype
+    ).create(model)
+    model(torch.randn(3, 4)).sum().backward()
+    optimizer.step()
+    for state in optimizer.state.values():
+        assert state["exp_avg"].dtype == torch.bfloat16
+
+
+@objectory_available
+def test_optimizer_creator_create_state_dtype_none() -> None:
+    model = create_model()
+    optimizer = OptimizerCreator({OBJECT_TARGET: "torch.optim.Adam"}).create(model)
+    model(torch.randn(3, 4)).sum().backward()
+    optimizer.step()
+    for state in optimizer.state.values():
+        assert state["exp_avg"].dtype == torch.float32
+
+
+@objectory_available
+def test_optimizer_creator_create_twice() -> None:
+    creator = OptimizerCreator({OBJECT_TARGET: "torch.optim.SGD", "lr": 0.01})
+    model = create_model()
+    assert creator.create(model) is not creator.create(model)
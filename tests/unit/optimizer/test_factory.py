@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import logging
+from unittest.mock import patch
+
+import pytest
+import torch
+
+from lightcat.optimizer import is_optimizer_config, setup_optimizer
+from lightcat.testing import objectory_available
+from lightcat.utils.imports import is_objectory_available
+
+if is_objectory_available():
+    from objectory import OBJECT_TARGET
+else:  # pragma: no cover
+    OBJECT_TARGET = "_target_"
+
+
+#########################################
+#     Tests for is_optimizer_config     #
+#########################################
+
+
+@objectory_available
+def test_is_optimizer_config_true() -> None:
+    assert is_optimizer_config({OBJECT_TARGET: "torch.optim.SGD", "lr": 0.01})
+
+
+@objectory_available
+def test_is_optimizer_config_false() -> None:
+    assert not is_optimizer_config({OBJECT_TARGET: "torch.nn.Identity"})
+
+
+#####################################
+#     Tests for setup_optimizer     #
+#####################################
+
+
+@objectory_available
+def test_setup_optimizer_config() -> None:
+    model = torch.nn.Linear(4, 2)
+    optimizer = setup_optimizer(
+        {OBJECT_TARGET: "torch.optim.SGD", "lr": 0.01}, params=model.parameters()
+    )
+    assert isinstance(optimizer, torch.optim.SGD)
+    assert optimizer.param_groups[0]["lr"] == 0.01
+    assert len(optimizer.param_groups[0]["params"]) == 2
+
+
+@objectory_available
+def test_setup_optimizer_object() -> None:
+    optimizer = torch.optim.SGD(torch.nn.Linear(4, 2).parameters(), lr=0.01)
+    assert setup_optimizer(optimizer) is optimizer
+
+
+@objectory_available
+def test_setup_optimizer_incorrect_type(caplog: pytest.LogCaptureFixture) -> None:
+    with caplog.at_level(level=logging.WARNING):
+        assert isinstance(setup_optimizer({OBJECT_TARGET: "torch.nn.Identity"}), torch.nn.Identity)
+        assert caplog.messages
+
+
+def test_setup_optimizer_object_no_objectory() -> None:
+    with (
+        patch("lightcat.utils.imports.is_objectory_available", lambda: False),
+        pytest.raises(RuntimeError, match="'objectory' package is required but not installed."),
+    ):
+        setup_optimizer({OBJECT_TARGET: "torch.optim.SGD", "lr": 0.01}, params=[])
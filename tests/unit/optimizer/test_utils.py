@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+from unittest.mock import Mock
+
+import pytest
+import torch
+
+from lightcat.optimizer import (
+    cast_optimizer_state,
+    get_implementation_kwargs,
+    get_param_groups,
+    register_state_dtype_hooks,
+)
+
+
+def create_model() -> torch.nn.Module:
+    return torch.nn.Sequential(
+        torch.nn.Linear(4, 8), torch.nn.LayerNorm(8), torch.nn.ReLU(), torch.nn.Linear(8, 2)
+    )
+
+
+def run_step(model: torch.nn.Module, optimizer: torch.optim.Optimizer) -> None:
+    optimizer.zero_grad()
+    model(torch.randn(3, 4)).sum().backward()
+    optimizer.step()
+
+
+######################################
+#     Tests for get_param_groups     #
+######################################
+
+
+def test_get_param_groups_no_rules() -> None:
+    model = create_model()
+    groups = get_param_groups(model)
+    assert len(groups) == 1
+    assert groups[0].keys() == {"params"}
+    assert groups[0]["params"] == list(model.parameters())
+
+
+def test_get_param_groups_names() -> None:
+    model = create_model()
+    groups = get_param_groups(model, rules=[{"names": [r"bias$"], "weight_decay": 0.0}])
+    assert len(groups) == 2
+    assert groups[0]["weight_decay"] == 0.0
+    assert groups[0]["params"] == [model[0].bias, model[1].bias, model[3].bias]
+    assert groups[1] == {"params": [model[0].weight, model[1].weight, model[3].weight]}
+
+
+@pytest.mark.parametrize("cls", [torch.nn.LayerNorm, "torch.nn.LayerNorm", "LayerNorm"])
+def test_get_param_groups_types(cls: type | str) -> None:
+    model = create_model()
+    groups = get_param_groups(model, rules=[{"types": [cls], "weight_decay": 0.0}])
+    assert groups[0] == {"weight_decay": 0.0, "params": [model[1].weight, model[1].bias]}
+
+
+def test_get_param_groups_first_rule_wins() -> None:
+    model = create_model()
+    groups = get_param_groups(
+        model,
+        rules=[
+            {"types": ["LayerNorm"], "lr": 0.1},
+            {"names": [r"bias$"], "weight_decay": 0.0},
+        ],
+    )
+    assert groups[0] == {"lr": 0.1, "params": [model[1].weight, model[1].bias]}
+    assert groups[1] == {"weight_decay": 0.0, "params": [model[0].bias, model[3].bias]}
+    assert groups[2] == {"params": [model[0].weight, model[3].weight]}
+
+
+def test_get_param_groups_empty_groups() -> None:
+    model = create_model()
+    groups = get_param_groups(
+        model, rules=[{"names": [r"missing"], "lr": 0.1}, {"names": [r"."], "lr": 0.2}]
+    )
+    assert groups == [{"lr": 0.2, "params": list(model.parameters())}]
+
+
+def test_get_param_groups_frozen_parameters() -> None:
+    model = create_model()
+    model[0].requires_grad_(False)
+    groups = get_param_groups(model)
+    assert groups == [{"params": list(model.parameters())[2:]}]
+
+
+def test_get_param_groups_shared_parameters() -> None:
+    linear = torch.nn.Linear(4, 4)
+    model = torch.nn.Sequential(linear, linear)
+    assert get_param_groups(model) == [{"params": [linear.weight, linear.bias]}]
+
+
+def test_get_param_groups_tied_parameters() -> None:
+    embedding = torch.nn.Embedding(10, 4)
+    head = torch.nn.Linear(4, 10, bias=False)
+    head.weight = embedding.weight
+    model = torch.nn.Sequential(embedding, torch.nn.LayerNorm(4), head)
+    groups = get_param_groups(model, rules=[{"types": ["Linear"], "lr": 0.1}])
+    assert groups == [{"params": [embedding.weight, model[1].weight, model[1].bias]}]
+    # Each parameter is updated once per step.
+    optimizer = torch.optim.SGD(groups, lr=1.0)
+    embedding.weight.grad = torch.ones_like(embedding.weight)
+    expected = embedding.weight.detach() - 1.0
+    optimizer.step()
+    assert embedding.weight.equal(expected)
+
+
+###############################################
+#     Tests for get_implementation_kwargs     #
+###############################################
+
+
+def test_get_implementation_kwargs_auto_cpu() -> None:
+    assert get_implementation_kwargs(torch.optim.Adam, create_model().parameters()) == {}
+
+
+def test_get_implementation_kwargs_auto_cuda_fused() -> None:
+    params = [Mock(device=torch.device("cuda"), is_floating_point=Mock(return_value=True))]
+    assert get_implementation_kwargs(torch.optim.AdamW, params) == {"fused": True}
+
+
+def test_get_implementation_kwargs_auto_cuda_foreach() -> None:
+    params = [Mock(device=torch.device("cuda"), is_floating_point=Mock(return_value=True))]
+    assert get_implementation_kwargs(torch.optim.RMSprop, params) == {"foreach": True}
+
+
+def test_get_implementation_kwargs_auto_cuda_unsupported() -> None:
+    params = [Mock(device=torch.device("cuda"), is_floating_point=Mock(return_value=True))]
+    assert get_implementation_kwargs(torch.optim.LBFGS, params) == {}
+
+
+def test_get_implementation_kwargs_auto_no_params() -> None:
+    assert get_implementation_kwargs(torch.optim.Adam, []) == {}
+
+
+@pytest.mark.parametrize(
+    ("implementation", "kwargs"),
+    [("fused", {"fused": True}), ("foreach", {"foreach": True}), ("for-loop", {"foreach": False})],
+)
+def test_get_implementation_kwargs_explicit(implementation: str, kwargs: dict) -> None:
+    assert (
+        get_implementation_kwargs(torch.optim.Adam, create_model().parameters(), implementation)
+        == kwargs
+    )
+
+
+def test_get_implementation_kwargs_unsupported() -> None:
+    with pytest.raises(ValueError, match="does not support the 'fused' implementation"):
+        get_implementation_kwargs(torch.optim.RMSprop, create_model().parameters(), "fused")
+
+
+def test_get_implementation_kwargs_incorrect() -> None:
+    with pytest.raises(ValueError, match="Incorrect implementation: incorrect"):
+        get_implementation_kwargs(torch.optim.Adam, create_model().parameters(), "incorrect")
+
+
+##########################################
+#     Tests for cast_optimizer_state     #
+##########################################
+
+
+def test_cast_optimizer_state() -> None:
+    model = create_model()
+    optimizer = torch.optim.Adam(model.parameters())
+    run_step(model, optimizer)
+    cast_optimizer_state(optimizer, torch.bfloat16)
+    for state in optimizer.state.values():
+        assert state["exp_avg"].dtype == torch.bfloat16
+        assert state["exp_avg_sq"].dtype == torch.bfloat16
+        assert state["step"].dtype == torch.float32
+
+
+def test_cast_optimizer_state_param_dtype() -> None:
+    model = create_model()
+    optimizer = torch.optim.Adam(model.parameters())
+    run_step(model, optimizer)
+    cast_optimizer_state(optimizer, torch.bfloat16)
+    cast_optimizer_state(optimizer, None)
+    for state in optimizer.state.values():
+        assert state["exp_avg"].dtype == torch.float32
+
+
+def test_cast_optimizer_state_empty() -> None:
+    optimizer = torch.optim.Adam(create_model().parameters())
+    cast_optimizer_state(optimizer, torch.bfloat16)
+    assert not optimizer.state
+
+
+################################################
+#     Tests for register_state_dtype_hooks     #
+################################################
+
+
+def test_register_state_dtype_hooks() -> None:
+    model = create_model()
+    optimizer = torch.optim.Adam(model.parameters())
+    handles = register_state_dtype_hooks(optimizer)
+    assert len(handles) == 3
+    for _ in range(3):
+        run_step(model, optimizer)
+        for state in optimizer.state.values():
+            assert state["exp_avg"].dtype == torch.bfloat16
+            assert state["exp_avg_sq"].dtype == torch.bfloat16
+
+
+def test_register_state_dtype_hooks_close_to_float32() -> None:
+    torch.manual_seed(0)
+    model1 = create_model()
+    model2 = create_model()
+    model2.load_state_dict(model1.state_dict())
+    optimizer1 = torch.optim.Adam(model1.parameters(), lr=0.01)
+    optimizer2 = torch.optim.Adam(model2.parameters(), lr=0.01)
+    register_state_dtype_hooks(optimizer2)
+    batch = torch.randn(3, 4)
+    for model, optimizer in [(model1, optimizer1), (model2, optimizer2)]:
+        for _ in range(3):
+            optimizer.zero_grad()
+            model(batch).sum().backward()
+            optimizer.step()
+    for param1, param2 in zip(model1.parameters(), model2.parameters()):
+        assert param1.allclose(param2, atol=1e-3)
+
+
+def test_register_state_dtype_hooks_load_state_dict() -> None:
+    model = create_model()
+    optimizer = torch.optim.Adam(model.parameters())
+    run_step(model, optimizer)
+    state_dict = optimizer.state_dict()
+    register_state_dtype_hooks(optimizer)
+    optimizer.load_state_dict(state_dict)
+    for state in optimizer.state.values():
+        assert state["exp_avg"].dtype == torch.bfloat16
+
+
+def test_register_state_dtype_hooks_remove() -> None:
+    model = create_model()
+    optimizer = torch.optim.Adam(model.parameters())
+    for handle in register_state_dtype_hooks(optimizer):
+        handle.remove()
+    run_step(model, optimizer)
+    for state in optimizer.state.values():
+        assert state["exp_avg"].dtype == torch.float32
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+import pytest
+import torch
+from lightning import LightningDataModule
+from lightning.pytorch.demos.boring_classes import RandomDataset, RandomIterableDataset
+
+from lightcat.datamodule.creator import DataModuleCreator
+
+from lightcat.scoring import ParallelPredictor, load_predictions
+from lightcat.testing import objectory_available
+from lightcat.utils.hashing import hash_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+MODEL = {
+    "_target_": "lightcat.model.creator.ModelCreator",
+    "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+}
+DATAMODULE = {
+    "_target_": "lightcat.datamodule.creator.DataModuleCreator",
+    "datamodule": {"_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"},
+}
+
+
+def run_predictor(output_dir: Path, **kwargs: Any) -> list[torch.Tensor]:
+    torch.manual_seed(42)
+    ParallelPredictor(MODEL, DATAMODULE, output_dir=output_dir, **kwargs).run()
+    return load_predictions(output_dir)
+
+
+#######################################
+#     Tests for ParallelPredictor     #
+#######################################
+
+
+def test_parallel_predictor_repr(tmp_path: Path) -> None:
+    assert repr(ParallelPredictor(MODEL, DATAMODULE, output_dir=tmp_path)).startswith(
+        "ParallelPredictor("
+    )
+
+
+def test_parallel_predictor_str(tmp_path: Path) -> None:
+    assert str(ParallelPredictor(MODEL, DATAMODULE, output_dir=tmp_path)).startswith(
+        "ParallelPredictor("
+    )
+
+
+@pytest.mark.parametrize("shard_size", [0, -1])
+def test_parallel_predictor_incorrect_shard_size(tmp_path: Path, shard_size: int) -> None:
+    with pytest.raises(ValueError, match="shard_size must be greater than 0"):
+        ParallelPredictor(MODEL, DATAMODULE, output_dir=tmp_path, shard_size=shard_size)
+
+
+@pytest.mark.parametrize("num_threads", [0, -1])
+def test_parallel_predictor_incorrect_num_threads(tmp_path: Path, num_threads: int) -> None:
+    with pytest.raises(ValueError, match="num_threads must be greater than 0"):
+        ParallelPredictor(MODEL, DATAMODULE, output_dir=tmp_path, num_threads=num_threads)
+
+
+def test_parallel_predictor_incorrect_num_workers(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="num_workers must be greater or equal to 0"):
+        ParallelPredictor(MODEL, DATAMODULE, output_dir=tmp_path, num_workers=-1)
+
+
+def test_parallel_predictor_num_workers_default(tmp_path: Path) -> None:
+    assert ParallelPredictor(MODEL, DATAMODULE, output_dir=tmp_path)._num_workers >= 1
+
+
+@objectory_available
+def test_parallel_predictor_run_main_process(tmp_path: Path) -> None:
+    paths = ParallelPredictor(
+        MODEL, DATAMODULE, output_dir=tmp_path, shard_size=20, num_workers=0, batch_size=32
+    ).run()
+    assert [path.name for path in paths] == [
+        "shard-000000.pt",
+        "shard-000001.pt",
+        "shard-000002.pt",
+        "shard-000003.pt",
+    ]
+    outputs = load_predictions(tmp_path)
+    # The prediction dataset of BoringDataModule has 64 examples.
+    assert [output.shape for output in outputs] == [
+        torch.Size([20, 2]),
+        torch.Size([20, 2]),
+        torch.Size([20, 2]),
+        torch.Size([4, 2]),
+    ]
+    manifest = json.loads(tmp_path.joinpath("manifest.json").read_text())
+    assert manifest["num_examples"] == 64
+    assert [shard["num_examples"] for shard in manifest["shards"]] == [20, 20, 20, 4]
+
+
+@objectory_available
+def test_parallel_predictor_run_batch_size(tmp_path: Path) -> None:
+    ParallelPredictor(
+        MODEL, DATAMODULE, output_dir=tmp_path, shard_size=40, num_workers=0, batch_size=16
+    ).run()
+    assert [output.shape[0] for output in load_predictions(tmp_path)] == [16, 16, 8, 16, 8]
+
+
+@objectory_available
+@pytest.mark.timeout(120)
+def test_parallel_predictor_run_workers(tmp_path: Path) -> None:
+    expected = run_predictor(tmp_path.joinpath("main"), shard_size=10, num_workers=0, batch_size=8)
+    outputs = run_predictor(
+        tmp_path.joinpath("workers"), shard_size=10, num_workers=2, batch_size=8
+    )
+    assert [output.shape[0] for output in outputs] == [8, 2] * 6 + [4]
+    assert all(torch.allclose(a, b) for a, b in zip(outputs, expected))
+
+
+@objectory_available
+def test_parallel_predictor_run_resume(tmp_path: Path) -> None:
+    expected = run_predictor(tmp_path.joinpath("ref"), shard_size=20, num_workers=0, batch_size=32)
+    output_dir = tmp_path.joinpath("resume")
+    run_predictor(output_dir, shard_size=20, num_workers=0, batch_size=32)
+    output_dir.joinpath("manifest.json").unlink()
+    # The remaining shards are not scored again.
+    shard = output_dir.joinpath("shard-000001.pt")
+    torch.save([torch.zeros(20, 2)], shard)
+    output_dir.joinpath("shard-000002.pt").unlink()
+    outputs = run_predictor(output_dir, shard_size=20, num_workers=0, batch_size=32)
+    assert outputs[1].equal(torch.zeros(20, 2))
+    assert outputs[2].allclose(expected[2])
+
+
+@objectory_available
+def test_parallel_predictor_run_complete(tmp_path: Path) -> None:
+    predictor = ParallelPredictor(MODEL, DATAMODULE, output_dir=tmp_path, num_workers=0)
+    assert not predictor.is_complete()
+    paths = predictor.run()
+    assert predictor.is_complete()
+    assert predictor.run() == paths
+
+
+@objectory_available
+def test_parallel_predictor_run_different_model(tmp_path: Path) -> None:
+    run_predictor(tmp_path, num_workers=0)
+    torch.manual_seed(0)
+    # The model has different weights.
+    predictor = ParallelPredictor(MODEL, DATAMODULE, output_dir=tmp_path, num_workers=0)
+    assert not predictor.is_complete()
+    with pytest.raises(ValueError, match="were computed with another model"):
+        predictor.run()
+
+
+@objectory_available
+def test_parallel_predictor_run_different_datamodule(tmp_path: Path) -> None:
+    run_predictor(tmp_path, shard_size=20, num_workers=0)
+    tmp_path.joinpath("manifest.json").unlink()
+    datamodule = DataModuleCreator(
+        LightningDataModule.from_datasets(predict_dataset=RandomDataset(32, 10), batch_size=4)
+    )
+    torch.manual_seed(42)
+    predictor = ParallelPredictor(
+        MODEL, datamodule, output_dir=tmp_path, shard_size=20, num_workers=0
+    )
+    with pytest.raises(ValueError, match="were computed with another model"):
+        predictor.run()
+
+
+@objectory_available
+def test_parallel_predictor_run_different_batch_size(tmp_path: Path) -> None:
+    run_predictor(tmp_path, num_workers=0, batch_size=32)
+    with pytest.raises(ValueError, match="were computed with another model"):
+        run_predictor(tmp_path, num_workers=0, batch_size=16)
+
+
+@objectory_available
+def test_parallel_predictor_run_shards_without_fingerprint(tmp_path: Path) -> None:
+    torch.save([torch.zeros(20, 2)], tmp_path.joinpath("shard-000000.pt"))
+    with pytest.raises(ValueError, match="were computed with another model"):
+        run_predictor(tmp_path, shard_size=20, num_workers=0)
+
+
+@objectory_available
+def test_parallel_predictor_get_config(tmp_path: Path) -> None:
+    config = ParallelPredictor(
+        MODEL, DATAMODULE, output_dir=tmp_path, shard_size=20, batch_size=8
+    ).get_config()
+    assert config["model"] == MODEL
+    assert config["datamodule"] == DATAMODULE
+    assert config["num_examples"] == 64
+    assert config["shard_size"] == 20
+    assert config["batch_size"] == 8
+
+
+@objectory_available
+def test_parallel_predictor_get_config_creator(tmp_path: Path) -> None:
+    datamodule = DataModuleCreator(
+        LightningDataModule.from_datasets(predict_dataset=RandomDataset(32, 64))
+    )
+    config = ParallelPredictor(MODEL, datamodule, output_dir=tmp_path).get_config()
+    assert config["datamodule"] == repr(datamodule)
+
+
+@objectory_available
+def test_parallel_predictor_get_config_different_datamodule_creator(tmp_path: Path) -> None:
+    # The datasets have the same number of examples but different values.
+    configs = []
+    for _ in range(2):
+        datamodule = DataModuleCreator(
+            LightningDataModule.from_datasets(predict_dataset=RandomDataset(32, 64))
+        )
+        torch.manual_seed(42)
+        configs.append(ParallelPredictor(MODEL, datamodule, output_dir=tmp_path).get_config())
+    assert configs[0]["weights"] == configs[1]["weights"]
+    assert configs[0]["num_examples"] == configs[1]["num_examples"]
+    assert hash_config(configs[0]) != hash_config(configs[1])
+
+
+@objectory_available
+def test_parallel_predictor_run_iterable_dataset(tmp_path: Path) -> None:
+    datamodule = DataModuleCreator(
+        LightningDataModule.from_datasets(predict_dataset=RandomIterableDataset(32, 8))
+    )
+    with pytest.raises(ValueError, match="does not support iterable datasets"):
+        ParallelPredictor(MODEL, datamodule, output_dir=tmp_path, num_workers=0).run()
+
+
+######################################
+#     Tests for load_predictions     #
+######################################
+
+
+def test_load_predictions_missing(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError, match="The predictions are not complete"):
+        load_predictions(tmp_path)
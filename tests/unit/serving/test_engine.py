@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+import pytest
+import torch
+from lightning.pytorch.demos.boring_classes import BoringModel
+
+from lightcat.model.creator import ModelCreator
+from lightcat.serving import InferenceEngine
+from lightcat.serving.engine import _get_batch_size_bounds, _get_item, _to_device
+from lightcat.testing import objectory_available
+
+
+class DictModel(BoringModel):
+    def forward(self, batch: dict) -> dict:
+        return {"out": self.layer(batch["x"]), "extra": (batch["x"].sum(dim=1),)}
+
+
+class SlowModel(BoringModel):
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        time.sleep(0.05)
+        return super().forward(x)
+
+
+def run(coro: Any) -> Any:
+    return asyncio.run(coro)
+
+
+async def predict_many(engine: InferenceEngine, examples: list) -> list:
+    async with engine:
+        return await asyncio.gather(*[engine.predict(example) for example in examples])
+
+
+#####################################
+#     Tests for InferenceEngine     #
+#####################################
+
+
+def test_inference_engine_repr() -> None:
+    assert repr(InferenceEngine(ModelCreator(BoringModel()))) == (
+        "InferenceEngine(max_batch_size=32, max_latency=0.005, device=cpu, running=False)"
+    )
+
+
+@pytest.mark.parametrize("max_batch_size", [0, -1])
+def test_inference_engine_incorrect_max_batch_size(max_batch_size: int) -> None:
+    with pytest.raises(ValueError, match="max_batch_size must be greater than 0"):
+        InferenceEngine(ModelCreator(BoringModel()), max_batch_size=max_batch_size)
+
+
+def test_inference_engine_incorrect_max_latency() -> None:
+    with pytest.raises(ValueError, match="max_latency must be greater or equal to 0"):
+        InferenceEngine(ModelCreator(BoringModel()), max_latency=-1)
+
+
+def test_inference_engine_model() -> None:
+    model = BoringModel()
+    engine = InferenceEngine(ModelCreator(model))
+    assert engine.model is None
+    run(engine.start())
+    assert engine.model is model
+    assert not model.training
+    run(engine.stop())
+
+
+def test_inference_engine_predict() -> None:
+    model = BoringModel()
+    examples = [torch.randn(32) for _ in range(5)]
+    outputs = run(predict_many(InferenceEngine(ModelCreator(model)), examples))
+    for example, output in zip(examples, outputs):
+        assert output.allclose(model(example.unsqueeze(0))[0], atol=1e-6)
+
+
+@objectory_available
+def test_inference_engine_predict_config() -> None:
+    engine = InferenceEngine(
+        {
+            "_target_": "lightcat.model.creator.ModelCreator",
+            "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+        }
+    )
+    assert run(predict_many(engine, [torch.randn(32)]))[0].shape == (2,)
+
+
+def test_inference_engine_batching() -> None:
+    engine = InferenceEngine(ModelCreator(BoringModel()), max_batch_size=4, max_latency=0.1)
+    run(predict_many(engine, [torch.randn(32) for _ in range(10)]))
+    batch_size = engine.get_metrics()["batch_size"]
+    assert batch_size["count"] == 3
+    assert batch_size["sum"] == 10
+    assert batch_size["max"] == 4
+
+
+def test_inference_engine_max_latency() -> None:
+    engine = InferenceEngine(ModelCreator(BoringModel()), max_batch_size=8, max_latency=0.05)
+    start_time = time.perf_counter()
+    run(predict_many(engine, [torch.randn(32)]))
+    assert time.perf_counter() - start_time >= 0.05
+    assert engine.get_metrics()["latency"]["min"] >= 0.05
+
+
+def test_inference_engine_max_latency_0() -> None:
+    engine = InferenceEngine(ModelCreator(BoringModel()), max_latency=0)
+    run(predict_many(engine, [torch.randn(32) for _ in range(3)]))
+    assert engine.get_metrics()["batch_size"]["sum"] == 3
+
+
+def test_inference_engine_batches_while_running() -> None:
+    async def main(engine: InferenceEngine) -> None:
+        async with engine:
+            first = asyncio.ensure_future(engine.predict(torch.randn(32)))
+            await asyncio.sleep(0.02)
+            # These requests arrive while the first batch is running.
+            await asyncio.gather(first, *[engine.predict(torch.randn(32)) for _ in range(5)])
+
+    engine = InferenceEngine(ModelCreator(SlowModel()), max_batch_size=8, max_latency=0.001)
+    run(main(engine))
+    assert engine.get_metrics()["batch_size"]["max"] == 5
+
+
+def test_inference_engine_predict_dict() -> None:
+    outputs = run(
+        predict_many(
+            InferenceEngine(ModelCreator(DictModel())), [{"x": torch.randn(32)} for _ in range(3)]
+        )
+    )
+    assert outputs[0]["out"].shape == (2,)
+    assert outputs[0]["extra"][0].shape == ()
+
+
+def test_inference_engine_predict_error() -> None:
+    engine = InferenceEngine(ModelCreator(BoringModel()))
+    with pytest.raises(RuntimeError, match="shapes cannot be multiplied"):
+        run(predict_many(engine, [torch.randn(3)]))
+    assert not engine.is_running()
+
+
+def test_inference_engine_predict_error_does_not_stop_engine() -> None:
+    async def main(engine: InferenceEngine) -> torch.Tensor:
+        async with engine:
+            with pytest.raises(RuntimeError, match="shapes cannot be multiplied"):
+                await engine.predict(torch.randn(3))
+            return await engine.predict(torch.randn(32))
+
+    assert run(main(InferenceEngine(ModelCreator(BoringModel())))).shape == (2,)
+
+
+def test_inference_engine_predict_not_running() -> None:
+    engine = InferenceEngine(ModelCreator(BoringModel()))
+    with pytest.raises(RuntimeError, match="The engine is not running"):
+        run(engine.predict(torch.randn(32)))
+
+
+def test_inference_engine_stop_cancels_queued_requests() -> None:
+    async def main(engine: InferenceEngine) -> list:
+        await engine.start()
+        tasks = [asyncio.ensure_future(engine.predict(torch.randn(32))) for _ in range(20)]
+        await asyncio.sleep(0.01)
+        await engine.stop()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = run(main(InferenceEngine(ModelCreator(SlowModel()), max_batch_size=2, max_latency=0)))
+    assert any(isinstance(result, asyncio.CancelledError) for result in results)
+
+
+def test_inference_engine_stop_cancels_collected_requests() -> None:
+    async def main(engine: InferenceEngine) -> None:
+        await engine.start()
+        task = asyncio.ensure_future(engine.predict(torch.randn(32)))
+        # The request waits for other requests in the batch that is
+        # collected.
+        await asyncio.sleep(0.01)
+        await engine.stop()
+        await asyncio.wait_for(task, timeout=1.0)
+
+    engine = InferenceEngine(ModelCreator(BoringModel()), max_latency=2.0)
+    with pytest.raises(asyncio.CancelledError):
+        run(main(engine))
+    assert engine.get_metrics()["batch_size"]["count"] == 0
+
+
+def test_inference_engine_stop_does_not_block_event_loop() -> None:
+    async def main(engine: InferenceEngine) -> int:
+        await engine.start()
+        task = asyncio.ensure_future(engine.predict(torch.randn(32)))
+        # The batch is running in the executor when the engine is
+        # stopped.
+        await asyncio.sleep(0.01)
+        stop = asyncio.ensure_future(engine.stop())
+        ticks = 0
+        while not stop.done():
+            ticks += 1
+            await asyncio.sleep(0.001)
+        await asyncio.gather(task, return_exceptions=True)
+        return ticks
+
+    assert run(main(InferenceEngine(ModelCreator(SlowModel()), max_latency=0))) > 1
+
+
+def test_inference_engine_start_twice() -> None:
+    async def main(engine: InferenceEngine) -> bool:
+        await engine.start()
+        await engine.start()
+        running = engine.is_running()
+        await engine.stop()
+        await engine.stop()
+        return running and not engine.is_running()
+
+    assert run(main(InferenceEngine(ModelCreator(BoringModel()))))
+
+
+def test_inference_engine_restart() -> None:
+    engine = InferenceEngine(ModelCreator(BoringModel()))
+    run(predict_many(engine, [torch.randn(32)]))
+    assert run(predict_many(engine, [torch.randn(32)]))[0].shape == (2,)
+
+
+def test_inference_engine_get_metrics() -> None:
+    engine = InferenceEngine(ModelCreator(BoringModel()))
+    run(predict_many(engine, [torch.randn(32) for _ in range(4)]))
+    metrics = engine.get_metrics()
+    assert sorted(metrics) == [
+        "batch_latency",
+        "batch_size",
+        "latency",
+        "queue_depth",
+        "queue_depth_histogram",
+    ]
+    assert metrics["queue_depth"] == 0
+    assert metrics["queue_depth_histogram"]["count"] == 4
+    assert metrics["latency"]["count"] == 4
+
+
+def test_inference_engine_reset_metrics() -> None:
+    engine = InferenceEngine(ModelCreator(BoringModel()))
+    run(predict_many(engine, [torch.randn(32)]))
+    engine.reset_metrics()
+    assert engine.get_metrics()["latency"]["count"] == 0
+
+
+############################################
+#     Tests for _get_batch_size_bounds     #
+############################################
+
+
+@pytest.mark.parametrize(
+    ("max_batch_size", "bounds"),
+    [(1, [1]), (2, [1, 2]), (8, [1, 2, 4, 8]), (10, [1, 2, 4, 8, 10])],
+)
+def test_get_batch_size_bounds(max_batch_size: int, bounds: list[int]) -> None:
+    assert _get_batch_size_bounds(max_batch_size) == bounds
+
+
+###############################
+#     Tests for _get_item     #
+###############################
+
+
+def test_get_item() -> None:
+    outputs = _get_item(
+        {"a": torch.arange(3), "b": (torch.ones(3, 2), [torch.zeros(3)]), "c": "abc"}, 1
+    )
+    assert outputs["a"].equal(torch.tensor(1))
+    assert outputs["b"][0].equal(torch.ones(2))
+    assert outputs["b"][1][0].equal(torch.tensor(0.0))
+    assert outputs["c"] == "abc"
+
+
+################################
+#     Tests for _to_device     #
+################################
+
+
+def test_to_device() -> None:
+    data = _to_device({"a": torch.ones(2), "b": [torch.zeros(1)], "c": 1}, torch.device("cpu"))
+    assert data["a"].equal(torch.ones(2))
+    assert data["b"][0].equal(torch.zeros(1))
+    assert data["c"] == 1
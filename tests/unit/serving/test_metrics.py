@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from lightcat.serving import Histogram
+
+###############################
+#     Tests for Histogram     #
+###############################
+
+
+def test_histogram_repr() -> None:
+    assert repr(Histogram(bounds=[1, 2])) == "Histogram(count=0, sum=0.0)"
+
+
+def test_histogram_incorrect_bounds() -> None:
+    with pytest.raises(ValueError, match="bounds must be in strictly increasing order"):
+        Histogram(bounds=[1, 1, 2])
+
+
+def test_histogram_observe() -> None:
+    hist = Histogram(bounds=[1, 2, 4])
+    for value in [0.5, 1, 1.5, 4, 100]:
+        hist.observe(value)
+    assert hist.count == 5
+    assert hist.to_dict() == {
+        "bounds": [1, 2, 4, math.inf],
+        "counts": [2, 1, 1, 1],
+        "count": 5,
+        "sum": 107.0,
+        "min": 0.5,
+        "max": 100,
+    }
+
+
+def test_histogram_empty() -> None:
+    assert Histogram(bounds=[1]).to_dict() == {
+        "bounds": [1, math.inf],
+        "counts": [0, 0],
+        "count": 0,
+        "sum": 0.0,
+        "min": None,
+        "max": None,
+    }
+
+
+def test_histogram_reset() -> None:
+    hist = Histogram(bounds=[1, 2])
+    hist.observe(1.5)
+    hist.reset()
+    assert hist.to_dict() == Histogram(bounds=[1, 2]).to_dict()
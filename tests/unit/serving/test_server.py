@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+from typing import TYPE_CHECKING, Any
+
+import pytest
+import torch
+from lightning.pytorch.demos.boring_classes import BoringModel
+
+from lightcat.model.creator import ModelCreator
+from lightcat.serving import InferenceEngine, InferenceServer
+from lightcat.serving.server import _replace_non_finite, _to_list
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+async def send_request(
+    server: InferenceServer, method: str, target: str, payload: Any = None
+) -> tuple[int, Any]:
+    if isinstance(server.address, tuple):
+        reader, writer = await asyncio.open_connection(*server.address)
+    else:
+        reader, writer = await asyncio.open_unix_connection(str(server.address))
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(
+        f"{method} {target} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body, parse_constant=reject_constant)
+
+
+def reject_constant(name: str) -> None:
+    msg = f"{name} is not a valid JSON value"
+    raise ValueError(msg)
+
+
+def create_server(**kwargs: Any) -> InferenceServer:
+    return InferenceServer(InferenceEngine(ModelCreator(BoringModel())), **kwargs)
+
+
+#####################################
+#     Tests for InferenceServer     #
+#####################################
+
+
+def test_inference_server_repr() -> None:
+    assert repr(create_server(port=8080)) == "InferenceServer(host=127.0.0.1, port=8080, path=None)"
+
+
+def test_inference_server_address() -> None:
+    assert create_server(port=8080).address == ("127.0.0.1", 8080)
+
+
+def test_inference_server_address_unix(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("server.sock")
+    assert create_server(path=path).address == path
+
+
+def test_inference_server_predict() -> None:
+    async def main() -> tuple[int, Any]:
+        async with create_server() as server:
+            assert server.address[1] > 0
+            return await send_request(server, "POST", "/predict", {"inputs": [0.0] * 32})
+
+    status, payload = asyncio.run(main())
+    assert status == 200
+    assert len(payload["outputs"]) == 2
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Requires Unix sockets")
+def test_inference_server_predict_unix(tmp_path: Path) -> None:
+    async def main() -> tuple[int, Any]:
+        async with create_server(path=tmp_path.joinpath("server.sock")) as server:
+            return await send_request(server, "POST", "/predict", {"inputs": [0.0] * 32})
+
+    status, payload = asyncio.run(main())
+    assert status == 200
+    assert len(payload["outputs"]) == 2
+
+
+def test_inference_server_predict_concurrent() -> None:
+    async def main() -> tuple[list, dict]:
+        async with create_server() as server:
+            responses = await asyncio.gather(
+                *[
+                    send_request(server, "POST", "/predict", {"inputs": [1.0] * 32})
+                    for _ in range(8)
+                ]
+            )
+            return responses, (await send_request(server, "GET", "/metrics"))[1]
+
+    responses, metrics = asyncio.run(main())
+    assert all(status == 200 for status, _ in responses)
+    assert metrics["latency"]["count"] == 8
+
+
+def test_inference_server_predict_invalid_inputs() -> None:
+    async def main() -> tuple[int, Any]:
+        async with create_server() as server:
+            return await send_request(server, "POST", "/predict", {"data": [1.0]})
+
+    status, payload = asyncio.run(main())
+    assert status == 400
+    assert payload["error"].startswith("Invalid inputs")
+
+
+def test_inference_server_predict_model_error() -> None:
+    async def main() -> tuple[int, Any]:
+        async with create_server() as server:
+            return await send_request(server, "POST", "/predict", {"inputs": [1.0]})
+
+    status, payload = asyncio.run(main())
+    assert status == 500
+    assert "shapes cannot be multiplied" in payload["error"]
+
+
+def test_inference_server_predict_cancelled() -> None:
+    async def main(engine: InferenceEngine) -> tuple[int, Any]:
+        async with InferenceServer(engine) as server:
+            task = asyncio.ensure_future(
+                send_request(server, "POST", "/predict", {"inputs": [1.0] * 32})
+            )
+            # The request waits for other requests in the batch that is
+            # collected when the engine is stopped.
+            await asyncio.sleep(0.05)
+            await engine.stop()
+            return await asyncio.wait_for(task, timeout=1.0)
+
+    status, payload = asyncio.run(
+        main(InferenceEngine(ModelCreator(BoringModel()), max_latency=2.0))
+    )
+    assert status == 503
+    assert payload == {"error": "The request was cancelled"}
+
+
+def test_inference_server_health() -> None:
+    async def main() -> tuple[int, Any]:
+        async with create_server() as server:
+            return await send_request(server, "GET", "/health")
+
+    assert asyncio.run(main()) == (200, {"status": "ok"})
+
+
+def test_inference_server_metrics() -> None:
+    async def main() -> tuple[int, Any]:
+        async with create_server() as server:
+            return await send_request(server, "GET", "/metrics")
+
+    status, payload = asyncio.run(main())
+    assert status == 200
+    assert payload["queue_depth"] == 0
+    assert payload["latency"]["bounds"][-1] == "+Inf"
+
+
+def test_inference_server_not_found() -> None:
+    async def main() -> tuple[int, Any]:
+        async with create_server() as server:
+            return await send_request(server, "GET", "/missing")
+
+    status, payload = asyncio.run(main())
+    assert status == 404
+    assert payload == {"error": "Unknown endpoint: GET /missing"}
+
+
+def test_inference_server_serve_forever() -> None:
+    async def main() -> tuple[int, Any]:
+        server = create_server()
+        task = asyncio.ensure_future(server.serve_forever())
+        while server._server is None:
+            await asyncio.sleep(0.01)
+        response = await send_request(server, "GET", "/health")
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return response
+
+    assert asyncio.run(main()) == (200, {"status": "ok"})
+
+
+##############################
+#     Tests for _to_list     #
+##############################
+
+
+def test_to_list() -> None:
+    assert _to_list({"a": torch.ones(2), "b": (torch.tensor(1), "x")}) == {
+        "a": [1.0, 1.0],
+        "b": [1, "x"],
+    }
+
+
+#########################################
+#     Tests for _replace_non_finite     #
+#########################################
+
+
+def test_replace_non_finite() -> None:
+    assert _replace_non_finite(
+        {"bounds": [1.0, float("inf")], "min": float("-inf"), "values": (float("nan"), 2)}
+    ) == {"bounds": [1.0, "+Inf"], "min": "-Inf", "values": [None, 2]}
+
+
+def test_replace_non_finite_finite() -> None:
+    assert _replace_non_finite({"count": 1, "sum": 2.5, "max": None}) == {
+        "count": 1,
+        "sum": 2.5,
+        "max": None,
+    }
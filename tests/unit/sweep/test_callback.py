@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+import pytest
+from lightning import Trainer
+from lightning.pytorch.demos.boring_classes import BoringModel
+
+from lightcat.sweep import ASHAScheduler, TrialReportCallback, TrialStorage
+
+if TYPE_CHECKING:
+    import torch
+    from pathlib import Path
+
+
+class MyModel(BoringModel):
+    def __init__(self, offset: float = 0.0) -> None:
+        super().__init__()
+        self.offset = offset
+
+    def validation_step(self, batch: torch.Tensor, batch_idx: int) -> None:  # noqa: ARG002
+        self.log("val_loss", self.step(batch) + self.offset)
+
+
+def fit(tmp_path: Path, model: BoringModel, callback: TrialReportCallback) -> Trainer:
+    trainer = Trainer(
+        max_epochs=4,
+        limit_train_batches=2,
+        limit_val_batches=1,
+        default_root_dir=tmp_path,
+        logger=False,
+        enable_checkpointing=False,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        callbacks=[callback],
+    )
+    trainer.fit(model)
+    return trainer
+
+
+#########################################
+#     Tests for TrialReportCallback     #
+#########################################
+
+
+def test_trial_report_callback_repr(tmp_path: Path) -> None:
+    callback = TrialReportCallback(
+        TrialStorage(tmp_path.joinpath("sweep.db")), ASHAScheduler(metric="val_loss"), trial_id=1
+    )
+    assert repr(callback) == (
+        "TrialReportCallback(trial_id=1, metric=val_loss, num_reports=0, pruned=False)"
+    )
+
+
+def test_trial_report_callback_report(tmp_path: Path) -> None:
+    storage = TrialStorage(tmp_path.joinpath("sweep.db"))
+    trial_id = storage.add_trial({})
+    callback = TrialReportCallback(storage, ASHAScheduler(metric="val_loss"), trial_id)
+    trainer = fit(tmp_path, MyModel(), callback)
+    assert not callback.pruned
+    assert trainer.current_epoch == 4
+    assert list(storage.get_trial(trial_id)["reports"]) == [1, 2, 3, 4]
+
+
+def test_trial_report_callback_pruned(tmp_path: Path) -> None:
+    storage = TrialStorage(tmp_path.joinpath("sweep.db"))
+    storage.report(storage.add_trial({}), resource=1, value=-1.0)
+    trial_id = storage.add_trial({})
+    callback = TrialReportCallback(
+        storage, ASHAScheduler(metric="val_loss", reduction_factor=2), trial_id
+    )
+    trainer = fit(tmp_path, MyModel(offset=100.0), callback)
+    assert callback.pruned
+    assert trainer.current_epoch == 1
+    assert list(storage.get_trial(trial_id)["reports"]) == [1]
+
+
+def test_trial_report_callback_pruned_nan(tmp_path: Path) -> None:
+    storage = TrialStorage(tmp_path.joinpath("sweep.db"))
+    trial_id = storage.add_trial({})
+    callback = TrialReportCallback(storage, ASHAScheduler(metric="val_loss"), trial_id)
+    trainer = fit(tmp_path, MyModel(offset=float("nan")), callback)
+    # The diverged trial is pruned at the first report.
+    assert callback.pruned
+    assert trainer.current_epoch == 1
+    reports = storage.get_trial(trial_id)["reports"]
+    assert list(reports) == [1]
+    assert math.isnan(reports[1])
+
+
+def test_trial_report_callback_missing_metric(tmp_path: Path) -> None:
+    storage = TrialStorage(tmp_path.joinpath("sweep.db"))
+    callback = TrialReportCallback(storage, ASHAScheduler(metric="missing"), storage.add_trial({}))
+    with pytest.raises(RuntimeError, match="The metric 'missing' is not logged"):
+        fit(tmp_path, MyModel(), callback)
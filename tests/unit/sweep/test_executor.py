@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import os
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+
+from lightcat.sweep import SweepExecutor
+from lightcat.testing import objectory_available
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def get_trial_config(root_dir: Path, max_steps: int = 4) -> dict:
+    return {
+        "trainer": {
+            "_target_": "lightcat.trainer.creator.TrainerCreator",
+            "trainer": {
+                "_target_": "lightning.Trainer",
+                "max_steps": max_steps,
+                "default_root_dir": str(root_dir),
+                "logger": False,
+                "enable_checkpointing": False,
+                "enable_progress_bar": False,
+            },
+        },
+        "model": {
+            "_target_": "lightcat.model.creator.ModelCreator",
+            "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+        },
+        "datamodule": {
+            "_target_": "lightcat.datamodule.creator.DataModuleCreator",
+            "datamodule": {"_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"},
+        },
+    }
+
+
+def get_num_threads() -> int:
+    import torch
+
+    return torch.get_num_threads()
+
+
+def get_loaded_modules(names: list[str]) -> list[bool]:
+    return [name in sys.modules for name in names]
+
+
+###################################
+#     Tests for SweepExecutor     #
+###################################
+
+
+def test_sweep_executor_repr() -> None:
+    with SweepExecutor(max_workers=1) as executor:
+        assert repr(executor).startswith("SweepExecutor(max_workers=1, start_method=")
+
+
+def test_sweep_executor_submit() -> None:
+    with SweepExecutor(max_workers=1) as executor:
+        assert executor.submit(pow, 2, 3).result() == 8
+
+
+def test_sweep_executor_reuses_workers() -> None:
+    with SweepExecutor(max_workers=1) as executor:
+        pid = executor.submit(os.getpid).result()
+        assert pid != os.getpid()
+        assert executor.submit(os.getpid).result() == pid
+
+
+def test_sweep_executor_preload() -> None:
+    with SweepExecutor(max_workers=1) as executor:
+        assert executor.submit(
+            get_loaded_modules, ["torch", "lightning", "lightcat.sweep.trial"]
+        ).result() == [True, True, True]
+
+
+def test_sweep_executor_num_threads() -> None:
+    with SweepExecutor(max_workers=1, num_threads=1) as executor:
+        assert executor.submit(get_num_threads).result() == 1
+
+
+def test_sweep_executor_shutdown() -> None:
+    executor = SweepExecutor(max_workers=1)
+    executor.shutdown()
+    with pytest.raises(RuntimeError, match="cannot schedule new futures after shutdown"):
+        executor.submit(os.getpid)
+
+
+@objectory_available
+def test_sweep_executor_submit_trial(tmp_path: Path) -> None:
+    with SweepExecutor(max_workers=1) as executor:
+        assert executor.submit_trial(get_trial_config(tmp_path)).result()["global_step"] == 4
+
+
+@objectory_available
+def test_sweep_executor_map_trials(tmp_path: Path) -> None:
+    with SweepExecutor(max_workers=2, num_threads=1) as executor:
+        results = executor.map_trials(
+            [get_trial_config(tmp_path, max_steps=max_steps) for max_steps in (1, 2, 3)]
+        )
+    assert [result["global_step"] for result in results] == [1, 2, 3]
+
+
+def test_sweep_executor_map_trials_error(tmp_path: Path) -> None:
+    with SweepExecutor(max_workers=1) as executor, pytest.raises(KeyError, match="trainer"):
+        executor.map_trials([{"root_dir": str(tmp_path)}])
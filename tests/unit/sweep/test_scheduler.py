@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from lightcat.sweep import ASHAScheduler, TrialStorage
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def storage(tmp_path: Path) -> TrialStorage:
+    storage = TrialStorage(tmp_path.joinpath("sweep.db"))
+    for _ in range(4):
+        storage.add_trial({})
+    return storage
+
+
+###################################
+#     Tests for ASHAScheduler     #
+###################################
+
+
+def test_asha_scheduler_repr() -> None:
+    assert repr(ASHAScheduler(metric="loss")) == (
+        "ASHAScheduler(metric=loss, mode=min, min_resource=1, reduction_factor=3)"
+    )
+
+
+def test_asha_scheduler_metric() -> None:
+    assert ASHAScheduler(metric="loss").metric == "loss"
+
+
+def test_asha_scheduler_mode() -> None:
+    assert ASHAScheduler(metric="acc", mode="max").mode == "max"
+
+
+def test_asha_scheduler_incorrect_mode() -> None:
+    with pytest.raises(ValueError, match="Incorrect mode 'avg'"):
+        ASHAScheduler(metric="loss", mode="avg")
+
+
+def test_asha_scheduler_incorrect_min_resource() -> None:
+    with pytest.raises(ValueError, match="min_resource must be greater than 0"):
+        ASHAScheduler(metric="loss", min_resource=0)
+
+
+def test_asha_scheduler_incorrect_reduction_factor() -> None:
+    with pytest.raises(ValueError, match="reduction_factor must be greater than 1"):
+        ASHAScheduler(metric="loss", reduction_factor=1)
+
+
+@pytest.mark.parametrize(
+    ("min_resource", "reduction_factor", "rungs"),
+    [(1, 2, [1, 2, 4, 8, 16]), (1, 3, [1, 3, 9]), (2, 2, [2, 4, 8, 16]), (3, 3, [3, 9])],
+)
+def test_asha_scheduler_is_rung(min_resource: int, reduction_factor: int, rungs: list[int]) -> None:
+    scheduler = ASHAScheduler(
+        metric="loss", min_resource=min_resource, reduction_factor=reduction_factor
+    )
+    assert [resource for resource in range(20) if scheduler.is_rung(resource)] == rungs
+
+
+def test_asha_scheduler_should_stop_first_trial(storage: TrialStorage) -> None:
+    scheduler = ASHAScheduler(metric="loss", reduction_factor=2)
+    storage.report(1, resource=1, value=5.0)
+    assert not scheduler.should_stop(storage, trial_id=1, resource=1, value=5.0)
+
+
+def test_asha_scheduler_should_stop_min(storage: TrialStorage) -> None:
+    scheduler = ASHAScheduler(metric="loss", reduction_factor=2)
+    storage.report(1, resource=1, value=1.0)
+    storage.report(2, resource=1, value=2.0)
+    assert scheduler.should_stop(storage, trial_id=2, resource=1, value=2.0)
+    storage.report(3, resource=1, value=0.5)
+    assert not scheduler.should_stop(storage, trial_id=3, resource=1, value=0.5)
+    # The top 2 of 4 trials continue.
+    storage.report(4, resource=1, value=0.8)
+    assert not scheduler.should_stop(storage, trial_id=4, resource=1, value=0.8)
+
+
+def test_asha_scheduler_should_stop_max(storage: TrialStorage) -> None:
+    scheduler = ASHAScheduler(metric="acc", mode="max", reduction_factor=2)
+    storage.report(1, resource=1, value=0.5)
+    storage.report(2, resource=1, value=0.9)
+    assert not scheduler.should_stop(storage, trial_id=2, resource=1, value=0.9)
+    storage.report(3, resource=1, value=0.1)
+    assert scheduler.should_stop(storage, trial_id=3, resource=1, value=0.1)
+
+
+def test_asha_scheduler_should_stop_not_rung(storage: TrialStorage) -> None:
+    scheduler = ASHAScheduler(metric="loss", reduction_factor=2)
+    storage.report(1, resource=3, value=1.0)
+    storage.report(2, resource=3, value=2.0)
+    assert not scheduler.should_stop(storage, trial_id=2, resource=3, value=2.0)
+
+
+def test_asha_scheduler_should_stop_nan(storage: TrialStorage) -> None:
+    scheduler = ASHAScheduler(metric="loss")
+    assert scheduler.should_stop(storage, trial_id=1, resource=3, value=float("nan"))
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from lightning.pytorch.demos.boring_classes import BoringModel
+
+from lightcat.sweep import ASHAScheduler, ASHASearch, TrialStorage
+from lightcat.testing import objectory_available
+
+if TYPE_CHECKING:
+    import torch
+    from pathlib import Path
+
+
+class OffsetModel(BoringModel):
+    def __init__(self, offset: float = 0.0) -> None:
+        super().__init__()
+        self.offset = offset
+
+    def validation_step(self, batch: torch.Tensor, batch_idx: int) -> None:  # noqa: ARG002
+        self.log("val_loss", self.step(batch) + self.offset)
+
+
+def get_trial_config(root_dir: Path, offset: float) -> dict:
+    return {
+        "trainer": {
+            "_target_": "lightcat.trainer.creator.TrainerCreator",
+            "trainer": {
+                "_target_": "lightning.Trainer",
+                "max_epochs": 4,
+                "limit_train_batches": 2,
+                "limit_val_batches": 1,
+                "num_sanity_val_steps": 0,
+                "default_root_dir": str(root_dir),
+                "logger": False,
+                "enable_checkpointing": False,
+                "enable_progress_bar": False,
+                "enable_model_summary": False,
+            },
+        },
+        "model": {
+            "_target_": "lightcat.model.creator.ModelCreator",
+            "model": {"_target_": "tests.unit.sweep.test_search.OffsetModel", "offset": offset},
+        },
+        "datamodule": {
+            "_target_": "lightcat.datamodule.creator.DataModuleCreator",
+            "datamodule": {"_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"},
+        },
+        "seed": 42,
+    }
+
+
+################################
+#     Tests for ASHASearch     #
+################################
+
+
+def test_asha_search_repr(tmp_path: Path) -> None:
+    assert repr(
+        ASHASearch(
+            configs=[{}],
+            storage=tmp_path.joinpath("sweep.db"),
+            scheduler=ASHAScheduler(metric="val_loss"),
+        )
+    ).startswith("ASHASearch(num_configs=1, storage=TrialStorage(path=")
+
+
+def test_asha_search_storage(tmp_path: Path) -> None:
+    storage = TrialStorage(tmp_path.joinpath("sweep.db"))
+    assert (
+        ASHASearch(configs=[], storage=storage, scheduler=ASHAScheduler(metric="val_loss")).storage
+        is storage
+    )
+
+
+def test_asha_search_run_empty(tmp_path: Path) -> None:
+    search = ASHASearch(
+        configs=[], storage=tmp_path.joinpath("sweep.db"), scheduler=ASHAScheduler(metric="loss")
+    )
+    assert search.run() == []
+    assert search.best_trial() is None
+
+
+@objectory_available
+def test_asha_search_run(tmp_path: Path) -> None:
+    search = ASHASearch(
+        configs=[get_trial_config(tmp_path, offset) for offset in (0.0, 10.0, 20.0)],
+        storage=tmp_path.joinpath("sweep.db"),
+        scheduler=ASHAScheduler(metric="val_loss", reduction_factor=2),
+        max_workers=1,
+        num_threads=1,
+    )
+    trials = search.run()
+    assert [trial["status"] for trial in trials] == ["completed", "pruned", "pruned"]
+    assert [list(trial["reports"]) for trial in trials] == [[1, 2, 3, 4], [1], [1]]
+    assert trials[0]["result"]["current_epoch"] == 4
+    assert search.best_trial()["trial_id"] == 1
+
+
+@objectory_available
+def test_asha_search_run_max(tmp_path: Path) -> None:
+    search = ASHASearch(
+        configs=[get_trial_config(tmp_path, offset) for offset in (0.0, 10.0)],
+        storage=tmp_path.joinpath("sweep.db"),
+        scheduler=ASHAScheduler(metric="val_loss", mode="max", reduction_factor=2),
+        max_workers=1,
+    )
+    assert [trial["status"] for trial in search.run()] == ["completed", "completed"]
+    assert search.best_trial()["trial_id"] == 2
+
+
+@objectory_available
+def test_asha_search_run_failed(tmp_path: Path) -> None:
+    config = get_trial_config(tmp_path, 0.0)
+    config["model"]["model"]["_target_"] = "tests.unit.sweep.test_search.MissingModel"
+    search = ASHASearch(
+        configs=[config],
+        storage=tmp_path.joinpath("sweep.db"),
+        scheduler=ASHAScheduler(metric="val_loss"),
+        max_workers=1,
+    )
+    trial = search.run()[0]
+    assert trial["status"] == "failed"
+    assert trial["error"]
+    assert search.best_trial() is None
+
+
+@objectory_available
+def test_asha_search_resume(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("sweep.db")
+    configs = [get_trial_config(tmp_path, offset) for offset in (0.0, 10.0, 20.0)]
+    storage = TrialStorage(path)
+    for config in configs[:2]:
+        storage.add_trial(config)
+    # The first trial is completed and the second trial was interrupted.
+    storage.set_status(1, "completed", result={"metrics": {"val_loss": 0.5}})
+    storage.report(1, resource=1, value=0.5)
+    storage.set_status(2, "running")
+    storage.report(2, resource=1, value=100.0)
+    storage.report(2, resource=2, value=100.0)
+
+    search = ASHASearch(
+        configs=configs,
+        storage=path,
+        scheduler=ASHAScheduler(metric="val_loss", reduction_factor=2),
+        max_workers=1,
+    )
+    trials = search.run()
+    assert [trial["status"] for trial in trials] == ["completed", "pruned", "pruned"]
+    # The first trial is not run again.
+    assert trials[0]["result"] == {"metrics": {"val_loss": 0.5}}
+    assert list(trials[1]["reports"]) == [1]
+
+
+@objectory_available
+def test_asha_search_run_twice(tmp_path: Path) -> None:
+    search = ASHASearch(
+        configs=[get_trial_config(tmp_path, 0.0)],
+        storage=tmp_path.joinpath("sweep.db"),
+        scheduler=ASHAScheduler(metric="val_loss"),
+        max_workers=1,
+    )
+    trials = search.run()
+    assert search.run() == trials
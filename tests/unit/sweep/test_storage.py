@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+import pytest
+
+from lightcat.sweep import TrialStorage
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def storage(tmp_path: Path) -> TrialStorage:
+    return TrialStorage(tmp_path.joinpath("sweep.db"))
+
+
+##################################
+#     Tests for TrialStorage     #
+##################################
+
+
+def test_trial_storage_repr(tmp_path: Path) -> None:
+    assert repr(TrialStorage(tmp_path.joinpath("sweep.db"))).startswith("TrialStorage(path=")
+
+
+def test_trial_storage_path(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("sweeps", "sweep.db")
+    assert TrialStorage(path).path == path
+    assert path.is_file()
+
+
+def test_trial_storage_add_trial(storage: TrialStorage) -> None:
+    assert storage.add_trial({"lr": 0.1}) == 1
+    assert storage.add_trial({"lr": 0.01}) == 2
+
+
+def test_trial_storage_get_trial(storage: TrialStorage) -> None:
+    trial_id = storage.add_trial({"lr": 0.1})
+    assert storage.get_trial(trial_id) == {
+        "trial_id": trial_id,
+        "config": {"lr": 0.1},
+        "status": "pending",
+        "result": None,
+        "error": None,
+        "reports": {},
+    }
+
+
+def test_trial_storage_get_trial_missing(storage: TrialStorage) -> None:
+    with pytest.raises(KeyError, match="The trial 1 does not exist"):
+        storage.get_trial(1)
+
+
+def test_trial_storage_get_trials(storage: TrialStorage) -> None:
+    storage.add_trial({"lr": 0.1})
+    storage.add_trial({"lr": 0.01})
+    storage.report(2, resource=1, value=0.5)
+    assert [(trial["config"], trial["reports"]) for trial in storage.get_trials()] == [
+        ({"lr": 0.1}, {}),
+        ({"lr": 0.01}, {1: 0.5}),
+    ]
+
+
+def test_trial_storage_get_trials_status(storage: TrialStorage) -> None:
+    storage.add_trial({"lr": 0.1})
+    storage.add_trial({"lr": 0.01})
+    storage.set_status(2, "running")
+    assert [trial["trial_id"] for trial in storage.get_trials(status="running")] == [2]
+    assert [trial["trial_id"] for trial in storage.get_trials(status="pending")] == [1]
+
+
+def test_trial_storage_get_trials_empty(storage: TrialStorage) -> None:
+    assert storage.get_trials() == []
+
+
+def test_trial_storage_set_status(storage: TrialStorage) -> None:
+    trial_id = storage.add_trial({})
+    storage.set_status(trial_id, "completed", result={"metrics": {"loss": 1.0}})
+    trial = storage.get_trial(trial_id)
+    assert trial["status"] == "completed"
+    assert trial["result"] == {"metrics": {"loss": 1.0}}
+
+
+def test_trial_storage_set_status_error(storage: TrialStorage) -> None:
+    trial_id = storage.add_trial({})
+    storage.set_status(trial_id, "failed", error="ValueError: abc")
+    assert storage.get_trial(trial_id)["error"] == "ValueError: abc"
+
+
+def test_trial_storage_reset_trial(storage: TrialStorage) -> None:
+    trial_id = storage.add_trial({})
+    storage.set_status(trial_id, "running")
+    storage.report(trial_id, resource=1, value=0.5)
+    storage.reset_trial(trial_id)
+    trial = storage.get_trial(trial_id)
+    assert trial["status"] == "pending"
+    assert trial["reports"] == {}
+
+
+def test_trial_storage_report_replace(storage: TrialStorage) -> None:
+    trial_id = storage.add_trial({})
+    storage.report(trial_id, resource=1, value=0.5)
+    storage.report(trial_id, resource=1, value=0.2)
+    assert storage.get_trial(trial_id)["reports"] == {1: 0.2}
+
+
+def test_trial_storage_get_values(storage: TrialStorage) -> None:
+    storage.add_trial({})
+    storage.add_trial({})
+    storage.report(1, resource=1, value=0.5)
+    storage.report(1, resource=2, value=0.4)
+    storage.report(2, resource=1, value=0.7)
+    assert storage.get_values(1) == {1: 0.5, 2: 0.7}
+    assert storage.get_values(2) == {1: 0.4}
+    assert storage.get_values(3) == {}
+
+
+def test_trial_storage_report_nan(storage: TrialStorage) -> None:
+    trial_id = storage.add_trial({})
+    storage.report(trial_id, resource=1, value=float("nan"))
+    assert math.isnan(storage.get_trial(trial_id)["reports"][1])
+    assert math.isnan(storage.get_trials()[0]["reports"][1])
+    assert math.isnan(storage.get_values(1)[trial_id])
+
+
+def test_trial_storage_persistence(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("sweep.db")
+    TrialStorage(path).add_trial({"lr": 0.1})
+    assert TrialStorage(path).get_trial(1)["config"] == {"lr": 0.1}
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import torch
+from lightning import Callback
+
+from lightcat.sweep import run_trial
+from lightcat.sweep.trial import _get_scalar_metrics
+from lightcat.testing import objectory_available
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from lightning import LightningModule, Trainer
+
+
+def get_trial_config(root_dir: Path, max_steps: int = 4, **kwargs: Any) -> dict:
+    return {
+        "trainer": {
+            "_target_": "lightcat.trainer.creator.TrainerCreator",
+            "trainer": {
+                "_target_": "lightning.Trainer",
+                "accelerator": "cpu",
+                "max_steps": max_steps,
+                "default_root_dir": str(root_dir),
+                "logger": False,
+                "enable_checkpointing": False,
+                "enable_progress_bar": False,
+                "enable_model_summary": False,
+            },
+        },
+        "model": {
+            "_target_": "lightcat.model.creator.ModelCreator",
+            "model": {"_target_": "lightning.pytorch.demos.boring_classes.BoringModel"},
+        },
+        "datamodule": {
+            "_target_": "lightcat.datamodule.creator.DataModuleCreator",
+            "datamodule": {"_target_": "lightning.pytorch.demos.boring_classes.BoringDataModule"},
+        },
+        **kwargs,
+    }
+
+
+class CountStepsCallback(Callback):
+    def __init__(self) -> None:
+        self.num_steps = 0
+
+    def on_train_batch_end(self, *args: Any, **kwargs: Any) -> None:  # noqa: ARG002
+        self.num_steps += 1
+
+
+class LogMetricsCallback(Callback):
+    def on_train_end(self, trainer: Trainer, pl_module: LightningModule) -> None:  # noqa: ARG002
+        trainer.callback_metrics["my_metric"] = torch.tensor(1.5)
+
+
+###############################
+#     Tests for run_trial     #
+###############################
+
+
+@objectory_available
+def test_run_trial(tmp_path: Path) -> None:
+    results = run_trial(get_trial_config(tmp_path))
+    assert sorted(results) == ["current_epoch", "duration", "global_step", "metrics"]
+    assert results["global_step"] == 4
+    assert results["duration"] > 0
+
+
+@objectory_available
+def test_run_trial_metrics(tmp_path: Path) -> None:
+    results = run_trial(get_trial_config(tmp_path), callbacks=[LogMetricsCallback()])
+    assert results["metrics"] == {"my_metric": 1.5}
+
+
+@objectory_available
+def test_run_trial_callbacks(tmp_path: Path) -> None:
+    callback = CountStepsCallback()
+    run_trial(get_trial_config(tmp_path, max_steps=3), callbacks=[callback])
+    assert callback.num_steps == 3
+
+
+@objectory_available
+def test_run_trial_seed(tmp_path: Path) -> None:
+    run_trial(get_trial_config(tmp_path, seed=42))
+    x1 = torch.rand(3)
+    run_trial(get_trial_config(tmp_path, seed=42))
+    assert torch.equal(x1, torch.rand(3))
+
+
+#########################################
+#     Tests for _get_scalar_metrics     #
+#########################################
+
+
+def test_get_scalar_metrics() -> None:
+    assert _get_scalar_metrics(
+        {
+            "tensor": torch.tensor(1.0),
+            "tensor_1d": torch.tensor([2.0]),
+            "int": 3,
+            "vector": torch.ones(2),
+            "str": "abc",
+        }
+    ) == {"tensor": 1.0, "tensor_1d": 2.0, "int": 3.0}
+
+
+def test_get_scalar_metrics_empty() -> None:
+    assert _get_scalar_metrics({}) == {}
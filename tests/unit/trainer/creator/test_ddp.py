@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from lightning import Trainer
+from lightning.pytorch.demos.boring_classes import BoringModel
+from lightning.pytorch.strategies import DDPStrategy
+from torch.distributed.algorithms.ddp_comm_hooks import default_hooks
+
+from lightcat.testing import objectory_available
+from lightcat.trainer.creator import DDPTrainerCreator
+from lightcat.utils.imports import is_objectory_available
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+if is_objectory_available():
+    from objectory import OBJECT_TARGET
+else:  # pragma: no cover
+    OBJECT_TARGET = "_target_"
+
+
+#######################################
+#     Tests for DDPTrainerCreator     #
+#######################################
+
+
+def test_ddp_trainer_creator_repr() -> None:
+    assert repr(DDPTrainerCreator({OBJECT_TARGET: "lightning.Trainer"})).startswith(
+        "DDPTrainerCreator("
+    )
+
+
+def test_ddp_trainer_creator_str() -> None:
+    assert str(DDPTrainerCreator({OBJECT_TARGET: "lightning.Trainer"})).startswith(
+        "DDPTrainerCreator("
+    )
+
+
+def test_ddp_trainer_creator_strategy_in_config() -> None:
+    with pytest.raises(ValueError, match="The trainer configuration must not have a strategy"):
+        DDPTrainerCreator({OBJECT_TARGET: "lightning.Trainer", "strategy": "ddp"})
+
+
+@objectory_available
+def test_ddp_trainer_creator_create() -> None:
+    trainer = DDPTrainerCreator(
+        {OBJECT_TARGET: "lightning.Trainer", "accelerator": "cpu", "devices": 1},
+        comm_hook="fp16",
+        bucket_cap_mb=10,
+        strategy={"process_group_backend": "gloo"},
+    ).create()
+    assert isinstance(trainer, Trainer)
+    assert isinstance(trainer.strategy, DDPStrategy)
+    assert trainer.strategy._ddp_comm_hook is default_hooks.fp16_compress_hook
+    assert trainer.strategy._ddp_kwargs["bucket_cap_mb"] == 10
+    assert trainer.strategy.process_group_backend == "gloo"
+
+
+@objectory_available
+@pytest.mark.timeout(120)
+@pytest.mark.parametrize("comm_hook", ["bf16", "powersgd"])
+def test_ddp_trainer_creator_fit_gloo(tmp_path: Path, comm_hook: str) -> None:
+    trainer = DDPTrainerCreator(
+        {
+            OBJECT_TARGET: "lightning.Trainer",
+            "accelerator": "cpu",
+            "devices": 2,
+            "max_steps": 3,
+            "limit_val_batches": 0,
+            "default_root_dir": str(tmp_path),
+            "logger": False,
+            "enable_checkpointing": False,
+            "enable_progress_bar": False,
+            "enable_model_summary": False,
+        },
+        comm_hook=comm_hook,
+        powersgd={"start_powerSGD_iter": 2},
+        # The processes are forked, so they do not import the modules again.
+        strategy={"process_group_backend": "gloo", "start_method": "fork"},
+    ).create()
+    model = BoringModel()
+    weight = model.layer.weight.detach().clone()
+    trainer.fit(model)
+    assert trainer.state.finished
+    # The weights trained by the processes are loaded in the main process.
+    assert not model.layer.weight.equal(weight)
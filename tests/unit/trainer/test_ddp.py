@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import pickle
+from typing import TYPE_CHECKING
+
+import pytest
+import torch
+from lightning.pytorch.strategies import DDPStrategy
+from torch import distributed as dist
+from torch.distributed.algorithms.ddp_comm_hooks import default_hooks, powerSGD_hook
+from torch.nn.parallel import DistributedDataParallel
+
+from lightcat.trainer.ddp import (
+    COMM_HOOKS,
+    get_comm_hook,
+    get_comm_wrapper,
+    get_ddp_strategy,
+    register_comm_hook,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from pathlib import Path
+
+
+@pytest.fixture
+def process_group(tmp_path: Path) -> Generator[None]:
+    dist.init_process_group(
+        "gloo", init_method=f"file://{tmp_path.joinpath('init')}", rank=0, world_size=1
+    )
+    try:
+        yield
+    finally:
+        dist.destroy_process_group()
+
+
+###################################
+#     Tests for get_comm_hook     #
+###################################
+
+
+def test_get_comm_hook_fp16() -> None:
+    assert get_comm_hook("fp16") == (None, default_hooks.fp16_compress_hook)
+
+
+def test_get_comm_hook_bf16() -> None:
+    state, hook = get_comm_hook("bf16")
+    assert state is None
+    assert callable(hook)
+
+
+def test_get_comm_hook_process_group() -> None:
+    assert get_comm_hook("fp16", process_group="group")[0] == "group"
+
+
+def test_get_comm_hook_powersgd() -> None:
+    state, hook = get_comm_hook(
+        "powersgd", powersgd={"matrix_approximation_rank": 2, "start_powerSGD_iter": 10}
+    )
+    assert isinstance(state.get(), powerSGD_hook.PowerSGDState)
+    assert state.get() is state.get()
+    assert state.get().matrix_approximation_rank == 2
+    assert state.get().start_powerSGD_iter == 10
+    assert callable(hook)
+
+
+def test_get_comm_hook_powersgd_pickle() -> None:
+    state, _ = get_comm_hook("powersgd", powersgd={"matrix_approximation_rank": 2})
+    state.get()
+    # The ``PowerSGDState`` is not pickled.
+    state = pickle.loads(pickle.dumps(state))  # noqa: S301
+    assert state._state is None
+    assert state.get().matrix_approximation_rank == 2
+
+
+def test_get_comm_hook_incorrect_name() -> None:
+    with pytest.raises(ValueError, match="Incorrect communication hook: int8"):
+        get_comm_hook("int8")
+
+
+######################################
+#     Tests for get_comm_wrapper     #
+######################################
+
+
+def test_get_comm_wrapper() -> None:
+    assert get_comm_wrapper("fp16") is default_hooks.fp16_compress_wrapper
+
+
+def test_get_comm_wrapper_incorrect_name() -> None:
+    with pytest.raises(ValueError, match="Incorrect communication hook wrapper: int8"):
+        get_comm_wrapper("int8")
+
+
+########################################
+#     Tests for register_comm_hook     #
+########################################
+
+
+@pytest.mark.usefixtures("process_group")
+@pytest.mark.parametrize("comm_hook", ["fp16", "bf16", "powersgd"])
+def test_register_comm_hook(comm_hook: str) -> None:
+    torch.manual_seed(0)
+    module = torch.nn.Linear(4, 2)
+    expected = torch.nn.Linear(4, 2)
+    expected.load_state_dict(module.state_dict())
+    model = DistributedDataParallel(module)
+    register_comm_hook(model, comm_hook, powersgd={"start_powerSGD_iter": 2})
+    x = torch.ones(3, 4)
+    model(x).sum().backward()
+    expected(x).sum().backward()
+    assert module.weight.grad.allclose(expected.weight.grad, atol=1e-2)
+
+
+@pytest.mark.usefixtures("process_group")
+def test_register_comm_hook_wrapper() -> None:
+    model = DistributedDataParallel(torch.nn.Linear(4, 2))
+    register_comm_hook(model, "powersgd", comm_wrapper="fp16")
+    model(torch.ones(3, 4)).sum().backward()
+    assert model.module.weight.grad.allclose(torch.full((2, 4), 3.0))
+
+
+######################################
+#     Tests for get_ddp_strategy     #
+######################################
+
+
+def test_get_ddp_strategy_default() -> None:
+    strategy = get_ddp_strategy()
+    assert isinstance(strategy, DDPStrategy)
+    assert strategy._ddp_comm_hook is None
+    assert "bucket_cap_mb" not in strategy._ddp_kwargs
+
+
+def test_get_ddp_strategy_comm_hook() -> None:
+    strategy = get_ddp_strategy(comm_hook="bf16", bucket_cap_mb=50, process_group_backend="gloo")
+    assert strategy._ddp_comm_hook is COMM_HOOKS["bf16"]
+    assert strategy._ddp_comm_state is None
+    assert strategy._ddp_comm_wrapper is None
+    assert strategy._ddp_kwargs["bucket_cap_mb"] == 50
+    assert strategy.process_group_backend == "gloo"
+
+
+def test_get_ddp_strategy_comm_wrapper() -> None:
+    strategy = get_ddp_strategy(comm_hook="powersgd", comm_wrapper="fp16")
+    assert isinstance(strategy._ddp_comm_state.get(), powerSGD_hook.PowerSGDState)
+    assert strategy._ddp_comm_hook is COMM_HOOKS["powersgd"]
+    assert strategy._ddp_comm_wrapper is default_hooks.fp16_compress_wrapper
+
+
+def test_get_ddp_strategy_wrapper_without_hook() -> None:
+    with pytest.raises(ValueError, match="A communication hook is required"):
+        get_ddp_strategy(comm_wrapper="fp16")
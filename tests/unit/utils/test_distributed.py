@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+import torch
+from torch import distributed as dist
+from torch import multiprocessing as mp
+
+from lightcat.utils.distributed import (
+    all_gather_object,
+    all_reduce,
+    broadcast_object,
+    build_and_broadcast,
+    get_gloo_group,
+    get_local_rank,
+    get_rank,
+    get_world_size,
+    is_distributed,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _build_vocab(rank: int) -> dict[str, Any]:
+    return {"vocab": ["a", "b"], "rank": rank}
+
+
+def _build_error() -> None:
+    msg = "missing file"
+    raise FileNotFoundError(msg)
+
+
+def broadcast_worker(rank: int, world_size: int, init_file: str, output_file: str) -> None:
+    dist.init_process_group(
+        "gloo", init_method=f"file://{init_file}", rank=rank, world_size=world_size
+    )
+    try:
+        objects = all_gather_object(
+            {
+                "object": broadcast_object({"rank": rank} if rank == 1 else None, src=1),
+                "build": build_and_broadcast(lambda: _build_vocab(rank)),
+            }
+        )
+        try:
+            build_and_broadcast(_build_error)
+        except (FileNotFoundError, RuntimeError) as exc:
+            error = type(exc).__name__
+        errors = all_gather_object(error)
+        if rank == 0:
+            torch.save({"objects": objects, "errors": errors}, output_file)
+    finally:
+        dist.destroy_process_group()
+
+
+####################################
+#     Tests for is_distributed     #
+####################################
+
+
+def test_is_distributed_false() -> None:
+    assert not is_distributed()
+
+
+def test_is_distributed_true() -> None:
+    with patch("lightcat.utils.distributed.dist.is_initialized", lambda: True):
+        assert is_distributed()
+
+
+##############################
+#     Tests for get_rank     #
+##############################
+
+
+def test_get_rank_not_distributed() -> None:
+    assert get_rank() == 0
+
+
+def test_get_rank_distributed() -> None:
+    with (
+        patch("lightcat.utils.distributed.is_distributed", lambda: True),
+        patch("lightcat.utils.distributed.dist.get_rank", lambda: 3),
+    ):
+        assert get_rank() == 3
+
+
+####################################
+#     Tests for get_world_size     #
+####################################
+
+
+def test_get_world_size_not_distributed() -> None:
+    assert get_world_size() == 1
+
+
+def test_get_world_size_distributed() -> None:
+    with (
+        patch("lightcat.utils.distributed.is_distributed", lambda: True),
+        patch("lightcat.utils.distributed.dist.get_world_size", lambda: 8),
+    ):
+        assert get_world_size() == 8
+
+
+####################################
+#     Tests for get_local_rank     #
+####################################
+
+
+def test_get_local_rank_default(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("LOCAL_RANK", raising=False)
+    assert get_local_rank() == 0
+
+
+def test_get_local_rank_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LOCAL_RANK", "2")
+    assert get_local_rank() == 2
+
+
+####################################
+#     Tests for get_gloo_group     #
+####################################
+
+
+def test_get_gloo_group_not_distributed() -> None:
+    with pytest.raises(RuntimeError, match="The default process group is not initialized"):
+        get_gloo_group()
+
+
+def test_get_gloo_group_gloo_backend() -> None:
+    with (
+        patch("lightcat.utils.distributed.is_distributed", lambda: True),
+        patch("lightcat.utils.distributed.dist.get_backend", lambda: "gloo"),
+    ):
+        assert get_gloo_group() is dist.group.WORLD
+
+
+def test_get_gloo_group_nccl_backend() -> None:
+    with (
+        patch("lightcat.utils.distributed.is_distributed", lambda: True),
+        patch("lightcat.utils.distributed.dist.get_backend", lambda: "nccl"),
+        patch("lightcat.utils.distributed._gloo_groups", {}),
+        patch("lightcat.utils.distributed.dist.new_group", return_value="group") as new_group,
+    ):
+        assert get_gloo_group() == "group"
+        assert get_gloo_group() == "group"
+        new_group.assert_called_once_with(backend="gloo")
+
+
+#######################################
+#     Tests for all_gather_object     #
+#######################################
+
+
+def test_all_gather_object_not_distributed() -> None:
+    assert all_gather_object({"key": 1}) == [{"key": 1}]
+
+
+######################################
+#     Tests for broadcast_object     #
+######################################
+
+
+def test_broadcast_object_not_distributed() -> None:
+    assert broadcast_object({"key": 1}) == {"key": 1}
+
+
+#########################################
+#     Tests for build_and_broadcast     #
+#########################################
+
+
+def test_build_and_broadcast_not_distributed() -> None:
+    assert build_and_broadcast(lambda: _build_vocab(0)) == {"vocab": ["a", "b"], "rank": 0}
+
+
+def test_build_and_broadcast_not_distributed_error() -> None:
+    with pytest.raises(FileNotFoundError, match="missing file"):
+        build_and_broadcast(_build_error)
+
+
+@pytest.mark.timeout(120)
+def test_broadcast_gloo(tmp_path: Path) -> None:
+    output_file = tmp_path.joinpath("output.pt")
+    # The processes are forked, so they do not import the modules again.
+    mp.start_processes(
+        broadcast_worker,
+        args=(2, str(tmp_path.joinpath("init")), str(output_file)),
+        nprocs=2,
+        start_method="fork",
+    )
+    output = torch.load(output_file)
+    # The object of the rank 1 is received by all the processes, and
+    # the object built by the rank 0 is received by the rank 1.
+    assert output["objects"] == [
+        {"object": {"rank": 1}, "build": {"vocab": ["a", "b"], "rank": 0}},
+        {"object": {"rank": 1}, "build": {"vocab": ["a", "b"], "rank": 0}},
+    ]
+    assert output["errors"] == ["FileNotFoundError", "RuntimeError"]
+
+
+################################
+#     Tests for all_reduce     #
+################################
+
+
+def test_all_reduce_not_distributed() -> None:
+    tensor = torch.tensor([1.0, 2.0])
+    assert all_reduce(tensor) is tensor
+    assert tensor.equal(torch.tensor([1.0, 2.0]))
+
+
+@pytest.mark.parametrize(
+    ("op", "reduce_op"),
+    [
+        ("sum", dist.ReduceOp.SUM),
+        ("min", dist.ReduceOp.MIN),
+        ("max", dist.ReduceOp.MAX),
+        ("product", dist.ReduceOp.PRODUCT),
+    ],
+)
+def test_all_reduce_distributed(op: str, reduce_op: Any) -> None:
+    tensor = torch.tensor([1.0, 2.0])
+    with (
+        patch("lightcat.utils.distributed.is_distributed", lambda: True),
+        patch("lightcat.utils.distributed.dist.all_reduce") as reduce,
+    ):
+        assert all_reduce(tensor, op=op, group="group") is tensor
+        reduce.assert_called_once_with(tensor, op=reduce_op, group="group")
+
+
+def test_all_reduce_incorrect_op() -> None:
+    with pytest.raises(ValueError, match="Incorrect reduction operation: incorrect"):
+        all_reduce(torch.tensor([1.0]), op="incorrect")
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import torch
+
+from lightcat.utils.hashing import hash_config, hash_state_dict
+
+#################################
+#     Tests for hash_config     #
+#################################
+
+
+def test_hash_config_same() -> None:
+    assert hash_config({"b": 1, "a": [1, 2]}) == hash_config({"a": [1, 2], "b": 1})
+
+
+def test_hash_config_different() -> None:
+    assert hash_config({"a": 1}) != hash_config({"a": 2})
+
+
+def test_hash_config_not_serializable() -> None:
+    assert hash_config({"dtype": torch.float32}) == hash_config({"dtype": "torch.float32"})
+
+
+#####################################
+#     Tests for hash_state_dict     #
+#####################################
+
+
+def test_hash_state_dict_module() -> None:
+    module = torch.nn.Linear(4, 2)
+    assert hash_state_dict(module) == hash_state_dict(module.state_dict())
+
+
+def test_hash_state_dict_same_values() -> None:
+    assert hash_state_dict({"a": torch.ones(2, 3)}) == hash_state_dict({"a": torch.ones(2, 3)})
+
+
+def test_hash_state_dict_different_values() -> None:
+    assert hash_state_dict({"a": torch.ones(2, 3)}) != hash_state_dict({"a": torch.zeros(2, 3)})
+
+
+def test_hash_state_dict_different_shape() -> None:
+    assert hash_state_dict({"a": torch.ones(2, 3)}) != hash_state_dict({"a": torch.ones(3, 2)})
+
+
+def test_hash_state_dict_different_dtype() -> None:
+    assert hash_state_dict({"a": torch.ones(2, dtype=torch.float32)}) != hash_state_dict(
+        {"a": torch.ones(2, dtype=torch.int32)}
+    )
+
+
+def test_hash_state_dict_different_keys() -> None:
+    assert hash_state_dict({"a": torch.ones(2)}) != hash_state_dict({"b": torch.ones(2)})
+
+
+def test_hash_state_dict_bfloat16_scalar() -> None:
+    assert hash_state_dict({"a": torch.tensor(1.0, dtype=torch.bfloat16)}) != hash_state_dict(
+        {"a": torch.tensor(2.0, dtype=torch.bfloat16)}
+    )
+
+
+def test_hash_state_dict_non_tensor() -> None:
+    assert hash_state_dict({"a": 1}) != hash_state_dict({"a": 2})
@@ -6,13 +6,22 @@ import pytest
 
 from lightcat.utils.imports import (
     check_karbonn,
+    check_numpy,
     check_objectory,
+    check_onnx,
+    check_onnxruntime,
     check_torchmetrics,
     is_karbonn_available,
+    is_numpy_available,
     is_objectory_available,
+    is_onnx_available,
+    is_onnxruntime_available,
     is_torchmetrics_available,
     karbonn_available,
+    numpy_available,
     objectory_available,
+    onnx_available,
+    onnxruntime_available,
     torchmetrics_available,
 )
 
@@ -75,6 +84,60 @@ def test_karbonn_available_decorator_without_package() -> None:
         assert fn(2) is None
 
 
+#################
+#     numpy     #
+#################
+
+
+def test_check_numpy_with_package() -> None:
+    with patch("lightcat.utils.imports.is_numpy_available", lambda: True):
+        check_numpy()
+
+
+def test_check_numpy_without_package() -> None:
+    with (
+        patch("lightcat.utils.imports.is_numpy_available", lambda: False),
+        pytest.raises(RuntimeError, match="'numpy' package is required but not installed."),
+    ):
+        check_numpy()
+
+
+def test_is_numpy_available() -> None:
+    assert isinstance(is_numpy_available(), bool)
+
+
+def test_numpy_available_with_package() -> None:
+    with patch("lightcat.utils.imports.is_numpy_available", lambda: True):
+        fn = numpy_available(my_function)
+        assert fn(2) == 44
+
+
+def test_numpy_available_without_package() -> None:
+    with patch("lightcat.utils.imports.is_numpy_available", lambda: False):
+        fn = numpy_available(my_function)
+        assert fn(2) is None
+
+
+def test_numpy_available_decorator_with_package() -> None:
+    with patch("lightcat.utils.imports.is_numpy_available", lambda: True):
+
+        @numpy_available
+        def fn(n: int = 0) -> int:
+            return 42 + n
+
+        assert fn(2) == 44
+
+
+def test_numpy_available_decorator_without_package() -> None:
+    with patch("lightcat.utils.imports.is_numpy_available", lambda: False):
+
+        @numpy_available
+        def fn(n: int = 0) -> int:
+            return 42 + n
+
+        assert fn(2) is None
+
+
 #####################
 #     objectory     #
 #####################
@@ -129,6 +192,114 @@ def test_objectory_available_decorator_without_package() -> None:
         assert fn(2) is None
 
 
+################
+#     onnx     #
+################
+
+
+def test_check_onnx_with_package() -> None:
+    with patch("lightcat.utils.imports.is_onnx_available", lambda: True):
+        check_onnx()
+
+
+def test_check_onnx_without_package() -> None:
+    with (
+        patch("lightcat.utils.imports.is_onnx_available", lambda: False),
+        pytest.raises(RuntimeError, match="'onnx' package is required but not installed."),
+    ):
+        check_onnx()
+
+
+def test_is_onnx_available() -> None:
+    assert isinstance(is_onnx_available(), bool)
+
+
+def test_onnx_available_with_package() -> None:
+    with patch("lightcat.utils.imports.is_onnx_available", lambda: True):
+        fn = onnx_available(my_function)
+        assert fn(2) == 44
+
+
+def test_onnx_available_without_package() -> None:
+    with patch("lightcat.utils.imports.is_onnx_available", lambda: False):
+        fn = onnx_available(my_function)
+        assert fn(2) is None
+
+
+def test_onnx_available_decorator_with_package() -> None:
+    with patch("lightcat.utils.imports.is_onnx_available", lambda: True):
+
+        @onnx_available
+        def fn(n: int = 0) -> int:
+            return 42 + n
+
+        assert fn(2) == 44
+
+
+def test_onnx_available_decorator_without_package() -> None:
+    with patch("lightcat.utils.imports.is_onnx_available", lambda: False):
+
+        @onnx_available
+        def fn(n: int = 0) -> int:
+            return 42 + n
+
+        assert fn(2) is None
+
+
+#######################
+#     onnxruntime     #
+#######################
+
+
+def test_check_onnxruntime_with_package() -> None:
+    with patch("lightcat.utils.imports.is_onnxruntime_available", lambda: True):
+        check_onnxruntime()
+
+
+def test_check_onnxruntime_without_package() -> None:
+    with (
+        patch("lightcat.utils.imports.is_onnxruntime_available", lambda: False),
+        pytest.raises(RuntimeError, match="'onnxruntime' package is required but not installed."),
+    ):
+        check_onnxruntime()
+
+
+def test_is_onnxruntime_available() -> None:
+    assert isinstance(is_onnxruntime_available(), bool)
+
+
+def test_onnxruntime_available_with_package() -> None:
+    with patch("lightcat.utils.imports.is_onnxruntime_available", lambda: True):
+        fn = onnxruntime_available(my_function)
+        assert fn(2) == 44
+
+
+def test_onnxruntime_available_without_package() -> None:
+    with patch("lightcat.utils.imports.is_onnxruntime_available", lambda: False):
+        fn = onnxruntime_available(my_function)
+        assert fn(2) is None
+
+
+def test_onnxruntime_available_decorator_with_package() -> None:
+    with patch("lightcat.utils.imports.is_onnxruntime_available", lambda: True):
+
+        @onnxruntime_available
+        def fn(n: int = 0) -> int:
+            return 42 + n
+
+        assert fn(2) == 44
+
+
+def test_onnxruntime_available_decorator_without_package() -> None:
+    with patch("lightcat.utils.imports.is_onnxruntime_available", lambda: False):
+
+        @onnxruntime_available
+        def fn(n: int = 0) -> int:
+            return 42 + n
+
+        assert fn(2) is None
+
+
 ########################
 #     torchmetrics     #
 ########################
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
+import torch
+from torch import distributed as dist
+from torch import multiprocessing as mp
+
+from lightcat.testing import torchmetrics_available
+from lightcat.utils.imports import is_torchmetrics_available
+from lightcat.utils.metric import supports_fused_sync, sync_metric_states
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+if is_torchmetrics_available():
+    from torchmetrics import MaxMetric, MeanMetric, MinMetric
+    from torchmetrics.classification import BinaryAccuracy, BinaryAUROC
+
+
+def sync_worker(rank: int, world_size: int, init_file: str, output_file: str) -> None:
+    dist.init_process_group(
+        "gloo", init_method=f"file://{init_file}", rank=rank, world_size=world_size
+    )
+    try:
+        accuracy = BinaryAccuracy(sync_on_compute=False)
+        accuracy.update(torch.tensor([0.9, 0.1]), torch.tensor([1, rank]))
+        mean = MeanMetric(sync_on_compute=False)
+        mean.update(torch.tensor([1.0, 2.0]) * (rank + 1))
+        maximum = MaxMetric(sync_on_compute=False)
+        maximum.update(torch.tensor(float(rank)))
+        # This metric is only updated by the process 1.
+        partial = MeanMetric(sync_on_compute=False)
+        if rank == 1:
+            partial.update(torch.tensor(3.0))
+        sync_metric_states([accuracy, mean, maximum, partial])
+        if rank == 0:
+            torch.save(
+                {
+                    "accuracy": accuracy.compute(),
+                    "tp": accuracy.tp,
+                    "mean": mean.compute(),
+                    "max": maximum.compute(),
+                    "partial_update_called": partial.update_called,
+                    "partial": partial.compute(),
+                },
+                output_file,
+            )
+    finally:
+        dist.destroy_process_group()
+
+
+#########################################
+#     Tests for supports_fused_sync     #
+#########################################
+
+
+@torchmetrics_available
+def test_supports_fused_sync_true() -> None:
+    assert supports_fused_sync(BinaryAccuracy())
+
+
+@torchmetrics_available
+def test_supports_fused_sync_false() -> None:
+    assert not supports_fused_sync(BinaryAUROC())
+
+
+########################################
+#     Tests for sync_metric_states     #
+########################################
+
+
+@torchmetrics_available
+def test_sync_metric_states_not_distributed() -> None:
+    metric = BinaryAccuracy()
+    metric.update(torch.tensor([0.9, 0.2]), torch.tensor([1, 1]))
+    with patch("lightcat.utils.metric.all_reduce") as all_reduce:
+        sync_metric_states([metric])
+        all_reduce.assert_not_called()
+    assert metric.tp.equal(torch.tensor([1]))
+
+
+@torchmetrics_available
+def test_sync_metric_states_unsupported() -> None:
+    with pytest.raises(ValueError, match="BinaryAUROC cannot be synchronized"):
+        sync_metric_states([BinaryAccuracy(), BinaryAUROC()])
+
+
+@torchmetrics_available
+def test_sync_metric_states_distributed() -> None:
+    accuracy = BinaryAccuracy()
+    accuracy.update(torch.tensor([0.9, 0.2, 0.8]), torch.tensor([1, 1, 0]))
+    mean = MeanMetric()
+    mean.update(torch.tensor([1.0, 2.0]))
+    minimum = MinMetric()
+    minimum.update(torch.tensor([1.0, 2.0]))
+    calls = []
+
+    def all_reduce(tensor: torch.Tensor, op: str, group: str) -> torch.Tensor:
+        calls.append((tensor.numel(), op, group))
+        # Simulate two processes with the same states.
+        return tensor * 2 if op == "sum" else tensor
+
+    with (
+        patch("lightcat.utils.metric.is_distributed", lambda: True),
+        patch("lightcat.utils.metric.get_world_size", lambda: 2),
+        patch("lightcat.utils.metric.all_reduce", all_reduce),
+    ):
+        sync_metric_states([accuracy, mean, minimum], group="group")
+    # One all-reduce for the states reduced with a sum, and one for the
+    # states reduced with a minimum.
+    # The numbers of updates are added to the buffer of the sums.
+    assert calls == [(9, "sum", "group"), (1, "min", "group")]
+    assert accuracy.tp.equal(torch.tensor([2]))
+    assert accuracy.fp.equal(torch.tensor([2]))
+    assert accuracy.fn.equal(torch.tensor([2]))
+    assert accuracy.tn.equal(torch.tensor([0]))
+    assert accuracy.tp.dtype == torch.int64
+    assert mean.mean_value.equal(torch.tensor(6.0))
+    assert mean.weight.equal(torch.tensor(4.0))
+    assert minimum.min_value.equal(torch.tensor(1.0))
+    assert [accuracy._update_count, mean._update_count, minimum._update_count] == [2, 2, 2]
+
+
+@torchmetrics_available
+def test_sync_metric_states_gloo(tmp_path: Path) -> None:
+    output_file = tmp_path.joinpath("output.pt")
+    mp.spawn(
+        sync_worker,
+        args=(2, str(tmp_path.joinpath("init")), str(output_file)),
+        nprocs=2,
+        join=True,
+    )
+    output = torch.load(output_file)
+    # rank 0: tp=1, tn=1; rank 1: tp=1, fn=1.
+    assert output["tp"].equal(torch.tensor([2]))
+    assert output["accuracy"].equal(torch.tensor(0.75))
+    assert output["mean"].equal(torch.tensor(2.25))
+    assert output["max"].equal(torch.tensor(1.0))
+    assert output["partial_update_called"]
+    assert output["partial"].equal(torch.tensor(3.0))
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import torch
+
+from lightcat.utils.modules import ModuleMatcher, get_class
+
+###################################
+#     Tests for ModuleMatcher     #
+###################################
+
+
+def test_module_matcher_empty() -> None:
+    assert not ModuleMatcher().match("0.weight", torch.nn.Linear(4, 8))
+
+
+def test_module_matcher_names_search() -> None:
+    matcher = ModuleMatcher(names=[r"bias"])
+    assert matcher.match("0.bias", torch.nn.Linear(4, 8))
+    assert not matcher.match("0.weight", torch.nn.Linear(4, 8))
+
+
+def test_module_matcher_names_fullmatch() -> None:
+    matcher = ModuleMatcher(names=[r"encoder\.\d+"], fullmatch=True)
+    assert matcher.match("encoder.0", torch.nn.Linear(4, 8))
+    assert not matcher.match("encoder.0.linear", torch.nn.Linear(4, 8))
+
+
+def test_module_matcher_types_class() -> None:
+    matcher = ModuleMatcher(types=[torch.nn.LayerNorm])
+    assert matcher.match("1", torch.nn.LayerNorm(8))
+    assert not matcher.match("0", torch.nn.Linear(4, 8))
+
+
+def test_module_matcher_types_import_path() -> None:
+    matcher = ModuleMatcher(types=["torch.nn.LayerNorm"])
+    assert matcher.match("1", torch.nn.LayerNorm(8))
+    assert not matcher.match("0", torch.nn.Linear(4, 8))
+
+
+def test_module_matcher_types_class_name() -> None:
+    matcher = ModuleMatcher(types=["LayerNorm"])
+    assert matcher.match("1", torch.nn.LayerNorm(8))
+    assert not matcher.match("0", torch.nn.Linear(4, 8))
+
+
+def test_module_matcher_types_base_class_name() -> None:
+    class MyLinear(torch.nn.Linear):
+        pass
+
+    assert ModuleMatcher(types=["Linear"]).match("0", MyLinear(4, 8))
+
+
+###############################
+#     Tests for get_class     #
+###############################
+
+
+def test_get_class_class() -> None:
+    assert get_class(torch.nn.Linear) is torch.nn.Linear
+
+
+def test_get_class_import_path() -> None:
+    assert get_class("torch.nn.Linear") is torch.nn.Linear
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from unittest.mock import Mock
+
+import pytest
+
+from lightcat.utils.timing import measure
+
+#############################
+#     Tests for measure     #
+#############################
+
+
+def test_measure() -> None:
+    fn = Mock()
+    stats = measure(fn, number=3, repeat=4, warmup=2)
+    assert fn.call_count == 14
+    assert stats["number"] == 3
+    assert stats["repeat"] == 4
+    assert 0 <= stats["min"] <= stats["median"] <= stats["max"]
+    assert stats["min"] <= stats["mean"] <= stats["max"]
+    assert stats["stdev"] >= 0
+
+
+def test_measure_repeat_1() -> None:
+    assert measure(Mock(), number=1, repeat=1, warmup=0)["stdev"] == 0.0
+
+
+@pytest.mark.parametrize("number", [0, -1])
+def test_measure_incorrect_number(number: int) -> None:
+    with pytest.raises(ValueError, match="number must be greater than 0"):
+        measure(Mock(), number=number)
+
+
+@pytest.mark.parametrize("repeat", [0, -1])
+def test_measure_incorrect_repeat(repeat: int) -> None:
+    with pytest.raises(ValueError, match="repeat must be greater than 0"):
+        measure(Mock(), repeat=repeat)